@@ -1,8 +1,48 @@
+import { useEffect, useState } from 'react';
+import { workersService, type ClusterStatus } from '../../services/workers';
+
 export function GPUMonitor() {
+  const [cluster, setCluster] = useState<ClusterStatus | null>(null);
+
+  useEffect(() => {
+    let isMounted = true;
+
+    const fetchStatus = async () => {
+      try {
+        const data = await workersService.getClusterStatus();
+        if (isMounted) setCluster(data);
+      } catch (err) {
+        console.error("Erro ao consultar Workers:", err);
+        if (isMounted) setCluster(null);
+      }
+    };
+
+    // Carga inicial + polling (heartbeats são publicados a cada ~5s)
+    fetchStatus();
+    const intervalId = setInterval(() => {
+      if (!document.hidden) fetchStatus();
+    }, 5000);
+
+    return () => {
+      isMounted = false;
+      clearInterval(intervalId);
+    };
+  }, []);
+
+  const online = cluster !== null && cluster.total_workers > 0;
+  const saturated = online && cluster.idle_workers === 0;
+
+  const dotColor = !online ? 'bg-red-500' : saturated ? 'bg-yellow-500' : 'bg-green-500';
+  const label = !online
+    ? 'Worker Offline'
+    : `${cluster.busy_workers}/${cluster.total_workers} Workers Ocupados`;
+  const gpu = cluster?.avg_gpu_utilization_percent;
+
   return (
     <span className="text-xs text-textSec bg-surface px-3 py-1 rounded-full border border-white/10">
-        <span className="w-2 h-2 rounded-full bg-green-500 inline-block mr-1 animate-pulse"></span>
-        Worker Online
+        <span className={`w-2 h-2 rounded-full ${dotColor} inline-block mr-1 ${online ? 'animate-pulse' : ''}`}></span>
+        {label}
+        {online && gpu != null && <span className="ml-2">GPU {Math.round(gpu)}%</span>}
     </span>
   );
-}
\ No newline at end of file
+}
@@ -9,9 +9,10 @@ interface JobCardProps {
     };
     onDownload: (id: string) => void;
     onView?: () => void; // <--- Nova Prop Opcional
+    onCancel?: (id: string) => void;
 }
 
-export function JobCard({ job, onDownload, onView }: JobCardProps) {
+export function JobCard({ job, onDownload, onView, onCancel }: JobCardProps) {
     
     const dateFormatted = new Date(job.created_at).toLocaleDateString('pt-BR', {
         day: '2-digit', month: 'short', hour: '2-digit', minute: '2-digit'
@@ -99,24 +100,36 @@ export function JobCard({ job, onDownload, onView }: JobCardProps) {
                     </div>
                     <p className="text-xs text-textSec mb-4 line-clamp-2 h-8">{description}</p>
                     
-                    <div className="w-full bg-gunmetal rounded-full h-1.5 overflow-hidden">
-                        <div className="bg-amber-500 h-full rounded-full w-1/3 animate-pulse"></div>
+                    <div className="flex items-center gap-3">
+                        <div className="w-full bg-gunmetal rounded-full h-1.5 overflow-hidden">
+                            <div className="bg-amber-500 h-full rounded-full w-1/3 animate-pulse"></div>
+                        </div>
+                        {onCancel && (
+                            <button
+                                onClick={() => onCancel(job.id)}
+                                className="text-textSec hover:text-danger transition-colors text-xs flex items-center gap-1 shrink-0"
+                                title="Cancelar job"
+                            >
+                                <i className="fa-solid fa-ban"></i> Cancelar
+                            </button>
+                        )}
                     </div>
                 </div>
             </div>
         );
     }
 
-    // 3. STATUS: FALHA (Vermelho)
+    // 3. STATUS: FALHA / CANCELADO (Vermelho)
+    const isCancelled = job.status === 'CANCELLED';
     return (
         <div className="bg-surface rounded-xl border border-white/5 overflow-hidden opacity-80 hover:opacity-100 transition-opacity relative">
             <div className="absolute top-3 left-3 z-10 bg-danger/10 px-2 py-1 rounded text-xs font-bold text-danger border border-danger/20 flex items-center gap-1">
-                <i className="fa-solid fa-triangle-exclamation"></i> FALHA
+                <i className={isCancelled ? "fa-solid fa-ban" : "fa-solid fa-triangle-exclamation"}></i> {isCancelled ? 'CANCELADO' : 'FALHA'}
             </div>
 
             <div className="h-48 bg-gunmetal/50 flex flex-col items-center justify-center text-textSec">
                 <i className="fa-solid fa-heart-crack text-3xl mb-2 opacity-20"></i>
-                <span className="text-xs">Erro na Geração</span>
+                <span className="text-xs">{isCancelled ? 'Cancelado pelo usuário' : 'Erro na Geração'}</span>
             </div>
 
             <div className="p-4">
@@ -124,7 +137,7 @@ export function JobCard({ job, onDownload, onView }: JobCardProps) {
                     <h3 className="font-semibold text-white truncate pr-2">{title}</h3>
                     <span className="text-[10px] text-textSec border border-white/10 px-1.5 rounded bg-gunmetal">{modelBadge}</span>
                 </div>
-                 <p className="text-xs text-textSec mb-4 line-clamp-2 h-8">Falha técnica.</p>
+                 <p className="text-xs text-textSec mb-4 line-clamp-2 h-8">{isCancelled ? 'Job cancelado.' : 'Falha técnica.'}</p>
 
                 <div className="flex justify-between items-center pt-3 border-t border-white/5">
                     <span className="text-[10px] text-textSec capitalize">{dateFormatted}</span>
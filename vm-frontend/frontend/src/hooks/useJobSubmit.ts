@@ -1,5 +1,5 @@
 import { useState } from 'react';
-import { jobsService, type JobCreate } from '../services/jobs';
+import { jobsService, sha256Hex, MULTIPART_THRESHOLD, type JobCreate } from '../services/jobs';
 
 interface SubmitProps {
     mode: 'TEXT' | 'IMAGE';
@@ -51,18 +51,27 @@ export function useJobSubmit() {
                 // --- FLUXO 2: IMAGEM (Stable Fast 3D) ---
                 if (!file) throw new Error("Selecione uma imagem de referência (PNG/JPG).");
 
-                // Passo A: Ticket de Upload
-                const ticket = await jobsService.getUploadTicket(file.name, file.type);
+                let objectName: string;
+                if (file.size > MULTIPART_THRESHOLD) {
+                    // Passos A+B para arquivos grandes: partes em paralelo, retomáveis
+                    objectName = await jobsService.uploadFileMultipart(file);
+                } else {
+                    // Passo A: Ticket de Upload (com o hash, imagens já enviadas não sobem de novo)
+                    const ticket = await jobsService.getUploadTicket(file.name, file.type, await sha256Hex(file));
 
-                // Passo B: Upload Binário Direto (MinIO)
-                await jobsService.uploadFileToStorage(ticket.upload_url, file);
+                    // Passo B: Upload Binário Direto (MinIO)
+                    if (ticket.upload_required && ticket.upload_url) {
+                        await jobsService.uploadFileToStorage(ticket.upload_url, file, ticket.checksum_sha256);
+                    }
+                    objectName = ticket.object_name;
+                }
 
                 // Passo C: Criação do Job
                 payload = {
                     model_id: 'sf3d-v1',
                     // Prompt omitido (ou null) pois é Image-to-3D
                     input_params: {
-                        input_path: ticket.object_name, // Caminho no Storage
+                        input_path: objectName, // Caminho no Storage
                         texture_resolution: textureRes,
                         remesh_option: remesh,
                         foreground_ratio: 0.85 
@@ -26,6 +26,17 @@ export function Gallery() {
     }
   };
 
+  // Cancelamento (o card muda de estado no próximo ciclo do polling)
+  const handleCancel = async (id: string) => {
+    if (!window.confirm("Cancelar este job? O processamento será interrompido.")) return;
+    try {
+        await jobsService.cancelJob(id);
+    } catch (err) {
+        console.error("Erro ao cancelar:", err);
+        alert("Não foi possível cancelar o job.");
+    }
+  };
+
   // --- NOVA FUNÇÃO: VISUALIZAR ---
   const handleView = async (job: JobRead) => {
       try {
@@ -116,6 +127,7 @@ export function Gallery() {
                     job={job} 
                     onDownload={handleDownload}
                     onView={() => handleView(job)} // <--- Passamos a função aqui
+                    onCancel={handleCancel}
                 />
             ))}
          </div>
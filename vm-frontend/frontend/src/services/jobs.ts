@@ -14,24 +14,91 @@ export interface JobCreate {
 export interface JobRead {
     id: string;
     model_id: string;
-    status: 'QUEUED' | 'PROCESSING' | 'SUCCEEDED' | 'FAILED';
+    status: 'QUEUED' | 'PROCESSING' | 'SUCCEEDED' | 'FAILED' | 'CANCELLED';
     progress_percent: number;
     created_at: string; // ISO String
     started_at?: string | null;
     completed_at?: string | null;
     prompt: string | null; // Pode ser null no SF3D
     input_params: Record<string, any>; // Dicionário flexível
+    retry_count?: number; // Reenfileiramentos automáticos (Worker morreu durante o job)
+    trace_id?: string | null; // ID do trace (busca dos spans do job)
+    estimated_start?: string | null; // Previsão de início (só em jobs não finalizados)
+    estimated_completion?: string | null; // Previsão de término
 }
 
 // Resposta do Endpoint de Ticket de Upload
 export interface ArtifactUploadResponse {
-    upload_url: string; // URL Assinada do MinIO (PUT)
+    upload_url: string | null; // URL Assinada do MinIO (PUT). null quando o arquivo já existe
     object_name: string; // Caminho interno (uploads/inputs/...) para salvar no banco
+    upload_required: boolean; // false: mesmo conteúdo (SHA-256) já está no Storage, pule o PUT
+    checksum_sha256?: string | null; // Header x-amz-checksum-sha256 exigido pela URL assinada
+}
+
+/**
+ * SHA-256 (hex) do arquivo, para a deduplicação de uploads.
+ * Retorna undefined fora de contexto seguro (HTTP sem TLS não expõe crypto.subtle).
+ */
+export const sha256Hex = async (file: File): Promise<string | undefined> => {
+    if (!window.crypto?.subtle) return undefined;
+    const digest = await window.crypto.subtle.digest('SHA-256', await file.arrayBuffer());
+    return Array.from(new Uint8Array(digest)).map((b) => b.toString(16).padStart(2, '0')).join('');
+};
+
+// Resposta dos Endpoints de Upload Multipart (arquivos grandes)
+export interface MultipartUploadResponse {
+    upload_id: string;
+    object_name: string; // Caminho final (enviar ao criar o Job)
+    part_size: number; // Bytes por parte (a última pode ser menor)
+    part_count: number;
+    parts: { part_number: number; upload_url: string }[]; // Partes que ainda faltam enviar
+    uploaded_parts: number[]; // Partes já recebidas (retomada)
+    expires_in: number;
+}
+
+// Acima disso o upload vai em partes paralelas (e retomáveis) em vez de um único PUT
+export const MULTIPART_THRESHOLD = 16 * 1024 * 1024;
+const MULTIPART_CONCURRENCY = 4;
+const MULTIPART_MAX_RESUMES = 3;
+
+// Estatísticas da malha calculadas pelo Worker (Artifact.metadata do OUTPUT_MODEL)
+export interface MeshMetadata {
+    format: string;
+    geometry_count: number;
+    vertex_count: number;
+    face_count: number;
+    has_colors: boolean;
+    has_texture: boolean;
+    texture_width: number | null;
+    texture_height: number | null;
+    bbox_min?: number[];
+    bbox_max?: number[];
+    glb_chunks?: Record<string, number> | null; // Bytes por chunk do GLB (total, json, bin)
 }
 
 interface ArtifactDownload {
     download_url: string;
     expires_in: number;
+    metadata?: MeshMetadata | null;
+}
+
+// Conversão de formato sob demanda (POST /jobs/{id}/conversions)
+export type ConversionFormat = 'usdz' | 'ply' | 'stl' | 'obj' | 'glb'; // glb: variante com texturas recodificadas/reduzidas
+
+export interface ConversionOptions {
+    scale?: number;
+    up_axis?: 'y' | 'z';
+    texture_format?: 'jpeg' | 'webp' | 'png'; // Só para 'glb'
+    texture_quality?: number;
+    max_texture_size?: number;
+}
+
+export interface ConversionResponse {
+    status: 'READY' | 'PENDING' | 'FAILED';
+    format: ConversionFormat;
+    download_url?: string | null; // Preenchido quando READY
+    expires_in?: number | null;
+    error?: string | null;
 }
 
 // --- Service Layer ---
@@ -41,10 +108,11 @@ export const jobsService = {
      * Passo 1 do Upload: Pede permissão ao Backend.
      * Retorna uma URL assinada temporária para fazer o PUT direto no Storage.
      */
-    getUploadTicket: async (filename: string, contentType: string) => {
+    getUploadTicket: async (filename: string, contentType: string, sha256?: string) => {
         const response = await api.post<ArtifactUploadResponse>('/jobs/upload-ticket', {
             filename,
-            content_type: contentType
+            content_type: contentType,
+            sha256
         });
         return response.data;
     },
@@ -54,10 +122,12 @@ export const jobsService = {
      * NOTA: Usamos axios puro para NÃO enviar o header 'x-api-key', 
      * pois o MinIO rejeitaria a requisição assinada.
      */
-    uploadFileToStorage: async (presignedUrl: string, file: File) => {
+    uploadFileToStorage: async (presignedUrl: string, file: File, checksumSha256?: string | null) => {
         await axios.put(presignedUrl, file, {
             headers: {
-                'Content-Type': file.type
+                'Content-Type': file.type,
+                // Assinado na URL: o Storage recusa o upload se o conteúdo não bater com o hash
+                ...(checksumSha256 ? { 'x-amz-checksum-sha256': checksumSha256 } : {})
             },
             // Monitoramento de progresso de upload (útil para barras de progresso futuras)
             onUploadProgress: (progressEvent) => {
@@ -67,6 +137,44 @@ export const jobsService = {
         });
     },
 
+    /**
+     * Passos 1 e 2 para arquivos grandes: upload multipart com partes em paralelo.
+     * Se partes falharem, retoma pedindo ao Backend as que faltam (com URLs novas).
+     * Retorna o object_name para a criação do Job.
+     */
+    uploadFileMultipart: async (file: File) => {
+        let ticket = (await api.post<MultipartUploadResponse>('/jobs/upload-ticket/multipart', {
+            filename: file.name,
+            content_type: file.type,
+            size: file.size
+        })).data;
+
+        for (let attempt = 0; ; attempt++) {
+            const pending = [...ticket.parts];
+            const { part_size } = ticket;
+            const sendParts = async () => {
+                for (let part = pending.shift(); part; part = pending.shift()) {
+                    const begin = (part.part_number - 1) * part_size;
+                    await axios.put(part.upload_url, file.slice(begin, begin + part_size));
+                }
+            };
+            try {
+                await Promise.all(Array.from({ length: MULTIPART_CONCURRENCY }, sendParts));
+                break;
+            } catch (error) {
+                if (attempt >= MULTIPART_MAX_RESUMES) {
+                    await api.delete(`/jobs/upload-ticket/multipart/${ticket.upload_id}`);
+                    throw error;
+                }
+                ticket = (await api.get<MultipartUploadResponse>(`/jobs/upload-ticket/multipart/${ticket.upload_id}`)).data;
+            }
+        }
+
+        // Sem a lista de ETags: o Backend usa as partes que o Storage recebeu
+        await api.post(`/jobs/upload-ticket/multipart/${ticket.upload_id}/complete`, {});
+        return ticket.object_name;
+    },
+
     /**
      * Passo 3 (Final): Cria o Job de fato no banco de dados.
      */
@@ -84,11 +192,27 @@ export const jobsService = {
         return response.data;
     },
 
+    /**
+     * Cancela um job na fila ou em execução (libera a GPU na hora).
+     */
+    cancelJob: async (jobId: string) => {
+        const response = await api.post<JobRead>(`/jobs/${jobId}/cancel`);
+        return response.data;
+    },
+
     /**
      * Obtém a URL assinada para baixar o GLB final.
      */
     getDownloadUrl: async (jobId: string) => {
         const response = await api.get<ArtifactDownload>(`/jobs/${jobId}/download`);
         return response.data.download_url;
+    },
+
+    /**
+     * Pede o modelo em outro formato. PENDING: repetir a chamada até READY (pedidos iguais não duplicam o trabalho).
+     */
+    requestConversion: async (jobId: string, format: ConversionFormat, options?: ConversionOptions) => {
+        const response = await api.post<ConversionResponse>(`/jobs/${jobId}/conversions`, { format, options });
+        return response.data;
     }
 };
\ No newline at end of file
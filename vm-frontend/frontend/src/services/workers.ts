@@ -0,0 +1,50 @@
+import { api } from './api';
+
+// --- Interfaces (Contratos de Dados) ---
+
+export interface GpuSample {
+    index: number;
+    name: string;
+    utilization_percent: number;
+    memory_used_bytes: number;
+    memory_total_bytes: number;
+}
+
+export interface WorkerHeartbeat {
+    name: string;
+    hostname: string;
+    queues: string[];
+    state: 'busy' | 'idle';
+    job_id: string | null;
+    model_id: string | null;
+    stage: string | null;
+    cpu_percent: number;
+    rss_bytes: number;
+    gpus: GpuSample[];
+}
+
+// Resposta de GET /workers/cluster (contagens e GPUs: só Workers da fila de geração)
+export interface ClusterStatus {
+    total_workers: number;
+    busy_workers: number;
+    idle_workers: number;
+    other_workers: number;
+    total_gpus: number;
+    avg_gpu_utilization_percent: number | null;
+    gpu_memory_used_bytes: number;
+    gpu_memory_total_bytes: number;
+    jobs_by_model: Record<string, number>;
+    workers: WorkerHeartbeat[]; // Vazia para não administradores
+}
+
+// --- Service Layer ---
+
+export const workersService = {
+    /**
+     * Visão agregada dos Workers vivos (heartbeats com TTL no Redis).
+     */
+    getClusterStatus: async () => {
+        const response = await api.get<ClusterStatus>('/workers/cluster');
+        return response.data;
+    }
+};
@@ -19,6 +19,7 @@ export default defineConfig(({ mode }) => {
           target: apiTarget, // <--- Usa a variável dinâmica
           changeOrigin: true,
           secure: false,
+          xfwd: true, // Repassa o IP do navegador (X-Forwarded-For) para o throttling de login da API
         }
       }
     }
@@ -0,0 +1,152 @@
+import os
+import math
+import logging
+import tempfile
+import zipfile
+from pathlib import Path
+
+import trimesh
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.glb_textures import reencode_glb_textures
+from app.core.heartbeat import redis_conn
+from app.core.storage import storage
+from app.core.tracing import trace_span
+from app.models.artifact_model import Artifact, ArtifactType
+
+logger = logging.getLogger(__name__)
+
+# Mesmas chaves da API (app/core/conversion.py no backend): trava de conversão em andamento e falha recente
+CONVERSION_PENDING_KEY = "conversion:pending:{key}"
+CONVERSION_FAILED_KEY = "conversion:failed:{key}"
+
+def _load_mesh(path: str, options: dict) -> trimesh.Trimesh:
+    """
+    Carrega o modelo de origem como uma malha única (cena achatada) e aplica as opções de exportação.
+    """
+    mesh = trimesh.load(path, force="mesh")
+    if options.get("up_axis") == "z":
+        # Os GLBs do pipeline são Y-up (glTF); formatos de CAD/impressão costumam ser Z-up
+        mesh.apply_transform(trimesh.transformations.rotation_matrix(math.radians(90), [1, 0, 0]))
+    scale = options.get("scale", 1.0)
+    if scale != 1.0:
+        mesh.apply_scale(scale)
+    return mesh
+
+def _export_obj_zip(mesh: trimesh.Trimesh, output_path: str) -> None:
+    """
+    OBJ + MTL + texturas num ZIP (o OBJ sozinho perde material e textura).
+    """
+    obj_text, textures = trimesh.exchange.obj.export_obj(
+        mesh, include_texture=True, return_texture=True, mtl_name="model.mtl"
+    )
+    with zipfile.ZipFile(output_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("model.obj", obj_text)
+        for name, data in textures.items():
+            archive.writestr(name, data)
+
+def _export_usdz(mesh: trimesh.Trimesh, output_path: str, work_dir: str) -> None:
+    """
+    USDZ (AR Quick Look) via usd-core: malha com cores de vértice, sem textura.
+    Dependência opcional, só necessária nos Workers de conversão.
+    """
+    try:
+        from pxr import Usd, UsdGeom, UsdUtils, Vt, Gf
+    except ImportError as e:
+        raise RuntimeError("Conversão para USDZ requer o pacote 'usd-core' no Worker.") from e
+
+    usdc_path = os.path.join(work_dir, "model.usdc")
+    stage = Usd.Stage.CreateNew(usdc_path)
+    UsdGeom.SetStageUpAxis(stage, UsdGeom.Tokens.y)
+    UsdGeom.SetStageMetersPerUnit(stage, 1.0)
+    root = UsdGeom.Xform.Define(stage, "/Model")
+    stage.SetDefaultPrim(root.GetPrim())
+
+    usd_mesh = UsdGeom.Mesh.Define(stage, "/Model/Mesh")
+    usd_mesh.CreatePointsAttr(Vt.Vec3fArray.FromNumpy(mesh.vertices.astype("float32")))
+    usd_mesh.CreateFaceVertexCountsAttr(Vt.IntArray([3] * len(mesh.faces)))
+    usd_mesh.CreateFaceVertexIndicesAttr(Vt.IntArray.FromNumpy(mesh.faces.reshape(-1).astype("int32")))
+    usd_mesh.CreateExtentAttr([Gf.Vec3f(*map(float, mesh.bounds[0])), Gf.Vec3f(*map(float, mesh.bounds[1]))])
+
+    if mesh.visual.kind == "vertex":
+        colors = mesh.visual.vertex_colors[:, :3].astype("float32") / 255.0
+        display_color = usd_mesh.CreateDisplayColorPrimvar(UsdGeom.Tokens.vertex)
+        display_color.Set(Vt.Vec3fArray.FromNumpy(colors))
+
+    stage.GetRootLayer().Save()
+    if not UsdUtils.CreateNewUsdzPackage(usdc_path, output_path):
+        raise RuntimeError("Falha ao empacotar o USDZ.")
+
+def convert_file(input_path: str, output_path: str, fmt: str, options: dict, work_dir: str) -> None:
+    """
+    Converte o modelo de origem (GLB) para 'fmt' (usdz, ply, stl, obj, glb).
+    'glb' é a variante com texturas recodificadas/reduzidas (só o contêiner é reescrito, sem recarregar a cena).
+    """
+    if fmt == "glb":
+        reencode_glb_textures(
+            input_path, output_path,
+            options.get("texture_format", "jpeg"),
+            options.get("texture_quality", 85),
+            options.get("max_texture_size"),
+        )
+        return
+
+    mesh = _load_mesh(input_path, options)
+    if fmt == "obj":
+        _export_obj_zip(mesh, output_path)
+    elif fmt == "usdz":
+        _export_usdz(mesh, output_path, work_dir)
+    elif fmt in ("ply", "stl"):
+        mesh.export(output_path, file_type=fmt)
+    else:
+        raise ValueError(f"Formato de conversão '{fmt}' não suportado.")
+
+def convert_artifact(source_artifact_id: str, source_path: str, target_path: str, fmt: str, options: dict,
+                     conversion_key: str) -> None:
+    """
+    Job RQ da fila de conversões (CPU, Workers separados dos de GPU): baixa o modelo de origem,
+    converte, sobe em 'target_path' e registra o artefato CONVERTED.
+    A API só enfileira uma conversão por chave (artefato, formato, opções); a trava é liberada aqui.
+    """
+    pending_key = CONVERSION_PENDING_KEY.format(key=conversion_key)
+    try:
+        with SessionLocal() as session:
+            # Corrida rara: a API enfileirou de novo logo após a conversão anterior liberar a trava
+            if session.query(Artifact.id).filter(Artifact.storage_path == target_path).first():
+                logger.info(f"Conversão {target_path} já existe. Nada a fazer.")
+                return
+
+        with trace_span("worker.convert_artifact", {"artifact.id": source_artifact_id, "conversion.format": fmt}), \
+                tempfile.TemporaryDirectory(prefix="conversion-") as temp_dir:
+            local_input = os.path.join(temp_dir, f"source{Path(source_path).suffix}")
+            local_output = os.path.join(temp_dir, f"converted{Path(target_path).suffix}")
+
+            storage.download_file(settings.MINIO_BUCKET, source_path, local_input)
+            convert_file(local_input, local_output, fmt, options, temp_dir)
+            storage.upload_file(local_output, settings.MINIO_BUCKET, target_path)
+
+            with SessionLocal() as session:
+                source = session.get(Artifact, source_artifact_id)
+                if source is None:
+                    # Origem apagada (retenção) durante a conversão: não registra um artefato sem Job
+                    logger.warning(f"Artefato de origem {source_artifact_id} não existe mais. Conversão descartada.")
+                    return
+                session.add(Artifact(
+                    job_id=source.job_id,
+                    type=ArtifactType.CONVERTED,
+                    storage_path=target_path,
+                    file_size_bytes=os.path.getsize(local_output),
+                    metadata_={"source_artifact_id": source_artifact_id, "format": fmt, "options": options}
+                ))
+                session.commit()
+            logger.info(f"Conversão {fmt} do artefato {source_artifact_id} concluída: {target_path}")
+
+    except Exception as e:
+        logger.error(f"Falha na conversão {fmt} do artefato {source_artifact_id}: {e}", exc_info=True)
+        # A API responde FAILED por um tempo (evita reenfileirar em loop uma conversão que sempre falha)
+        redis_conn.set(CONVERSION_FAILED_KEY.format(key=conversion_key), str(e), ex=settings.CONVERSION_FAILURE_TTL)
+        raise
+
+    finally:
+        redis_conn.delete(pending_key)
@@ -0,0 +1,135 @@
+import logging
+import os
+import signal
+import subprocess
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from app.core.config import settings
+from app.core.heartbeat import redis_conn, worker_name
+
+logger = logging.getLogger(__name__)
+
+# Chaves no Redis (mesmos nomes em vm-mgmnt/backend/app/core/cancellation.py)
+CANCEL_KEY = "job:cancel:{job_id}"      # Marca durável: cobre o cancelamento feito antes de começarmos a escutar
+CANCEL_CHANNEL = "worker:cancel:{name}" # Pub/Sub deste Worker (payload = job_id)
+
+_active_cancellation: ContextVar["JobCancellation | None"] = ContextVar("active_cancellation", default=None)
+
+class JobCancelled(Exception):
+    """
+    O usuário cancelou o job (POST /jobs/{id}/cancel). O status CANCELLED já foi gravado pela API.
+    """
+    def __init__(self, job_id: str, pid: int | None = None):
+        super().__init__(f"Job {job_id} cancelado pelo usuário.")
+        self.job_id = job_id
+        self.pid = pid # PID do Wrapper interrompido (None se o cancelamento ocorreu entre etapas)
+
+class JobCancellation:
+    """
+    Estado de cancelamento do job em execução.
+    Os Wrappers rodam em um grupo de processos próprio: no cancelamento, o grupo inteiro
+    (Wrapper + processo do modelo) recebe SIGTERM e, após JOB_CANCEL_GRACE segundos, SIGKILL.
+    """
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.event = threading.Event()
+        self._process: subprocess.Popen | None = None
+        self._lock = threading.Lock()
+
+    def cancel(self) -> None:
+        if self.event.is_set():
+            return
+        logger.warning(f"Cancelamento recebido para o Job {self.job_id}.")
+        with self._lock:
+            self.event.set()
+            process = self._process
+        if process and process.poll() is None:
+            # SIGTERM primeiro: o Wrapper limpa as pastas temporárias do modelo antes de sair
+            _kill_group(process.pid, signal.SIGTERM)
+            timer = threading.Timer(settings.JOB_CANCEL_GRACE, self._force_kill, args=(process,))
+            timer.daemon = True
+            timer.start()
+
+    @staticmethod
+    def _force_kill(process: subprocess.Popen) -> None:
+        if process.poll() is None:
+            logger.warning(f"Wrapper {process.pid} não saiu após SIGTERM. Enviando SIGKILL ao grupo.")
+            _kill_group(process.pid, signal.SIGKILL)
+
+    def raise_if_cancelled(self) -> None:
+        if self.event.is_set():
+            raise JobCancelled(self.job_id)
+
+    def run(self, cmd: list[str], **popen_kwargs) -> None:
+        """
+        Equivalente a subprocess.run(cmd, check=True), mas interrompível pelo cancelamento.
+        Raises:
+            JobCancelled: O job foi cancelado durante a execução.
+            subprocess.CalledProcessError: O comando terminou com código diferente de 0.
+        """
+        with self._lock:
+            self.raise_if_cancelled()
+            # Sessão nova = grupo de processos novo (o modelo, filho do Wrapper, herda o grupo)
+            process = subprocess.Popen(cmd, start_new_session=True, **popen_kwargs)
+            self._process = process
+        try:
+            returncode = process.wait()
+        finally:
+            with self._lock:
+                self._process = None
+            if self.event.is_set():
+                # Nada do grupo pode sobreviver segurando a GPU
+                _kill_group(process.pid, signal.SIGKILL)
+
+        if self.event.is_set():
+            raise JobCancelled(self.job_id, process.pid)
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, cmd)
+
+def _kill_group(pgid: int, sig: int) -> None:
+    try:
+        os.killpg(pgid, sig)
+    except ProcessLookupError:
+        pass # Grupo já encerrado
+
+def _listen(cancellation: JobCancellation, stop: threading.Event) -> None:
+    """
+    Escuta o canal de cancelamento deste Worker até o job acabar (ou ser cancelado).
+    """
+    pubsub = redis_conn.pubsub(ignore_subscribe_messages=True)
+    try:
+        pubsub.subscribe(CANCEL_CHANNEL.format(name=worker_name()))
+        # Inscreve ANTES de checar a marca: um cancelamento nunca cai no intervalo entre os dois
+        if redis_conn.exists(CANCEL_KEY.format(job_id=cancellation.job_id)):
+            cancellation.cancel()
+        while not stop.is_set() and not cancellation.event.is_set():
+            message = pubsub.get_message(timeout=1.0)
+            if message and message["data"].decode() == cancellation.job_id:
+                cancellation.cancel()
+    except Exception as e:
+        logger.warning(f"Escuta de cancelamento do Job {cancellation.job_id} interrompida: {e}")
+    finally:
+        pubsub.close()
+
+@contextmanager
+def watching_cancellation(job_id: str):
+    """
+    Ativa a escuta de cancelamento do job durante o bloco.
+    """
+    cancellation = JobCancellation(job_id)
+    stop = threading.Event()
+    listener = threading.Thread(target=_listen, args=(cancellation, stop), name=f"cancel-{job_id}", daemon=True)
+    listener.start()
+    token = _active_cancellation.set(cancellation)
+    try:
+        yield cancellation
+    finally:
+        _active_cancellation.reset(token)
+        stop.set()
+        if cancellation.event.is_set():
+            redis_conn.delete(CANCEL_KEY.format(job_id=job_id))
+
+def get_job_cancellation() -> JobCancellation | None:
+    return _active_cancellation.get()
@@ -17,6 +17,44 @@ class Settings(BaseSettings):
     # Conexão com a Fila
     REDIS_URL: str
 
+    # Métricas (Prometheus)
+    METRICS_PORT: int = 9200 # Porta do exporter do Worker (GET /metrics); por Worker via variável de ambiente
+    METRICS_PORT_ATTEMPTS: int = 10 # Portas seguintes tentadas se a METRICS_PORT já estiver em uso (outro Worker na máquina)
+    METRICS_MULTIPROC_DIR: str = "/tmp/tcc-worker-metrics" # Base dos arquivos compartilhados entre os processos do RQ (um subdiretório por Worker)
+
+    # Heartbeat / Telemetria (lida pela API em GET /workers/cluster)
+    HEARTBEAT_INTERVAL: float = 5.0 # Segundos entre publicações
+    HEARTBEAT_TTL: int = 15         # Sem heartbeat por este tempo = Worker considerado morto
+    HEARTBEAT_GPU_SAMPLER: str = "auto" # auto | nvml | none
+
+    # Tracing (spans em OTLP/JSON, relativo à raiz vm-ia/). Vazio desativa.
+    TRACE_EXPORT_PATH: str = "traces/worker-spans.jsonl"
+
+    # Lease dos jobs: sem renovação por JOB_LEASE_TTL, o reaper da API considera o Worker morto
+    JOB_LEASE_TTL: int = 120
+    JOB_LEASE_RENEW_INTERVAL: float = 30.0
+
+    # Cancelamento: segundos entre o SIGTERM e o SIGKILL no grupo de processos do Wrapper
+    JOB_CANCEL_GRACE: float = 10.0
+
+    # Janitor das pastas temporárias órfãs (temp_df_*, temp_sf3d_*, diretórios de job)
+    JANITOR_INTERVAL: float = 600.0                 # Segundos entre varreduras (a 1ª roda no startup)
+    JANITOR_MIN_AGE: float = 300.0                  # Pastas mais novas que isso nunca são apagadas
+    JANITOR_DELETE_BUDGET_BYTES: int = 20 * 1024 ** 3 # Máximo apagado por varredura (limita o I/O)
+
+    # Spool de uploads (relativo à raiz vm-ia/): resultados só saem daqui depois de enviados ao Storage
+    UPLOAD_SPOOL_DIR: str = "spool/uploads"
+    UPLOAD_RETRY_BASE_DELAY: float = 5.0   # Backoff exponencial: 5s, 10s, 20s...
+    UPLOAD_RETRY_MAX_DELAY: float = 600.0  # ...limitado a 10 minutos entre tentativas
+    UPLOAD_SPOOL_POLL_INTERVAL: float = 5.0
+
+    # Conversão de formatos (fila "conversions", Workers só de CPU: python run_worker.py conversions)
+    CONVERSION_FAILURE_TTL: int = 300 # Segundos em que a API responde FAILED antes de aceitar nova tentativa
+
+    # Limpeza das malhas do DreamFusion (marching cubes) antes da exportação
+    MESH_CLEANUP_WELD_TOLERANCE: float = 1e-6     # Solda de vértices, como fração da diagonal da bbox
+    MESH_CLEANUP_MIN_COMPONENT_FACES: int = 100   # Ilhas com menos faces são removidas (a maior nunca sai)
+
     # SF3D
     SF3D_PYTHON_PATH: str
     SF3D_SCRIPT_PATH: str
@@ -0,0 +1,301 @@
+import io
+import json
+import struct
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+_GLB_MAGIC = b"glTF"
+_CHUNK_JSON = 0x4E4F534A
+_CHUNK_BIN = 0x004E4942
+
+# Formato -> mimeType no glTF
+IMAGE_MIME_TYPES = {"png": "image/png", "jpeg": "image/jpeg", "webp": "image/webp"}
+
+# WebP não faz parte do glTF core: texturas WebP ficam na extensão (loaders sem suporte recusam o arquivo)
+WEBP_EXTENSION = "EXT_texture_webp"
+
+@dataclass
+class ImageReport:
+    index: int
+    role: str                   # baseColor, normal, emissive... (primeiro uso encontrado)
+    format_before: str
+    format_after: str
+    size_before: tuple[int, int]
+    size_after: tuple[int, int]
+    bytes_before: int
+    bytes_after: int
+    psnr: float | None = None   # dB, em relação ao original (na resolução final); None = não medido / idêntico
+
+@dataclass
+class TextureReport:
+    bytes_before: int = 0       # Tamanho do GLB de entrada
+    bytes_after: int = 0        # Tamanho do GLB gerado
+    images: list[ImageReport] = field(default_factory=list)
+
+    @property
+    def ratio(self) -> float:
+        return self.bytes_after / self.bytes_before if self.bytes_before else 1.0
+
+# --------------------------------------------------
+# Leitura/escrita do contêiner GLB (JSON + BIN)
+# --------------------------------------------------
+def read_glb(path: str) -> tuple[dict, bytes]:
+    """
+    Returns:
+        (JSON do glTF, chunk BIN). Lê só o contêiner: nenhuma malha ou cena é carregada.
+    """
+    data = Path(path).read_bytes()
+    if len(data) < 12 or data[:4] != _GLB_MAGIC:
+        raise ValueError(f"{path} não é um arquivo GLB.")
+    version, length = struct.unpack_from("<II", data, 4)
+    if version != 2:
+        raise ValueError(f"GLB versão {version} não suportado.")
+
+    gltf, binary, offset = None, b"", 12
+    while offset + 8 <= length:
+        chunk_length, chunk_type = struct.unpack_from("<II", data, offset)
+        chunk = data[offset + 8:offset + 8 + chunk_length]
+        if chunk_type == _CHUNK_JSON:
+            gltf = json.loads(chunk)
+        elif chunk_type == _CHUNK_BIN and not binary:
+            binary = chunk
+        offset += 8 + chunk_length
+
+    if gltf is None:
+        raise ValueError(f"{path} não tem o chunk JSON.")
+    return gltf, binary
+
+def _pad(data: bytes, fill: bytes) -> bytes:
+    return data + fill * (-len(data) % 4)
+
+def write_glb(path: str, gltf: dict, binary: bytes) -> int:
+    """
+    Grava o GLB (chunks alinhados a 4 bytes, como exige a especificação).
+    Returns:
+        Tamanho do arquivo em bytes.
+    """
+    json_chunk = _pad(json.dumps(gltf, separators=(",", ":")).encode(), b" ")
+    bin_chunk = _pad(binary, b"\x00")
+    length = 12 + 8 + len(json_chunk) + (8 + len(bin_chunk) if bin_chunk else 0)
+
+    with open(path, "wb") as f:
+        f.write(struct.pack("<4sII", _GLB_MAGIC, 2, length))
+        f.write(struct.pack("<II", len(json_chunk), _CHUNK_JSON))
+        f.write(json_chunk)
+        if bin_chunk:
+            f.write(struct.pack("<II", len(bin_chunk), _CHUNK_BIN))
+            f.write(bin_chunk)
+    return length
+
+# --------------------------------------------------
+# Texturas
+# --------------------------------------------------
+def _texture_source(texture: dict) -> int | None:
+    source = texture.get("source")
+    if source is None:
+        source = texture.get("extensions", {}).get(WEBP_EXTENSION, {}).get("source")
+    return source
+
+def _image_roles(gltf: dict) -> dict[int, str]:
+    """
+    Uso de cada imagem nos materiais (o primeiro encontrado): define se a textura aceita compressão com perdas.
+    """
+    textures = gltf.get("textures", [])
+    roles: dict[int, str] = {}
+
+    def visit(info: dict | None, role: str):
+        if info and info.get("index") is not None and info["index"] < len(textures):
+            source = _texture_source(textures[info["index"]])
+            if source is not None:
+                roles.setdefault(source, role)
+
+    for material in gltf.get("materials", []):
+        pbr = material.get("pbrMetallicRoughness", {})
+        visit(pbr.get("baseColorTexture"), "baseColor")
+        visit(pbr.get("metallicRoughnessTexture"), "metallicRoughness")
+        visit(material.get("normalTexture"), "normal")
+        visit(material.get("occlusionTexture"), "occlusion")
+        visit(material.get("emissiveTexture"), "emissive")
+    return roles
+
+def _has_transparency(image: Image.Image) -> bool:
+    if image.mode in ("RGBA", "LA"):
+        return image.getchannel("A").getextrema()[0] < 255
+    return image.mode == "P" and "transparency" in image.info
+
+def _psnr(reference: Image.Image, candidate: Image.Image) -> float | None:
+    a = np.asarray(reference.convert("RGB"), dtype=np.float32)
+    b = np.asarray(candidate.convert("RGB"), dtype=np.float32)
+    mse = float(np.mean((a - b) ** 2))
+    return None if mse == 0 else round(float(10 * np.log10(255.0 ** 2 / mse)), 2)
+
+def _encode(image: Image.Image, fmt: str, quality: int) -> bytes:
+    buffer = io.BytesIO()
+    if fmt == "jpeg":
+        image.convert("RGB").save(buffer, "JPEG", quality=quality, optimize=True)
+    elif fmt == "webp":
+        image.save(buffer, "WEBP", quality=quality, method=4)
+    else:
+        image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+def _reencode_image(raw: bytes, fmt: str, quality: int, max_size: int | None, lossless_only: bool,
+                    measure_quality: bool) -> tuple[bytes, str, Image.Image, Image.Image, float | None]:
+    """
+    Returns:
+        (bytes finais, formato final, imagem original, imagem final, PSNR)
+    """
+    original = Image.open(io.BytesIO(raw))
+    original.load()
+    original_format = (original.format or "png").lower()
+    image = original
+
+    resized = bool(max_size and max(image.size) > max_size)
+    if resized:
+        image = image.copy()
+        image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+
+    # Normais/máscaras não aceitam artefatos de compressão; JPEG não tem canal alfa
+    target = fmt
+    if lossless_only or (fmt == "jpeg" and _has_transparency(image)):
+        target = "png"
+
+    if target == original_format and not resized:
+        return raw, original_format, original, original, None
+
+    encoded = _encode(image, target, quality)
+    if not resized and len(encoded) >= len(raw):
+        # Nunca aumenta o arquivo: o original continua
+        return raw, original_format, original, original, None
+
+    psnr = None
+    if measure_quality and target != "png":
+        reference = original.resize(image.size, Image.Resampling.LANCZOS) if resized else original
+        psnr = _psnr(reference, Image.open(io.BytesIO(encoded)))
+    return encoded, target, original, image, psnr
+
+def _rebuild_binary(gltf: dict, binary: bytes, replacements: dict[int, bytes]) -> bytes:
+    """
+    Remonta o chunk BIN com os bufferViews na ordem original, trocando o conteúdo dos substituídos
+    e recalculando byteOffset/byteLength. Accessors apontam para bufferView + offset relativo, então
+    seguem válidos sem alteração. Dados sem bufferView (lixo entre views) ficam de fora.
+    """
+    views = gltf.get("bufferViews", [])
+    output = bytearray()
+    ordered = sorted(
+        (i for i, view in enumerate(views) if view.get("buffer", 0) == 0),
+        key=lambda i: views[i].get("byteOffset", 0)
+    )
+    for i in ordered:
+        view = views[i]
+        start = view.get("byteOffset", 0)
+        content = replacements.get(i, binary[start:start + view["byteLength"]])
+        output.extend(b"\x00" * (-len(output) % 4)) # Alinhamento exigido pelos accessors
+        view["byteOffset"] = len(output)
+        view["byteLength"] = len(content)
+        output.extend(content)
+
+    if gltf.get("buffers"):
+        gltf["buffers"][0]["byteLength"] = len(output)
+    return bytes(output)
+
+def _use_webp(gltf: dict, webp_images: set[int]) -> None:
+    for texture in gltf.get("textures", []):
+        source = _texture_source(texture)
+        if source in webp_images:
+            texture.pop("source", None)
+            texture.setdefault("extensions", {})[WEBP_EXTENSION] = {"source": source}
+    for key in ("extensionsUsed", "extensionsRequired"):
+        extensions = gltf.setdefault(key, [])
+        if WEBP_EXTENSION not in extensions:
+            extensions.append(WEBP_EXTENSION)
+
+def reencode_glb_textures(input_path: str, output_path: str, fmt: str = "jpeg", quality: int = 90,
+                          max_size: int | None = None, lossy_normals: bool = False,
+                          measure_quality: bool = False) -> TextureReport:
+    """
+    Reescreve as imagens embutidas no GLB (só o contêiner: JSON + BIN, sem recarregar a cena).
+    Args:
+        fmt: png | jpeg | webp (webp usa EXT_texture_webp).
+        quality: Qualidade do JPEG/WebP (1-100).
+        max_size: Maior lado das texturas (variantes reduzidas para clientes com pouca banda).
+        lossy_normals: Também comprime normal/metallicRoughness/occlusion com perdas (padrão: mantém PNG).
+        measure_quality: Calcula o PSNR de cada imagem recodificada (custo extra de decodificação).
+    """
+    if fmt not in IMAGE_MIME_TYPES:
+        raise ValueError(f"Formato de textura '{fmt}' não suportado.")
+
+    gltf, binary = read_glb(input_path)
+    report = TextureReport(bytes_before=Path(input_path).stat().st_size)
+    roles = _image_roles(gltf)
+    views = gltf.get("bufferViews", [])
+
+    replacements: dict[int, bytes] = {}
+    webp_images: set[int] = set()
+    for index, image_def in enumerate(gltf.get("images", [])):
+        view_index = image_def.get("bufferView")
+        if view_index is None: # Imagem externa (uri): fora do GLB
+            continue
+        view = views[view_index]
+        start = view.get("byteOffset", 0)
+        raw = binary[start:start + view["byteLength"]]
+        role = roles.get(index, "unused")
+
+        lossless_only = not lossy_normals and role in ("normal", "metallicRoughness", "occlusion")
+        encoded, final_format, before, after, psnr = _reencode_image(
+            raw, fmt, quality, max_size, lossless_only, measure_quality
+        )
+        if encoded is not raw:
+            replacements[view_index] = encoded
+            image_def["mimeType"] = IMAGE_MIME_TYPES[final_format]
+        if final_format == "webp":
+            webp_images.add(index)
+
+        report.images.append(ImageReport(
+            index=index, role=role,
+            format_before=(before.format or "png").lower(),
+            format_after=final_format,
+            size_before=before.size, size_after=after.size,
+            bytes_before=len(raw), bytes_after=len(encoded), psnr=psnr,
+        ))
+
+    if webp_images:
+        _use_webp(gltf, webp_images)
+    if replacements:
+        binary = _rebuild_binary(gltf, binary, replacements)
+    report.bytes_after = write_glb(output_path, gltf, binary)
+    return report
+
+def _print_tradeoffs(paths: list[str], variants: list[tuple[str, int, int | None]]) -> None:
+    """
+    Tabela tamanho x qualidade de cada variante sobre um conjunto de GLBs (ex: saídas do SF3D).
+    """
+    import tempfile
+    print(f"{'arquivo':<32} {'variante':<20} {'MB':>8} {'razão':>7} {'PSNR (dB)':>10}")
+    for path in paths:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for fmt, quality, max_size in variants:
+                label = f"{fmt} q{quality}" + (f" {max_size}px" if max_size else "")
+                report = reencode_glb_textures(path, f"{temp_dir}/out.glb", fmt, quality, max_size, measure_quality=True)
+                psnrs = [image.psnr for image in report.images if image.psnr is not None]
+                psnr = f"{min(psnrs):.2f}" if psnrs else "-"
+                print(f"{Path(path).name:<32} {label:<20} {report.bytes_after / 1024 ** 2:>8.2f} {report.ratio:>7.2f} {psnr:>10}")
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Relatório tamanho x qualidade da recodificação de texturas de GLBs")
+    parser.add_argument("paths", nargs="+", help="Arquivos GLB (ex: saídas do SF3D)")
+    args = parser.parse_args()
+    _print_tradeoffs(args.paths, [
+        ("png", 100, None),
+        ("jpeg", 90, None), ("jpeg", 75, None),
+        ("webp", 90, None), ("webp", 75, None),
+        ("jpeg", 85, 1024), ("jpeg", 85, 512),
+        ("webp", 80, 512),
+    ])
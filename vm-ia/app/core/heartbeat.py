@@ -0,0 +1,210 @@
+import json
+import logging
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+import psutil
+import redis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Chaves no Redis (lidas pela API em GET /workers/cluster)
+HEARTBEAT_KEY = "worker:heartbeat:{name}"  # JSON com TTL: some sozinho se o Worker morrer
+ACTIVITY_KEY = "worker:activity:{name}"    # Hash com o job/etapa atual (escrito pelo processo do job)
+
+redis_conn = redis.from_url(settings.REDIS_URL)
+
+def worker_name() -> str:
+    """
+    Nome do Worker definido pelo run_worker.py (herdado pelos processos filhos dos jobs).
+    """
+    return os.environ.get("TCC_WORKER_NAME", f"worker-ia-{os.getpid()}")
+
+def worker_is_alive(name: str) -> bool:
+    """
+    True enquanto o heartbeat do Worker não expirou (TTL de HEARTBEAT_TTL).
+    """
+    return bool(redis_conn.exists(HEARTBEAT_KEY.format(name=name)))
+
+# ====================================================
+# SAMPLERS DE GPU (Plugáveis)
+# ====================================================
+class NullGpuSampler:
+    """
+    Stub usado quando não há GPU/NVML disponível (dev, CI, máquinas só-CPU).
+    """
+    def sample(self) -> list[dict]:
+        return []
+
+class NvmlGpuSampler:
+    """
+    Leitura de utilização e memória via NVML (pacote 'nvidia-ml-py', opcional).
+    """
+    def __init__(self):
+        import pynvml
+        pynvml.nvmlInit()
+        self._nvml = pynvml
+        self._handles = [pynvml.nvmlDeviceGetHandleByIndex(i) for i in range(pynvml.nvmlDeviceGetCount())]
+
+    def sample(self) -> list[dict]:
+        gpus = []
+        for index, handle in enumerate(self._handles):
+            util = self._nvml.nvmlDeviceGetUtilizationRates(handle)
+            memory = self._nvml.nvmlDeviceGetMemoryInfo(handle)
+            name = self._nvml.nvmlDeviceGetName(handle)
+            gpus.append({
+                "index": index,
+                "name": name.decode() if isinstance(name, bytes) else name,
+                "utilization_percent": util.gpu,
+                "memory_used_bytes": memory.used,
+                "memory_total_bytes": memory.total,
+            })
+        return gpus
+
+def get_gpu_sampler():
+    """
+    Escolhe o sampler conforme HEARTBEAT_GPU_SAMPLER ("auto", "nvml" ou "none").
+    No modo "auto", cai para o stub se o NVML não estiver instalado ou não houver GPU.
+    """
+    mode = settings.HEARTBEAT_GPU_SAMPLER
+    if mode == "none":
+        return NullGpuSampler()
+    try:
+        return NvmlGpuSampler()
+    except Exception as e:
+        if mode == "nvml":
+            raise
+        logger.info(f"NVML indisponível, telemetria de GPU desativada: {e}")
+        return NullGpuSampler()
+
+# ====================================================
+# ATIVIDADE ATUAL (Escrita pelo processo do job)
+# ====================================================
+def report_job(job_id: str | None, model_id: str | None = None) -> None:
+    """
+    Marca o job em execução neste Worker (None = ocioso).
+    Falhas no Redis não devem derrubar o job, então são apenas logadas.
+    """
+    key = ACTIVITY_KEY.format(name=worker_name())
+    try:
+        if job_id is None:
+            redis_conn.delete(key)
+        else:
+            redis_conn.hset(key, mapping={"job_id": job_id, "model_id": model_id or "", "stage": "", "stage_since": time.time()})
+    except Exception as e:
+        logger.warning(f"Falha ao reportar atividade do Worker: {e}")
+
+def report_stage(stage: str) -> None:
+    """
+    Atualiza a etapa atual do job (download, inference, convert, upload...).
+    """
+    try:
+        redis_conn.hset(ACTIVITY_KEY.format(name=worker_name()), mapping={"stage": stage, "stage_since": time.time()})
+    except Exception as e:
+        logger.warning(f"Falha ao reportar etapa do Worker: {e}")
+
+@contextmanager
+def reporting_job(job_id: str, model_id: str):
+    """
+    Marca o Worker como ocupado durante o bloco e volta a ocioso ao sair (mesmo com erro).
+    """
+    report_job(job_id, model_id)
+    try:
+        yield
+    finally:
+        report_job(None)
+
+# ====================================================
+# PUBLICADOR DE HEARTBEAT (Processo principal do Worker)
+# ====================================================
+class HeartbeatPublisher:
+    """
+    Thread que publica, a cada HEARTBEAT_INTERVAL segundos, o estado do Worker no Redis
+    com TTL de HEARTBEAT_TTL. Se o Worker morrer, a chave expira e ele sai do painel.
+    """
+    def __init__(self, name: str, queues: list[str], metrics_port: int | None = None):
+        self.name = name
+        self.queues = queues # Filas RQ atendidas: a API só conta a fila de geração como capacidade de GPU
+        self.metrics_port = metrics_port # Porta do exporter (None se não subiu)
+        self.gpu_sampler = get_gpu_sampler()
+        self._process = psutil.Process(os.getpid())
+        # Cache de psutil.Process por PID: cpu_percent precisa da leitura anterior do mesmo objeto
+        self._tracked: dict[int, psutil.Process] = {}
+        self._stop = threading.Event()
+
+    def _process_tree_usage(self) -> tuple[float, int]:
+        """
+        CPU (%) e RSS (bytes) do Worker + filhos (job, wrapper e processo do modelo).
+        """
+        cpu, rss = 0.0, 0
+        alive = {}
+        for proc in [self._process, *self._process.children(recursive=True)]:
+            proc = self._tracked.get(proc.pid, proc)
+            try:
+                cpu += proc.cpu_percent(interval=None)
+                rss += proc.memory_info().rss
+                alive[proc.pid] = proc
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        self._tracked = alive
+        return cpu, rss
+
+    def snapshot(self) -> dict:
+        activity = {
+            k.decode(): v.decode()
+            for k, v in redis_conn.hgetall(ACTIVITY_KEY.format(name=self.name)).items()
+        }
+        cpu, rss = self._process_tree_usage()
+        disk = shutil.disk_usage(tempfile.gettempdir())
+
+        return {
+            "name": self.name,
+            "hostname": socket.gethostname(),
+            "pid": os.getpid(),
+            "queues": self.queues,
+            "metrics_port": self.metrics_port,
+            "timestamp": time.time(),
+            "state": "busy" if activity.get("job_id") else "idle",
+            "job_id": activity.get("job_id") or None,
+            "model_id": activity.get("model_id") or None,
+            "stage": activity.get("stage") or None,
+            "stage_since": float(activity["stage_since"]) if activity.get("stage_since") else None,
+            "cpu_percent": round(cpu, 1),
+            "rss_bytes": rss,
+            "temp_disk_used_bytes": disk.used,
+            "temp_disk_total_bytes": disk.total,
+            "gpus": self.gpu_sampler.sample(),
+        }
+
+    def publish(self) -> None:
+        redis_conn.set(
+            HEARTBEAT_KEY.format(name=self.name),
+            json.dumps(self.snapshot()),
+            ex=settings.HEARTBEAT_TTL
+        )
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.publish()
+            except Exception as e:
+                logger.warning(f"Falha ao publicar heartbeat: {e}")
+            self._stop.wait(settings.HEARTBEAT_INTERVAL)
+
+    def start(self) -> threading.Thread:
+        # Atividade de uma execução anterior (Worker morto no meio do job) não vale mais
+        redis_conn.delete(ACTIVITY_KEY.format(name=self.name))
+        thread = threading.Thread(target=self._run, name="heartbeat", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        self._stop.set()
+        redis_conn.delete(HEARTBEAT_KEY.format(name=self.name))
@@ -0,0 +1,176 @@
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import psutil
+from sqlalchemy import func
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import JANITOR_RECLAIMED_BYTES
+from app.models.job_model import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+# Prefixo do diretório temporário de cada job (ver run_job): identifica o job dono para a checagem de lease
+JOB_TEMP_PREFIX = "tcc-job-"
+
+# Pastas criadas pelos Wrappers com o PID do processo dono
+_WRAPPER_DIR_PATTERN = re.compile(r"^temp_(?:df|sf3d)_(\d+)$")
+_JOB_DIR_PATTERN = re.compile(rf"^{JOB_TEMP_PREFIX}([0-9a-f-]{{36}})-")
+
+@dataclass
+class OrphanDir:
+    path: Path
+    size: int
+    mtime: float
+
+def _dir_size(path: Path) -> int:
+    """
+    Soma o tamanho dos arquivos (sem seguir symlinks) de uma árvore.
+    """
+    total = 0
+    stack = [path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(Path(entry.path))
+                    else:
+                        total += entry.stat(follow_symlinks=False).st_size
+        except OSError:
+            continue
+    return total
+
+def _wrapper_alive(pid: int) -> bool:
+    """
+    O PID ainda é um Wrapper vivo? (PIDs são reciclados: confere a linha de comando.)
+    """
+    try:
+        return any("wrappers" in part for part in psutil.Process(pid).cmdline())
+    except psutil.NoSuchProcess:
+        return False
+    except psutil.AccessDenied:
+        return True # Na dúvida, não apaga
+
+def _live_job_ids(job_ids: list[str]) -> set[str]:
+    """
+    Jobs que ainda têm lease válida (algum Worker está de fato trabalhando neles).
+    """
+    if not job_ids:
+        return set()
+    with SessionLocal() as session:
+        rows = session.query(Job.id).filter(
+            Job.id.in_(job_ids),
+            Job.status == JobStatus.PROCESSING,
+            Job.lease_expires_at > func.now(),
+        ).all()
+    return {str(row.id) for row in rows}
+
+class TempJanitor:
+    """
+    Recupera o disco ocupado por pastas temporárias órfãs:
+    - <modelo DreamFusion>/outputs/temp_df_<pid> (o Wrapper só apaga no sucesso);
+    - temp_sf3d_<pid> dentro dos diretórios de job;
+    - <tmp>/tcc-job-<job_id>-* de jobs cujo processo morreu (kill -9, OOM) sem limpar.
+    Uma pasta é órfã quando o PID dono não existe mais ou a lease do job venceu.
+    """
+    def __init__(self):
+        self._stop = threading.Event()
+
+    def scan_roots(self) -> list[Path]:
+        roots = [Path(tempfile.gettempdir())]
+        if settings.DREAMFUSION_SCRIPT_PATH:
+            roots.append(Path(settings.DREAMFUSION_SCRIPT_PATH).parent / "outputs")
+        return [root for root in roots if root.is_dir()]
+
+    def find_orphans(self) -> list[OrphanDir]:
+        now = time.time()
+        wrapper_dirs: list[Path] = []
+        job_dirs: dict[str, Path] = {}
+
+        for root in self.scan_roots():
+            for path in root.iterdir():
+                if not path.is_dir() or path.is_symlink():
+                    continue
+                if _WRAPPER_DIR_PATTERN.match(path.name):
+                    wrapper_dirs.append(path)
+                elif match := _JOB_DIR_PATTERN.match(path.name):
+                    job_dirs[match.group(1)] = path
+                    # SF3D cria temp_sf3d_<pid> ao lado do output, dentro do diretório do job
+                    wrapper_dirs.extend(p for p in path.glob("temp_sf3d_*") if p.is_dir())
+
+        orphans = [
+            path for path in wrapper_dirs
+            if not _wrapper_alive(int(_WRAPPER_DIR_PATTERN.match(path.name).group(1)))
+        ]
+        try:
+            live_jobs = _live_job_ids(list(job_dirs))
+            orphans += [path for job_id, path in job_dirs.items() if job_id not in live_jobs]
+        except Exception as e:
+            # Sem banco não dá para checar a lease: os diretórios de job ficam para a próxima passada
+            logger.warning(f"Janitor: leases não verificadas ({e}).")
+
+        result = []
+        for path in orphans:
+            try:
+                mtime = path.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            # Carência: pastas recém-criadas podem ser de um job/Wrapper subindo agora
+            if now - mtime < settings.JANITOR_MIN_AGE:
+                continue
+            result.append(OrphanDir(path, _dir_size(path), mtime))
+
+        # Uma pasta temp_sf3d_* de um job órfão já sai junto com o diretório do job
+        job_paths = {o.path for o in result if _JOB_DIR_PATTERN.match(o.path.name)}
+        return [o for o in result if o.path.parent not in job_paths]
+
+    def sweep(self) -> int:
+        """
+        Apaga as pastas órfãs (mais antigas primeiro) até JANITOR_DELETE_BUDGET_BYTES por passada,
+        para não disputar I/O de disco com um job em execução. O restante fica para a próxima passada.
+        Returns:
+            Bytes recuperados.
+        """
+        orphans = sorted(self.find_orphans(), key=lambda o: o.mtime)
+        reclaimed, removed = 0, 0
+        for orphan in orphans:
+            if reclaimed and reclaimed + orphan.size > settings.JANITOR_DELETE_BUDGET_BYTES:
+                break
+            shutil.rmtree(orphan.path, ignore_errors=True)
+            reclaimed += orphan.size
+            removed += 1
+            logger.info(f"Janitor: removido {orphan.path} ({orphan.size / 1024 ** 2:.1f} MB).")
+
+        if removed:
+            JANITOR_RECLAIMED_BYTES.inc(reclaimed)
+            logger.info(
+                f"Janitor: {removed} pasta(s) órfã(s) removida(s), {reclaimed / 1024 ** 3:.2f} GB recuperados"
+                f" ({len(orphans) - removed} pendente(s))."
+            )
+        return reclaimed
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.warning(f"Falha na varredura do janitor: {e}")
+            self._stop.wait(settings.JANITOR_INTERVAL)
+
+    def start(self) -> threading.Thread:
+        # A primeira varredura roda já no startup (restos de um Worker que caiu)
+        thread = threading.Thread(target=self._run, name="temp-janitor", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        self._stop.set()
@@ -0,0 +1,69 @@
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Iterable
+
+from sqlalchemy import update, func
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.heartbeat import worker_name
+from app.models.job_model import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+def lease_expiry():
+    """
+    Novo vencimento da lease, calculado pelo relógio do banco
+    (o reaper da API compara com now() do Postgres: sem depender do relógio das máquinas).
+    """
+    return func.now() + timedelta(seconds=settings.JOB_LEASE_TTL)
+
+def renew_job_leases(job_ids: list[str], claim_from: Iterable[str] = ()) -> int:
+    """
+    Estende a lease dos jobs em PROCESSING deste Worker.
+    Args:
+        claim_from: Workers mortos cuja lease este Worker assume (ex.: jobs no spool de uploads deixados
+                    por um Worker que caiu ou voltou com outro nome). Leases de qualquer outro Worker ficam intactas.
+    Returns:
+        Quantidade de jobs renovados.
+    """
+    if not job_ids:
+        return 0
+    with SessionLocal() as session:
+        stmt = update(Job).where(
+            Job.id.in_(job_ids),
+            Job.status == JobStatus.PROCESSING,
+            Job.leased_by.in_([worker_name(), *claim_from])
+        )
+        result = session.execute(stmt.values(leased_by=worker_name(), lease_expires_at=lease_expiry()))
+        session.commit()
+        return result.rowcount
+
+@contextmanager
+def holding_job_lease(job_id: str):
+    """
+    Renova a lease do job em segundo plano enquanto o bloco executa.
+    Se o processo morrer (kill -9, OOM, queda da máquina), a renovação para junto
+    e o reaper da API recolhe o job depois de JOB_LEASE_TTL.
+    """
+    stop = threading.Event()
+
+    def renew():
+        while not stop.wait(settings.JOB_LEASE_RENEW_INTERVAL):
+            try:
+                if not renew_job_leases([job_id]):
+                    # Reaper já recolheu o job (ex.: banco inacessível por mais que o TTL)
+                    logger.warning(f"Lease do Job {job_id} perdida. O resultado deste processo pode ser descartado.")
+                    return
+            except Exception as e:
+                logger.warning(f"Falha ao renovar lease do Job {job_id}: {e}")
+
+    thread = threading.Thread(target=renew, name=f"lease-{job_id}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
@@ -0,0 +1,72 @@
+import gzip
+import logging
+import subprocess
+import threading
+from collections import deque
+
+# Captura de saída de subprocessos com memória limitada.
+# Não importa 'settings': é usado pelos Wrappers (processos isolados) e pelo Worker.
+
+# Tamanho máximo lido de uma vez por linha: barras de progresso com '\r' (tqdm)
+# podem passar muito tempo sem '\n', e não queremos uma "linha" crescendo sem limite.
+_MAX_CHUNK = 64 * 1024
+
+class LogCapture:
+    """
+    Executa um comando lendo stdout e stderr de forma incremental, em threads separadas:
+    - Tudo vai para um arquivo .gz no disco (nada fica acumulado em memória);
+    - As últimas 'tail_lines' linhas ficam num ring buffer para relatórios de erro;
+    - Opcionalmente, cada linha é repassada ao logger (acompanhamento ao vivo).
+    """
+    def __init__(self, log_path: str, tail_lines: int = 200, logger: logging.Logger | None = None):
+        self.log_path = log_path
+        self.logger = logger
+        self._tail: deque[str] = deque(maxlen=tail_lines)
+        self._lock = threading.Lock()
+        self._file = None
+
+    def _pump(self, stream, label: str) -> None:
+        for raw in iter(lambda: stream.readline(_MAX_CHUNK), b""):
+            text = raw.decode("utf-8", errors="replace")
+            with self._lock:
+                self._file.write(f"[{label}] {text}" if text.endswith("\n") else f"[{label}] {text}\n")
+                # Barras de progresso: só o último estado (após o último '\r') interessa ao tail
+                line = text.rstrip("\n").split("\r")[-1]
+                if line:
+                    self._tail.append(f"[{label}] {line}")
+            if self.logger and line:
+                self.logger.info(f"[{label}] {line}")
+        stream.close()
+
+    def run(self, cmd: list[str], **popen_kwargs) -> int:
+        """
+        Executa o comando até o fim e devolve o código de saída.
+        Aceita os mesmos kwargs do subprocess.Popen (cwd, env...).
+        """
+        # Modo append: várias execuções (ex: treino + exportação) viram membros do mesmo .gz
+        with gzip.open(self.log_path, "at", encoding="utf-8") as self._file:
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, **popen_kwargs)
+            readers = [
+                threading.Thread(target=self._pump, args=(process.stdout, "stdout"), daemon=True),
+                threading.Thread(target=self._pump, args=(process.stderr, "stderr"), daemon=True),
+            ]
+            for reader in readers:
+                reader.start()
+            try:
+                returncode = process.wait()
+            except BaseException:
+                # Interrupção do Wrapper: não deixa o modelo órfão rodando na GPU
+                process.kill()
+                process.wait()
+                raise
+            finally:
+                for reader in readers:
+                    reader.join()
+        return returncode
+
+    def tail(self) -> str:
+        """
+        Últimas linhas capturadas (para mensagens de erro).
+        """
+        with self._lock:
+            return "\n".join(self._tail)
@@ -0,0 +1,171 @@
+import time
+import logging
+from dataclasses import dataclass
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class CleanupReport:
+    vertices_before: int
+    faces_before: int
+    vertices_after: int = 0
+    faces_after: int = 0
+    welded: int = 0              # Vértices removidos pela solda
+    degenerate: int = 0          # Faces com índice repetido ou área ~zero
+    islands: int = 0             # Componentes removidos (abaixo do mínimo de faces)
+    island_faces: int = 0        # Faces desses componentes
+    elapsed: float = 0.0
+
+    def summary(self) -> str:
+        return (
+            f"vértices {self.vertices_before} -> {self.vertices_after} (solda: -{self.welded}), "
+            f"faces {self.faces_before} -> {self.faces_after} (degeneradas: -{self.degenerate}, "
+            f"ilhas: -{self.island_faces} em {self.islands} componentes), {self.elapsed:.2f}s"
+        )
+
+# Bits por eixo na chave compactada (3 x 21 = 63 bits: cabe num int64)
+_KEY_BITS = 21
+
+def _grid_keys(vertices: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Chave 1D da célula de cada vértice. Ordenar int64 é bem mais rápido que unique(axis=0) (lexsort)
+    ou que a linha vista como bytes opacos (np.void), o fallback quando a grade não cabe em 63 bits.
+    """
+    if tolerance > 0:
+        cells = np.floor(vertices / tolerance + 0.5).astype(np.int64)
+        cells -= cells.min(axis=0)
+        if cells.max() < (1 << _KEY_BITS):
+            return (cells[:, 0] << (2 * _KEY_BITS)) | (cells[:, 1] << _KEY_BITS) | cells[:, 2]
+    else:
+        cells = vertices
+    cells = np.ascontiguousarray(cells)
+    return cells.view(np.dtype((np.void, cells.dtype.itemsize * cells.shape[1]))).ravel()
+
+def weld_vertices(vertices: np.ndarray, faces: np.ndarray, colors: np.ndarray | None,
+                  tolerance: float) -> tuple[np.ndarray, np.ndarray, np.ndarray | None]:
+    """
+    Funde vértices que caem na mesma célula de uma grade de lado 'tolerance' (tolerance=0: só idênticos).
+    A posição é a do primeiro vértice da célula; a cor é a média das cores fundidas.
+    """
+    _, first, inverse = np.unique(_grid_keys(vertices, tolerance), return_index=True, return_inverse=True)
+    inverse = inverse.ravel()
+
+    welded_colors = None
+    if colors is not None:
+        counts = np.bincount(inverse, minlength=len(first))
+        # bincount por canal: bem mais rápido que np.add.at em arrays grandes
+        sums = np.stack(
+            [np.bincount(inverse, weights=colors[:, channel], minlength=len(first)) for channel in range(colors.shape[1])],
+            axis=1
+        )
+        welded_colors = np.rint(sums / counts[:, None]).astype(colors.dtype)
+
+    return vertices[first], inverse[faces], welded_colors
+
+def degenerate_faces(vertices: np.ndarray, faces: np.ndarray, area_epsilon: float) -> np.ndarray:
+    """
+    Máscara das faces degeneradas: índices repetidos (após a solda) ou área <= area_epsilon.
+    """
+    a, b, c = faces[:, 0], faces[:, 1], faces[:, 2]
+    mask = (a == b) | (b == c) | (a == c)
+    v0 = vertices[a]
+    e1, e2 = vertices[b] - v0, vertices[c] - v0
+    # Dobro da área = |e1 x e2|; produto vetorial por componente (np.cross é lento em arrays grandes)
+    # e comparação ao quadrado para evitar a raiz
+    cx = e1[:, 1] * e2[:, 2] - e1[:, 2] * e2[:, 1]
+    cy = e1[:, 2] * e2[:, 0] - e1[:, 0] * e2[:, 2]
+    cz = e1[:, 0] * e2[:, 1] - e1[:, 1] * e2[:, 0]
+    mask |= cx * cx + cy * cy + cz * cz <= (2 * area_epsilon) ** 2
+    return mask
+
+def connected_components(faces: np.ndarray, vertex_count: int) -> np.ndarray:
+    """
+    Union-find vetorizado sobre as arestas (hook + pointer jumping).
+    Returns:
+        Raiz (representante do componente) de cada vértice.
+    """
+    parent = np.arange(vertex_count)
+    # Arestas 0-1 e 1-2 bastam para a conectividade (0-2 já está implicada)
+    a = np.concatenate([faces[:, 0], faces[:, 1]])
+    b = np.concatenate([faces[:, 1], faces[:, 2]])
+
+    while True:
+        root_a, root_b = parent[a], parent[b]
+        pending = root_a != root_b
+        if not pending.any():
+            return parent
+        # Arestas já resolvidas saem da próxima rodada
+        a, b, root_a, root_b = a[pending], b[pending], root_a[pending], root_b[pending]
+        # Hook: raiz maior aponta para a menor (os pais só diminuem, então nunca forma ciclo)
+        parent[np.maximum(root_a, root_b)] = np.minimum(root_a, root_b)
+        # Pointer jumping até todo vértice apontar direto para a raiz
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+
+def small_component_faces(faces: np.ndarray, vertex_count: int, min_faces: int) -> tuple[np.ndarray, int]:
+    """
+    Máscara das faces em componentes com menos de 'min_faces' faces (o maior componente nunca sai).
+    Returns:
+        (máscara, quantidade de componentes removidos)
+    """
+    roots = connected_components(faces, vertex_count)
+    face_roots = roots[faces[:, 0]]
+    sizes = np.bincount(face_roots, minlength=vertex_count)
+    small = sizes < min_faces
+    small[np.argmax(sizes)] = False
+    return small[face_roots], int(np.count_nonzero(small & (sizes > 0)))
+
+def compact(vertices: np.ndarray, faces: np.ndarray, colors: np.ndarray | None):
+    """
+    Remove os vértices sem face e reindexa o index buffer.
+    """
+    used = np.zeros(len(vertices), dtype=bool)
+    used[faces.ravel()] = True
+    remap = np.cumsum(used) - 1
+    return vertices[used], remap[faces], colors[used] if colors is not None else None
+
+def cleanup_mesh(vertices: np.ndarray, faces: np.ndarray, colors: np.ndarray | None = None,
+                 weld_tolerance: float = 1e-6, min_component_faces: int = 100):
+    """
+    Limpeza explícita (e vetorizada) das malhas do marching cubes, no lugar do processamento
+    implícito do trimesh (process=True), lento e que descarta as cores por vértice:
+    1. Solda de vértices dentro da tolerância (fração da diagonal da bbox), preservando as cores;
+    2. Remoção de faces degeneradas e de área ~zero;
+    3. Remoção de ilhas com menos de 'min_component_faces' faces (union-find sobre as arestas);
+    4. Compactação do index buffer.
+    Returns:
+        (vertices, faces, colors, CleanupReport)
+    """
+    started = time.perf_counter()
+    vertices = np.asarray(vertices, dtype=np.float64)
+    faces = np.asarray(faces, dtype=np.int64)
+    report = CleanupReport(len(vertices), len(faces))
+
+    if len(faces) == 0:
+        report.vertices_after, report.elapsed = len(vertices), time.perf_counter() - started
+        return vertices, faces, colors, report
+
+    diagonal = float(np.linalg.norm(vertices.max(axis=0) - vertices.min(axis=0)))
+    tolerance = weld_tolerance * diagonal
+
+    vertices, faces, colors = weld_vertices(vertices, faces, colors, tolerance)
+    report.welded = report.vertices_before - len(vertices)
+
+    degenerate = degenerate_faces(vertices, faces, area_epsilon=tolerance ** 2)
+    faces = faces[~degenerate]
+    report.degenerate = int(np.count_nonzero(degenerate))
+
+    if min_component_faces > 1 and len(faces):
+        islands, report.islands = small_component_faces(faces, len(vertices), min_component_faces)
+        faces = faces[~islands]
+        report.island_faces = int(np.count_nonzero(islands))
+
+    vertices, faces, colors = compact(vertices, faces, colors)
+    report.vertices_after, report.faces_after = len(vertices), len(faces)
+    report.elapsed = time.perf_counter() - started
+    return vertices, faces, colors, report
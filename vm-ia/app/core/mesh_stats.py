@@ -0,0 +1,81 @@
+import logging
+import struct
+from pathlib import Path
+
+import trimesh
+
+logger = logging.getLogger(__name__)
+
+_GLB_MAGIC = b"glTF"
+_GLB_CHUNK_TYPES = {0x4E4F534A: "json", 0x004E4942: "bin"}
+
+def glb_chunk_sizes(path: str) -> dict[str, int] | None:
+    """
+    Tamanho de cada chunk do GLB (JSON e BIN), lido só dos cabeçalhos.
+    Returns:
+        {"total": ..., "json": ..., "bin": ...}, ou None se o arquivo não é um GLB.
+    """
+    with open(path, "rb") as f:
+        header = f.read(12)
+        if len(header) < 12 or header[:4] != _GLB_MAGIC:
+            return None
+        _, total = struct.unpack("<II", header[4:12])
+        sizes = {"total": total}
+        while chunk_header := f.read(8):
+            if len(chunk_header) < 8:
+                break
+            length, chunk_type = struct.unpack("<II", chunk_header)
+            name = _GLB_CHUNK_TYPES.get(chunk_type, f"0x{chunk_type:08x}")
+            sizes[name] = sizes.get(name, 0) + length
+            f.seek(length, 1)
+    return sizes
+
+def _texture_size(visual) -> tuple[int, int] | None:
+    material = getattr(visual, "material", None)
+    if material is None:
+        return None
+    # PBRMaterial (GLB) guarda a textura base em baseColorTexture; SimpleMaterial (OBJ) em image
+    image = getattr(material, "baseColorTexture", None) or getattr(material, "image", None)
+    return tuple(image.size) if image is not None else None
+
+def compute_mesh_stats(path: str) -> dict | None:
+    """
+    Estatísticas do modelo final, gravadas em Artifact.metadata: o Frontend e o Unity decidem
+    LOD/orçamento sem baixar o arquivo, e admins consultam em agregado direto no banco.
+    Melhor esforço: uma falha aqui nunca derruba o job (retorna None).
+    """
+    try:
+        scene = trimesh.load(path, force="scene")
+        vertex_count, face_count, has_colors = 0, 0, False
+        texture_width, texture_height = 0, 0
+
+        for geometry in scene.geometry.values():
+            if not isinstance(geometry, trimesh.Trimesh):
+                continue
+            vertex_count += len(geometry.vertices)
+            face_count += len(geometry.faces)
+            visual = geometry.visual
+            has_colors = has_colors or (visual.kind in ("vertex", "face"))
+            if visual.kind == "texture" and (size := _texture_size(visual)):
+                texture_width, texture_height = max(texture_width, size[0]), max(texture_height, size[1])
+
+        stats = {
+            "format": Path(path).suffix.lstrip(".").lower(),
+            "geometry_count": len(scene.geometry),
+            "vertex_count": vertex_count,
+            "face_count": face_count,
+            "has_colors": has_colors,
+            "has_texture": texture_width > 0,
+            "texture_width": texture_width or None,
+            "texture_height": texture_height or None,
+        }
+        bounds = scene.bounds
+        if bounds is not None:
+            stats["bbox_min"] = [round(float(v), 6) for v in bounds[0]]
+            stats["bbox_max"] = [round(float(v), 6) for v in bounds[1]]
+        if stats["format"] == "glb":
+            stats["glb_chunks"] = glb_chunk_sizes(path)
+        return stats
+    except Exception as e:
+        logger.warning(f"Falha ao calcular estatísticas da malha {path}: {e}")
+        return None
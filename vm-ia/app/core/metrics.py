@@ -0,0 +1,144 @@
+import glob
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+
+import psutil
+
+from app.core.config import settings
+from app.core.heartbeat import worker_name
+
+# Modo multiprocesso do prometheus_client: o RQ executa cada job num processo filho (fork),
+# então cada processo grava seus valores em arquivos mmap neste diretório e o exporter
+# do processo principal agrega tudo no scrape.
+# Um subdiretório por Worker: vários Workers na mesma máquina (geração + conversões) não
+# apagam nem somam os arquivos uns dos outros. Os processos dos jobs herdam a variável.
+# IMPORTANTE: precisa estar definido ANTES do primeiro import do prometheus_client.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(settings.METRICS_MULTIPROC_DIR, worker_name()))
+os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+from prometheus_client import CollectorRegistry, Counter, Histogram, multiprocess, start_http_server  # noqa: E402
+from prometheus_client.mmap_dict import MmapedDict, mmap_key  # noqa: E402
+
+# Buckets longos: jobs vão de segundos (SF3D) a 1h30 (DreamFusion)
+_DURATION_BUCKETS = (0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1200, 2400, 3600, 5400)
+
+JOB_DURATION = Histogram(
+    "worker_job_duration_seconds",
+    "Duração total do job no Worker",
+    ["model", "status"],
+    buckets=_DURATION_BUCKETS,
+)
+
+STAGE_DURATION = Histogram(
+    "worker_job_stage_duration_seconds",
+    "Duração de cada etapa do job (download, inference, convert, upload)",
+    ["model", "stage"],
+    buckets=_DURATION_BUCKETS,
+)
+
+STORAGE_BYTES = Counter(
+    "worker_storage_bytes_total",
+    "Bytes transferidos entre o Worker e o MinIO",
+    ["direction"], # upload | download
+)
+
+JANITOR_RECLAIMED_BYTES = Counter(
+    "worker_janitor_reclaimed_bytes_total",
+    "Bytes recuperados pelo janitor ao apagar pastas temporárias órfãs",
+)
+
+@contextmanager
+def track_stage(model_id: str, stage: str):
+    """
+    Mede a duração de uma etapa do pipeline:
+        with track_stage("sf3d-v1", "download"): ...
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_DURATION.labels(model_id, stage).observe(time.perf_counter() - start)
+
+# Tipos gravados pelos processos dos jobs (não há Gauges, cujos arquivos "live" o mark_process_dead já apaga)
+_ARCHIVED_TYPES = ("counter", "histogram")
+
+# Exporter e arquivamento rodam no processo principal do Worker: o scrape nunca vê um processo
+# contado duas vezes (no arquivo dele e no acumulado) nem nenhuma vez
+_files_lock = threading.Lock()
+
+class _LockedMultiProcessCollector(multiprocess.MultiProcessCollector):
+    def collect(self):
+        with _files_lock:
+            return super().collect()
+
+def archive_process_metrics(pid: int) -> None:
+    """
+    Incorpora os arquivos de um processo de job que já terminou aos acumulados do Worker
+    ("<tipo>_archive.db") e apaga os do processo. Sem isso cada job deixa seus .db no diretório
+    e o scrape, que lê todos, fica mais lento a cada job executado.
+    Contadores e histogramas continuam somando o mesmo valor (sem "reset" no Prometheus).
+    """
+    multiproc_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    with _files_lock:
+        multiprocess.mark_process_dead(pid, multiproc_dir)
+        for typ in _ARCHIVED_TYPES:
+            dead = glob.glob(os.path.join(multiproc_dir, f"{typ}_{pid}.db"))
+            if not dead:
+                continue
+            archive = os.path.join(multiproc_dir, f"{typ}_archive.db")
+            files = dead + ([archive] if os.path.exists(archive) else [])
+            # accumulate=False: buckets do histograma ficam não cumulativos, como nos arquivos
+            merged = multiprocess.MultiProcessCollector.merge(files, accumulate=False)
+
+            # Arquivo novo fora do glob "*.db" do collector, trocado de uma vez
+            staging = f"{archive}.tmp"
+            values = MmapedDict(staging)
+            try:
+                for metric in merged:
+                    for sample in metric.samples:
+                        key = mmap_key(metric.name, sample.name, list(sample.labels), list(sample.labels.values()),
+                                       metric.documentation)
+                        values.write_value(key, sample.value, 0.0)
+            finally:
+                values.close()
+            os.replace(staging, archive)
+            for path in dead:
+                os.remove(path)
+
+def _remove_dead_worker_dirs(base_dir: str) -> None:
+    """
+    Apaga os subdiretórios de Workers desta máquina que já morreram (nome "worker-ia-<pid>").
+    """
+    if not os.path.isdir(base_dir):
+        return
+    for entry in os.scandir(base_dir):
+        pid = entry.name.rsplit("-", 1)[-1]
+        if entry.is_dir() and entry.name.startswith("worker-ia-") and pid.isdigit() and not psutil.pid_exists(int(pid)):
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+def start_metrics_exporter(port: int, attempts: int = 1) -> int:
+    """
+    Sobe o servidor HTTP de métricas no processo principal do Worker.
+    Limpa os arquivos de execuções anteriores deste Worker e agrega os valores de todos os processos filhos.
+    Args:
+        attempts: Portas tentadas a partir de 'port' (a seguinte quando outro Worker já ocupa a porta).
+    Returns:
+        Porta em uso.
+    """
+    multiproc_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(multiproc_dir, ignore_errors=True)
+    os.makedirs(multiproc_dir, exist_ok=True)
+    _remove_dead_worker_dirs(settings.METRICS_MULTIPROC_DIR)
+
+    registry = CollectorRegistry()
+    _LockedMultiProcessCollector(registry)
+    for candidate in range(port, port + max(attempts, 1)):
+        try:
+            start_http_server(candidate, registry=registry)
+            return candidate
+        except OSError as e:
+            last_error = e
+    raise last_error
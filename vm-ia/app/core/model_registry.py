@@ -0,0 +1,111 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+import redis
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.ai_model import AIModel
+
+logger = logging.getLogger(__name__)
+
+# Chaves no Redis compartilhadas entre API e Worker
+MODELS_VERSION_KEY = "models:version"   # Contador incrementado a cada seed de modelos
+MODELS_RELOAD_CHANNEL = "models:reload" # Canal Pub/Sub que avisa a nova versão
+
+@dataclass(frozen=True)
+class ModelSpec:
+    """
+    Cópia em memória de uma linha da tabela 'models'.
+    """
+    id: str
+    name: str
+    default_params: dict[str, Any] = field(default_factory=dict)
+    is_active: bool = True
+
+    def merge_params(self, input_params: dict[str, Any]) -> dict[str, Any]:
+        """
+        Parâmetros efetivos do Job: defaults do modelo sobrescritos pelo que o cliente enviou.
+        """
+        return {**self.default_params, **(input_params or {})}
+
+class ModelRegistry:
+    """
+    Catálogo de modelos de IA em memória (mesma implementação na API e no Worker).
+    Carregado no startup e recarregado quando o seed publica uma nova versão no Redis.
+    """
+    def __init__(self):
+        self._models: dict[str, ModelSpec] = {}
+        self.version: int = 0
+        self.loaded: bool = False
+
+    def replace(self, models: list[AIModel], version: int) -> None:
+        """
+        Troca o catálogo inteiro de uma vez (leitores nunca veem um estado parcial).
+        """
+        self._models = {
+            m.id: ModelSpec(
+                id=m.id,
+                name=m.name,
+                default_params=dict(m.default_params or {}),
+                is_active=m.is_active
+            )
+            for m in models
+        }
+        self.version = version
+        self.loaded = True
+        logger.info(f"Registro de modelos carregado (versão {version}): {sorted(self._models)}")
+
+    def get(self, model_id: str) -> ModelSpec | None:
+        return self._models.get(model_id)
+
+    def __contains__(self, model_id: str) -> bool:
+        return model_id in self._models
+
+# Instância Singleton do processo
+model_registry = ModelRegistry()
+
+# Conexão própria (o Worker não usa o cliente da API)
+redis_conn = redis.from_url(settings.REDIS_URL)
+
+def load_model_registry() -> None:
+    """
+    Lê a tabela 'models' e a versão atual no Redis e substitui o catálogo em memória.
+    """
+    version = int(redis_conn.get(MODELS_VERSION_KEY) or 0)
+    with SessionLocal() as session:
+        models = session.query(AIModel).all()
+    model_registry.replace(models, version)
+
+def ensure_model_registry_fresh() -> None:
+    """
+    Chamado no início de cada job (1 GET no Redis).
+    Cobre o caso de um aviso de reload perdido ou de um processo que nunca carregou o catálogo.
+    """
+    version = int(redis_conn.get(MODELS_VERSION_KEY) or 0)
+    if not model_registry.loaded or version != model_registry.version:
+        load_model_registry()
+
+def _listen_for_reloads() -> None:
+    while True:
+        try:
+            pubsub = redis_conn.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(MODELS_RELOAD_CHANNEL)
+            for message in pubsub.listen():
+                if int(message["data"]) != model_registry.version:
+                    load_model_registry()
+        except Exception as e:
+            logger.error(f"Listener do catálogo de modelos caiu (reconectando): {e}")
+            time.sleep(5)
+
+def start_model_registry_listener() -> threading.Thread:
+    """
+    Inicia (no processo principal do Worker) a thread que recarrega o catálogo a cada seed.
+    Como o RQ faz fork por job, cada job herda o catálogo já atualizado do processo pai.
+    """
+    thread = threading.Thread(target=_listen_for_reloads, name="model-registry", daemon=True)
+    thread.start()
+    return thread
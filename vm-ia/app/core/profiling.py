@@ -0,0 +1,72 @@
+import cProfile
+import os
+import pstats
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Profiler do job em execução (None quando o job não pediu profiling).
+# O caminho sem profiling só faz um .get() aqui: custo zero na prática.
+_active_profiler: ContextVar["JobProfiler | None"] = ContextVar("active_profiler", default=None)
+
+class JobProfiler:
+    """
+    Coleta de diagnóstico de um job com 'profile: true' (apenas administradores):
+    - cProfile das etapas de pós-processamento (relatório texto + .prof para snakeviz);
+    - stdout/stderr completos dos Wrappers.
+    Tudo é enviado ao Storage pelo Worker e registrado como artefatos LOG no fim do job.
+    """
+    def __init__(self, job_id: str, output_dir: str):
+        self.job_id = job_id
+        self.output_dir = output_dir
+        self.log_files: list[str] = []
+
+    @contextmanager
+    def profile(self, name: str):
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            raw_path = os.path.join(self.output_dir, f"profile_{name}.prof")
+            report_path = os.path.join(self.output_dir, f"profile_{name}.txt")
+            profiler.dump_stats(raw_path)
+            with open(report_path, "w") as f:
+                stats = pstats.Stats(profiler, stream=f)
+                stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(50)
+            self.log_files += [report_path, raw_path]
+
+    def wrapper_log_paths(self, name: str) -> tuple[str, str]:
+        """
+        Caminhos onde o stdout e o stderr do Wrapper serão gravados na íntegra.
+        """
+        paths = (
+            os.path.join(self.output_dir, f"{name}_stdout.log"),
+            os.path.join(self.output_dir, f"{name}_stderr.log"),
+        )
+        self.log_files += list(paths)
+        return paths
+
+    def log_targets(self) -> list[tuple[str, str]]:
+        """
+        Arquivos coletados que existem em disco, com o destino em jobs/<id>/logs/.
+        """
+        return [
+            (path, f"jobs/{self.job_id}/logs/{os.path.basename(path)}")
+            for path in self.log_files if os.path.exists(path)
+        ]
+
+@contextmanager
+def job_profiling(job_id: str, output_dir: str, enabled: bool):
+    """
+    Ativa o JobProfiler durante o bloco (se enabled) e o desativa ao sair.
+    """
+    profiler = JobProfiler(job_id, output_dir) if enabled else None
+    token = _active_profiler.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _active_profiler.reset(token)
+
+def get_job_profiler() -> JobProfiler | None:
+    return _active_profiler.get()
@@ -3,6 +3,7 @@ import boto3
 import logging
 from botocore.exceptions import ClientError
 from app.core.config import settings
+from app.core.metrics import STORAGE_BYTES
 
 logger = logging.getLogger(__name__)
 
@@ -56,6 +57,7 @@ class StorageClient:
         try:
             # Correção: Usando self.s3_client (consistente com __init__)
             self.s3_client.upload_file(file_path, bucket, object_name)
+            STORAGE_BYTES.labels("upload").inc(os.path.getsize(file_path))
             logger.info(f"Upload realizado com sucesso: {file_path} -> {bucket}/{object_name}")
             return True
         except Exception as e:
@@ -74,6 +76,7 @@ class StorageClient:
         try:
             # Correção: Assinatura corrigida para receber bucket, object_name e file_path
             self.s3_client.download_file(bucket, object_name, file_path)
+            STORAGE_BYTES.labels("download").inc(os.path.getsize(file_path))
             logger.info(f"Download realizado com sucesso: {object_name} -> {file_path}")
             return True
         except Exception as e:
@@ -0,0 +1,151 @@
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+# Tracing mínimo, sem dependências externas, exportando spans no formato OTLP/JSON
+# (o mesmo do 'fileexporter' do OpenTelemetry Collector: uma ExportTraceServiceRequest por linha).
+# O arquivo pode ser lido por qualquer ferramenta OTel ou reenviado a um Collector.
+# Propagação entre processos via W3C 'traceparent' (00-<trace_id>-<span_id>-01).
+# Não importa 'settings': os Wrappers (processos isolados) também usam este módulo.
+# Espelho de vm-mgmnt/backend/app/core/tracing.py (mesmo formato; lá a exportação é em buffer,
+# gravado fora do event loop). Os testes do backend comparam as duas cópias.
+
+# Configuração do exportador (definida por configure_tracing no startup de cada processo)
+_config = {"service_name": "tcc", "export_path": None}
+_write_lock = threading.Lock()
+
+# Span ativo no contexto atual (funciona com threads e com asyncio)
+_current_span: ContextVar["Span | None"] = ContextVar("current_span", default=None)
+
+def configure_tracing(service_name: str, export_path: str | None) -> None:
+    """
+    Define o nome do serviço e o arquivo de saída. export_path=None desativa a exportação.
+    """
+    _config["service_name"] = service_name
+    _config["export_path"] = export_path
+    if export_path:
+        os.makedirs(os.path.dirname(os.path.abspath(export_path)), exist_ok=True)
+
+def new_trace_id() -> str:
+    return secrets.token_hex(16)
+
+def parse_traceparent(traceparent: str | None) -> tuple[str, str] | None:
+    """
+    Extrai (trace_id, span_id) de um header W3C traceparent. Retorna None se inválido.
+    """
+    if not traceparent:
+        return None
+    parts = traceparent.split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return parts[1], parts[2]
+
+class Span:
+    def __init__(self, name: str, trace_id: str, parent_span_id: str | None, attributes: dict[str, Any] | None = None,
+                 start_ns: int | None = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent_span_id
+        self.attributes = dict(attributes or {})
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns: int | None = None
+        self.error: str | None = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def end(self, end_ns: int | None = None) -> None:
+        if self.end_ns is None:
+            self.end_ns = end_ns or time.time_ns()
+            _export(self)
+
+def start_span(name: str, attributes: dict[str, Any] | None = None, traceparent: str | None = None,
+               trace_id: str | None = None, start_ns: int | None = None) -> Span:
+    """
+    Cria um span filho do span ativo, ou do 'traceparent' informado (vindo de outro processo).
+    Sem nenhum dos dois, inicia um trace novo (com trace_id informado ou gerado).
+    """
+    parent = _current_span.get()
+    remote = parse_traceparent(traceparent)
+    if remote:
+        trace_id, parent_span_id = remote
+    elif parent:
+        trace_id, parent_span_id = parent.trace_id, parent.span_id
+    else:
+        trace_id, parent_span_id = trace_id or new_trace_id(), None
+    return Span(name, trace_id, parent_span_id, attributes, start_ns)
+
+@contextmanager
+def trace_span(name: str, attributes: dict[str, Any] | None = None, traceparent: str | None = None):
+    """
+    Context manager: abre o span, torna-o ativo no bloco e o finaliza (registrando erro, se houver).
+        with trace_span("worker.upload"): ...
+    """
+    span = start_span(name, attributes, traceparent)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+
+def current_traceparent() -> str | None:
+    """
+    traceparent do span ativo (para repassar a subprocessos/filas).
+    """
+    span = _current_span.get()
+    return span.traceparent if span else None
+
+def _attribute_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)} # OTLP/JSON codifica int64 como string
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+def _export(span: Span) -> None:
+    export_path = _config["export_path"]
+    if not export_path:
+        return
+
+    otlp_span = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1, # SPAN_KIND_INTERNAL
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [{"key": k, "value": _attribute_value(v)} for k, v in span.attributes.items()],
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+    }
+    if span.parent_span_id:
+        otlp_span["parentSpanId"] = span.parent_span_id
+
+    line = json.dumps({
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": _config["service_name"]}}]},
+            "scopeSpans": [{"scope": {"name": "tcc.tracing"}, "spans": [otlp_span]}],
+        }]
+    })
+
+    # Append de uma linha curta: vários processos (API, Worker, Wrappers) podem escrever no mesmo arquivo
+    try:
+        with _write_lock, open(export_path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    except OSError:
+        pass # Tracing nunca pode derrubar o job
@@ -0,0 +1,319 @@
+import fcntl
+import json
+import logging
+import os
+import random
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable
+
+from app.core.config import settings
+from app.core.heartbeat import worker_is_alive, worker_name
+from app.core.storage import storage
+
+logger = logging.getLogger(__name__)
+
+# Raiz do spool (relativa à raiz vm-ia/, como os traces). Precisa sobreviver a restarts do Worker.
+SPOOL_ROOT = Path(__file__).resolve().parents[2] / settings.UPLOAD_SPOOL_DIR
+
+MANIFEST_NAME = "manifest.json"
+LOCK_NAME = ".lock"
+STAGING_PREFIX = ".staging-"
+
+class UploadSpool:
+    """
+    Spool local e durável dos artefatos finais de um job.
+
+    Assim que o modelo termina, o resultado (e os logs) saem do diretório temporário do job
+    para <raiz>/<job_id>/, junto de um manifest.json com o destino de cada arquivo no Storage.
+    O job só é finalizado no banco (callback on_uploaded) depois que TODOS os arquivos subiram;
+    até lá a entrada fica no disco e é reenviada com backoff exponencial, inclusive após restart.
+    Vários Workers da mesma máquina dividem a raiz: cada entrada registra o Worker dono ('owner'),
+    o único que a reenvia e renova a lease do job; se ele morrer, outro Worker adota a entrada.
+
+    Layout:
+        <raiz>/<job_id>/manifest.json
+        <raiz>/<job_id>/<arquivos>
+        <raiz>/.staging-<job_id>/   (entrada sendo montada; vira <job_id> com um rename atômico)
+    """
+    def __init__(self, root: Path, upload: Callable[[str, str], None]):
+        """
+        Args:
+            root: Diretório do spool.
+            upload: Função (caminho_local, caminho_no_storage) que envia um arquivo (levanta em caso de erro).
+        """
+        self.root = Path(root)
+        self.upload = upload
+
+    # --------------------------------------------------
+    # Montagem da entrada (processo do job)
+    # --------------------------------------------------
+    def add(self, job_id: str, model_id: str, output: tuple[str, str], logs: list[tuple[str, str]],
+            output_metadata: dict | None = None) -> Path:
+        """
+        Move o resultado e os logs do job para o spool.
+        Args:
+            output: (caminho_local, caminho_no_storage) do artefato final.
+            logs: Lista de (caminho_local, caminho_no_storage) dos logs.
+            output_metadata: Estatísticas da malha final (vão para Artifact.metadata na finalização).
+        Returns:
+            Diretório da entrada criada.
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        staging = self.root / f"{STAGING_PREFIX}{job_id}"
+        entry = self.root / job_id
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir()
+
+        files = []
+        for kind, (local_path, remote_path) in [("output", output), *[("log", log) for log in logs]]:
+            name = f"{len(files):02d}_{os.path.basename(local_path)}"
+            shutil.move(local_path, staging / name)
+            files.append({
+                "name": name,
+                "remote_path": remote_path,
+                "kind": kind,
+                "size": (staging / name).stat().st_size,
+                "uploaded": False,
+            })
+        files[0]["metadata"] = output_metadata
+
+        manifest = {
+            "job_id": job_id,
+            "model_id": model_id,
+            "owner": worker_name(), # Nome herdado do Worker pelo processo do job
+            "files": files,
+            "attempts": 0,
+            "next_attempt_at": 0,
+            "last_error": None,
+            "spooled_at": time.time(),
+        }
+        self._write_manifest(staging, manifest)
+
+        # Reentrega do mesmo job: a entrada nova substitui a antiga
+        if entry.exists():
+            shutil.rmtree(entry)
+        os.replace(staging, entry)
+        return entry
+
+    # --------------------------------------------------
+    # Envio (processo do job e thread do UploadSpooler)
+    # --------------------------------------------------
+    def flush(self, job_id: str, on_uploaded: Callable[[dict], None]) -> bool:
+        """
+        Tenta enviar os arquivos pendentes de uma entrada e, se todos subirem, chama
+        on_uploaded(manifest) e apaga a entrada.
+        Returns:
+            True se a entrada foi concluída (ou já não existe); False se continua no spool.
+        """
+        entry = self.root / job_id
+        with self._entry_lock(entry) as locked:
+            if not locked:
+                return False # Outro processo está enviando esta entrada agora
+            manifest = self._read_manifest(entry)
+            if manifest is None:
+                return True
+
+            try:
+                for item in manifest["files"]:
+                    if item["uploaded"]:
+                        continue
+                    self.upload(str(entry / item["name"]), item["remote_path"])
+                    item["uploaded"] = True
+                    # Persiste o progresso: num retry, só o que faltou é reenviado
+                    self._write_manifest(entry, manifest)
+
+                on_uploaded(manifest)
+            except Exception as e:
+                manifest["attempts"] += 1
+                manifest["last_error"] = str(e)
+                manifest["next_attempt_at"] = time.time() + self.backoff(manifest["attempts"])
+                self._write_manifest(entry, manifest)
+                logger.warning(
+                    f"Upload do job {job_id} falhou (tentativa {manifest['attempts']}): {e}. "
+                    f"Artefatos mantidos no spool, nova tentativa em "
+                    f"{manifest['next_attempt_at'] - time.time():.0f}s."
+                )
+                return False
+
+            shutil.rmtree(entry, ignore_errors=True)
+            return True
+
+    def flush_due(self, on_uploaded: Callable[[dict], None], owner: str | None = None) -> None:
+        """
+        Reenvia as entradas (de 'owner', se informado) cujo backoff já venceu.
+        """
+        now = time.time()
+        for job_id in self.pending(owner):
+            manifest = self._read_manifest(self.root / job_id)
+            if manifest and manifest["next_attempt_at"] <= now:
+                self.flush(job_id, on_uploaded)
+
+    def pending(self, owner: str | None = None) -> list[str]:
+        """
+        job_ids com entrada completa no spool (só as de 'owner', se informado).
+        """
+        if not self.root.exists():
+            return []
+        job_ids = sorted(
+            path.name for path in self.root.iterdir()
+            if path.is_dir() and not path.name.startswith(STAGING_PREFIX)
+        )
+        if owner is None:
+            return job_ids
+        return [job_id for job_id in job_ids if (self._read_manifest(self.root / job_id) or {}).get("owner") == owner]
+
+    def adopt(self, owner: str, is_alive: Callable[[str], bool]) -> set[str]:
+        """
+        Passa para 'owner' as entradas cujo dono morreu (heartbeat expirado) e as libera para envio imediato.
+        Entradas de Workers vivos não são tocadas: só o dono envia a entrada e renova a lease do job.
+        Returns:
+            Nomes dos donos anteriores (a lease dos jobs adotados ainda está em nome deles).
+        """
+        previous_owners = set()
+        for job_id in self.pending():
+            entry = self.root / job_id
+            with self._entry_lock(entry) as locked:
+                if not locked:
+                    continue # Sendo enviada agora (pelo dono, que então está vivo)
+                manifest = self._read_manifest(entry)
+                previous = manifest.get("owner") if manifest else owner
+                if previous == owner or (previous and is_alive(previous)):
+                    continue
+                manifest["owner"] = owner
+                manifest["next_attempt_at"] = 0
+                self._write_manifest(entry, manifest)
+            if previous:
+                previous_owners.add(previous)
+            logger.info(f"Spool de uploads: job {job_id} adotado de {previous or 'Worker desconhecido'}.")
+        return previous_owners
+
+    def recover(self) -> None:
+        """
+        Executado no startup do Worker: conclui entradas cujo rename não chegou a acontecer
+        e libera as pendentes para envio imediato.
+        """
+        if not self.root.exists():
+            return
+        for staging in self.root.glob(f"{STAGING_PREFIX}*"):
+            job_id = staging.name[len(STAGING_PREFIX):]
+            if (staging / MANIFEST_NAME).exists() and not (self.root / job_id).exists():
+                os.replace(staging, self.root / job_id)
+            else:
+                # Queda no meio da montagem: não dá para saber se o resultado está completo
+                logger.warning(f"Entrada incompleta no spool mantida para inspeção manual: {staging}")
+
+        for job_id in self.pending():
+            entry = self.root / job_id
+            manifest = self._read_manifest(entry)
+            if manifest:
+                manifest["next_attempt_at"] = 0
+                self._write_manifest(entry, manifest)
+        if self.pending():
+            logger.info(f"Spool de uploads: {len(self.pending())} job(s) pendente(s) recuperado(s).")
+
+    @staticmethod
+    def backoff(attempts: int) -> float:
+        """
+        Backoff exponencial com jitter, limitado a UPLOAD_RETRY_MAX_DELAY.
+        """
+        delay = min(settings.UPLOAD_RETRY_MAX_DELAY, settings.UPLOAD_RETRY_BASE_DELAY * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    # --------------------------------------------------
+    # Auxiliares de disco
+    # --------------------------------------------------
+    @staticmethod
+    def _read_manifest(entry: Path) -> dict | None:
+        try:
+            with open(entry / MANIFEST_NAME) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _write_manifest(entry: Path, manifest: dict) -> None:
+        # Escrita atômica: um crash nunca deixa um manifest pela metade
+        tmp_path = entry / f"{MANIFEST_NAME}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, entry / MANIFEST_NAME)
+
+    @staticmethod
+    @contextmanager
+    def _entry_lock(entry: Path):
+        """
+        Lock exclusivo (flock, não bloqueante) da entrada: o processo do job e a thread
+        do UploadSpooler nunca enviam a mesma entrada ao mesmo tempo.
+        """
+        try:
+            fd = os.open(entry / LOCK_NAME, os.O_CREAT | os.O_RDWR)
+        except FileNotFoundError:
+            yield True # Entrada já concluída por outro processo
+            return
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            yield True
+        finally:
+            os.close(fd)
+
+class UploadSpooler:
+    """
+    Thread do processo principal do Worker que reenvia periodicamente o que ficou no spool
+    (falhas de upload dos jobs deste Worker e entradas adotadas de Workers mortos ou de uma execução anterior).
+    on_pending, se informado, recebe a cada JOB_LEASE_RENEW_INTERVAL os job_ids ainda no spool deste Worker
+    e os donos anteriores dos adotados (renovação das leases: o job segue vivo enquanto o resultado espera o upload).
+    """
+    def __init__(self, spool: UploadSpool, on_uploaded: Callable[[dict], None],
+                 on_pending: Callable[[list[str], set[str]], None] | None = None,
+                 owner: str | None = None, is_alive: Callable[[str], bool] = worker_is_alive):
+        self.spool = spool
+        self.on_uploaded = on_uploaded
+        self.on_pending = on_pending
+        self.owner = owner or worker_name()
+        self.is_alive = is_alive
+        self._last_pending_report = 0.0
+        self._stop = threading.Event()
+
+    def run_once(self) -> None:
+        """
+        Uma rodada: adota entradas de Workers mortos e reporta as pendentes (a cada JOB_LEASE_RENEW_INTERVAL)
+        e reenvia as entradas deste Worker com backoff vencido.
+        """
+        if time.monotonic() - self._last_pending_report >= settings.JOB_LEASE_RENEW_INTERVAL:
+            previous_owners = self.spool.adopt(self.owner, self.is_alive)
+            if self.on_pending:
+                self.on_pending(self.spool.pending(self.owner), previous_owners)
+            self._last_pending_report = time.monotonic()
+        self.spool.flush_due(self.on_uploaded, self.owner)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.warning(f"Falha ao processar spool de uploads: {e}")
+            self._stop.wait(settings.UPLOAD_SPOOL_POLL_INTERVAL)
+
+    def start(self) -> threading.Thread:
+        self.spool.recover()
+        thread = threading.Thread(target=self._run, name="upload-spooler", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        self._stop.set()
+
+def storage_upload(local_path: str, remote_path: str) -> None:
+    storage.upload_file(local_path, settings.MINIO_BUCKET, remote_path)
+
+upload_spool = UploadSpool(SPOOL_ROOT, storage_upload)
@@ -1,9 +1,10 @@
 import uuid
 import enum
 from datetime import datetime
-from sqlalchemy import String, Integer, DateTime, ForeignKey
+from typing import Any
+from sqlalchemy import String, Integer, DateTime, ForeignKey, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 
 from app.models.base import Base
 
@@ -13,17 +14,33 @@ class ArtifactType(str, enum.Enum):
     OUTPUT_MODEL = "OUTPUT_MODEL"     # O arquivo .glb ou .obj final
     PREVIEW = "PREVIEW"       # Thumbnail ou render
     LOG = "LOG"               # Arquivos de log de erro
+    CONVERTED = "CONVERTED"   # Modelo convertido sob demanda (USDZ, PLY, STL, OBJ)
+
+# Expressão do índice ix_artifacts_face_count (chave literal: com bind parameter o índice não casa)
+FACE_COUNT_SQL = "((metadata ->> 'face_count')::integer)"
 
 class Artifact(Base):
     __tablename__ = "artifacts"
+    __table_args__ = (
+        # GIN (jsonb_path_ops): filtros por containment nas estatísticas da malha (metadata @> '{"has_texture": true}').
+        # Índices em __table_args__ referenciam o nome da coluna ("metadata"), não o atributo metadata_
+        Index("ix_artifacts_metadata", "metadata", postgresql_using="gin", postgresql_ops={"metadata": "jsonb_path_ops"}),
+        # O GIN só atende @>: comparações numéricas (filtro max_faces da galeria) usam este índice de expressão.
+        # A query precisa repetir a MESMA expressão (FACE_COUNT_SQL) para o Postgres escolhê-lo.
+        Index("ix_artifacts_face_count", text(FACE_COUNT_SQL)),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     job_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("jobs.id"), nullable=False, index=True)
     
     # Armazena como string no banco, mas usamos o Enum no código
     type: Mapped[str] = mapped_column(String, nullable=False) 
-    storage_path: Mapped[str] = mapped_column(String, nullable=False)
+    storage_path: Mapped[str] = mapped_column(String, nullable=False, index=True) # Índice: lookup da retenção
     file_size_bytes: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+    # Estatísticas do OUTPUT_MODEL calculadas pelo Worker (vértices, faces, bbox, textura, chunks do GLB).
+    # "metadata" é nome reservado no Declarative: o atributo é metadata_, a coluna continua "metadata"
+    metadata_: Mapped[dict[str, Any] | None] = mapped_column("metadata", JSONB, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
 
     job = relationship("app.models.job_model.Job", back_populates="artifacts")
\ No newline at end of file
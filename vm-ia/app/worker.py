@@ -1,18 +1,36 @@
 import sys
 import os
 import logging
+import shutil
 import subprocess
 import tempfile
+import time
 import math
 import numpy as np
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import Callable
+from contextlib import contextmanager
+from functools import partial
 import trimesh # Biblioteca para manipulação de malhas 3D
+from rq import get_current_job
 
 # Imports do Core
-from app.core.database import SessionLocal
+from app.core.database import SessionLocal, sync_engine
 from app.core.storage import storage 
 from app.core.config import settings
+from app.core.model_registry import model_registry, ensure_model_registry_fresh
+from app.core.metrics import JOB_DURATION, track_stage
+from app.core.heartbeat import report_stage, reporting_job, worker_name
+from app.core.job_lease import holding_job_lease, lease_expiry
+from app.core.tracing import configure_tracing, current_traceparent, start_span, trace_span
+from app.core.profiling import get_job_profiler, job_profiling
+from app.core.upload_spool import upload_spool
+from app.core.janitor import JOB_TEMP_PREFIX
+from app.core.mesh_stats import compute_mesh_stats
+from app.core.glb_textures import reencode_glb_textures
+from app.core.mesh_cleanup import cleanup_mesh
+from app.core.cancellation import JobCancelled, get_job_cancellation, watching_cancellation
 
 # Imports dos Modelos
 from app.models.job_model import Job, JobStatus
@@ -26,14 +44,108 @@ logger = logging.getLogger(__name__)
 BASE_DIR = Path(__file__).resolve().parents[1]
 WRAPPERS_DIR = BASE_DIR / "wrappers"
 
-def convert_obj_to_glb(input_obj_path: str, output_glb_path: str):
+# Exportação de spans (mesmo arquivo é usado pelos Wrappers, via variável de ambiente)
+TRACE_EXPORT_PATH = str(BASE_DIR / settings.TRACE_EXPORT_PATH) if settings.TRACE_EXPORT_PATH else None
+configure_tracing("tcc-worker", TRACE_EXPORT_PATH)
+
+# Log da saída do modelo gravado pelos Wrappers (--log_path), um por Wrapper
+WRAPPER_LOG_SUFFIX = "_model.log.gz"
+
+# Etapas de pós-processamento (rodam dentro do Worker e são perfiladas quando o job pede)
+POST_PROCESSING_STAGES = {"convert", "texture", "mesh_stats"}
+
+@contextmanager
+def pipeline_stage(model_id: str, stage: str):
+    """
+    Etapa do pipeline: publica a etapa atual no heartbeat, mede sua duração (métricas)
+    e registra um span no trace do job.
+    """
+    # Cancelamento entre etapas (durante a inferência o processo do Wrapper é morto na hora)
+    cancellation = get_job_cancellation()
+    if cancellation:
+        cancellation.raise_if_cancelled()
+
+    report_stage(stage)
+    with track_stage(model_id, stage), trace_span(f"worker.{stage}", {"job.model_id": model_id}):
+        profiler = get_job_profiler()
+        if profiler and stage in POST_PROCESSING_STAGES:
+            with profiler.profile(stage):
+                yield
+        else:
+            yield
+
+def wrapper_env() -> dict:
+    """
+    Ambiente do subprocesso do Wrapper: repassa o contexto de trace para que as fases
+    do Wrapper (treino, exportação...) apareçam como filhas da etapa atual.
+    """
+    env = os.environ.copy()
+    traceparent = current_traceparent()
+    if traceparent and TRACE_EXPORT_PATH:
+        env["TRACEPARENT"] = traceparent
+        env["TRACE_EXPORT_PATH"] = TRACE_EXPORT_PATH
+    return env
+
+def run_wrapper(cmd: list[str], name: str, work_dir: str) -> None:
+    """
+    Executa o Wrapper do modelo. A saída do modelo é gravada pelo próprio Wrapper
+    (em streaming, gzip) em <work_dir>/<name>_model.log.gz e sobe como artefato LOG.
+    Com profiling ativo, também grava stdout/stderr completos do Wrapper.
+    Roda em um grupo de processos próprio, interrompível por POST /jobs/{id}/cancel.
+    """
+    cmd = [*cmd, "--log_path", os.path.join(work_dir, f"{name}{WRAPPER_LOG_SUFFIX}")]
+    cancellation = get_job_cancellation()
+    run = cancellation.run if cancellation else partial(subprocess.run, check=True)
+
+    profiler = get_job_profiler()
+    if profiler is None:
+        run(cmd, env=wrapper_env())
+        return
+
+    stdout_path, stderr_path = profiler.wrapper_log_paths(name)
+    with open(stdout_path, "w") as stdout, open(stderr_path, "w") as stderr:
+        run(cmd, env=wrapper_env(), stdout=stdout, stderr=stderr)
+
+def job_log_targets(job_id: str, work_dir: str) -> list[tuple[str, str]]:
+    """
+    Logs do job: saída dos modelos (sempre) e o material do profiler (se ativo).
+    Returns:
+        Lista de (caminho_local, caminho_no_storage) em jobs/<id>/logs/.
+    """
+    targets = [
+        (str(path), f"jobs/{job_id}/logs/{path.name}")
+        for path in sorted(Path(work_dir).glob(f"*{WRAPPER_LOG_SUFFIX}"))
+    ]
+    profiler = get_job_profiler()
+    if profiler:
+        targets.extend(profiler.log_targets())
+    return targets
+
+def upload_job_logs(job_id: str, work_dir: str) -> list[tuple[str, int]]:
+    """
+    Sobe os logs de um job que falhou (no sucesso eles vão junto do resultado pelo spool).
+    Returns:
+        Lista de (caminho_no_storage, tamanho) para registrar como artefatos LOG.
+    """
+    uploaded = []
+    for local_path, remote_path in job_log_targets(job_id, work_dir):
+        try:
+            storage.upload_file(local_path, settings.MINIO_BUCKET, remote_path)
+            uploaded.append((remote_path, os.path.getsize(local_path)))
+        except Exception as e:
+            # Log é diagnóstico: falha no envio não muda o status do job
+            logger.warning(f"Falha ao enviar log {os.path.basename(local_path)}: {e}")
+    return uploaded
+
+def convert_obj_to_glb(input_obj_path: str, output_glb_path: str, cleanup: bool = True):
     """
     Converte um arquivo .obj (texto) para .glb (binário) usando trimesh.
     Essencial para visualização Web (<model-viewer>) e Unity.
     
     Inclui correções validadas (V3):
     1. Extração manual de cores de vértices (formato não-padrão).
-    2. Correção de Orientação (Z-up para Y-up).
+    2. Limpeza da malha (solda, faces degeneradas, ilhas), desligável com cleanup=False.
+    3. Correção de Orientação (Z-up para Y-up).
     """
     logger.info(f"Iniciando conversão de formato: OBJ -> GLB")
     
@@ -82,18 +194,32 @@ def convert_obj_to_glb(input_obj_path: str, output_glb_path: str):
                         if len(face_idxs) == 4: # Transforma quad em 2 triângulos
                             faces.append([face_idxs[0], face_idxs[2], face_idxs[3]])
 
-        # 2. Reconstrução da Malha com Trimesh
+        vertex_colors = np.asarray(colors, dtype=np.uint8) if len(colors) == len(vertices) else None
+        if vertex_colors is None:
+            logger.warning(f"Descompasso de cores: {len(colors)} cores para {len(vertices)} vértices.")
+
+        # 2. Limpeza explícita (vetorizada) da malha do marching cubes: vértices duplicados,
+        # faces degeneradas e ilhas flutuantes, mantendo as cores por vértice
+        if cleanup:
+            with trace_span("worker.mesh_cleanup"):
+                vertices, faces, vertex_colors, report = cleanup_mesh(
+                    vertices, faces, vertex_colors,
+                    weld_tolerance=settings.MESH_CLEANUP_WELD_TOLERANCE,
+                    min_component_faces=settings.MESH_CLEANUP_MIN_COMPONENT_FACES,
+                )
+            logger.info(f"Limpeza da malha: {report.summary()}")
+
+        # 3. Reconstrução da Malha com Trimesh
         # process=False é crucial para evitar que o trimesh reordene vértices e perca a referência das cores
+        # (a limpeza já foi feita acima, de forma explícita)
         mesh = trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
         
         # Aplicação das Cores Visuais (sem textura/UV, apenas vertex colors)
-        if len(colors) == len(vertices):
-            mesh.visual = trimesh.visual.ColorVisuals(mesh, vertex_colors=colors)
+        if vertex_colors is not None:
+            mesh.visual = trimesh.visual.ColorVisuals(mesh, vertex_colors=vertex_colors)
             logger.info("Cores de vértice aplicadas com sucesso.")
-        else:
-            logger.warning(f"Descompasso de cores: {len(colors)} cores para {len(vertices)} vértices.")
 
-        # 3. Correção de Orientação (Z-up -> Y-up)
+        # 4. Correção de Orientação (Z-up -> Y-up)
         # Aplica rotação de -90 graus no eixo X para o modelo ficar "em pé"
         logger.info("Aplicando correção de rotação (Z-up -> Y-up)...")
         rotation_matrix = trimesh.transformations.rotation_matrix(
@@ -102,7 +228,7 @@ def convert_obj_to_glb(input_obj_path: str, output_glb_path: str):
         )
         mesh.apply_transform(rotation_matrix)
 
-        # 4. Exportação
+        # 5. Exportação
         mesh.export(output_glb_path, file_type='glb')
         
         # Verificação final
@@ -121,14 +247,25 @@ def update_job_start(job_id: str):
     """
     Abre uma sessão curta apenas para marcar o início do Job.
     Retorna o prompt (se houver) para uso na memória, desconectando do banco logo em seguida.
+    Retorna None se o job não existe ou já foi iniciado por outra entrega.
     """
     with SessionLocal() as session:
-        job = session.query(Job).filter(Job.id == job_id).first()
+        # FOR UPDATE: duas entregas do mesmo job (outbox é at-least-once) não passam daqui juntas
+        job = session.query(Job).filter(Job.id == job_id).with_for_update().first()
         if not job:
             return None
+
+        # Deduplicação: só um job ainda na fila pode ser iniciado.
+        # Uma reentrega de um job já iniciado/finalizado é descartada.
+        if job.status != JobStatus.QUEUED:
+            logger.warning(f"Job {job_id} já está com status {job.status}. Entrega duplicada ignorada.")
+            return None
         
         job.status = JobStatus.PROCESSING
         job.started_at = datetime.utcnow()
+        # Lease: este Worker passa a ser o dono do job (renovada por holding_job_lease)
+        job.leased_by = worker_name()
+        job.lease_expires_at = lease_expiry()
         
         # Captura dados necessários antes de fechar a sessão
         job_data = {
@@ -138,19 +275,37 @@ def update_job_start(job_id: str):
         session.commit()
         return job_data
 
-def update_job_finish(job_id: str, status: JobStatus, artifact_path: str = None, file_size: int = 0, error_msg: str = None):
+def update_job_finish(job_id: str, status: JobStatus, artifact_path: str = None, file_size: int = 0, error_msg: str = None,
+                      log_artifacts: list[tuple[str, int]] = None, artifact_metadata: dict = None) -> bool:
     """
     Abre uma NOVA sessão apenas para marcar o fim do Job.
     Isso evita timeouts de conexão em jobs longos (DreamFusion).
+    log_artifacts: (caminho, tamanho) de logs/profiles, registrados em qualquer status.
+    artifact_metadata: Estatísticas da malha (mesh_stats), gravadas no OUTPUT_MODEL.
+    Returns:
+        False se a finalização foi ignorada com o job ainda em aberto (lease com outra execução ou de volta
+        à fila); True se não há mais nada a finalizar (finalizado agora, já finalizado antes ou inexistente).
     """
     with SessionLocal() as session:
-        job = session.query(Job).filter(Job.id == job_id).first()
+        job = session.query(Job).filter(Job.id == job_id).with_for_update().first()
         if not job:
             logger.error(f"Job {job_id} não encontrado para finalização.")
-            return
+            return True
+
+        # Lease: o reaper pode ter recolhido o job enquanto este processo ainda rodava.
+        # Só o dono atual da lease finaliza: depois do reaper o job já voltou para a fila (ou está FAILED),
+        # e um resultado atrasado desta execução é descartado (sucesso ou falha).
+        if job.status in (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED):
+            logger.warning(f"Job {job_id} já finalizado com status {job.status}. Finalização duplicada ignorada.")
+            return True
+        if job.status != JobStatus.PROCESSING or job.leased_by != worker_name():
+            logger.warning(f"Job {job_id} foi recolhido pelo reaper ou assumido por outra execução. Finalização desta execução ignorada.")
+            return False
 
         job.status = status
         job.completed_at = datetime.utcnow()
+        job.leased_by = None
+        job.lease_expires_at = None
         
         if status == JobStatus.SUCCEEDED:
             job.progress_percent = 100
@@ -161,7 +316,8 @@ def update_job_finish(job_id: str, status: JobStatus, artifact_path: str = None,
                     job_id=job_id,
                     type=ArtifactType.OUTPUT_MODEL,
                     storage_path=artifact_path,
-                    file_size_bytes=file_size
+                    file_size_bytes=file_size,
+                    metadata_=artifact_metadata
                 )
                 session.add(artifact)
         
@@ -171,107 +327,221 @@ def update_job_finish(job_id: str, status: JobStatus, artifact_path: str = None,
             # Como não temos coluna error_message no model atual, apenas logamos
             logger.error(f"Finalizando Job {job_id} com erro: {error_msg}")
 
+        # Logs (saída dos modelos e, se ativo, o profiling) valem tanto para sucesso quanto para falha
+        for log_path, log_size in log_artifacts or []:
+            session.add(Artifact(
+                job_id=job_id,
+                type=ArtifactType.LOG,
+                storage_path=log_path,
+                file_size_bytes=log_size
+            ))
+
         session.commit()
         logger.info(f"Job {job_id} finalizado com status: {status}")
+        return True
+
+def finish_spooled_job(manifest: dict) -> None:
+    """
+    Callback do spool de uploads: todos os arquivos do job já estão no Storage,
+    então o job pode ser marcado como SUCCEEDED (com o artefato final e os logs).
+    Roda no processo do job (1ª tentativa) ou na thread UploadSpooler do Worker (retries).
+    Se a lease do job está com outra execução, levanta: a entrada fica no spool (com backoff) até o job
+    ser finalizado por alguém ou a lease voltar para este Worker.
+    """
+    output = next(item for item in manifest["files"] if item["kind"] == "output")
+    logs = [(item["remote_path"], item["size"]) for item in manifest["files"] if item["kind"] == "log"]
+    if not update_job_finish(manifest["job_id"], JobStatus.SUCCEEDED, output["remote_path"], output["size"],
+                             log_artifacts=logs, artifact_metadata=output.get("metadata")):
+        raise RuntimeError(f"Lease do job {manifest['job_id']} não pertence a {worker_name()}; resultado mantido no spool.")
+
+# ====================================================
+# REGISTRO DE HANDLERS (model_id -> execução do modelo)
+# ====================================================
+# Cada handler recebe os parâmetros já mesclados com os defaults do modelo
+# e devolve o caminho local do arquivo final a ser enviado ao Storage.
+MODEL_HANDLERS: dict[str, Callable[[str, dict, dict, str], str]] = {}
+
+def register_handler(model_id: str):
+    """
+    Decorator que associa uma função de execução a um model_id do catálogo.
+    Para suportar um modelo novo basta registrar um handler (sem mexer no process_job).
+    """
+    def decorator(func):
+        MODEL_HANDLERS[model_id] = func
+        return func
+    return decorator
+
+# ====================================================
+# LÓGICA DO STABLE FAST 3D (Image-to-3D)
+# ====================================================
+@register_handler("sf3d-v1")
+def run_sf3d(job_id: str, job_data: dict, params: dict, temp_dir: str) -> str:
+    # CORREÇÃO 1: Busca priorizada por 'input_path' (Frontend novo)
+    # Fallback para 'image_path' (Legado) e erro se não achar nada.
+    image_filename = params.get("input_path") or params.get("image_path")
+    
+    if not image_filename:
+        raise ValueError("Parâmetro 'input_path' não encontrado nos parâmetros do Job.")
+
+    bucket_name = params.get("bucket", settings.MINIO_BUCKET)
+    
+    local_input = os.path.join(temp_dir, "input_image.png")
+    local_output = os.path.join(temp_dir, "output.glb")
+
+    logger.info(f"Baixando input '{image_filename}' do bucket '{bucket_name}'...")
+    with pipeline_stage("sf3d-v1", "download"):
+        storage.download_file(bucket_name, image_filename, local_input)
+
+    wrapper_script = WRAPPERS_DIR / "sf3d" / "run.py"
+    
+    cmd = [
+        sys.executable, str(wrapper_script),
+        "--input_path", local_input,
+        "--output_path", local_output,
+        "--texture_resolution", str(params.get("texture_resolution", 1024)),
+        "--remesh_option", str(params.get("remesh_option", "triangle"))
+    ]
+
+    logger.info(f"Chamando Wrapper SF3D...")
+    with pipeline_stage("sf3d-v1", "inference"):
+        run_wrapper(cmd, "sf3d", temp_dir)
+
+    # --- PÓS-PROCESSAMENTO (Recodificação da Textura) ---
+    # O SF3D embute a textura em PNG, que ocupa a maior parte do GLB
+    texture_format = params.get("texture_format", "png")
+    if texture_format != "png" and os.path.exists(local_output):
+        local_reencoded = os.path.join(temp_dir, "output_texture.glb")
+        with pipeline_stage("sf3d-v1", "texture"):
+            try:
+                report = reencode_glb_textures(
+                    local_output, local_reencoded, texture_format, int(params.get("texture_quality", 90))
+                )
+                logger.info(
+                    f"Texturas recodificadas ({texture_format}): {report.bytes_before / 1024 ** 2:.2f} MB -> "
+                    f"{report.bytes_after / 1024 ** 2:.2f} MB"
+                )
+                return local_reencoded
+            except Exception as e:
+                # Otimização: o GLB original continua válido
+                logger.warning(f"Falha ao recodificar as texturas do GLB. Mantendo o original: {e}")
+
+    return local_output
+
+# ====================================================
+# LÓGICA DO DREAMFUSION (Text-to-3D)
+# ====================================================
+@register_handler("dreamfusion-sd")
+def run_dreamfusion(job_id: str, job_data: dict, params: dict, temp_dir: str) -> str:
+    # Recupera o prompt da coluna segura (via job_data) ou params
+    prompt = job_data.get("prompt") or params.get("prompt")
+    
+    if not prompt:
+        raise ValueError("Parâmetro 'prompt' é obrigatório para DreamFusion.")
+    
+    # Definimos os caminhos: O Wrapper gera OBJ, nós queremos GLB
+    local_obj = os.path.join(temp_dir, "output.obj")
+    local_glb = os.path.join(temp_dir, "output.glb")
+    
+    wrapper_script = WRAPPERS_DIR / "dreamfusion" / "run.py"
+    
+    # O Wrapper continua configurado para gerar OBJ (fmt=obj)
+    cmd = [
+        sys.executable, str(wrapper_script),
+        "--prompt", prompt,
+        "--output_path", local_obj, # O Wrapper salva o OBJ aqui
+        "--max_steps", str(params.get("max_steps", 1000))
+    ]
+
+    logger.info(f"Chamando Wrapper DreamFusion...")
+    with pipeline_stage("dreamfusion-sd", "inference"):
+        try:
+            run_wrapper(cmd, "dreamfusion", temp_dir)
+        except JobCancelled as e:
+            # O Wrapper limpa a pasta do Threestudio no SIGTERM; se precisou de SIGKILL, limpamos aqui
+            if e.pid and settings.DREAMFUSION_SCRIPT_PATH:
+                leftover = Path(settings.DREAMFUSION_SCRIPT_PATH).parent / "outputs" / f"temp_df_{e.pid}"
+                shutil.rmtree(leftover, ignore_errors=True)
+            raise
+    
+    if not os.path.exists(local_obj):
+        raise FileNotFoundError("O Wrapper finalizou mas não gerou o arquivo output.obj.")
+
+    # --- EXTRA: Upload do Original (Apenas Storage) ---
+    # Preserva o arquivo bruto para debug/comparação sem sujar o banco de dados
+    try:
+        remote_obj_path = f"jobs/{job_id}/model.obj"
+        logger.info(f"Fazendo upload do OBJ original para {remote_obj_path}...")
+        storage.upload_file(local_obj, settings.MINIO_BUCKET, remote_obj_path)
+    except Exception as e:
+        logger.warning(f"Falha não-crítica ao subir OBJ original: {e}")
 
-def process_job(job_id: str, model_id: str, input_params: dict):
+    # --- PÓS-PROCESSAMENTO (Conversão para GLB) ---
+    # O arquivo GLB será o artefato oficial registrado no sistema
+    with pipeline_stage("dreamfusion-sd", "convert"):
+        converted = convert_obj_to_glb(local_obj, local_glb, cleanup=bool(params.get("mesh_cleanup", True)))
+    if not converted:
+        raise RuntimeError("O arquivo OBJ foi gerado, mas a conversão para GLB falhou.")
+
+    return local_glb
+
+def process_job(job_id: str, model_id: str, input_params: dict, traceparent: str = None):
     """
     Função principal executada pelo RQ Worker.
-    Refatorada para não manter conexão aberta com o banco.
+    Abre o span raiz do Worker como filho do span da API (traceparent vindo nos args do RQ)
+    e registra quanto tempo o job esperou na fila.
+    """
+    # O processo do job é um fork do Worker, cuja thread UploadSpooler também usa o banco:
+    # descarta (sem fechar) as conexões herdadas para não compartilhar sockets com o pai.
+    sync_engine.dispose(close=False)
+
+    queued_job = get_current_job()
+    if traceparent and queued_job and queued_job.enqueued_at:
+        enqueued_at = queued_job.enqueued_at
+        if enqueued_at.tzinfo is None:
+            enqueued_at = enqueued_at.replace(tzinfo=timezone.utc) # RQ grava em UTC
+        start_span("queue.wait", traceparent=traceparent, start_ns=int(enqueued_at.timestamp() * 1e9)).end()
+
+    with trace_span("worker.process_job", {"job.id": job_id, "job.model_id": model_id}, traceparent=traceparent):
+        run_job(job_id, model_id, input_params)
+
+def run_job(job_id: str, model_id: str, input_params: dict):
+    """
+    Pipeline do job. Refatorada para não manter conexão aberta com o banco.
+    Despacha para o handler registrado do modelo, com os defaults do catálogo aplicados.
     """
     logger.info(f"Iniciando processamento do Job {job_id} (Model: {model_id})")
     
     # 1. Marca Início (Sessão Curta)
     job_data = update_job_start(job_id)
     if not job_data:
-        logger.error(f"Job {job_id} não encontrado no banco.")
+        logger.error(f"Job {job_id} não encontrado no banco ou já processado.")
         return
 
-    # Cria diretório temporário para isolar este job
-    with tempfile.TemporaryDirectory() as temp_dir:
-        try:
-            output_file_path = None
-            
-            # ====================================================
-            # LÓGICA DO STABLE FAST 3D (Image-to-3D)
-            # ====================================================
-            if model_id == "sf3d-v1":
-                # CORREÇÃO 1: Busca priorizada por 'input_path' (Frontend novo)
-                # Fallback para 'image_path' (Legado) e erro se não achar nada.
-                image_filename = input_params.get("input_path") or input_params.get("image_path")
-                
-                if not image_filename:
-                    raise ValueError("Parâmetro 'input_path' não encontrado nos parâmetros do Job.")
+    job_started = time.perf_counter()
+    final_status = JobStatus.FAILED
 
-                bucket_name = input_params.get("bucket", settings.MINIO_BUCKET)
-                
-                local_input = os.path.join(temp_dir, "input_image.png")
-                local_output = os.path.join(temp_dir, "output.glb")
+    # Cria diretório temporário para isolar este job (prefixo com o job_id: o janitor confere a lease)
+    # reporting_job: o heartbeat mostra este job como "em execução" até o fim do bloco
+    # job_profiling: só ativo com 'profile: true' (validado como admin-only na API)
+    # holding_job_lease: renova a lease do job enquanto ele roda (Worker morto = lease vence)
+    # watching_cancellation: escuta POST /jobs/{id}/cancel e mata o Wrapper na hora
+    with holding_job_lease(job_id), reporting_job(job_id, model_id), tempfile.TemporaryDirectory(prefix=f"{JOB_TEMP_PREFIX}{job_id}-") as temp_dir, \
+            job_profiling(job_id, temp_dir, enabled=bool(input_params.get("profile"))), \
+            watching_cancellation(job_id):
+        try:
+            # Catálogo em memória (recarrega só se o seed publicou versão nova)
+            ensure_model_registry_fresh()
+            model_spec = model_registry.get(model_id)
+            handler = MODEL_HANDLERS.get(model_id)
 
-                logger.info(f"Baixando input '{image_filename}' do bucket '{bucket_name}'...")
-                storage.download_file(bucket_name, image_filename, local_input)
+            if not model_spec:
+                raise ValueError(f"Modelo '{model_id}' não existe no catálogo.")
+            if not handler:
+                raise ValueError(f"Nenhum handler registrado para o modelo '{model_id}'.")
 
-                wrapper_script = WRAPPERS_DIR / "sf3d" / "run.py"
-                
-                cmd = [
-                    sys.executable, str(wrapper_script),
-                    "--input_path", local_input,
-                    "--output_path", local_output,
-                    "--texture_resolution", str(input_params.get("texture_resolution", 1024)),
-                    "--remesh_option", str(input_params.get("remesh_option", "triangle"))
-                ]
-
-                logger.info(f"Chamando Wrapper SF3D...")
-                subprocess.run(cmd, check=True)
-                
-                output_file_path = local_output
-
-            # ====================================================
-            # LÓGICA DO DREAMFUSION (Text-to-3D)
-            # ====================================================
-            elif model_id == "dreamfusion-sd":
-                # Recupera o prompt da coluna segura (via job_data) ou params
-                prompt = job_data.get("prompt") or input_params.get("prompt")
-                
-                if not prompt:
-                    raise ValueError("Parâmetro 'prompt' é obrigatório para DreamFusion.")
-                
-                # Definimos os caminhos: O Wrapper gera OBJ, nós queremos GLB
-                local_obj = os.path.join(temp_dir, "output.obj")
-                local_glb = os.path.join(temp_dir, "output.glb")
-                
-                wrapper_script = WRAPPERS_DIR / "dreamfusion" / "run.py"
-                
-                # O Wrapper continua configurado para gerar OBJ (fmt=obj)
-                cmd = [
-                    sys.executable, str(wrapper_script),
-                    "--prompt", prompt,
-                    "--output_path", local_obj, # O Wrapper salva o OBJ aqui
-                    "--max_steps", str(input_params.get("max_steps", 1000))
-                ]
-
-                logger.info(f"Chamando Wrapper DreamFusion...")
-                subprocess.run(cmd, check=True)
-                
-                if os.path.exists(local_obj):
-                    # --- EXTRA: Upload do Original (Apenas Storage) ---
-                    # Preserva o arquivo bruto para debug/comparação sem sujar o banco de dados
-                    try:
-                        remote_obj_path = f"jobs/{job_id}/model.obj"
-                        logger.info(f"Fazendo upload do OBJ original para {remote_obj_path}...")
-                        storage.upload_file(local_obj, settings.MINIO_BUCKET, remote_obj_path)
-                    except Exception as e:
-                        logger.warning(f"Falha não-crítica ao subir OBJ original: {e}")
-
-                    # --- PÓS-PROCESSAMENTO (Conversão para GLB) ---
-                    # O arquivo GLB será o artefato oficial registrado no sistema
-                    success = convert_obj_to_glb(local_obj, local_glb)
-                    if success:
-                        output_file_path = local_glb 
-                    else:
-                        raise RuntimeError("O arquivo OBJ foi gerado, mas a conversão para GLB falhou.")
-                else:
-                    raise FileNotFoundError("O Wrapper finalizou mas não gerou o arquivo output.obj.")
+            # Defaults do modelo (AIModel.default_params) + parâmetros enviados no Job
+            params = model_spec.merge_params(input_params)
+            output_file_path = handler(job_id, job_data, params, temp_dir)
 
             # ====================================================
             # UPLOAD E FINALIZAÇÃO (Sessão Nova)
@@ -280,21 +550,45 @@ def process_job(job_id: str, model_id: str, input_params: dict):
             if output_file_path and os.path.exists(output_file_path):
                 file_ext = Path(output_file_path).suffix
                 remote_path = f"jobs/{job_id}/model{file_ext}"
-                file_size = os.path.getsize(output_file_path)
-                
-                logger.info(f"Fazendo upload do resultado para {remote_path}...")
-                storage.upload_file(output_file_path, settings.MINIO_BUCKET, remote_path)
 
-                # 2. Marca Sucesso (Nova Sessão)
-                update_job_finish(job_id, JobStatus.SUCCEEDED, remote_path, file_size)
+                # 2. Spool: o resultado sai do diretório temporário ANTES do upload.
+                # Se o Storage falhar, nada do trabalho da GPU se perde: o UploadSpooler
+                # reenvia com backoff (inclusive após restart) e só então finaliza o job.
+                get_job_cancellation().raise_if_cancelled() # Cancelado: nada vai para o spool
+
+                # Estatísticas da malha (vértices, bbox, textura, chunks do GLB) calculadas aqui, com o
+                # arquivo ainda local: a API as expõe sem ninguém precisar baixar o modelo
+                with pipeline_stage(model_id, "mesh_stats"):
+                    mesh_stats = compute_mesh_stats(output_file_path)
+
+                upload_spool.add(job_id, model_id, (output_file_path, remote_path), job_log_targets(job_id, temp_dir),
+                                 output_metadata=mesh_stats)
+
+                logger.info(f"Fazendo upload do resultado para {remote_path}...")
+                with pipeline_stage(model_id, "upload"):
+                    # 3. Marca Sucesso (Nova Sessão) assim que tudo subir
+                    if upload_spool.flush(job_id, finish_spooled_job):
+                        final_status = JobStatus.SUCCEEDED
+                    else:
+                        final_status = JobStatus.PROCESSING
+                        logger.warning(f"Job {job_id} segue PROCESSING até o UploadSpooler concluir o envio.")
 
             else:
                 raise FileNotFoundError("O Wrapper finalizou mas não gerou o arquivo de saída esperado.")
 
+        except JobCancelled as e:
+            # Status CANCELLED já gravado pela API; o Worker só libera a GPU e segue para o próximo job
+            logger.warning(str(e))
+            final_status = JobStatus.CANCELLED
+
         except subprocess.CalledProcessError as e:
             logger.error(f"Erro na execução do Wrapper CLI: {e}")
-            update_job_finish(job_id, JobStatus.FAILED, error_msg="Erro interno na execução do modelo.")
+            update_job_finish(job_id, JobStatus.FAILED, error_msg="Erro interno na execução do modelo.",
+                              log_artifacts=upload_job_logs(job_id, temp_dir))
             
         except Exception as e:
             logger.error(f"Erro genérico no worker: {e}", exc_info=True)
-            update_job_finish(job_id, JobStatus.FAILED, error_msg=str(e))
\ No newline at end of file
+            update_job_finish(job_id, JobStatus.FAILED, error_msg=str(e), log_artifacts=upload_job_logs(job_id, temp_dir))
+
+        finally:
+            JOB_DURATION.labels(model_id, final_status.value).observe(time.perf_counter() - job_started)
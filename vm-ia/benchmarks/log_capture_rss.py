@@ -0,0 +1,105 @@
+"""
+Memória do Worker durante um modelo "tagarela": a LogCapture mantém o RSS estável
+independente do volume de saída do subprocesso.
+
+Um processo filho escreve GBs em stdout e stderr (linhas de log e barras de progresso com '\\r',
+como o tqdm do threestudio). O RSS deste processo é amostrado numa thread durante a execução.
+Com --compare, roda também a captura antiga (subprocess.run(capture_output=True)) num volume
+menor, para comparação.
+
+Uso (no diretório do vm-ia):
+    poetry run python -m benchmarks.log_capture_rss [--gigabytes 2] [--compare 0.25]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import psutil
+
+from app.core.log_capture import LogCapture
+
+# Filho: metade do volume em cada stream; a cada 100 linhas de log, 50 atualizações de barra de progresso
+_CHATTY_CHILD = r"""
+import sys
+target = int(sys.argv[1]) // 2
+line = ("step 000000 loss=0.123456 lr=0.000100 " * 3).encode() + b"\n"
+bar = b"\r 42%|#########           | 4200/10000 [01:23<01:55, 50.2it/s]"
+written = 0
+while written < target:
+    chunk = line * 100 + bar * 50 + b"\n"
+    sys.stdout.buffer.write(chunk)
+    sys.stderr.buffer.write(chunk)
+    written += len(chunk)
+"""
+
+class RssSampler:
+    """
+    Pico de RSS do processo atual, amostrado a cada 'interval' segundos numa thread.
+    """
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.process = psutil.Process()
+        self.baseline = self.process.memory_info().rss
+        self.peak = self.baseline
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self.process.memory_info().rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.process.memory_info().rss)
+
+def _mb(n: int) -> str:
+    return f"{n / 1024 ** 2:8.1f} MB"
+
+def run_log_capture(total_bytes: int, work_dir: str) -> None:
+    log_path = os.path.join(work_dir, "model.log.gz")
+    capture = LogCapture(log_path)
+    started = time.perf_counter()
+    with RssSampler() as rss:
+        returncode = capture.run([sys.executable, "-c", _CHATTY_CHILD, str(total_bytes)])
+    elapsed = time.perf_counter() - started
+
+    print(f"LogCapture ({total_bytes / 1024 ** 3:.2f} GB de saída, código {returncode})")
+    print(f"  RSS inicial {_mb(rss.baseline)}   pico {_mb(rss.peak)}   crescimento {_mb(rss.peak - rss.baseline)}")
+    print(f"  {elapsed:.1f}s ({total_bytes / 1024 ** 2 / elapsed:.0f} MB/s), log .gz: {_mb(os.path.getsize(log_path))}")
+    print(f"  tail: {len(capture.tail().splitlines())} linhas")
+
+def run_buffered(total_bytes: int) -> None:
+    """
+    Captura anterior dos Wrappers: a saída inteira acumula em memória até o processo terminar.
+    """
+    started = time.perf_counter()
+    with RssSampler() as rss:
+        result = subprocess.run([sys.executable, "-c", _CHATTY_CHILD, str(total_bytes)], capture_output=True)
+        del result
+    elapsed = time.perf_counter() - started
+
+    print(f"subprocess.run(capture_output=True) ({total_bytes / 1024 ** 3:.2f} GB de saída)")
+    print(f"  RSS inicial {_mb(rss.baseline)}   pico {_mb(rss.peak)}   crescimento {_mb(rss.peak - rss.baseline)}")
+    print(f"  {elapsed:.1f}s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="RSS do Worker capturando a saída de um subprocesso tagarela")
+    parser.add_argument("--gigabytes", type=float, default=2.0, help="Volume total escrito pelo filho (stdout + stderr)")
+    parser.add_argument("--compare", type=float, default=0.0, metavar="GB",
+                        help="Também roda a captura em memória com este volume (0 = não roda)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="log-capture-bench-") as temp_dir:
+        run_log_capture(int(args.gigabytes * 1024 ** 3), temp_dir)
+    if args.compare:
+        run_buffered(int(args.compare * 1024 ** 3))
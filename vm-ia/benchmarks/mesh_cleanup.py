@@ -0,0 +1,103 @@
+"""
+Limpeza de malhas (app.core.mesh_cleanup) em malhas sintéticas no formato da saída do marching cubes:
+tempo da limpeza e tamanho dos buffers do GLB antes/depois, comparados com o equivalente do trimesh
+(process=True + degeneradas + componentes) até --trimesh-max-faces. As malhas são geradas com semente fixa.
+
+Uso (no diretório do vm-ia):
+    poetry run python -m benchmarks.mesh_cleanup [--faces 1e6 3e6 10e6] [--trimesh-max-faces 3e6]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.core.mesh_cleanup import cleanup_mesh
+
+def synthetic_mesh(face_count: int, seed: int = 0):
+    """
+    Malha no formato da saída do marching cubes: superfície em grade com metade das faces
+    sem vértices compartilhados (sopa de triângulos), ~1% de faces em ilhas soltas pequenas
+    e ~0,5% de faces degeneradas. Cores RGBA por vértice.
+    """
+    rng = np.random.default_rng(seed)
+    side = max(2, int(np.sqrt(face_count * 0.985 / 2)) + 1)
+    u, v = np.meshgrid(np.linspace(0, 1, side), np.linspace(0, 1, side), indexing="ij")
+    surface = np.stack([u.ravel(), v.ravel(), 0.1 * np.sin(6 * u.ravel()) * np.cos(6 * v.ravel())], axis=1)
+    index = np.arange(side * side).reshape(side, side)
+    a, b = index[:-1, :-1].ravel(), index[1:, :-1].ravel()
+    c, d = index[:-1, 1:].ravel(), index[1:, 1:].ravel()
+    faces = np.concatenate([np.stack([a, b, d], axis=1), np.stack([a, d, c], axis=1)])
+
+    # Metade das faces com cópias próprias dos vértices (duplicatas exatas, como no marching cubes)
+    soup = rng.random(len(faces)) < 0.5
+    copies = faces[soup].ravel()
+    faces[soup] = (len(surface) + np.arange(len(copies))).reshape(-1, 3)
+    vertices = np.concatenate([surface, surface[copies]])
+
+    # Ilhas: leques de 10 faces acima da superfície
+    fans = max(1, face_count // 1000)
+    centers = np.column_stack([rng.random((fans, 2)), np.full(fans, 0.5)])
+    angles = np.linspace(0, 2 * np.pi, 11)
+    ring = 0.002 * np.column_stack([np.cos(angles), np.sin(angles), np.zeros(11)])
+    fan_vertices = np.concatenate([centers[:, None, :], centers[:, None, :] + ring], axis=1).reshape(-1, 3)
+    base = len(vertices) + 12 * np.arange(fans)[:, None]
+    fan_faces = np.stack([np.zeros(10, dtype=np.int64), np.arange(1, 11), np.arange(2, 12)], axis=1)
+    island_faces = (base[:, None, :] + fan_faces[None]).reshape(-1, 3)
+    vertices = np.concatenate([vertices, fan_vertices])
+
+    # Degeneradas: índice repetido
+    degenerate = faces[rng.integers(0, len(faces), face_count // 200)].copy()
+    degenerate[:, 2] = degenerate[:, 0]
+    faces = np.concatenate([faces, island_faces, degenerate])
+
+    colors = np.column_stack([rng.integers(0, 256, (len(vertices), 3)), np.full(len(vertices), 255)]).astype(np.uint8)
+    return vertices, faces, colors
+
+def buffer_bytes(vertices: np.ndarray, faces: np.ndarray, colors: np.ndarray | None) -> int:
+    """
+    Tamanho dos buffers do GLB: posições float32, índices uint32 e cores RGBA uint8.
+    """
+    return len(vertices) * 12 + len(faces) * 12 + (len(vertices) * 4 if colors is not None else 0)
+
+def trimesh_cleanup(vertices: np.ndarray, faces: np.ndarray, colors: np.ndarray, min_component_faces: int) -> float:
+    """
+    Equivalente com o trimesh (process=True + degeneradas + componentes pela adjacência de faces).
+    Returns:
+        Segundos.
+    """
+    import trimesh # Só para a comparação (não é dependência do Worker)
+    started = time.perf_counter()
+    mesh = trimesh.Trimesh(vertices, faces, vertex_colors=colors, process=True)
+    mesh.update_faces(mesh.nondegenerate_faces())
+    components = trimesh.graph.connected_components(mesh.face_adjacency, nodes=np.arange(len(mesh.faces)))
+    keep = np.concatenate([c for c in components if len(c) >= min_component_faces] or [np.arange(0)])
+    mesh.update_faces(np.isin(np.arange(len(mesh.faces)), keep))
+    mesh.remove_unreferenced_vertices()
+    return time.perf_counter() - started
+
+def main(face_counts: list[int], trimesh_max_faces: int, min_component_faces: int) -> None:
+    """
+    Tempo e tamanho economizado pela limpeza em malhas sintéticas; o trimesh roda até 'trimesh_max_faces'.
+    """
+    print(f"{'faces':>12} {'vértices':>22} {'faces após':>12} {'buffers MB':>16} {'limpeza':>9} {'trimesh':>9}")
+    for face_count in face_counts:
+        vertices, faces, colors = synthetic_mesh(face_count)
+        size_before = buffer_bytes(vertices, faces, colors)
+        new_vertices, new_faces, new_colors, report = cleanup_mesh(vertices, faces, colors,
+                                                                   min_component_faces=min_component_faces)
+        size_after = buffer_bytes(new_vertices, new_faces, new_colors)
+        del new_vertices, new_faces, new_colors
+        baseline = (f"{trimesh_cleanup(vertices, faces, colors, min_component_faces):>8.2f}s"
+                    if len(faces) <= trimesh_max_faces else f"{'-':>9}")
+        print(f"{report.faces_before:>12} {report.vertices_before:>10} -> {report.vertices_after:>8} "
+              f"{report.faces_after:>12} {size_before / 1024 ** 2:>7.0f} -> {size_after / 1024 ** 2:>5.0f} "
+              f"{report.elapsed:>8.2f}s {baseline}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tempo e tamanho economizado pela limpeza de malhas sintéticas do marching cubes")
+    parser.add_argument("--faces", type=float, nargs="+", default=[1e6, 3e6, 10e6], help="Quantidade de faces de cada malha")
+    parser.add_argument("--trimesh-max-faces", type=float, default=3e6,
+                        help="Maior malha em que o equivalente do trimesh também roda (0 = nunca)")
+    parser.add_argument("--min-component-faces", type=int, default=100)
+    args = parser.parse_args()
+    main([int(n) for n in args.faces], int(args.trimesh_max_faces), args.min_component_faces)
@@ -21,7 +21,31 @@ except ImportError as e:
     logger.error(f"Detalhe: {e}")
     sys.exit(1)
 
-listen = ['default']
+# Filas escutadas: argumentos da linha de comando (ex: "python run_worker.py conversions"
+# para um Worker só de CPU com as conversões de formato); sem argumentos, a fila padrão dos jobs de geração
+listen = sys.argv[1:] or ['default']
+
+class JobWorker(Worker):
+    """
+    Worker do RQ que, ao fim de cada job, incorpora as métricas do processo filho (work-horse)
+    aos acumulados do Worker: cada job roda num pid novo, e sem isso o diretório de métricas
+    ganharia arquivos a cada job (e o scrape ficaria mais lento).
+    """
+    _metrics_pid = 0
+
+    def fork_work_horse(self, job, queue):
+        super().fork_work_horse(job, queue)
+        self._metrics_pid = self.horse_pid # No pai (o filho sai pelo os._exit)
+
+    def execute_job(self, job, queue):
+        try:
+            super().execute_job(job, queue)
+        finally:
+            try:
+                from app.core.metrics import archive_process_metrics
+                archive_process_metrics(self._metrics_pid)
+            except Exception as e:
+                logger.warning(f"Métricas do job {job.id} não arquivadas: {e}")
 
 def start_worker():
     # 1. Obtém a URL do settings (Garantia que vem do .env)
@@ -44,6 +68,62 @@ def start_worker():
         logger.error(f"FALHA! ao conectar no Redis: {e}")
         sys.exit(1)
 
+    # Nome único do Worker (Dashboard do RQ, heartbeat e processos filhos dos jobs)
+    worker_name = f"worker-ia-{os.getpid()}"
+    os.environ["TCC_WORKER_NAME"] = worker_name
+
+    # 2.1 Exporter de métricas (agrega os processos filhos de cada job).
+    # Vários Workers na mesma máquina: cada um usa a primeira porta livre a partir da METRICS_PORT
+    # (ou a sua própria, ex: METRICS_PORT=9300 python run_worker.py conversions) e publica a porta no heartbeat
+    metrics_port = None
+    try:
+        from app.core.metrics import start_metrics_exporter
+        metrics_port = start_metrics_exporter(settings.METRICS_PORT, settings.METRICS_PORT_ATTEMPTS)
+        logger.info(f"Métricas do Worker expostas em :{metrics_port}/metrics")
+    except Exception as e:
+        logger.warning(f"Exporter de métricas não iniciado: {e}")
+
+    # 2.2 Catálogo de modelos em memória: carrega uma vez e escuta os reloads do seed.
+    # Os jobs (processos filhos do RQ) herdam o catálogo já carregado.
+    try:
+        from app.core.model_registry import load_model_registry, start_model_registry_listener
+        load_model_registry()
+        start_model_registry_listener()
+    except Exception as e:
+        logger.warning(f"Catálogo de modelos não carregado no startup (será carregado no 1º job): {e}")
+
+    # 2.3 Heartbeat com telemetria (job/etapa atual, CPU/RSS, disco temporário e GPU)
+    heartbeat = None
+    try:
+        from app.core.heartbeat import HeartbeatPublisher
+        heartbeat = HeartbeatPublisher(worker_name, listen, metrics_port)
+        heartbeat.start()
+    except Exception as e:
+        logger.warning(f"Heartbeat não iniciado: {e}")
+
+    # 2.4 Spool de uploads: reenvia resultados cujo upload falhou (e os que sobraram de um restart)
+    spooler = None
+    try:
+        from app.core.upload_spool import UploadSpooler, upload_spool
+        from app.core.job_lease import renew_job_leases
+        from app.worker import finish_spooled_job
+        # Jobs no spool continuam em PROCESSING: a lease é mantida pelo Worker dono da entrada.
+        # Os Workers da máquina dividem o spool; entradas de um Worker morto (ou de uma execução anterior,
+        # com outro nome) são adotadas e a lease passa deste para este (claim_from)
+        spooler = UploadSpooler(upload_spool, finish_spooled_job, on_pending=renew_job_leases)
+        spooler.start()
+    except Exception as e:
+        logger.warning(f"Spool de uploads não iniciado: {e}")
+
+    # 2.5 Janitor: apaga pastas temporárias órfãs (Wrappers/jobs mortos) no startup e periodicamente
+    janitor = None
+    try:
+        from app.core.janitor import TempJanitor
+        janitor = TempJanitor()
+        janitor.start()
+    except Exception as e:
+        logger.warning(f"Janitor não iniciado: {e}")
+
     # 3. Instancia as Filas com a Conexão Explícita (A CORREÇÃO ESTÁ AQUI)
     # Precisamos passar 'connection=conn' para CADA fila, não apenas para o Worker
     try:
@@ -52,10 +132,10 @@ def start_worker():
         # 4. Inicia o Worker
         logger.info("Inicializando worker dedicado com timeout de 1h30m...")
         
-        worker = Worker(
+        worker = JobWorker(
             queues, 
             connection=conn,
-            name=f"worker-ia-{os.getpid()}" # Nome único para aparecer bonito no Dashboard
+            name=worker_name # Nome único para aparecer bonito no Dashboard
         )
         
         # Inicia o loop de processamento
@@ -65,5 +145,14 @@ def start_worker():
         logger.error(f"Erro ao iniciar o loop do Worker: {e}")
         sys.exit(1)
 
+    finally:
+        # Saída limpa: remove o heartbeat na hora (sem esperar o TTL)
+        if heartbeat:
+            heartbeat.stop()
+        if spooler:
+            spooler.stop()
+        if janitor:
+            janitor.stop()
+
 if __name__ == '__main__':
     start_worker()
\ No newline at end of file
@@ -0,0 +1,239 @@
+import multiprocessing
+import os
+import shlex
+import shutil
+import signal
+import subprocess
+import time
+import uuid
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+from app import worker
+from app.core.config import settings
+from app.core.database import SessionLocal, sync_engine
+from app.core.heartbeat import redis_conn
+from app.core.job_lease import renew_job_leases
+from app.core.upload_spool import UploadSpool
+from app.models.ai_model import AIModel
+from app.models.artifact_model import Artifact
+from app.models.job_model import Job, JobStatus
+from app.models.job_outbox_model import JobOutbox
+from app.models.user_model import User
+
+# O reaper é da API: roda no ambiente do backend (BACKEND_PYTHON, ou "poetry run python" no diretório dele)
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "vm-mgmnt" / "backend"
+REAP_ONCE = "import asyncio; from app.core.reaper import reap_once; print(asyncio.run(reap_once()))"
+
+MODEL_ID = "lease-test"
+STAGES = ["download", "inference", "convert", "upload"]
+JOB_MAX_RETRIES = 2
+LEASE_TTL = 1
+
+def _backend_command() -> list[str] | None:
+    if os.environ.get("BACKEND_PYTHON"):
+        return shlex.split(os.environ["BACKEND_PYTHON"])
+    if shutil.which("poetry"):
+        return ["poetry", "run", "python"]
+    return None
+
+def _backend_env() -> dict[str, str]:
+    return {
+        **os.environ,
+        # Mesma troca de driver do app.core.database, no sentido contrário (a API usa asyncpg)
+        "DATABASE_URL": settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1),
+        "JOB_MAX_RETRIES": str(JOB_MAX_RETRIES),
+        "FIRST_SUPERUSER_USERNAME": "admin",
+        "FIRST_SUPERUSER_PASSWORD": "admin",
+        "FIRST_SUPERUSER_API_KEY": "admin",
+    }
+
+@pytest.fixture(scope="module")
+def backend():
+    """
+    Banco de teste recriado pelas migrações da API (mesmo schema de produção) e um executor do reaper.
+    """
+    command = _backend_command()
+    if not BACKEND_DIR.exists() or not command:
+        pytest.skip("Backend (vm-mgmnt/backend) ou seu interpretador indisponível")
+    if not make_url(settings.DATABASE_URL).database.endswith("_test"):
+        pytest.skip("TEST_DATABASE_URL precisa apontar para um banco *_test (ele é recriado)")
+    try:
+        with sync_engine.begin() as conn:
+            conn.execute(text("DROP SCHEMA public CASCADE; CREATE SCHEMA public"))
+        redis_conn.flushdb()
+    except Exception as e:
+        pytest.skip(f"Postgres/Redis de teste indisponíveis: {e}")
+
+    env = _backend_env()
+    subprocess.run([*command, "-m", "alembic", "upgrade", "head"], cwd=BACKEND_DIR, env=env,
+                   check=True, capture_output=True)
+
+    def reap_once() -> int:
+        result = subprocess.run([*command, "-c", REAP_ONCE], cwd=BACKEND_DIR, env=env,
+                                check=True, capture_output=True, text=True)
+        return int(result.stdout.split()[-1])
+
+    with SessionLocal() as session:
+        session.add(AIModel(id=MODEL_ID, name="Lease test"))
+        session.commit()
+    yield reap_once
+    sync_engine.dispose()
+
+@pytest.fixture
+def lease_settings(monkeypatch):
+    monkeypatch.setattr(settings, "JOB_LEASE_TTL", LEASE_TTL)
+    monkeypatch.setattr(settings, "JOB_LEASE_RENEW_INTERVAL", 0.2)
+
+def _create_job(retry_count: int = 0) -> str:
+    with SessionLocal() as session:
+        user = User(username=f"user-{uuid.uuid4().hex[:8]}", password_hash="x", api_key=uuid.uuid4().hex)
+        session.add(user)
+        session.flush()
+        job = Job(user_id=user.id, model_id=MODEL_ID, input_params={}, retry_count=retry_count)
+        session.add(job)
+        session.commit()
+        return str(job.id)
+
+@worker.register_handler(MODEL_ID)
+def _staged_handler(job_id: str, job_data: dict, params: dict, temp_dir: str) -> str:
+    """
+    Handler com as etapas dos modelos reais; o arquivo final segue o caminho normal (spool + upload).
+    """
+    output = os.path.join(temp_dir, "model.glb")
+    for stage in ("download", "inference", "convert"):
+        with worker.pipeline_stage(MODEL_ID, stage):
+            with open(output, "wb") as f:
+                f.write(b"glTF" + stage.encode())
+    return output
+
+def _die_at_stage(job_id: str, stage: str, spool_root: str) -> None:
+    """
+    Processo do job (fork, como no RQ): recebe SIGKILL ao entrar na etapa, depois de segurar
+    a lease por mais que o TTL (a renovação precisa mantê-la viva até a morte).
+    """
+    real_report_stage = worker.report_stage
+
+    def report_stage(current: str) -> None:
+        real_report_stage(current)
+        if current == stage:
+            time.sleep(LEASE_TTL * 1.5)
+            os.kill(os.getpid(), signal.SIGKILL)
+
+    os.environ["TCC_WORKER_NAME"] = f"worker-ia-dead-{stage}"
+    worker.report_stage = report_stage
+    worker.upload_spool = UploadSpool(spool_root, lambda local_path, remote_path: None)
+    worker.compute_mesh_stats = lambda path: {}
+    worker.process_job(job_id, MODEL_ID, {})
+    os._exit(4) # Nunca deve terminar o job
+
+def _kill_at_stage(job_id: str, stage: str, tmp_path) -> None:
+    process = multiprocessing.get_context("fork").Process(target=_die_at_stage, args=(job_id, stage, str(tmp_path / "spool")))
+    process.start()
+    process.join(60)
+    assert process.exitcode == -signal.SIGKILL
+
+def _load(job_id: str) -> tuple[Job, int, int]:
+    with SessionLocal() as session:
+        job = session.get(Job, uuid.UUID(job_id))
+        outbox = session.query(JobOutbox).filter(JobOutbox.job_id == job.id).count()
+        artifacts = session.query(Artifact).filter(Artifact.job_id == job.id).count()
+        session.expunge(job)
+        return job, outbox, artifacts
+
+def _lease_is_valid(job_id: str) -> bool:
+    with SessionLocal() as session:
+        return session.execute(text("SELECT lease_expires_at > now() FROM jobs WHERE id = :id"), {"id": job_id}).scalar()
+
+def _kill_and_reap(backend, job_id: str, stage: str, tmp_path) -> Job:
+    _kill_at_stage(job_id, stage, tmp_path)
+    job, _, _ = _load(job_id)
+    assert job.status == JobStatus.PROCESSING
+    assert job.leased_by == f"worker-ia-dead-{stage}"
+    assert _lease_is_valid(job_id) # Renovada até o SIGKILL
+
+    while _lease_is_valid(job_id):
+        time.sleep(0.1)
+    assert backend() == 1
+    return job
+
+def _late_finish(job_id: str, stage: str, monkeypatch) -> None:
+    """
+    O dono morto (ou isolado da rede) tenta finalizar depois do reaper.
+    """
+    monkeypatch.setenv("TCC_WORKER_NAME", f"worker-ia-dead-{stage}")
+    reaped_to_queue = _load(job_id)[0].status == JobStatus.QUEUED
+    # De volta à fila: False (o spool guarda o resultado); já FAILED: True (nada mais a finalizar)
+    assert worker.update_job_finish(job_id, JobStatus.SUCCEEDED, f"jobs/{job_id}/model.glb", 8,
+                                    log_artifacts=[(f"jobs/{job_id}/logs/worker.log", 1)]) is not reaped_to_queue
+    assert worker.update_job_finish(job_id, JobStatus.FAILED, error_msg="late") is not reaped_to_queue
+
+@pytest.mark.parametrize("stage", STAGES)
+def test_killed_job_is_requeued_after_lease_expires(backend, lease_settings, tmp_path, monkeypatch, stage):
+    job_id = _create_job()
+    _kill_and_reap(backend, job_id, stage, tmp_path)
+
+    job, outbox, artifacts = _load(job_id)
+    assert job.status == JobStatus.QUEUED
+    assert job.retry_count == 1
+    assert (job.leased_by, job.lease_expires_at, job.started_at) == (None, None, None)
+    assert job.progress_percent == 0
+    assert outbox == 1 # Reentrega via outbox
+
+    _late_finish(job_id, stage, monkeypatch)
+    job, outbox, artifacts = _load(job_id)
+    assert job.status == JobStatus.QUEUED and job.completed_at is None
+    assert (outbox, artifacts) == (1, 0)
+
+@pytest.mark.parametrize("stage", STAGES)
+def test_killed_job_fails_at_retry_limit(backend, lease_settings, tmp_path, monkeypatch, stage):
+    job_id = _create_job(retry_count=JOB_MAX_RETRIES)
+    _kill_and_reap(backend, job_id, stage, tmp_path)
+
+    job, outbox, artifacts = _load(job_id)
+    assert job.status == JobStatus.FAILED
+    assert job.retry_count == JOB_MAX_RETRIES
+    assert job.completed_at is not None
+    assert (job.leased_by, job.lease_expires_at) == (None, None)
+    assert outbox == 0
+
+    _late_finish(job_id, stage, monkeypatch)
+    job, outbox, artifacts = _load(job_id)
+    assert job.status == JobStatus.FAILED
+    assert (outbox, artifacts) == (0, 0)
+
+def test_live_owner_still_finishes(backend, lease_settings, monkeypatch):
+    """
+    Controle: a mesma finalização vale para o dono atual da lease.
+    """
+    job_id = _create_job()
+    monkeypatch.setenv("TCC_WORKER_NAME", "worker-ia-alive")
+    assert worker.update_job_start(job_id)
+    assert worker.update_job_finish(job_id, JobStatus.SUCCEEDED, f"jobs/{job_id}/model.glb", 8)
+
+    job, outbox, artifacts = _load(job_id)
+    assert job.status == JobStatus.SUCCEEDED
+    assert artifacts == 1
+
+def test_lease_is_claimed_only_from_dead_workers(backend, lease_settings, monkeypatch):
+    """
+    Spool dividido pelos Workers da máquina: a lease de um irmão vivo nunca é tomada.
+    """
+    job_id = _create_job()
+    monkeypatch.setenv("TCC_WORKER_NAME", "worker-ia-sibling")
+    assert worker.update_job_start(job_id)
+
+    monkeypatch.setenv("TCC_WORKER_NAME", "worker-ia-spooler")
+    assert renew_job_leases([job_id]) == 0
+    assert renew_job_leases([job_id], claim_from={"worker-ia-dead"}) == 0
+    assert _load(job_id)[0].leased_by == "worker-ia-sibling"
+    assert worker.update_job_finish(job_id, JobStatus.SUCCEEDED, f"jobs/{job_id}/model.glb", 8) is False
+
+    # O irmão morreu (o spool passou a entrada para este Worker): a lease passa junto
+    assert renew_job_leases([job_id], claim_from={"worker-ia-sibling"}) == 1
+    assert _load(job_id)[0].leased_by == "worker-ia-spooler"
+    assert worker.update_job_finish(job_id, JobStatus.SUCCEEDED, f"jobs/{job_id}/model.glb", 8)
+    assert _load(job_id)[0].status == JobStatus.SUCCEEDED
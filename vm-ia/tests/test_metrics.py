@@ -0,0 +1,70 @@
+import glob
+import multiprocessing
+import os
+
+from prometheus_client import CollectorRegistry, multiprocess
+
+from app.core import metrics
+
+def _run_job(model_id: str, seconds: float, uploaded: int) -> None:
+    """
+    Processo do job (fork, como o work-horse do RQ): grava as métricas nos próprios arquivos.
+    """
+    metrics.JOB_DURATION.labels(model_id, "SUCCEEDED").observe(seconds)
+    metrics.STORAGE_BYTES.labels("upload").inc(uploaded)
+    os._exit(0)
+
+def _job(model_id: str, seconds: float, uploaded: int) -> int:
+    process = multiprocessing.get_context("fork").Process(target=_run_job, args=(model_id, seconds, uploaded))
+    process.start()
+    process.join(30)
+    assert process.exitcode == 0
+    return process.pid
+
+def _scrape() -> dict[tuple[str, tuple], float]:
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return {
+        (sample.name, tuple(sorted(sample.labels.items()))): sample.value
+        for metric in registry.collect() for sample in metric.samples
+    }
+
+def _files(pid) -> list[str]:
+    return glob.glob(os.path.join(os.environ["PROMETHEUS_MULTIPROC_DIR"], f"*_{pid}.db"))
+
+def test_archived_jobs_keep_totals_and_leave_no_files():
+    before = _scrape()
+    jobs = [("sf3d-v1", 40.0, 1000), ("sf3d-v1", 3.0, 500), ("dreamfusion-sd", 2000.0, 7)]
+
+    pids = []
+    for model_id, seconds, uploaded in jobs:
+        pid = _job(model_id, seconds, uploaded)
+        pids.append(pid)
+        assert _files(pid)
+        expected = _scrape()
+        metrics.archive_process_metrics(pid)
+        # Mesmos valores antes e depois do arquivamento, sem os arquivos do processo
+        assert _scrape() == expected
+        assert _files(pid) == []
+
+    def delta(name: str, **labels) -> float:
+        key = (name, tuple(sorted(labels.items())))
+        return _scrape().get(key, 0.0) - before.get(key, 0.0)
+
+    assert delta("worker_storage_bytes_total", direction="upload") == 1507
+    assert delta("worker_job_duration_seconds_count", model="sf3d-v1", status="SUCCEEDED") == 2
+    assert delta("worker_job_duration_seconds_sum", model="sf3d-v1", status="SUCCEEDED") == 43.0
+    # Buckets cumulativos no scrape: 3 s cai no de 5 s; 40 s só a partir do de 60 s
+    assert delta("worker_job_duration_seconds_bucket", model="sf3d-v1", status="SUCCEEDED", le="5.0") == 1
+    assert delta("worker_job_duration_seconds_bucket", model="sf3d-v1", status="SUCCEEDED", le="60.0") == 2
+    assert delta("worker_job_duration_seconds_bucket", model="dreamfusion-sd", status="SUCCEEDED", le="+Inf") == 1
+
+    # Só os acumulados continuam no diretório, qualquer que seja o número de jobs
+    names = {os.path.basename(path) for path in glob.glob(os.path.join(os.environ["PROMETHEUS_MULTIPROC_DIR"], "*.db"))}
+    assert {"counter_archive.db", "histogram_archive.db"} <= names
+    assert not any(name.endswith(f"_{pid}.db") for name in names for pid in pids)
+
+def test_archiving_a_process_without_metrics_is_a_noop():
+    before = _scrape()
+    metrics.archive_process_metrics(2 ** 22 + 12345)
+    assert _scrape() == before
@@ -0,0 +1,298 @@
+import json
+import multiprocessing
+import os
+import signal
+
+import pytest
+
+from app import worker
+from app.core import upload_spool as spool_module
+from app.core.config import settings
+from app.core.upload_spool import MANIFEST_NAME, STAGING_PREFIX, UploadSpool, UploadSpooler
+
+class FlakyStorage:
+    """
+    Stand-in do Storage: falha nas primeiras 'failures' chamadas e guarda o conteúdo de cada envio bem-sucedido.
+    """
+    def __init__(self, failures: int = 0, fail_on: set[str] | None = None):
+        self.failures = failures
+        self.fail_on = fail_on or set() # remote_paths que sempre falham
+        self.calls: list[str] = []
+        self.objects: dict[str, bytes] = {}
+
+    def __call__(self, local_path: str, remote_path: str) -> None:
+        self.calls.append(remote_path)
+        if self.failures > 0 or remote_path in self.fail_on:
+            self.failures -= 1
+            raise ConnectionError(f"MinIO indisponível ({remote_path})")
+        with open(local_path, "rb") as f:
+            self.objects[remote_path] = f.read()
+
+class FakeClock:
+    def __init__(self, start: float = 1_000_000.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(spool_module.time, "time", fake)
+    return fake
+
+@pytest.fixture
+def finished(monkeypatch):
+    """
+    update_job_finish do Worker substituído por um registro das chamadas (sem banco).
+    """
+    calls = []
+    monkeypatch.setattr(worker, "update_job_finish", lambda *args, **kwargs: calls.append((args, kwargs)) or True)
+    return calls
+
+def _spool_job(spool: UploadSpool, tmp_path, job_id: str = "job-1") -> dict[str, bytes]:
+    """
+    Coloca no spool um resultado e dois logs; devolve o conteúdo esperado por caminho no Storage.
+    O dono da entrada é o Worker de TCC_WORKER_NAME (herdado pelo processo do job).
+    """
+    work = tmp_path / f"work-{job_id}"
+    work.mkdir()
+    contents = {
+        f"jobs/{job_id}/model.glb": b"glTF" + os.urandom(4096),
+        f"jobs/{job_id}/logs/sf3d_model.log.gz": os.urandom(512),
+        f"jobs/{job_id}/logs/worker.log": b"linha de log\n" * 10,
+    }
+    local = {}
+    for remote_path, data in contents.items():
+        path = work / os.path.basename(remote_path)
+        path.write_bytes(data)
+        local[remote_path] = str(path)
+
+    remote_output, *remote_logs = contents
+    spool.add(job_id, "sf3d-v1", (local[remote_output], remote_output),
+              [(local[remote], remote) for remote in remote_logs],
+              output_metadata={"face_count": 1234, "has_texture": True})
+    return contents
+
+def _manifest(spool: UploadSpool, job_id: str = "job-1") -> dict:
+    return json.loads((spool.root / job_id / MANIFEST_NAME).read_text())
+
+def test_backoff_is_exponential_with_jitter_and_cap(monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_RETRY_BASE_DELAY", 5.0)
+    monkeypatch.setattr(settings, "UPLOAD_RETRY_MAX_DELAY", 600.0)
+    for attempts, expected in [(1, 5), (2, 10), (3, 20), (5, 80), (8, 600), (20, 600)]:
+        for _ in range(50):
+            assert expected * 0.5 <= UploadSpool.backoff(attempts) <= expected
+
+def test_flaky_storage_retries_with_backoff_until_uploaded(tmp_path, clock, finished):
+    storage = FlakyStorage(failures=3)
+    spool = UploadSpool(tmp_path / "spool", storage)
+    contents = _spool_job(spool, tmp_path)
+
+    # 1ª tentativa (processo do job): falha, nada é finalizado e os arquivos continuam no spool
+    assert spool.flush("job-1", worker.finish_spooled_job) is False
+    assert finished == []
+    manifest = _manifest(spool)
+    assert manifest["attempts"] == 1 and "MinIO indisponível" in manifest["last_error"]
+    delays = [manifest["next_attempt_at"] - clock.now]
+
+    # Antes do backoff vencer, o spooler não tenta de novo
+    spool.flush_due(worker.finish_spooled_job)
+    assert len(storage.calls) == 1
+
+    # Backoff vencido a cada rodada: falhas 2 e 3, depois sobe tudo
+    for _ in range(10):
+        clock.now = _manifest(spool)["next_attempt_at"]
+        spool.flush_due(worker.finish_spooled_job)
+        if not (spool.root / "job-1").exists():
+            break
+        manifest = _manifest(spool)
+        delays.append(manifest["next_attempt_at"] - clock.now)
+
+    assert spool.pending() == []
+    assert storage.objects == contents
+    assert len(finished) == 1
+    # Cada atraso fica na faixa do jitter [50%, 100%] de base * 2^(n-1)
+    for attempt, delay in enumerate(delays, start=1):
+        expected = min(settings.UPLOAD_RETRY_MAX_DELAY, settings.UPLOAD_RETRY_BASE_DELAY * 2 ** (attempt - 1))
+        assert expected * 0.5 <= delay <= expected
+    assert len(delays) == 3
+
+def test_job_is_finished_only_after_every_artifact(tmp_path, clock, finished):
+    contents_paths = ["jobs/job-1/model.glb", "jobs/job-1/logs/sf3d_model.log.gz", "jobs/job-1/logs/worker.log"]
+    storage = FlakyStorage(fail_on={contents_paths[2]})
+    spool = UploadSpool(tmp_path / "spool", storage)
+    contents = _spool_job(spool, tmp_path)
+
+    # O último log falha: o resultado já subiu, mas o job NÃO pode ser finalizado
+    assert spool.flush("job-1", worker.finish_spooled_job) is False
+    assert finished == []
+    assert [item["uploaded"] for item in _manifest(spool)["files"]] == [True, True, False]
+
+    # Na retentativa só o que faltou é reenviado; a finalização vem depois do último envio
+    storage.fail_on.clear()
+    storage.calls.clear()
+    clock.now = _manifest(spool)["next_attempt_at"]
+    spool.flush_due(lambda manifest: (
+        finished.append(("uploaded_before_finish", sorted(storage.objects))),
+        worker.finish_spooled_job(manifest),
+    ))
+
+    assert storage.calls == [contents_paths[2]]
+    assert finished[0] == ("uploaded_before_finish", sorted(contents))
+    (job_id, status, output_path, output_size), kwargs = finished[1]
+    assert (job_id, status, output_path, output_size) == (
+        "job-1", worker.JobStatus.SUCCEEDED, contents_paths[0], len(contents[contents_paths[0]])
+    )
+    assert kwargs["log_artifacts"] == [(path, len(contents[path])) for path in contents_paths[1:]]
+    assert kwargs["artifact_metadata"] == {"face_count": 1234, "has_texture": True}
+
+def test_manifest_survives_worker_restart(tmp_path, clock, finished):
+    root = tmp_path / "spool"
+    contents = _spool_job(UploadSpool(root, FlakyStorage(failures=1)), tmp_path)
+    first = UploadSpool(root, FlakyStorage(failures=1))
+    assert first.flush("job-1", worker.finish_spooled_job) is False
+    next_attempt_at = _manifest(first)["next_attempt_at"]
+    assert next_attempt_at > clock.now
+
+    # "Restart": uma instância nova lê só o que está no disco; recover libera o envio imediato
+    storage = FlakyStorage()
+    restarted = UploadSpool(root, storage)
+    assert restarted.pending() == ["job-1"]
+    restarted.recover()
+    assert _manifest(restarted)["next_attempt_at"] == 0
+    assert _manifest(restarted)["attempts"] == 1
+
+    restarted.flush_due(worker.finish_spooled_job)
+    assert storage.objects == contents
+    assert len(finished) == 1
+    assert restarted.pending() == []
+
+def _die_mid_flush(root: str, kill_after: int) -> None:
+    """
+    Processo do job: envia 'kill_after' arquivos e recebe SIGKILL no meio do envio seguinte.
+    """
+    sent = []
+
+    def upload(local_path: str, remote_path: str) -> None:
+        if len(sent) == kill_after:
+            os.kill(os.getpid(), signal.SIGKILL)
+        sent.append(remote_path)
+
+    UploadSpool(root, upload).flush("job-1", lambda manifest: os._exit(3)) # Nunca deve finalizar
+    os._exit(4)
+
+@pytest.mark.parametrize("kill_after", [0, 1, 2])
+def test_kill_mid_flush_loses_nothing(tmp_path, finished, kill_after):
+    root = tmp_path / "spool"
+    contents = _spool_job(UploadSpool(root, FlakyStorage()), tmp_path)
+
+    process = multiprocessing.get_context("fork").Process(target=_die_mid_flush, args=(str(root), kill_after))
+    process.start()
+    process.join(30)
+    assert process.exitcode == -signal.SIGKILL
+
+    # Nada foi finalizado, todos os arquivos seguem no spool e o manifest registra o que já subiu
+    assert finished == []
+    manifest = _manifest(UploadSpool(root, FlakyStorage()))
+    assert [item["uploaded"] for item in manifest["files"]] == [i < kill_after for i in range(3)]
+    for item in manifest["files"]:
+        assert (root / "job-1" / item["name"]).stat().st_size == item["size"]
+
+    # O flock morreu com o processo: o Worker reiniciado conclui o envio do que faltou
+    storage = FlakyStorage()
+    restarted = UploadSpool(root, storage)
+    restarted.recover()
+    restarted.flush_due(worker.finish_spooled_job)
+    assert storage.calls == list(contents)[kill_after:]
+    assert len(finished) == 1
+    assert restarted.pending() == []
+
+def _die_before_rename(root: str, work_dir: str) -> None:
+    """
+    Processo do job: morre entre gravar o manifest da entrada e o rename atômico.
+    """
+    def killed_replace(src, dst):
+        if os.path.basename(str(src)).startswith(STAGING_PREFIX):
+            os.kill(os.getpid(), signal.SIGKILL)
+        return real_replace(src, dst)
+
+    real_replace = os.replace
+    spool_module.os.replace = killed_replace
+    output = os.path.join(work_dir, "model.glb")
+    with open(output, "wb") as f:
+        f.write(b"glTF" + b"\0" * 1024)
+    UploadSpool(root, FlakyStorage()).add("job-1", "sf3d-v1", (output, "jobs/job-1/model.glb"), [])
+    os._exit(4)
+
+def test_kill_while_spooling_is_recovered_at_startup(tmp_path, finished):
+    root, work_dir = tmp_path / "spool", tmp_path / "work"
+    work_dir.mkdir()
+    process = multiprocessing.get_context("fork").Process(target=_die_before_rename, args=(str(root), str(work_dir)))
+    process.start()
+    process.join(30)
+    assert process.exitcode == -signal.SIGKILL
+    assert (root / f"{STAGING_PREFIX}job-1" / MANIFEST_NAME).exists()
+
+    storage = FlakyStorage()
+    restarted = UploadSpool(root, storage)
+    restarted.recover()
+    assert restarted.pending() == ["job-1"]
+    restarted.flush_due(worker.finish_spooled_job)
+    assert list(storage.objects) == ["jobs/job-1/model.glb"]
+    assert len(finished) == 1
+
+def test_skipped_finish_keeps_the_entry(tmp_path, clock, monkeypatch):
+    """
+    Lease com outra execução: a finalização é ignorada e o resultado continua no spool até o job se resolver.
+    """
+    outcomes = [False, True]
+    monkeypatch.setattr(worker, "update_job_finish", lambda *args, **kwargs: outcomes.pop(0))
+    storage = FlakyStorage()
+    spool = UploadSpool(tmp_path / "spool", storage)
+    _spool_job(spool, tmp_path)
+
+    assert spool.flush("job-1", worker.finish_spooled_job) is False
+    manifest = _manifest(spool)
+    assert manifest["attempts"] == 1 and "Lease do job job-1" in manifest["last_error"]
+    assert all(item["uploaded"] for item in manifest["files"])
+
+    # Job já finalizado (ou devolvido a este Worker): a entrada sai sem reenviar nada
+    clock.now = manifest["next_attempt_at"]
+    spool.flush_due(worker.finish_spooled_job)
+    assert spool.pending() == []
+    assert len(storage.calls) == 3
+
+def test_spoolers_sharing_a_directory_only_touch_their_own_entries(tmp_path, clock, finished, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_LEASE_RENEW_INTERVAL", 0.0)
+    root = tmp_path / "spool"
+    contents = {}
+    for name, job_id in [("worker-ia-a", "job-a"), ("worker-ia-b", "job-b")]:
+        monkeypatch.setenv("TCC_WORKER_NAME", name)
+        contents.update(_spool_job(UploadSpool(root, FlakyStorage()), tmp_path, job_id))
+
+    alive = {"worker-ia-a", "worker-ia-b"}
+    reports, spoolers, storages = {}, {}, {}
+    for name in sorted(alive):
+        storages[name] = FlakyStorage()
+        spoolers[name] = UploadSpooler(
+            UploadSpool(root, storages[name]), worker.finish_spooled_job, owner=name, is_alive=alive.__contains__,
+            on_pending=lambda job_ids, claim_from, name=name: reports.setdefault(name, []).append((job_ids, claim_from))
+        )
+
+    # B ainda vivo: A só reporta (renova a lease) e envia a própria entrada
+    storages["worker-ia-b"].fail_on = set(contents) # Storage fora do ar para B
+    for name in sorted(alive):
+        spoolers[name].run_once()
+    assert reports == {"worker-ia-a": [(["job-a"], set())], "worker-ia-b": [(["job-b"], set())]}
+    assert sorted(storages["worker-ia-a"].objects) == sorted(path for path in contents if "job-a" in path)
+    assert [args[0] for args, _ in finished] == ["job-a"]
+    assert _manifest(spoolers["worker-ia-b"].spool, "job-b")["owner"] == "worker-ia-b"
+
+    # B morre (heartbeat expirado): A adota a entrada, assume a lease de B e conclui o envio
+    alive.discard("worker-ia-b")
+    spoolers["worker-ia-a"].run_once()
+    assert reports["worker-ia-a"][-1] == (["job-b"], {"worker-ia-b"})
+    assert storages["worker-ia-a"].objects == contents
+    assert [args[0] for args, _ in finished] == ["job-a", "job-b"]
+    assert spoolers["worker-ia-a"].spool.pending() == []
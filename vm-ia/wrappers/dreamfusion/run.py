@@ -1,8 +1,8 @@
 import argparse
-import subprocess
 import sys
 import os
 import shutil
+import signal
 import logging
 from pathlib import Path
 from dotenv import load_dotenv
@@ -11,6 +11,16 @@ from dotenv import load_dotenv
 env_path = Path(__file__).resolve().parents[2] / '.env'
 load_dotenv(env_path)
 
+# --- TRACING ---
+# Spans das fases do Wrapper, filhos da etapa do Worker (TRACEPARENT vem do ambiente)
+# Imports do app só depois de incluir a raiz do vm-ia no sys.path (E402 de propósito)
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from app.core.tracing import configure_tracing, trace_span  # noqa: E402
+from app.core.log_capture import LogCapture  # noqa: E402
+
+TRACEPARENT = os.getenv("TRACEPARENT")
+configure_tracing("tcc-wrapper-dreamfusion", os.getenv("TRACE_EXPORT_PATH") if TRACEPARENT else None)
+
 VENV_PYTHON = os.getenv("DREAMFUSION_PYTHON_PATH")
 MODEL_SCRIPT = os.getenv("DREAMFUSION_SCRIPT_PATH")
 BASE_CONFIG = os.getenv("DREAMFUSION_CONFIG", "configs/dreamfusion-sd.yaml")
@@ -19,11 +29,19 @@ BASE_CONFIG = os.getenv("DREAMFUSION_CONFIG", "configs/dreamfusion-sd.yaml")
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - [DreamFusion Wrapper] - %(message)s')
 logger = logging.getLogger(__name__)
 
-def run_inference(prompt: str, output_path: str, max_steps: int = 1000):
+def _terminate(signum, frame):
+    """
+    Cancelamento do job: o Worker envia SIGTERM ao grupo de processos.
+    Vira SystemExit para que a limpeza das pastas temporárias rode antes de sair.
+    """
+    raise SystemExit(128 + signum)
+
+def run_inference(prompt: str, output_path: str, max_steps: int = 1000, log_path: str = None):
     """
     Executa o pipeline completo do Threestudio: Treino -> Exportação.
     Args:
 	max_steps: Mínimo forçado de 1000 steps para garantir geometria válida.
+	log_path: Arquivo .gz que recebe a saída completa do treino e da exportação.
     """
 
     # Garantindo que tenha no mínimo 1000 steps
@@ -59,6 +77,9 @@ def run_inference(prompt: str, output_path: str, max_steps: int = 1000):
     job_tag = f"temp_df_{os.getpid()}"
     base_output_dir = model_root / "outputs" / job_tag
 
+    # Saída do Threestudio (treino + exportação) em streaming para um único .gz
+    capture = LogCapture(log_path or str(Path(output_path).parent / "dreamfusion_model.log.gz"), logger=logger)
+
     try:
         # --- FASE 1: TREINAMENTO ---
         logger.info(f"--- FASE 1: TREINAMENTO (Steps: {max_steps}) ---")
@@ -76,16 +97,13 @@ def run_inference(prompt: str, output_path: str, max_steps: int = 1000):
 
         logger.info(f"Executando Treino...")
         
-        result_train = subprocess.run(
-            train_cmd,
-            cwd=model_root,
-            env=env_vars,
-            text=True
-        )
-
-        if result_train.returncode != 0:
+        with trace_span("dreamfusion.train", {"dreamfusion.max_steps": max_steps}, traceparent=TRACEPARENT):
+            train_returncode = capture.run(train_cmd, cwd=model_root, env=env_vars)
+
+        if train_returncode != 0:
             # Em caso de erro, não temos como suprimir o stderr, pois ele pode conter a causa
-            raise RuntimeError(f"Falha na etapa de treinamento. Código: {result_train.returncode}")
+            logger.error(f"Últimas linhas do Threestudio:\n{capture.tail()}")
+            raise RuntimeError(f"Falha na etapa de treinamento. Código: {train_returncode}")
         
         logger.info("Treinamento concluído.")
 
@@ -127,21 +145,19 @@ def run_inference(prompt: str, output_path: str, max_steps: int = 1000):
         ]
 
         logger.info(f"Executando Export...")
-        result_export = subprocess.run(
-            export_cmd,
-            cwd=model_root,
-            env=env_vars,
-            text=True
-        )
+        with trace_span("dreamfusion.export", traceparent=TRACEPARENT):
+            export_returncode = capture.run(export_cmd, cwd=model_root, env=env_vars)
 
-        if result_export.returncode != 0:
-            raise RuntimeError(f"Falha na etapa de exportação. Código: {result_export.returncode}")
+        if export_returncode != 0:
+            logger.error(f"Últimas linhas do Threestudio:\n{capture.tail()}")
+            raise RuntimeError(f"Falha na etapa de exportação. Código: {export_returncode}")
 
         # --- FASE 3: CAPTURA E LIMPEZA ---
         save_dir = real_experiment_dir / "save"
         
         # Procura recursivamente por .obj (às vezes fica em it300-export/...)
-        found_objs = list(save_dir.rglob("*.obj"))
+        with trace_span("dreamfusion.capture", traceparent=TRACEPARENT):
+            found_objs = list(save_dir.rglob("*.obj"))
 
         if not found_objs:
             if save_dir.exists():
@@ -154,6 +170,12 @@ def run_inference(prompt: str, output_path: str, max_steps: int = 1000):
         shutil.move(str(source_file), output_path)
         logger.info(f"Sucesso! Modelo salvo em: {output_path}")
 
+    except SystemExit:
+        # Cancelado (SIGTERM): a pasta do experimento não serve para nada, remove já
+        logger.warning(f"Execução cancelada. Removendo pasta temporária: {base_output_dir}")
+        shutil.rmtree(base_output_dir, ignore_errors=True)
+        raise
+
     except Exception as e:
         logger.error(f"Erro crítico: {e}")
         sys.exit(1)
@@ -165,16 +187,20 @@ def run_inference(prompt: str, output_path: str, max_steps: int = 1000):
             shutil.rmtree(base_output_dir)
 
 if __name__ == "__main__":
+    signal.signal(signal.SIGTERM, _terminate)
+
     parser = argparse.ArgumentParser(description="Wrapper CLI para DreamFusion (Threestudio)")
     parser.add_argument("--prompt", required=True, help="Prompt de texto")
     parser.add_argument("--output_path", required=True, help="Destino do arquivo")
     # Alterado default para 300 para segurança
     parser.add_argument("--max_steps", type=int, default=1000, help="Passos de treino")
+    parser.add_argument("--log_path", type=str, default=None, help="Arquivo .gz com a saída completa do Threestudio")
 
     args = parser.parse_args()
 
     run_inference(
         args.prompt,
         args.output_path,
-        args.max_steps
+        args.max_steps,
+        args.log_path
     )
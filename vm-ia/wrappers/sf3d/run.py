@@ -1,8 +1,8 @@
 import argparse
-import subprocess
 import sys
 import os
 import shutil
+import signal
 import logging
 from pathlib import Path
 from dotenv import load_dotenv
@@ -11,6 +11,16 @@ from dotenv import load_dotenv
 env_path = Path(__file__).resolve().parents[2] / '.env'
 load_dotenv(env_path)
 
+# --- TRACING ---
+# Spans das fases do Wrapper, filhos da etapa do Worker (TRACEPARENT vem do ambiente)
+# Imports do app só depois de incluir a raiz do vm-ia no sys.path (E402 de propósito)
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from app.core.tracing import configure_tracing, trace_span  # noqa: E402
+from app.core.log_capture import LogCapture  # noqa: E402
+
+TRACEPARENT = os.getenv("TRACEPARENT")
+configure_tracing("tcc-wrapper-sf3d", os.getenv("TRACE_EXPORT_PATH") if TRACEPARENT else None)
+
 VENV_PYTHON = os.getenv("SF3D_PYTHON_PATH")
 MODEL_SCRIPT = os.getenv("SF3D_SCRIPT_PATH")
 
@@ -18,9 +28,17 @@ MODEL_SCRIPT = os.getenv("SF3D_SCRIPT_PATH")
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - [SF3D Wrapper] - %(message)s')
 logger = logging.getLogger(__name__)
 
-def run_inference(input_path: str, output_path: str, texture_res: int, remesh_option: str):
+def _terminate(signum, frame):
+    """
+    Cancelamento do job: o Worker envia SIGTERM ao grupo de processos.
+    Vira SystemExit para que a limpeza das pastas temporárias rode antes de sair.
+    """
+    raise SystemExit(128 + signum)
+
+def run_inference(input_path: str, output_path: str, texture_res: int, remesh_option: str, log_path: str = None):
     """
     Executa a inferência do Stable Fast 3D isoladamente.
+    A saída do modelo é lida em streaming e gravada (gzip) em log_path.
     """
     
     if not VENV_PYTHON or not MODEL_SCRIPT:
@@ -53,36 +71,29 @@ def run_inference(input_path: str, output_path: str, texture_res: int, remesh_op
         logger.info(f"Iniciando subprocesso: {' '.join(cmd)}")
 
         # Execução
-        result = subprocess.run(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            cwd=os.path.dirname(MODEL_SCRIPT) 
-        )
-
         # --- LOG DINÂMICO ---
-        # Agora mostramos o que o modelo falou (Ex: "Device used: cuda")
-        # Isso atende ao seu pedido de ver o log real em vez de uma string fixa.
-        if result.stdout:
-            logger.info(f"--- OUTPUT MODELO ---\n{result.stdout.strip()}\n---------------------")
+        # O que o modelo fala (Ex: "Device used: cuda") aparece ao vivo, sem acumular em memória:
+        # a saída completa vai para o .gz e só as últimas linhas ficam guardadas para o erro.
+        capture = LogCapture(log_path or str(Path(output_path).parent / "sf3d_model.log.gz"), logger=logger)
+        with trace_span("sf3d.inference", {"sf3d.texture_resolution": texture_res}, traceparent=TRACEPARENT):
+            returncode = capture.run(cmd, cwd=os.path.dirname(MODEL_SCRIPT))
 
-        if result.returncode != 0:
-            logger.error("STDERR do Modelo:")
-            logger.error(result.stderr)
-            raise RuntimeError(f"O script do modelo falhou com código {result.returncode}")
+        if returncode != 0:
+            logger.error(f"Últimas linhas do Modelo:\n{capture.tail()}")
+            raise RuntimeError(f"O script do modelo falhou com código {returncode}")
 
         # Captura do Artefato
-        found_glbs = list(temp_output_dir.rglob("*.glb"))
+        with trace_span("sf3d.capture", traceparent=TRACEPARENT):
+            found_glbs = list(temp_output_dir.rglob("*.glb"))
 
-        if not found_glbs:
-            logger.error(f"Nenhum .glb encontrado em {temp_output_dir}")
-            raise FileNotFoundError("O modelo não gerou o arquivo .glb esperado.")
+            if not found_glbs:
+                logger.error(f"Nenhum .glb encontrado em {temp_output_dir}")
+                raise FileNotFoundError("O modelo não gerou o arquivo .glb esperado.")
 
-        source_file = found_glbs[0]
-        
-        # Move para o destino final
-        shutil.move(str(source_file), output_path)
+            source_file = found_glbs[0]
+            
+            # Move para o destino final
+            shutil.move(str(source_file), output_path)
         logger.info(f"Sucesso! Resultado salvo em: {output_path}")
 
     except Exception as e:
@@ -96,11 +107,14 @@ def run_inference(input_path: str, output_path: str, texture_res: int, remesh_op
             logger.info("Limpeza temporária concluída.")
 
 if __name__ == "__main__":
+    signal.signal(signal.SIGTERM, _terminate)
+
     parser = argparse.ArgumentParser(description="Wrapper CLI para Stable Fast 3D")
     parser.add_argument("--input_path", required=True, help="Caminho da imagem de entrada")
     parser.add_argument("--output_path", required=True, help="Caminho onde salvar o GLB final")
     parser.add_argument("--texture_resolution", type=int, default=1024, help="Resolução da textura")
     parser.add_argument("--remesh_option", type=str, default="triangle", help="Opção de remesh")
+    parser.add_argument("--log_path", type=str, default=None, help="Arquivo .gz com a saída completa do modelo")
 
     args = parser.parse_args()
 
@@ -108,5 +122,6 @@ if __name__ == "__main__":
         args.input_path,
         args.output_path,
         args.texture_resolution,
-        args.remesh_option
+        args.remesh_option,
+        args.log_path
     )
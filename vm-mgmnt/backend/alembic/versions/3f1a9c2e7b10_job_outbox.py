@@ -0,0 +1,40 @@
+"""Job outbox
+
+Revision ID: 3f1a9c2e7b10
+Revises: 10847bfe0432
+Create Date: 2026-10-19 09:12:41.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1a9c2e7b10'
+down_revision: Union[str, Sequence[str], None] = '10847bfe0432'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('job_outbox',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('job_id', sa.UUID(), nullable=False),
+    sa.Column('model_id', sa.String(), nullable=False),
+    sa.Column('input_params', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_job_outbox_job_id'), 'job_outbox', ['job_id'], unique=False)
+    op.create_index(op.f('ix_job_outbox_created_at'), 'job_outbox', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_job_outbox_created_at'), table_name='job_outbox')
+    op.drop_index(op.f('ix_job_outbox_job_id'), table_name='job_outbox')
+    op.drop_table('job_outbox')
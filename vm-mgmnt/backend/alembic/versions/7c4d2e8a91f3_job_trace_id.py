@@ -0,0 +1,31 @@
+"""Job trace id
+
+Revision ID: 7c4d2e8a91f3
+Revises: 3f1a9c2e7b10
+Create Date: 2026-10-19 11:03:17.552091
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '7c4d2e8a91f3'
+down_revision: Union[str, Sequence[str], None] = '3f1a9c2e7b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('jobs', sa.Column('trace_id', sa.String(length=32), nullable=True))
+    op.create_index(op.f('ix_jobs_trace_id'), 'jobs', ['trace_id'], unique=False)
+    op.add_column('job_outbox', sa.Column('traceparent', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('job_outbox', 'traceparent')
+    op.drop_index(op.f('ix_jobs_trace_id'), table_name='jobs')
+    op.drop_column('jobs', 'trace_id')
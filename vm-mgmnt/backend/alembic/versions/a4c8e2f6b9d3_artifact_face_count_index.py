@@ -0,0 +1,30 @@
+"""Expression index on artifacts.metadata face_count
+
+Revision ID: a4c8e2f6b9d3
+Revises: f3a9c5e1b7d4
+Create Date: 2026-10-19 21:05:37.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c8e2f6b9d3'
+down_revision: Union[str, Sequence[str], None] = 'f3a9c5e1b7d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # O GIN jsonb_path_ops de ix_artifacts_metadata só atende @>; o filtro max_faces compara números
+    op.create_index(
+        'ix_artifacts_face_count', 'artifacts', [sa.text("((metadata ->> 'face_count')::integer)")], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_artifacts_face_count', table_name='artifacts')
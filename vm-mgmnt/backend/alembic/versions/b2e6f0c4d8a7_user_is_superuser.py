@@ -0,0 +1,27 @@
+"""User is_superuser
+
+Revision ID: b2e6f0c4d8a7
+Revises: 7c4d2e8a91f3
+Create Date: 2026-10-19 13:25:48.019374
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2e6f0c4d8a7'
+down_revision: Union[str, Sequence[str], None] = '7c4d2e8a91f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('is_superuser', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'is_superuser')
@@ -0,0 +1,36 @@
+"""Job lease (leased_by, lease_expires_at) and partial index for the reaper
+
+Revision ID: d5a1c7e3f9b2
+Revises: b2e6f0c4d8a7
+Create Date: 2026-10-19 14:02:11.532817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a1c7e3f9b2'
+down_revision: Union[str, Sequence[str], None] = 'b2e6f0c4d8a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('jobs', sa.Column('leased_by', sa.String(), nullable=True))
+    op.add_column('jobs', sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        'ix_jobs_processing_lease', 'jobs', ['lease_expires_at'], unique=False,
+        postgresql_where=sa.text("status = 'PROCESSING'")
+    )
+    # Jobs presos em PROCESSING de antes da lease: ficam vencidos e o reaper decide o destino deles
+    op.execute("UPDATE jobs SET lease_expires_at = now() WHERE status = 'PROCESSING'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_jobs_processing_lease', table_name='jobs', postgresql_where=sa.text("status = 'PROCESSING'"))
+    op.drop_column('jobs', 'lease_expires_at')
+    op.drop_column('jobs', 'leased_by')
@@ -0,0 +1,26 @@
+"""Index artifacts.storage_path (storage retention lookups)
+
+Revision ID: e8b3d2f6a4c1
+Revises: d5a1c7e3f9b2
+Create Date: 2026-10-19 15:10:37.204918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b3d2f6a4c1'
+down_revision: Union[str, Sequence[str], None] = 'd5a1c7e3f9b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_artifacts_storage_path'), 'artifacts', ['storage_path'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_artifacts_storage_path'), table_name='artifacts')
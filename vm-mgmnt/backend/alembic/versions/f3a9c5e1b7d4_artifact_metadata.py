@@ -0,0 +1,33 @@
+"""Add artifacts.metadata (mesh statistics) with GIN index
+
+Revision ID: f3a9c5e1b7d4
+Revises: e8b3d2f6a4c1
+Create Date: 2026-10-19 18:42:11.531067
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a9c5e1b7d4'
+down_revision: Union[str, Sequence[str], None] = 'e8b3d2f6a4c1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('artifacts', sa.Column('metadata', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.create_index(
+        'ix_artifacts_metadata', 'artifacts', ['metadata'], unique=False,
+        postgresql_using='gin', postgresql_ops={'metadata': 'jsonb_path_ops'}
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_artifacts_metadata', table_name='artifacts', postgresql_using='gin')
+    op.drop_column('artifacts', 'metadata')
@@ -1,6 +1,7 @@
 from fastapi import APIRouter
 from app.api.endpoints import jobs
 from app.api.endpoints import auth
+from app.api.endpoints import workers
 
 # O roteador principal que agrupa todos
 api_router = APIRouter()
@@ -9,6 +10,9 @@ api_router = APIRouter()
 # Assim, todas as rotas lá dentro responderão em http://.../api/v1/jobs/...
 api_router.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
 
+# Telemetria dos Workers (heartbeats publicados pela vm-ia no Redis)
+api_router.include_router(workers.router, prefix="/workers", tags=["Workers"])
+
 # Rotas de Autenticação
 # Nota: prefixo vazio para /login ficar em /api/v1/login e /users/me em /api/v1/users/me
 api_router.include_router(auth.router, prefix="/auth", tags=["Auth"]) # <--- Adicionar Router
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.api.deps import db_session, CurrentUser
-from app.core.security import verify_password
+from app.core.rate_limit import check_login_throttle, register_login_failure, reset_login_failures
+from app.core.security import verify_password_async, PasswordHashingBusy
 from app.models.user_model import User
 from app.schemas.user import LoginRequest, LoginResponse, UserRead
 
@@ -12,31 +13,64 @@ router = APIRouter()
 @router.post("/login", response_model=LoginResponse)
 async def login(
     form_data: LoginRequest,
+    request: Request,
     session: db_session # <--- Use diretamente o tipo anotado
 ):
     """
     Recebe username e password.
     Se válido, devolve a API Key do utilizador.
+    O bcrypt roda num pool dedicado (fora do event loop) e há limite de tentativas por IP/utilizador.
     """
+    # 0. Throttling: barra rajadas antes de gastar CPU com o bcrypt
+    # Atrás do proxy, request.client é o IP do cliente só se o Uvicorn confiar no proxy
+    # (--proxy-headers + FORWARDED_ALLOW_IPS); senão todos dividiriam o contador do IP do proxy
+    client_ip = request.client.host if request.client else "unknown"
+    retry_after = await check_login_throttle(form_data.username, client_ip)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Muitas tentativas de login. Tente novamente mais tarde.",
+            headers={"Retry-After": str(retry_after)}
+        )
+
     # 1. Buscar utilizador no banco
     stmt = select(User).where(User.username == form_data.username)
     result = await session.execute(stmt)
     user = result.scalar_one_or_none()
+    # Devolve a conexão ao pool antes do bcrypt: numa rajada, os logins à espera de uma vaga
+    # no pool do hash não podem segurar as conexões de que as outras rotas precisam
+    # (o expunge mantém os atributos já lidos; o rollback expiraria o objeto)
+    if user:
+        session.expunge(user)
+    await session.rollback()
 
     # 2. Verificar se existe e se a senha bate
     if not user:
         # Segurança: Mensagem genérica para evitar enumeração de utilizadores
+        # (sem contar falha: o bloqueio por usuário só existe para contas reais)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciais inválidas"
         )
     
-    if not verify_password(form_data.password, user.password_hash):
+    try:
+        password_ok = await verify_password_async(form_data.password, user.password_hash)
+    except PasswordHashingBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servidor ocupado. Tente novamente em instantes.",
+            headers={"Retry-After": "1"}
+        )
+
+    if not password_ok:
+        await register_login_failure(form_data.username, client_ip)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciais inválidas"
         )
 
+    await reset_login_failures(form_data.username, client_ip)
+
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
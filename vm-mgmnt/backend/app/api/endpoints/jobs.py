@@ -1,19 +1,72 @@
 import uuid
-from fastapi import APIRouter, HTTPException, status
-from sqlalchemy import select
-from typing import List
+from datetime import datetime
+from fastapi import APIRouter, Header, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Integer, select, insert, delete, and_, exists, literal_column
+from typing import Annotated, List
 
-from app.models.ai_model import AIModel
-from app.models.artifact_model import Artifact, ArtifactType
+from app.models.artifact_model import FACE_COUNT_SQL, Artifact, ArtifactType
 from app.models.job_model import Job, JobStatus
-from app.schemas.artifact import ArtifactDownload, ArtifactUploadRequest, ArtifactUploadResponse
-from app.schemas.job import JobCreate, JobRead
+from app.models.job_outbox_model import JobOutbox
+from app.schemas.artifact import (
+    ArtifactDownload, ArtifactRead, ArtifactUploadRequest, ArtifactUploadResponse,
+    MultipartUploadRequest, MultipartUploadResponse, MultipartPartUrl,
+    MultipartCompleteRequest, MultipartCompleteResponse, ConversionRequest, ConversionResponse,
+)
+from app.schemas.job import (
+    JobCreate, JobRead, JobGalleryItem,
+    JobBatchCreate, JobBatchItemResult, JobBatchResponse, JobExportRequest,
+)
 from app.api.deps import CurrentUser, db_session
-from app.core.queue import job_queue
-from app.core.storage import storage
+from app.core.admission import check_admission, count_admitted, estimate_job
+from app.core.cancellation import signal_job_cancel
+from app.core.config import settings
+from app.core.conversion import request_conversion
+from app.core.idempotency import ClaimStatus, claim_idempotency_key
+from app.core.input_validation import validate_input_upload, validate_input_uploads
+from app.core.model_registry import get_model_spec
+from app.core.multipart_upload import (
+    MultipartSession, MultipartUploadError, MultipartSizeError, start_multipart_upload, get_multipart_session, sign_parts,
+    uploaded_parts, complete_multipart_upload, abort_multipart_upload,
+)
+from app.core.outbox import notify_outbox
+from app.core.tracing import start_span
+from app.core.zip_export import job_export_entries, stream_zip
+from app.core.upload_dedup import content_addressed_key, find_existing_upload, sha256_to_base64
+from app.core.storage import storage, presigned_cache
 
 router = APIRouter()
 
+def _input_upload_path(input_params: dict) -> str | None:
+    """
+    Caminho do upload de entrada (upload-ticket) referenciado pelo Job.
+    'input_path' é o campo do Frontend atual; 'image_path' é o legado (mesma prioridade do Worker).
+    """
+    return input_params.get("input_path") or input_params.get("image_path")
+
+def _split_prompt(job_in: JobCreate) -> tuple[str | None, dict]:
+    """
+    Separa o prompt dos parâmetros técnicos do Job.
+    Retorna (prompt_final, parametros_limpos), sem alterar o objeto de entrada.
+    """
+    # Trabalhamos numa cópia para não alterar o objeto de entrada original
+    clean_params = job_in.input_params.copy()
+    
+    # Define o valor inicial do prompt vindo do payload (pode ser None no payload)
+    final_prompt = job_in.prompt
+
+    # Se o prompt veio "escondido" dentro dos parâmetros técnicos (comum em frontends antigos),
+    # nós o resgatamos e limpamos o dicionário.
+    if "prompt" in clean_params:
+        # Se o prompt principal estava vazio, usamos o que estava no dict
+        if not final_prompt:
+            final_prompt = clean_params["prompt"]
+        
+        # REMOVE do dict para evitar duplicação no banco (SSOT - Single Source of Truth)
+        del clean_params["prompt"]
+
+    return final_prompt, clean_params
+
 @router.post("/upload-ticket", response_model=ArtifactUploadResponse)
 async def generate_upload_ticket(
     ticket_in: ArtifactUploadRequest,
@@ -26,21 +79,41 @@ async def generate_upload_ticket(
     2. API gera um caminho único e uma URL assinada (PUT).
     3. Frontend usa a URL para enviar o arquivo.
     4. Frontend cria o Job enviando o 'object_name' retornado aqui.
+    Com 'sha256', o caminho é endereçado pelo conteúdo: se o arquivo já existe no Storage
+    o upload é dispensado (upload_required=False); senão o PUT só é aceito com o conteúdo desse hash.
     """
-    
-    # 1. Gerar um identificador único para evitar colisão de nomes
-    # Estrutura: uploads/inputs/{uuid}-{filename_original}
-    file_uuid = uuid.uuid4()
-    sanitized_filename = ticket_in.filename.replace(" ", "_") # Limpeza básica
-    object_name = f"uploads/inputs/{file_uuid}-{sanitized_filename}"
+    expiration = settings.UPLOAD_TICKET_EXPIRATION
+    checksum = None
+
+    if ticket_in.sha256:
+        sha256 = ticket_in.sha256.lower()
+        existing = await find_existing_upload(sha256)
+        if existing:
+            return ArtifactUploadResponse(
+                upload_url=None,
+                object_name=existing,
+                expires_in=expiration,
+                upload_required=False
+            )
+
+        # Caminho = hash: o conteúdo é conferido pelo Storage no PUT (checksum assinado na URL)
+        object_name = content_addressed_key(sha256)
+        checksum = sha256_to_base64(sha256)
+    else:
+        # 1. Gerar um identificador único para evitar colisão de nomes
+        # Estrutura: uploads/inputs/{uuid}-{filename_original}
+        file_uuid = uuid.uuid4()
+        sanitized_filename = ticket_in.filename.replace(" ", "_") # Limpeza básica
+        object_name = f"uploads/inputs/{file_uuid}-{sanitized_filename}"
 
     # 2. Gerar a URL assinada no Storage
     # Validade de 300 segundos (5 minutos) é suficiente para iniciar o upload
-    expiration = 300 
+    # (a retenção só apaga uploads sem Job depois desse prazo + RETENTION_UPLOAD_GRACE)
     upload_url = storage.generate_presigned_upload_url(
         object_name=object_name,
         content_type=ticket_in.content_type,
-        expiration=expiration
+        expiration=expiration,
+        checksum_sha256=checksum
     )
 
     if not upload_url:
@@ -52,25 +125,175 @@ async def generate_upload_ticket(
     return ArtifactUploadResponse(
         upload_url=upload_url,
         object_name=object_name,
-        expires_in=expiration
+        expires_in=expiration,
+        checksum_sha256=checksum
+    )
+
+def _multipart_response(session: MultipartSession, done: list[int]) -> MultipartUploadResponse:
+    done_set = set(done)
+    pending = [number for number in range(1, session.part_count + 1) if number not in done_set]
+    urls = sign_parts(session, pending)
+    return MultipartUploadResponse(
+        upload_id=session.upload_id,
+        object_name=session.object_name,
+        part_size=session.part_size,
+        part_count=session.part_count,
+        parts=[MultipartPartUrl(part_number=number, upload_url=urls[number]) for number in pending],
+        uploaded_parts=done,
+        expires_in=settings.MULTIPART_URL_EXPIRATION
     )
 
+async def _owned_multipart_session(upload_id: str, current_user) -> MultipartSession:
+    session = await get_multipart_session(upload_id, str(current_user.id))
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload multipart não encontrado ou expirado."
+        )
+    return session
+
+@router.post("/upload-ticket/multipart", response_model=MultipartUploadResponse)
+async def start_multipart_upload_ticket(
+    ticket_in: MultipartUploadRequest,
+    current_user: CurrentUser,
+):
+    """
+    Versão multipart do upload-ticket, para arquivos grandes.
+    Fluxo:
+    1. Frontend informa nome, tipo e tamanho; recebe uma URL assinada (PUT) por parte.
+    2. Envia as partes em paralelo. Se a conexão cair, GET /upload-ticket/multipart/{upload_id}
+       devolve as partes já recebidas e URLs novas para as que faltam.
+    3. POST .../complete junta as partes; o 'object_name' é usado na criação do Job.
+    4. Desistiu? DELETE .../{upload_id} descarta as partes enviadas.
+    O limite é o mesmo da validação da entrada na criação do Job (MULTIPART_MAX_BYTES <= INPUT_MAX_BYTES):
+    um arquivo maior é recusado aqui, antes de qualquer parte subir.
+    """
+    if ticket_in.size > settings.MULTIPART_MAX_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Arquivo excede o limite de {settings.MULTIPART_MAX_BYTES / 1024 ** 2:.0f} MB."
+        )
+
+    session = await start_multipart_upload(
+        str(current_user.id), ticket_in.filename, ticket_in.content_type, ticket_in.size
+    )
+    return _multipart_response(session, done=[])
+
+@router.get("/upload-ticket/multipart/{upload_id}", response_model=MultipartUploadResponse)
+async def resume_multipart_upload_ticket(
+    upload_id: str,
+    current_user: CurrentUser,
+):
+    """
+    Retomada: partes já recebidas pelo Storage + URLs novas (validade renovada) para as que faltam.
+    """
+    session = await _owned_multipart_session(upload_id, current_user)
+    done = [part["PartNumber"] for part in await uploaded_parts(session)]
+    return _multipart_response(session, done)
+
+@router.post("/upload-ticket/multipart/{upload_id}/complete", response_model=MultipartCompleteResponse)
+async def complete_multipart_upload_ticket(
+    upload_id: str,
+    complete_in: MultipartCompleteRequest,
+    current_user: CurrentUser,
+):
+    """
+    Junta as partes no objeto final. Responde 409 (com as partes faltantes) se o upload está incompleto.
+    Partes que não somam o tamanho declarado (ou passam do limite) descartam o upload: 400 (ou 413).
+    """
+    session = await _owned_multipart_session(upload_id, current_user)
+    parts = (
+        [(part.part_number, part.etag) for part in complete_in.parts]
+        if complete_in.parts is not None else None
+    )
+    try:
+        missing = await complete_multipart_upload(session, parts)
+    except MultipartSizeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE if e.too_large else status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except MultipartUploadError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Upload incompleto: faltam as partes {missing[:20]}{'...' if len(missing) > 20 else ''}."
+        )
+    return MultipartCompleteResponse(object_name=session.object_name)
+
+@router.delete("/upload-ticket/multipart/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def abort_multipart_upload_ticket(
+    upload_id: str,
+    current_user: CurrentUser,
+):
+    """
+    Cancela o upload e libera o espaço das partes já enviadas.
+    """
+    session = await _owned_multipart_session(upload_id, current_user)
+    await abort_multipart_upload(session)
+
 @router.post("/", response_model=JobRead, status_code=status.HTTP_201_CREATED)
 async def create_job(
     job_in: JobCreate,       # O JSON que o Unity mandou (validado pelo Pydantic)
     current_user: CurrentUser, # O Usuário dono da chave (validado pelo deps.py)
     session: db_session,     # A conexão com o banco
+    response: Response,
+    idempotency_key: Annotated[str | None, Header(alias="Idempotency-Key", max_length=255)] = None,
 ):
     """
     Cria um novo Job de geração 3D.
-    Valida se o modelo existe, associa ao usuário autenticado e e registra seus artefatos de entrada.
+    Com o header 'Idempotency-Key', repetições da mesma requisição (retry do cliente após timeout)
+    devolvem o Job original sem tocar no banco nem na fila, por até IDEMPOTENCY_TTL segundos.
+    Com a fila cheia (ou o usuário no limite de jobs ativos), responde 429 com Retry-After.
+    """
+    if not idempotency_key:
+        return await _create_job(job_in, current_user, session)
+
+    claim = await claim_idempotency_key(str(current_user.id), idempotency_key, job_in.model_dump(mode="json"))
+
+    if claim.status == ClaimStatus.REPLAY:
+        response.headers["Idempotent-Replayed"] = "true"
+        return JobRead.model_validate_json(claim.response)
+
+    if claim.status == ClaimStatus.MISMATCH:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key já usada com um corpo de requisição diferente."
+        )
+
+    if claim.status == ClaimStatus.IN_PROGRESS:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Uma requisição com esta Idempotency-Key ainda está em andamento.",
+            headers={"Retry-After": "1"}
+        )
+
+    try:
+        new_job = await _create_job(job_in, current_user, session)
+    except BaseException:
+        await claim.release()
+        raise
+
+    await claim.complete(new_job.model_dump_json())
+    return new_job
+
+def _admission_rejected(reason: str, retry_after: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=reason,
+        headers={"Retry-After": str(retry_after)}
+    )
+
+async def _create_job(job_in: JobCreate, current_user, session) -> JobRead:
+    """
+    Valida se o modelo existe, associa ao usuário autenticado e registra seus artefatos de entrada.
     """
     
     # 1. Validação de Negócio: O modelo de IA existe?
     # Não podemos criar um job para "modelo-fantasma"
-    stmt = select(AIModel).where(AIModel.id == job_in.model_id)
-    result = await session.execute(stmt)
-    ai_model = result.scalar_one_or_none()
+    # Consulta o catálogo em memória (sem ida ao banco por submissão)
+    ai_model = await get_model_spec(job_in.model_id)
 
     if not ai_model:
         raise HTTPException(
@@ -79,21 +302,31 @@ async def create_job(
         )
 
     # 2. TRATAMENTO DE DADOS (Sanitização), caso input esteja em parametros 
-    # Trabalhamos numa cópia para não alterar o objeto de entrada original
-    clean_params = job_in.input_params.copy()
-    
-    # Define o valor inicial do prompt vindo do payload (pode ser None no payload)
-    final_prompt = job_in.prompt
+    final_prompt, clean_params = _split_prompt(job_in)
 
-    # Se o prompt veio "escondido" dentro dos parâmetros técnicos (comum em frontends antigos),
-    # nós o resgatamos e limpamos o dicionário.
-    if "prompt" in clean_params:
-        # Se o prompt principal estava vazio, usamos o que estava no dict
-        if not final_prompt:
-            final_prompt = clean_params["prompt"]
-        
-        # REMOVE do dict para evitar duplicação no banco (SSOT - Single Source of Truth)
-        del clean_params["prompt"]
+    # Profiling do job (cProfile + logs completos) é restrito a administradores
+    if clean_params.get("profile") and not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Profiling de jobs é restrito a administradores."
+        )
+
+    # Entrada conferida aqui, e não só no Worker (depois de ocupar a vez na fila da GPU)
+    input_image_path = _input_upload_path(job_in.input_params)
+    input_validation = await validate_input_upload(input_image_path) if input_image_path else None
+    if input_validation and not input_validation.ok:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=input_validation.error
+        )
+
+    # Controle de admissão: melhor recusar agora do que deixar o job estourar o JOB_TIMEOUT na fila
+    admission = await check_admission(session, current_user.id, [job_in.model_id])
+    if admission.retry_after is not None:
+        raise _admission_rejected(admission.reason, admission.retry_after)
+
+    # Raiz do trace do Job: o Worker e os Wrappers penduram seus spans neste
+    span = start_span("api.create_job", attributes={"job.model_id": job_in.model_id})
     
     # 3. Criação do Objeto Job
     # Note que injetamos o user_id do usuário autenticado aqui
@@ -102,7 +335,8 @@ async def create_job(
         model_id=job_in.model_id,
         status=JobStatus.QUEUED,
         prompt=final_prompt,      # <--- Vai para a coluna TEXT (Indexável e buscável)
-        input_params=clean_params # <--- Vai para a coluna JSONB (Apenas configs técnicas)
+        input_params=clean_params, # <--- Vai para a coluna JSONB (Apenas configs técnicas)
+        trace_id=span.trace_id
     )
 
     session.add(new_job)
@@ -112,33 +346,295 @@ async def create_job(
     # 4. Registro do Artefato de Entrada (Se houver)
     # Se o job tem um input de imagem (vindo do upload-ticket), registramos agora na tabela Artifacts.
     # Isso garante rastreabilidade total: Job -> Artifact(INPUT) -> MinIO
-    input_image_path = job_in.input_params.get("image_path")
-
-    if input_image_path:
+    if input_validation:
         # Cria o registro do artefato linkado ao Job
         input_artifact = Artifact(
             job_id=new_job.id,                 
             type=ArtifactType.INPUT,           # Classificação correta via Enum
             storage_path=input_image_path,     # Caminho no MinIO
-            file_size_bytes=None               # O Frontend não mandou o tamanho, fica None por enquanto
+            file_size_bytes=input_validation.size # Tamanho real, lido no HEAD da validação
         )
         session.add(input_artifact)
 
-    # 4. Commit Atômico (Job + Artifact são salvos juntos)
+    # 5. Outbox: o pedido de enfileiramento entra na MESMA transação do Job.
+    # Se a API cair depois do commit, o relay ainda publica o job no Redis.
+    session.add(JobOutbox(
+        job_id=new_job.id,
+        model_id=new_job.model_id,
+        input_params=new_job.input_params, # Apenas dados simples (strings/dicts), nunca objetos do Banco.
+        traceparent=span.traceparent
+    ))
+
+    # 6. Commit Atômico (Job + Artifact + Outbox são salvos juntos)
     await session.commit()
     await session.refresh(new_job)
+    span.set_attribute("job.id", str(new_job.id))
+    span.end()
+
+    # 7. Acorda o relay (sem I/O bloqueante no event loop)
+    notify_outbox()
+    count_admitted([new_job.model_id])
 
-    # 5. Enfileiramento no Redis
-    # Timeout de 1h30min (5400s) para suportar modelos pesados como DreamFusion
-    job_queue.enqueue(     # Passamos apenas dados simples (strings/dicts), nunca objetos do Banco.
-        "app.worker.process_job",
-        str(new_job.id),      # Converta UUID para string
-        new_job.model_id,
-        new_job.input_params,
-        job_timeout=5400
+    return JobRead.model_validate(new_job).model_copy(update=admission.estimates(new_job.model_id))
+
+@router.post("/batch", response_model=JobBatchResponse, status_code=status.HTTP_201_CREATED)
+async def create_jobs_batch(
+    batch_in: JobBatchCreate,
+    current_user: CurrentUser,
+    session: db_session,
+):
+    """
+    Cria vários Jobs numa única requisição (pipelines de conteúdo com centenas de prompts/imagens).
+    Custos fixos por lote, e não por job:
+    validação pelo catálogo em memória, 1 transação com INSERTs multi-linha e 1 pipeline no Redis.
+    Itens inválidos são reportados individualmente sem derrubar o lote, assim como os que não cabem
+    na admissão (limite por usuário ou espera máxima); o lote só é recusado com 429 se nenhum couber.
+    """
+    if len(batch_in.items) > settings.JOB_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Lote excede o limite de {settings.JOB_BATCH_MAX_ITEMS} itens."
+        )
+
+    # 1. Validação de todos os modelos pelo catálogo em memória (nenhuma query)
+    requested_models = {item.model_id for item in batch_in.items}
+    valid_models = {model_id for model_id in requested_models if await get_model_spec(model_id)}
+
+    # 2. Validação das entradas (HEAD + cabeçalho), em paralelo e uma vez por caminho distinto
+    input_validations = await validate_input_uploads([
+        path for item in batch_in.items
+        if item.model_id in valid_models and (path := _input_upload_path(item.input_params))
+    ])
+
+    # Motivo da rejeição de cada item inválido, por posição no lote
+    item_errors: dict[int, str] = {}
+    for index, item in enumerate(batch_in.items):
+        input_validation = input_validations.get(_input_upload_path(item.input_params))
+        if item.model_id not in valid_models:
+            item_errors[index] = f"Modelo de IA '{item.model_id}' não encontrado."
+        elif item.input_params.get("profile") and not current_user.is_superuser:
+            item_errors[index] = "Profiling de jobs é restrito a administradores."
+        elif input_validation and not input_validation.ok:
+            item_errors[index] = input_validation.error
+
+    # 3. Controle de admissão na ordem do lote (itens inválidos não contam): os que passam
+    # do limite por usuário ou da espera máxima viram erros por item
+    valid_indexes = [index for index in range(len(batch_in.items)) if index not in item_errors]
+    if valid_indexes:
+        admission = await check_admission(session, current_user.id, [batch_in.items[index].model_id for index in valid_indexes])
+        if not admission.admitted:
+            raise _admission_rejected(admission.reason, admission.retry_after)
+        for index in valid_indexes[admission.admitted:]:
+            item_errors[index] = f"{admission.reason} Tente novamente em {admission.retry_after}s."
+
+    # 4. Monta as linhas em memória (IDs e timestamps gerados aqui, dispensando flush/refresh)
+    now = datetime.utcnow()
+    job_rows = []
+    artifact_rows = []
+    spans = [] # Um trace por job (mesma regra do create_job)
+    ahead = 0.0 # Trabalho dos jobs do lote que entram na fila antes do atual (para as estimativas)
+    results: list[JobBatchItemResult] = []
+
+    for index, item in enumerate(batch_in.items):
+        if index in item_errors:
+            results.append(JobBatchItemResult(index=index, error=item_errors[index]))
+            continue
+
+        final_prompt, clean_params = _split_prompt(item)
+
+        span = start_span("api.create_job", attributes={"job.model_id": item.model_id, "job.batch": True})
+        spans.append(span)
+        job_row = {
+            "id": uuid.uuid4(),
+            "user_id": current_user.id,
+            "model_id": item.model_id,
+            "status": JobStatus.QUEUED.value,
+            "progress_percent": 0,
+            "prompt": final_prompt,
+            "input_params": clean_params,
+            "retry_count": 0,
+            "created_at": now,
+            "trace_id": span.trace_id,
+        }
+        span.set_attribute("job.id", str(job_row["id"]))
+        job_rows.append(job_row)
+
+        # Artefato de entrada (mesma regra do create_job)
+        input_image_path = _input_upload_path(item.input_params)
+        if input_image_path:
+            artifact_rows.append({
+                "id": uuid.uuid4(),
+                "job_id": job_row["id"],
+                "type": ArtifactType.INPUT.value,
+                "storage_path": input_image_path,
+                "file_size_bytes": input_validations[input_image_path].size,
+                "created_at": now,
+            })
+
+        results.append(JobBatchItemResult(
+            index=index,
+            job=JobRead.model_validate({**job_row, **admission.estimates(item.model_id, ahead=ahead)})
+        ))
+        ahead += admission.estimator.duration(item.model_id)
+
+    if job_rows:
+        # 5. Transação única com INSERTs multi-linha (Job + Artifacts + Outbox juntos)
+        await session.execute(insert(Job), job_rows)
+        if artifact_rows:
+            await session.execute(insert(Artifact), artifact_rows)
+        await session.execute(insert(JobOutbox), [
+            {
+                "id": uuid.uuid4(),
+                "job_id": row["id"],
+                "model_id": row["model_id"],
+                "input_params": row["input_params"],
+                "traceparent": span.traceparent,
+                "created_at": now,
+            }
+            for row, span in zip(job_rows, spans)
+        ])
+        await session.commit()
+        for span in spans:
+            span.end()
+
+        # 6. O relay publica o lote inteiro num único pipeline do Redis
+        notify_outbox()
+        count_admitted([row["model_id"] for row in job_rows])
+
+    return JobBatchResponse(
+        created=len(job_rows),
+        failed=len(results) - len(job_rows),
+        results=results
     )
 
-    return new_job
+@router.get("/gallery", response_model=List[JobGalleryItem])
+async def list_gallery(
+    current_user: CurrentUser,
+    session: db_session,
+    skip: int = 0,
+    limit: int = 50,
+    has_texture: bool | None = None,
+    max_faces: int | None = None,
+):
+    """
+    Lista uma página de jobs do usuário já com os links de download (modelo 3D e preview).
+    Substitui o padrão "1 chamada de /download por job": uma única query com JOIN
+    e todas as URLs assinadas de uma vez (reaproveitando as que ainda estão válidas no cache).
+    Filtros opcionais pelas estatísticas da malha (has_texture, max_faces): só entram jobs
+    cujo OUTPUT_MODEL atende aos critérios.
+    """
+    # 1. Página de jobs (subquery) para que o LIMIT conte jobs e não linhas do JOIN
+    page_query = select(Job.id).where(Job.user_id == current_user.id)
+
+    mesh_filters = []
+    if has_texture is not None:
+        # Containment (@>): usa o índice GIN de artifacts.metadata
+        mesh_filters.append(Artifact.metadata_.contains({"has_texture": has_texture}))
+    if max_faces is not None:
+        # Mesma expressão do índice ix_artifacts_face_count
+        mesh_filters.append(literal_column(FACE_COUNT_SQL, Integer) <= max_faces)
+    if mesh_filters:
+        page_query = page_query.where(exists().where(
+            Artifact.job_id == Job.id,
+            Artifact.type == ArtifactType.OUTPUT_MODEL,
+            *mesh_filters
+        ))
+
+    page = (
+        page_query
+        .order_by(Job.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+        .subquery()
+    )
+
+    # 2. Jobs + Artefatos de interesse numa única ida ao banco (LEFT JOIN)
+    stmt = (
+        select(Job, Artifact)
+        .join(page, Job.id == page.c.id)
+        .outerjoin(
+            Artifact,
+            and_(
+                Artifact.job_id == Job.id,
+                Artifact.type.in_([ArtifactType.OUTPUT_MODEL, ArtifactType.PREVIEW])
+            )
+        )
+        .order_by(Job.created_at.desc())
+    )
+    result = await session.execute(stmt)
+
+    # 3. Agrupa as linhas por Job, mantendo a ordem da página
+    jobs: dict[uuid.UUID, Job] = {}
+    paths: dict[uuid.UUID, dict[str, str]] = {}
+    mesh_metadata: dict[uuid.UUID, dict] = {}
+    for job, artifact in result.all():
+        jobs.setdefault(job.id, job)
+        job_paths = paths.setdefault(job.id, {})
+        if artifact:
+            job_paths[artifact.type] = artifact.storage_path
+            if artifact.type == ArtifactType.OUTPUT_MODEL and artifact.metadata_:
+                mesh_metadata[job.id] = artifact.metadata_
+
+    # 4. Assinatura em lote (apenas os caminhos fora do cache são assinados)
+    all_paths = [path for job_paths in paths.values() for path in job_paths.values()]
+    signed = presigned_cache.get_many(all_paths)
+
+    gallery = []
+    for job_id, job in jobs.items():
+        item = JobGalleryItem.model_validate(job)
+        model = signed.get(paths[job_id].get(ArtifactType.OUTPUT_MODEL.value))
+        preview = signed.get(paths[job_id].get(ArtifactType.PREVIEW.value))
+
+        item.model_url = model[0] if model else None
+        item.preview_url = preview[0] if preview else None
+        expirations = [entry[1] for entry in (model, preview) if entry]
+        item.expires_in = min(expirations) if expirations else None
+        item.model_metadata = mesh_metadata.get(job_id)
+        gallery.append(item)
+
+    return gallery
+
+@router.post("/export")
+async def export_jobs(
+    export_in: JobExportRequest,
+    current_user: CurrentUser,
+    session: db_session,
+):
+    """
+    Baixa os resultados de vários jobs num único ZIP (GLB, OBJ bruto, previews), em vez de
+    um /download + uma URL assinada por job. O ZIP é montado em streaming a partir do Storage:
+    memória constante e nenhum arquivo temporário, qualquer que seja o tamanho total.
+    Apenas jobs SUCCEEDED do usuário entram; os demais IDs são ignorados.
+    """
+    if len(export_in.job_ids) > settings.EXPORT_MAX_JOBS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Exportação excede o limite de {settings.EXPORT_MAX_JOBS} jobs."
+        )
+
+    # Dono + status numa única query (mantendo a ordem pedida pelo cliente)
+    result = await session.execute(
+        select(Job.id).where(
+            Job.id.in_(export_in.job_ids),
+            Job.user_id == current_user.id,
+            Job.status == JobStatus.SUCCEEDED
+        )
+    )
+    allowed = set(result.scalars().all())
+    job_ids = [str(job_id) for job_id in dict.fromkeys(export_in.job_ids) if job_id in allowed]
+
+    if not job_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Nenhum job finalizado com sucesso entre os informados."
+        )
+
+    # Gerador síncrono: o Starlette o consome numa thread, um pedaço por envio ao cliente
+    return StreamingResponse(
+        stream_zip(job_export_entries(job_ids)),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="jobs-export-{datetime.utcnow():%Y%m%d-%H%M%S}.zip"'}
+    )
 
 @router.get("/{job_id}", response_model=JobRead)
 async def get_job_status(
@@ -170,6 +666,59 @@ async def get_job_status(
             detail="Você não tem permissão para acessar este job"
         )
 
+    # Jobs ainda não finalizados recebem a previsão de início/fim
+    estimates = await estimate_job(job)
+    if estimates:
+        return JobRead.model_validate(job).model_copy(update=estimates)
+    return job
+
+@router.post("/{job_id}/cancel", response_model=JobRead)
+async def cancel_job(
+    job_id: uuid.UUID,
+    current_user: CurrentUser,
+    session: db_session,
+):
+    """
+    Cancela um Job na fila ou em execução.
+    - QUEUED: sai da outbox/RQ e nunca chega a um Worker.
+    - PROCESSING: o Worker dono (lease) recebe o sinal via Redis e mata o processo do modelo.
+    Segurança: Apenas o dono do Job pode cancelá-lo.
+    """
+    # FOR UPDATE: não disputa com o Worker marcando início/fim do mesmo job
+    result = await session.execute(select(Job).where(Job.id == job_id).with_for_update())
+    job = result.scalar_one_or_none()
+
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job não encontrado"
+        )
+
+    if job.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Você não tem permissão para cancelar este job"
+        )
+
+    if job.status not in (JobStatus.QUEUED, JobStatus.PROCESSING):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job já finalizado (status: {job.status})"
+        )
+
+    owner = job.leased_by if job.status == JobStatus.PROCESSING else None
+    if job.status == JobStatus.QUEUED:
+        # Ainda não publicado pelo relay: basta apagar o pedido de enfileiramento
+        await session.execute(delete(JobOutbox).where(JobOutbox.job_id == job.id))
+
+    job.status = JobStatus.CANCELLED
+    job.completed_at = datetime.utcnow()
+    job.leased_by = None
+    job.lease_expires_at = None
+    await session.commit()
+
+    # Sinal só depois do commit: o Worker que consultar o banco já enxerga CANCELLED
+    await signal_job_cancel(str(job.id), owner)
     return job
 
 @router.get("/{job_id}/download", response_model=ArtifactDownload)
@@ -225,7 +774,122 @@ async def download_job_artifact(
     # Retorna o link para o cliente (Unity/Front) baixar
     return ArtifactDownload(
         download_url=presigned_url,
-        expires_in=600
+        expires_in=600,
+        metadata=artifact.metadata_
+    )
+
+@router.post("/{job_id}/conversions", response_model=ConversionResponse)
+async def convert_job_artifact(
+    job_id: uuid.UUID,
+    body: ConversionRequest,
+    response: Response,
+    current_user: CurrentUser,
+    session: db_session,
+):
+    """
+    Converte o modelo final (GLB) para USDZ, PLY, STL ou OBJ+MTL, ou gera uma variante GLB
+    com texturas recodificadas (JPEG/WebP) e/ou reduzidas, sob demanda.
+    A conversão roda na fila de CPU e fica guardada como artefato CONVERTED por (artefato, formato, opções):
+    - 200 READY: já convertido, com a URL assinada;
+    - 202 PENDING: na fila (pedidos iguais e simultâneos viram uma única conversão). Repita o POST para acompanhar;
+    - 200 FAILED: a última tentativa falhou (uma nova é aceita depois de alguns minutos).
+    """
+    job = await session.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    if job.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Acesso negado")
+    if job.status != JobStatus.SUCCEEDED:
+        raise HTTPException(
+            status_code=400,
+            detail=f"O Job ainda não foi finalizado. Status atual: {job.status}"
+        )
+
+    source = await session.scalar(
+        select(Artifact).where(Artifact.job_id == job_id, Artifact.type == ArtifactType.OUTPUT_MODEL)
+    )
+    if not source:
+        raise HTTPException(status_code=404, detail="Artefato não encontrado.")
+
+    if body.format == "glb" and (body.options.scale != 1.0 or body.options.up_axis != "y"):
+        raise HTTPException(status_code=422, detail="Variantes GLB só recodificam texturas (sem scale/up_axis).")
+
+    # Opções não informadas ficam fora da chave: pedidos equivalentes caem na mesma conversão
+    options = body.options.model_dump(exclude_none=True)
+    result = await request_conversion(session, source, body.format, options)
+    if result.status == "PENDING":
+        response.status_code = status.HTTP_202_ACCEPTED
+    return ConversionResponse(
+        status=result.status,
+        format=body.format,
+        download_url=result.download_url,
+        expires_in=result.expires_in,
+        error=result.error,
+    )
+
+@router.get("/{job_id}/logs", response_model=List[ArtifactRead])
+async def list_job_logs(
+    job_id: uuid.UUID,
+    current_user: CurrentUser,
+    session: db_session,
+):
+    """
+    Lista os artefatos de LOG do Job. Todo job que chegou a rodar tem a saída do modelo de cada Wrapper
+    (<nome>_model.log.gz, comprimida); jobs criados com 'profile: true' têm também o material do profiler
+    e o stdout/stderr completos dos Wrappers.
+    """
+    job = await session.get(Job, job_id)
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+
+    if job.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Acesso negado")
+
+    stmt = (
+        select(Artifact)
+        .where(Artifact.job_id == job_id, Artifact.type == ArtifactType.LOG)
+        .order_by(Artifact.storage_path)
+    )
+    result = await session.execute(stmt)
+    return result.scalars().all()
+
+@router.get("/{job_id}/logs/{artifact_id}", response_model=ArtifactDownload)
+async def download_job_log(
+    job_id: uuid.UUID,
+    artifact_id: uuid.UUID,
+    current_user: CurrentUser,
+    session: db_session,
+):
+    """
+    Gera uma URL temporária para baixar um artefato de LOG do Job.
+    """
+    # JOIN com Job: valida existência, tipo e dono numa única query
+    stmt = (
+        select(Artifact)
+        .join(Job, Job.id == Artifact.job_id)
+        .where(
+            Artifact.id == artifact_id,
+            Artifact.job_id == job_id,
+            Artifact.type == ArtifactType.LOG,
+            Job.user_id == current_user.id
+        )
+    )
+    result = await session.execute(stmt)
+    artifact = result.scalar_one_or_none()
+
+    if not artifact:
+        raise HTTPException(status_code=404, detail="Log não encontrado")
+
+    presigned_url = storage.generate_presigned_url(artifact.storage_path, expiration=600)
+
+    if not presigned_url:
+        raise HTTPException(status_code=500, detail="Erro ao gerar link de download")
+
+    return ArtifactDownload(
+        download_url=presigned_url,
+        expires_in=600,
+        metadata=artifact.metadata_
     )
 
 @router.get("/", response_model=List[JobRead])
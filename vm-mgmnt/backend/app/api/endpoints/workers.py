@@ -0,0 +1,43 @@
+from fastapi import APIRouter
+
+from app.api.deps import CurrentUser
+from app.core.worker_heartbeats import load_heartbeats, serves_jobs
+from app.schemas.worker import ClusterStatus
+
+router = APIRouter()
+
+@router.get("/cluster", response_model=ClusterStatus)
+async def get_cluster_status(current_user: CurrentUser):
+    """
+    Agrega os heartbeats dos Workers (vm-ia) numa visão do cluster.
+    Cada heartbeat tem TTL no Redis: Workers mortos somem sozinhos desta lista.
+    A lista por Worker (hostname, pid, porta de métricas, job em execução) é restrita a administradores;
+    os demais usuários recebem só os agregados.
+    """
+    # 1. Heartbeats vivos; a capacidade de geração conta só quem atende a fila dos jobs
+    workers = await load_heartbeats()
+    job_workers = [w for w in workers if serves_jobs(w)]
+
+    # 2. Agregação
+    busy = [w for w in job_workers if w.state == "busy"]
+    gpus = [gpu for w in job_workers for gpu in w.gpus]
+
+    jobs_by_model: dict[str, int] = {}
+    for w in busy:
+        if w.model_id:
+            jobs_by_model[w.model_id] = jobs_by_model.get(w.model_id, 0) + 1
+
+    return ClusterStatus(
+        total_workers=len(job_workers),
+        busy_workers=len(busy),
+        idle_workers=len(job_workers) - len(busy),
+        other_workers=len(workers) - len(job_workers),
+        total_gpus=len(gpus),
+        avg_gpu_utilization_percent=(
+            round(sum(g.utilization_percent for g in gpus) / len(gpus), 1) if gpus else None
+        ),
+        gpu_memory_used_bytes=sum(g.memory_used_bytes for g in gpus),
+        gpu_memory_total_bytes=sum(g.memory_total_bytes for g in gpus),
+        jobs_by_model=jobs_by_model,
+        workers=workers if current_user.is_superuser else []
+    )
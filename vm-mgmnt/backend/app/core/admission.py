@@ -0,0 +1,230 @@
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, func
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.worker_heartbeats import load_heartbeats, serves_jobs
+from app.models.job_model import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class QueueSnapshot:
+    """
+    Estado da fila num instante: o que ainda falta processar antes de um job novo.
+    """
+    queued: dict[str, int] = field(default_factory=dict)           # model_id -> jobs em QUEUED
+    running: list[tuple[str, float]] = field(default_factory=list) # (model_id, segundos já em execução)
+    workers: int = 1
+
+class WaitEstimator:
+    """
+    Estimativa de espera a partir das durações históricas por modelo (completed_at - started_at).
+    Modelo simples de fila: o trabalho restante (fila + o que falta dos jobs em execução)
+    dividido pelos Workers vivos. Sem I/O: recebe os dados prontos (replay de históricos).
+    """
+    def __init__(self, durations: dict[str, float], default_duration: float):
+        self.durations = durations
+        self.default_duration = default_duration
+
+    def duration(self, model_id: str) -> float:
+        return self.durations.get(model_id, self.default_duration)
+
+    def pending_work(self, snapshot: QueueSnapshot) -> float:
+        work = sum(count * self.duration(model_id) for model_id, count in snapshot.queued.items())
+        # Job que já passou da duração típica: conta como "quase no fim", e não como trabalho negativo
+        work += sum(max(self.duration(model_id) - elapsed, 0.0) for model_id, elapsed in snapshot.running)
+        return work
+
+    def estimate_wait(self, snapshot: QueueSnapshot) -> float:
+        """
+        Segundos até um job submetido agora começar a rodar.
+        """
+        return self.pending_work(snapshot) / max(snapshot.workers, 1)
+
+@dataclass
+class AdmissionDecision:
+    wait_seconds: float            # Espera estimada até o início do job
+    estimator: WaitEstimator
+    workers: int = 1
+    admitted: int = 0              # Quantos dos jobs pedidos (na ordem) entram na fila
+    retry_after: int | None = None # Preenchido quando algum job foi recusado (429 se nenhum entrou)
+    reason: str | None = None
+
+    def estimates(self, model_id: str, ahead: float = 0.0, now: datetime | None = None) -> dict[str, datetime]:
+        """
+        Campos estimated_start / estimated_completion do JobRead.
+        Args:
+            ahead: Trabalho (segundos) de jobs do mesmo lote que entram na fila antes deste.
+        """
+        now = now or datetime.now(timezone.utc)
+        start = now + timedelta(seconds=self.wait_seconds + ahead / max(self.workers, 1))
+        return {
+            "estimated_start": start,
+            "estimated_completion": start + timedelta(seconds=self.estimator.duration(model_id)),
+        }
+
+class _Cached:
+    """
+    Valor recalculado no máximo a cada 'ttl' segundos (evita 1 agregação no banco por submissão).
+    """
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.value = None
+        self.loaded_at = 0.0
+
+    def fresh(self) -> bool:
+        return self.value is not None and time.monotonic() - self.loaded_at < self.ttl
+
+    def set(self, value):
+        self.value = value
+        self.loaded_at = time.monotonic()
+        return value
+
+_durations_cache = _Cached(settings.ADMISSION_HISTORY_CACHE_TTL)
+_snapshot_cache = _Cached(settings.ADMISSION_SNAPSHOT_CACHE_TTL)
+
+async def _load_durations(session) -> dict[str, float]:
+    """
+    Mediana da duração dos jobs SUCCEEDED recentes, por modelo
+    (a mediana não se deixa levar por um job que ficou horas preso num Worker lento).
+    """
+    seconds = func.extract("epoch", Job.completed_at - Job.started_at)
+    since = datetime.now(timezone.utc) - timedelta(days=settings.ADMISSION_HISTORY_DAYS)
+    result = await session.execute(
+        select(Job.model_id, func.percentile_cont(0.5).within_group(seconds))
+        .where(
+            Job.status == JobStatus.SUCCEEDED,
+            Job.started_at.is_not(None),
+            Job.completed_at >= since,
+        )
+        .group_by(Job.model_id)
+    )
+    return {model_id: float(median) for model_id, median in result.all() if median is not None}
+
+async def _count_workers() -> int:
+    # Só quem atende a fila de geração (os Workers de conversão não escoam os jobs);
+    # sem heartbeat vivo, assume 1 (a fila anda quando alguém subir)
+    workers = sum(1 for worker in await load_heartbeats() if serves_jobs(worker))
+    return max(workers, 1)
+
+async def _load_snapshot(session) -> QueueSnapshot:
+    queued = await session.execute(
+        select(Job.model_id, func.count())
+        .where(Job.status == JobStatus.QUEUED)
+        .group_by(Job.model_id)
+    )
+    running = await session.execute(
+        select(Job.model_id, func.extract("epoch", func.now() - Job.started_at))
+        .where(Job.status == JobStatus.PROCESSING, Job.started_at.is_not(None))
+    )
+    return QueueSnapshot(
+        queued={model_id: count for model_id, count in queued.all()},
+        running=[(model_id, float(elapsed)) for model_id, elapsed in running.all()],
+        workers=await _count_workers(),
+    )
+
+async def get_wait_estimator() -> WaitEstimator:
+    if not _durations_cache.fresh():
+        async with AsyncSessionLocal() as session:
+            _durations_cache.set(await _load_durations(session))
+    return WaitEstimator(_durations_cache.value, settings.ADMISSION_DEFAULT_DURATION)
+
+async def get_queue_snapshot() -> QueueSnapshot:
+    if not _snapshot_cache.fresh():
+        async with AsyncSessionLocal() as session:
+            _snapshot_cache.set(await _load_snapshot(session))
+    return _snapshot_cache.value
+
+async def _active_jobs_of(session, user_id) -> int:
+    result = await session.execute(
+        select(func.count())
+        .select_from(Job)
+        .where(Job.user_id == user_id, Job.status.in_([JobStatus.QUEUED, JobStatus.PROCESSING]))
+    )
+    return result.scalar_one()
+
+async def check_admission(session, user_id, model_ids: list[str]) -> AdmissionDecision:
+    """
+    Decide quantos dos jobs novos (1 ou um lote, na ordem) entram na fila.
+    - Por usuário: no máximo ADMISSION_MAX_ACTIVE_PER_USER jobs em QUEUED/PROCESSING.
+    - Global: a espera estimada de cada job não pode passar de ADMISSION_MAX_WAIT (por padrão o JOB_TIMEOUT:
+      além disso a fila cresce mais rápido do que os Workers conseguem escoar). Num lote, a espera de cada
+      job inclui o trabalho dos jobs do próprio lote que entram antes dele.
+    Returns:
+        A decisão, com as estimativas; retry_after preenchido quando algum job foi recusado.
+    """
+    estimator = await get_wait_estimator()
+    snapshot = await get_queue_snapshot()
+
+    wait = estimator.estimate_wait(snapshot)
+    decision = AdmissionDecision(wait_seconds=wait, estimator=estimator, workers=snapshot.workers,
+                                 admitted=len(model_ids))
+
+    if settings.ADMISSION_MAX_ACTIVE_PER_USER:
+        active = await _active_jobs_of(session, user_id)
+        free = max(settings.ADMISSION_MAX_ACTIVE_PER_USER - active, 0)
+        if free < len(model_ids):
+            # Uma vaga abre quando um job do usuário termina: ao menos a duração típica de um job
+            decision.admitted = free
+            decision.retry_after = math.ceil(min(estimator.duration(model_id) for model_id in model_ids))
+            decision.reason = (
+                f"Limite de {settings.ADMISSION_MAX_ACTIVE_PER_USER} jobs ativos por usuário atingido "
+                f"({active} ativos)."
+            )
+
+    max_wait = settings.ADMISSION_MAX_WAIT or settings.JOB_TIMEOUT
+    ahead = 0.0 # Trabalho dos jobs do lote admitidos antes do atual
+    for index, model_id in enumerate(model_ids[:decision.admitted]):
+        projected = wait + ahead / max(snapshot.workers, 1)
+        if projected > max_wait:
+            # Tempo para os Workers escoarem o excesso da fila
+            decision.admitted = index
+            decision.retry_after = math.ceil(projected - max_wait)
+            decision.reason = f"Fila cheia: espera estimada de {projected / 60:.0f} min (limite {max_wait / 60:.0f} min)."
+            logger.warning(f"Admissão recusada ({len(model_ids) - index} de {len(model_ids)} jobs): {decision.reason}")
+            break
+        ahead += estimator.duration(model_id)
+    return decision
+
+def count_admitted(model_ids: list[str]) -> None:
+    """
+    Soma os jobs recém-aceitos ao snapshot em cache: rajadas dentro do mesmo
+    ADMISSION_SNAPSHOT_CACHE_TTL não passam todas pelo limite global com o mesmo número.
+    """
+    snapshot = _snapshot_cache.value
+    if snapshot is not None:
+        for model_id in model_ids:
+            snapshot.queued[model_id] = snapshot.queued.get(model_id, 0) + 1
+
+async def estimate_job(job: Job) -> dict[str, datetime] | None:
+    """
+    Estimativas de um job existente (GET /jobs/{id}).
+    - PROCESSING: início real + duração típica do modelo.
+    - QUEUED: toda a fila atual à frente, menos o próprio job (limite superior: a fila é FIFO).
+    """
+    estimator = await get_wait_estimator()
+
+    if job.status == JobStatus.PROCESSING and job.started_at:
+        return {
+            "estimated_start": job.started_at,
+            "estimated_completion": job.started_at + timedelta(seconds=estimator.duration(job.model_id)),
+        }
+
+    if job.status == JobStatus.QUEUED:
+        snapshot = await get_queue_snapshot()
+        # O próprio job já está na contagem da fila: não espera por si mesmo
+        work = max(estimator.pending_work(snapshot) - estimator.duration(job.model_id), 0.0)
+        decision = AdmissionDecision(
+            wait_seconds=work / max(snapshot.workers, 1),
+            estimator=estimator,
+            workers=snapshot.workers,
+        )
+        return decision.estimates(job.model_id)
+
+    return None
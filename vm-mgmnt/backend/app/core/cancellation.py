@@ -0,0 +1,20 @@
+import asyncio
+
+from app.core.config import settings
+from app.core.queue import discard_rq_jobs
+from app.core.redis_client import redis_async
+
+# Chaves no Redis (mesmos nomes em vm-ia/app/core/cancellation.py)
+CANCEL_KEY = "job:cancel:{job_id}"      # Marca durável: cobre o Worker que ainda não estava escutando
+CANCEL_CHANNEL = "worker:cancel:{name}" # Pub/Sub do Worker dono do job (payload = job_id)
+
+async def signal_job_cancel(job_id: str, worker_name: str | None) -> None:
+    """
+    Avisa o Worker dono do job (leased_by) para matar o processo do modelo.
+    Sem dono (job ainda na fila), apenas tira o job do RQ para ele nunca começar.
+    """
+    await redis_async.set(CANCEL_KEY.format(job_id=job_id), 1, ex=settings.JOB_TIMEOUT)
+    if worker_name:
+        await redis_async.publish(CANCEL_CHANNEL.format(name=worker_name), job_id)
+    else:
+        await asyncio.to_thread(discard_rq_jobs, [job_id])
@@ -1,4 +1,4 @@
-from pydantic import AnyHttpUrl, field_validator
+from pydantic import AnyHttpUrl, field_validator, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -36,12 +36,96 @@ class Settings(BaseSettings):
 
     # Conexão com a Fila
     REDIS_URL: str
+    JOB_TIMEOUT: int = 5400          # 1h30min para suportar modelos pesados como DreamFusion
+    JOB_BATCH_MAX_ITEMS: int = 1000  # Limite de itens por chamada de POST /jobs/batch
+    OUTBOX_BATCH_SIZE: int = 500     # Jobs publicados por pipeline pelo relay da outbox
+    OUTBOX_POLL_INTERVAL: float = 1.0 # Segundos entre varreduras da outbox (rede de segurança)
+    JOB_MAX_RETRIES: int = 2           # Reenfileiramentos de um job cujo Worker morreu, antes de FAILED
+    JOB_REAPER_INTERVAL: float = 30.0  # Segundos entre varreduras de leases vencidas
+    JOB_REAPER_BATCH_SIZE: int = 100   # Jobs recolhidos por transação
+
+    # Controle de admissão (429 + Retry-After) e estimativas de início/fim dos jobs
+    ADMISSION_MAX_ACTIVE_PER_USER: int = 50     # Jobs em QUEUED/PROCESSING por usuário (0 desativa)
+    ADMISSION_MAX_WAIT: int | None = None       # Espera estimada máxima em segundos (None = JOB_TIMEOUT)
+    ADMISSION_DEFAULT_DURATION: float = 600.0   # Duração assumida para modelos sem histórico
+    ADMISSION_HISTORY_DAYS: int = 7             # Janela de jobs SUCCEEDED usada nas medianas
+    ADMISSION_HISTORY_CACHE_TTL: float = 300.0  # Segundos entre recálculos das durações por modelo
+    ADMISSION_SNAPSHOT_CACHE_TTL: float = 5.0   # Segundos entre leituras da profundidade da fila
+
+    # Login (bcrypt fora do event loop + throttling)
+    PASSWORD_HASH_WORKERS: int = 2             # Threads dedicadas ao bcrypt
+    PASSWORD_HASH_MAX_PENDING: int = 8         # Verificações simultâneas (executando + na espera)
+    PASSWORD_HASH_QUEUE_TIMEOUT: float = 2.0   # Espera máxima por uma vaga antes de responder 503
+    LOGIN_IP_MAX_ATTEMPTS: int = 20            # Tentativas por IP a cada LOGIN_IP_WINDOW
+    LOGIN_IP_WINDOW: int = 60                  # Segundos
+    LOGIN_USER_MAX_FAILURES: int = 5           # Falhas seguidas (mesmo usuário e IP) antes de bloquear
+    LOGIN_USER_LOCKOUT: int = 900              # Segundos de bloqueio (15 min)
+
+    # Idempotency-Key em POST /jobs/
+    IDEMPOTENCY_TTL: int = 86400          # Janela em que repetições devolvem o Job original
+    IDEMPOTENCY_PENDING_TTL: int = 60     # Reserva enquanto a 1ª requisição cria o Job
+    IDEMPOTENCY_WAIT: float = 5.0         # Espera de uma duplicata simultânea antes do 409
+
+    # Upload direto para o MinIO (validade do ticket PUT)
+    UPLOAD_TICKET_EXPIRATION: int = 300
+
+    # Upload multipart (partes assinadas individualmente; o navegador envia em paralelo e retoma)
+    MULTIPART_PART_SIZE: int = 8 * 1024 ** 2        # Bytes por parte (mínimo do S3: 5 MiB)
+    MULTIPART_MAX_BYTES: int | None = None          # Tamanho máximo do arquivo (None = INPUT_MAX_BYTES; não pode passar dele)
+    MULTIPART_URL_EXPIRATION: int = 3600            # Validade das URLs das partes (renováveis na retomada)
+    MULTIPART_SESSION_TTL: int = 86400              # Uploads não concluídos são abortados pela retenção depois disso
+
+    # Exportação em ZIP (POST /jobs/export), montada em streaming a partir do Storage
+    EXPORT_MAX_JOBS: int = 500                    # Jobs por exportação
+    EXPORT_CHUNK_SIZE: int = 1024 ** 2            # Bytes lidos do Storage / enviados ao cliente por vez
+
+    # Conversão de formatos sob demanda (POST /jobs/{id}/conversions), na fila de CPU separada da de geração
+    CONVERSION_QUEUE: str = "conversions"
+    CONVERSION_TIMEOUT: int = 900                 # Timeout do job RQ de conversão (e da trava que agrupa pedidos)
+    CONVERSION_URL_EXPIRATION: int = 600          # Validade da URL assinada do arquivo convertido
+
+    # Validação da imagem de entrada na criação do Job (HEAD + leitura parcial do cabeçalho)
+    INPUT_MAX_BYTES: int = 50 * 1024 ** 2         # Tamanho máximo do arquivo
+    INPUT_HEADER_BYTES: int = 256 * 1024          # Bytes lidos para achar as dimensões (JPEG com EXIF/ICC grandes)
+    INPUT_MIN_DIMENSION: int = 64                 # Menor lado aceito, em pixels
+    INPUT_MAX_DIMENSION: int = 8192               # Maior lado aceito (evita imagens que estouram a RAM do Worker)
+    INPUT_VALIDATION_CACHE_TTL: int = 86400       # Resultado guardado por ETag
+
+    # Retenção do Storage (TTLs em dias; None = manter para sempre)
+    RETENTION_INTERVAL: float = 86400.0          # Segundos entre varreduras da API (0 desativa o loop)
+    RETENTION_UPLOAD_GRACE: int = 3600           # Uploads sem Job: apagados após ticket + esta carência
+    RETENTION_DEBUG_OBJ_DAYS: int | None = 7     # Cópias brutas jobs/<id>/model.obj (sem linha em artifacts)
+    RETENTION_LOG_DAYS: int | None = 30
+    RETENTION_PREVIEW_DAYS: int | None = None
+    RETENTION_OUTPUT_MODEL_DAYS: int | None = None
+    RETENTION_INPUT_DAYS: int | None = None
+    RETENTION_CONVERTED_DAYS: int | None = 30    # Conversões sob demanda (refeitas no próximo pedido)
+    RETENTION_BATCH_SIZE: int = 1000             # Mesmo limite do DeleteObjects
+    RETENTION_LOCK_TTL: int = 3600
+
+    # Tracing (spans em OTLP/JSON, uma linha por span). Vazio desativa.
+    TRACE_EXPORT_PATH: str = "traces/api-spans.jsonl"
+    TRACE_FLUSH_INTERVAL: float = 1.0   # Segundos entre gravações do buffer de spans
 
     # Primeiro usuário
     FIRST_SUPERUSER_USERNAME: str
     FIRST_SUPERUSER_PASSWORD: str
     FIRST_SUPERUSER_API_KEY: str
 
+    @model_validator(mode="after")
+    def check_multipart_limit(self) -> "Settings":
+        """
+        O upload multipart existe para as entradas dos Jobs: um arquivo acima de INPUT_MAX_BYTES
+        subiria inteiro só para o Job ser recusado na validação da entrada.
+        """
+        if self.MULTIPART_MAX_BYTES is None:
+            self.MULTIPART_MAX_BYTES = self.INPUT_MAX_BYTES
+        elif self.MULTIPART_MAX_BYTES > self.INPUT_MAX_BYTES:
+            raise ValueError(
+                f"MULTIPART_MAX_BYTES ({self.MULTIPART_MAX_BYTES}) não pode passar de INPUT_MAX_BYTES ({self.INPUT_MAX_BYTES})."
+            )
+        return self
+
     # Leitura do arquivo .env
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=True)
 
@@ -0,0 +1,74 @@
+import asyncio
+import hashlib
+import json
+import uuid
+from dataclasses import dataclass
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.queue import enqueue_conversion
+from app.core.redis_client import redis_async
+from app.core.storage import storage
+from app.models.artifact_model import Artifact
+
+# Chaves no Redis (mesmos nomes em vm-ia/app/conversion.py)
+CONVERSION_PENDING_KEY = "conversion:pending:{key}" # Trava: uma conversão por chave na fila (pedidos agrupados)
+CONVERSION_FAILED_KEY = "conversion:failed:{key}"   # Erro da última tentativa (expira: permite tentar de novo)
+
+# Extensão do arquivo convertido (OBJ vai num ZIP junto com o MTL e as texturas)
+# "glb": variante do próprio GLB com texturas recodificadas/reduzidas (clientes com pouca banda)
+CONVERSION_EXTENSIONS = {"usdz": "usdz", "ply": "ply", "stl": "stl", "obj": "zip", "glb": "glb"}
+
+@dataclass
+class ConversionStatus:
+    status: str                     # READY | PENDING | FAILED
+    download_url: str | None = None
+    expires_in: int | None = None
+    error: str | None = None
+
+def conversion_key(source_artifact_id: uuid.UUID, fmt: str, options: dict) -> str:
+    """
+    Chave estável de (artefato de origem, formato, opções): as opções entram normalizadas
+    (JSON com chaves ordenadas) para que o mesmo pedido sempre caia no mesmo arquivo.
+    """
+    canonical = json.dumps({"source": str(source_artifact_id), "format": fmt, "options": options}, sort_keys=True)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:32]
+
+def converted_path(job_id: uuid.UUID, key: str, fmt: str) -> str:
+    return f"jobs/{job_id}/converted/{key}.{CONVERSION_EXTENSIONS[fmt]}"
+
+async def request_conversion(session, source: Artifact, fmt: str, options: dict) -> ConversionStatus:
+    """
+    Devolve a conversão pronta (URL assinada) ou garante que ela está na fila.
+    1. Artefato CONVERTED já existe no caminho da chave: READY, sem enfileirar nada;
+    2. Falha recente da mesma chave: FAILED (até CONVERSION_FAILURE_TTL expirar no Worker);
+    3. Senão, SET NX na trava: só o primeiro pedido enfileira, os concorrentes recebem PENDING.
+    """
+    key = conversion_key(source.id, fmt, options)
+    target_path = converted_path(source.job_id, key, fmt)
+
+    existing = await session.scalar(select(Artifact.id).where(Artifact.storage_path == target_path))
+    if existing:
+        url = storage.generate_presigned_url(target_path, expiration=settings.CONVERSION_URL_EXPIRATION)
+        return ConversionStatus("READY", url, settings.CONVERSION_URL_EXPIRATION)
+
+    failed = await redis_async.get(CONVERSION_FAILED_KEY.format(key=key))
+    if failed is not None:
+        return ConversionStatus("FAILED", error=failed.decode())
+
+    rq_job_id = f"conversion-{key}-{uuid.uuid4().hex[:8]}"
+    claimed = await redis_async.set(
+        CONVERSION_PENDING_KEY.format(key=key), rq_job_id, nx=True, ex=settings.CONVERSION_TIMEOUT
+    )
+    if claimed:
+        try:
+            await asyncio.to_thread(
+                enqueue_conversion, rq_job_id,
+                (str(source.id), source.storage_path, target_path, fmt, options, key)
+            )
+        except Exception:
+            # Sem job na fila a trava só bloquearia os próximos pedidos até expirar
+            await redis_async.delete(CONVERSION_PENDING_KEY.format(key=key))
+            raise
+    return ConversionStatus("PENDING")
@@ -0,0 +1,78 @@
+import asyncio
+import enum
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+
+from app.core.config import settings
+from app.core.redis_client import redis_async
+
+logger = logging.getLogger(__name__)
+
+# Uma chave por usuário: o mesmo Idempotency-Key de usuários diferentes não colide
+IDEMPOTENCY_KEY = "idempotency:jobs:{user_id}:{key}"
+
+class ClaimStatus(str, enum.Enum):
+    NEW = "NEW"                  # Primeira vez: esta requisição cria o Job
+    REPLAY = "REPLAY"            # Já concluída: devolve a resposta original
+    IN_PROGRESS = "IN_PROGRESS"  # Outra requisição com a mesma chave ainda está criando o Job
+    MISMATCH = "MISMATCH"        # Mesma chave com outro corpo (erro do cliente)
+
+@dataclass
+class IdempotencyClaim:
+    status: ClaimStatus
+    redis_key: str
+    body_hash: str
+    response: str | None = None # JSON do JobRead original (status REPLAY)
+
+    async def complete(self, response_json: str) -> None:
+        """
+        Guarda a resposta final por IDEMPOTENCY_TTL: as repetições dentro da janela a recebem de volta.
+        """
+        await redis_async.set(
+            self.redis_key,
+            json.dumps({"hash": self.body_hash, "response": response_json}),
+            ex=settings.IDEMPOTENCY_TTL
+        )
+
+    async def release(self) -> None:
+        """
+        A criação falhou: libera a chave para o cliente poder tentar de novo.
+        """
+        await redis_async.delete(self.redis_key)
+
+def hash_body(body: dict) -> str:
+    return hashlib.sha256(json.dumps(body, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+async def claim_idempotency_key(user_id: str, key: str, body: dict) -> IdempotencyClaim:
+    """
+    Reserva atômica da chave (SET NX): entre requisições simultâneas com a mesma chave,
+    só uma recebe NEW. As demais esperam até IDEMPOTENCY_WAIT segundos pela resposta original.
+    """
+    redis_key = IDEMPOTENCY_KEY.format(user_id=user_id, key=key)
+    body_hash = hash_body(body)
+    pending = json.dumps({"hash": body_hash, "response": None})
+
+    # TTL curto enquanto pendente: se a API cair no meio, a chave não fica presa
+    if await redis_async.set(redis_key, pending, nx=True, ex=settings.IDEMPOTENCY_PENDING_TTL):
+        return IdempotencyClaim(ClaimStatus.NEW, redis_key, body_hash)
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.IDEMPOTENCY_WAIT
+    while True:
+        raw = await redis_async.get(redis_key)
+        if raw is None:
+            # A requisição original falhou e liberou a chave: tentamos assumir
+            if await redis_async.set(redis_key, pending, nx=True, ex=settings.IDEMPOTENCY_PENDING_TTL):
+                return IdempotencyClaim(ClaimStatus.NEW, redis_key, body_hash)
+            continue
+
+        stored = json.loads(raw)
+        if stored["hash"] != body_hash:
+            return IdempotencyClaim(ClaimStatus.MISMATCH, redis_key, body_hash)
+        if stored["response"] is not None:
+            return IdempotencyClaim(ClaimStatus.REPLAY, redis_key, body_hash, stored["response"])
+        if loop.time() >= deadline:
+            return IdempotencyClaim(ClaimStatus.IN_PROGRESS, redis_key, body_hash)
+        await asyncio.sleep(0.1)
@@ -0,0 +1,164 @@
+import asyncio
+import json
+import logging
+import struct
+from dataclasses import dataclass
+
+from app.core.config import settings
+from app.core.redis_client import redis_async
+from app.core.storage import storage
+from app.core.upload_dedup import expected_sha256, object_sha256
+
+logger = logging.getLogger(__name__)
+
+# Resultado por ETag: o mesmo conteúdo (reenvios, lotes com a mesma imagem) é validado uma vez só
+VALIDATION_CACHE_KEY = "input:validation:{etag}"
+
+# Marcadores JPEG de início de quadro (SOFn) que trazem as dimensões; C4/C8/CC são outras tabelas
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+@dataclass
+class ImageHeader:
+    format: str
+    width: int
+    height: int
+
+def _parse_png(data: bytes) -> ImageHeader | None:
+    # Assinatura (8) + tamanho/tipo do chunk IHDR (8) + largura/altura (8)
+    if len(data) < 24 or data[12:16] != b"IHDR":
+        return None
+    width, height = struct.unpack(">II", data[16:24])
+    return ImageHeader("png", width, height)
+
+def _parse_jpeg(data: bytes) -> ImageHeader | None:
+    # Percorre os segmentos até o SOFn (pode vir depois de EXIF/ICC grandes)
+    i = 2
+    while i + 4 <= len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF: # Bytes de preenchimento
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8: # Marcadores sem tamanho
+            i += 2
+            continue
+        length = struct.unpack(">H", data[i + 2:i + 4])[0]
+        if marker in _JPEG_SOF_MARKERS:
+            if i + 9 > len(data):
+                return None
+            height, width = struct.unpack(">HH", data[i + 5:i + 9])
+            return ImageHeader("jpeg", width, height)
+        i += 2 + length
+    return None
+
+def _parse_webp(data: bytes) -> ImageHeader | None:
+    if len(data) < 30:
+        return None
+    chunk = data[12:16]
+    if chunk == b"VP8 " and data[23:26] == b"\x9d\x01\x2a":
+        width, height = struct.unpack("<HH", data[26:30])
+        return ImageHeader("webp", width & 0x3FFF, height & 0x3FFF)
+    if chunk == b"VP8L" and data[20] == 0x2F:
+        bits = int.from_bytes(data[21:25], "little")
+        return ImageHeader("webp", (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1)
+    if chunk == b"VP8X":
+        width = int.from_bytes(data[24:27], "little") + 1
+        height = int.from_bytes(data[27:30], "little") + 1
+        return ImageHeader("webp", width, height)
+    return None
+
+def parse_image_header(data: bytes) -> ImageHeader | None:
+    """
+    Identifica o formato e as dimensões só pelo cabeçalho (PNG, JPEG, WebP: os formatos aceitos no upload),
+    sem decodificar os pixels.
+    Returns:
+        None se o conteúdo não é uma imagem suportada ou o cabeçalho está truncado.
+    """
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return _parse_png(data)
+    if data.startswith(b"\xff\xd8"):
+        return _parse_jpeg(data)
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return _parse_webp(data)
+    return None
+
+def check_image_header(header: ImageHeader | None) -> str | None:
+    """
+    Returns:
+        O motivo da rejeição, ou None se a imagem serve de entrada.
+    """
+    if header is None:
+        return "Arquivo de entrada não é uma imagem PNG, JPEG ou WebP válida."
+    smallest, largest = min(header.width, header.height), max(header.width, header.height)
+    if smallest < settings.INPUT_MIN_DIMENSION:
+        return (
+            f"Imagem de entrada muito pequena ({header.width}x{header.height}); "
+            f"mínimo de {settings.INPUT_MIN_DIMENSION}px por lado."
+        )
+    if largest > settings.INPUT_MAX_DIMENSION:
+        return (
+            f"Imagem de entrada muito grande ({header.width}x{header.height}); "
+            f"máximo de {settings.INPUT_MAX_DIMENSION}px por lado."
+        )
+    return None
+
+@dataclass
+class InputValidation:
+    path: str
+    size: int | None = None  # ContentLength do HEAD (vai para Artifact.file_size_bytes)
+    error: str | None = None # Motivo da rejeição (None = entrada válida)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+async def _inspect(path: str, etag: str) -> str | None:
+    """
+    Lê o cabeçalho da imagem (GET com Range) e aplica as regras, com cache por ETag.
+    """
+    cache_key = VALIDATION_CACHE_KEY.format(etag=etag)
+    cached = await redis_async.get(cache_key)
+    if cached is not None:
+        return json.loads(cached)["error"]
+
+    data = await asyncio.to_thread(storage.read_range, path, 0, settings.INPUT_HEADER_BYTES - 1)
+    error = check_image_header(parse_image_header(data))
+
+    await redis_async.set(cache_key, json.dumps({"error": error}), ex=settings.INPUT_VALIDATION_CACHE_TTL)
+    return error
+
+async def validate_input_upload(path: str) -> InputValidation:
+    """
+    Confere o upload de entrada ANTES de enfileirar o Job (o Worker de GPU só descobriria
+    um arquivo ausente ou corrompido depois de puxar o job e baixar o arquivo):
+    1. HEAD: o objeto existe e o tamanho está dentro de INPUT_MAX_BYTES;
+    2. Uploads endereçados pelo conteúdo (uploads/inputs/sha256/...): o conteúdo confere com o hash do caminho;
+    3. GET parcial (INPUT_HEADER_BYTES): é uma imagem suportada, com dimensões aceitáveis.
+    """
+    head = await asyncio.to_thread(storage.head_object, path, True)
+    if head is None:
+        return InputValidation(path, error=f"Arquivo de entrada '{path}' não encontrado no Storage.")
+
+    size = head["ContentLength"]
+    if size == 0:
+        return InputValidation(path, size, "Arquivo de entrada vazio.")
+    if size > settings.INPUT_MAX_BYTES:
+        return InputValidation(
+            path, size,
+            f"Arquivo de entrada excede {settings.INPUT_MAX_BYTES / 1024 ** 2:.0f} MB."
+        )
+
+    expected = expected_sha256(path)
+    if expected and await object_sha256(path, head) != expected:
+        return InputValidation(path, size, "Conteúdo do arquivo de entrada não confere com o SHA-256 informado.")
+
+    return InputValidation(path, size, await _inspect(path, head["ETag"].strip('"')))
+
+async def validate_input_uploads(paths: list[str]) -> dict[str, InputValidation]:
+    """
+    Valida vários uploads em paralelo (lotes), um por caminho distinto.
+    """
+    unique = list(dict.fromkeys(paths))
+    results = await asyncio.gather(*(validate_input_upload(path) for path in unique))
+    return dict(zip(unique, results))
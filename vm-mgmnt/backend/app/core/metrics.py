@@ -0,0 +1,97 @@
+import time
+from datetime import datetime, timezone
+
+from prometheus_client import Counter, Histogram, CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+from rq import Queue, Worker
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.queue import redis_conn
+
+# --- Latência HTTP por rota ---
+# O label 'route' usa o template da rota (/api/v1/jobs/{job_id}) e não a URL real,
+# para não explodir a cardinalidade com um UUID por série.
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Latência das requisições HTTP por rota",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+# --- Reaper de jobs (lease vencida) ---
+JOBS_REAPED = Counter(
+    "tcc_jobs_reaped_total",
+    "Jobs recolhidos por lease vencida, por destino (requeued | failed)",
+    ["outcome"],
+)
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI puro: mede a duração de cada requisição (custo: 2 leituras de relógio + 1 observe).
+    Não usa BaseHTTPMiddleware (app.middleware("http")), que embrulha cada resposta num stream
+    e numa task group extras e custava centenas de microssegundos por requisição.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # O roteador grava a rota casada no próprio scope
+            route = scope.get("route")
+            route_path = route.path if route else "unmatched"
+            REQUEST_LATENCY.labels(scope["method"], route_path, str(status_code)).observe(time.perf_counter() - start)
+
+class QueueCollector(Collector):
+    """
+    Métricas das filas RQ lidas do Redis no momento do scrape (nada é mantido em memória).
+    """
+    def collect(self):
+        depth = GaugeMetricFamily("rq_queue_depth", "Jobs aguardando em cada fila", labels=["queue"])
+        age = GaugeMetricFamily("rq_queue_oldest_job_age_seconds", "Idade do job mais antigo na fila", labels=["queue"])
+        workers = GaugeMetricFamily("rq_workers", "Workers registrados no Redis")
+
+        now = datetime.now(timezone.utc)
+        for queue in Queue.all(connection=redis_conn):
+            depth.add_metric([queue.name], queue.count)
+
+            oldest_age = 0.0
+            oldest_ids = queue.get_job_ids(0, 1)
+            if oldest_ids:
+                job = queue.fetch_job(oldest_ids[0])
+                if job and job.enqueued_at:
+                    enqueued_at = job.enqueued_at
+                    if enqueued_at.tzinfo is None:
+                        enqueued_at = enqueued_at.replace(tzinfo=timezone.utc) # RQ grava em UTC
+                    oldest_age = (now - enqueued_at).total_seconds()
+            age.add_metric([queue.name], oldest_age)
+
+        workers.add_metric([], Worker.count(connection=redis_conn))
+
+        yield depth
+        yield age
+        yield workers
+
+REGISTRY.register(QueueCollector())
+
+def metrics_response() -> Response:
+    """
+    Resposta no formato texto do Prometheus.
+    """
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal
+from app.core.redis_client import redis_async
+from app.models.ai_model import AIModel
+
+logger = logging.getLogger(__name__)
+
+# Chaves no Redis compartilhadas entre API e Worker
+MODELS_VERSION_KEY = "models:version"   # Contador incrementado a cada seed de modelos
+MODELS_RELOAD_CHANNEL = "models:reload" # Canal Pub/Sub que avisa a nova versão
+
+@dataclass(frozen=True)
+class ModelSpec:
+    """
+    Cópia em memória de uma linha da tabela 'models'.
+    """
+    id: str
+    name: str
+    default_params: dict[str, Any] = field(default_factory=dict)
+    is_active: bool = True
+
+    def merge_params(self, input_params: dict[str, Any]) -> dict[str, Any]:
+        """
+        Parâmetros efetivos do Job: defaults do modelo sobrescritos pelo que o cliente enviou.
+        """
+        return {**self.default_params, **(input_params or {})}
+
+class ModelRegistry:
+    """
+    Catálogo de modelos de IA em memória (mesma implementação na API e no Worker).
+    Carregado no startup e recarregado quando o seed publica uma nova versão no Redis.
+    """
+    def __init__(self):
+        self._models: dict[str, ModelSpec] = {}
+        self.version: int = 0
+        self.loaded: bool = False
+
+    def replace(self, models: list[AIModel], version: int) -> None:
+        """
+        Troca o catálogo inteiro de uma vez (leitores nunca veem um estado parcial).
+        """
+        self._models = {
+            m.id: ModelSpec(
+                id=m.id,
+                name=m.name,
+                default_params=dict(m.default_params or {}),
+                is_active=m.is_active
+            )
+            for m in models
+        }
+        self.version = version
+        self.loaded = True
+        logger.info(f"Registro de modelos carregado (versão {version}): {sorted(self._models)}")
+
+    def get(self, model_id: str) -> ModelSpec | None:
+        return self._models.get(model_id)
+
+    def __contains__(self, model_id: str) -> bool:
+        return model_id in self._models
+
+# Instância Singleton do processo
+model_registry = ModelRegistry()
+
+async def load_model_registry() -> None:
+    """
+    Lê a tabela 'models' e a versão atual no Redis e substitui o catálogo em memória.
+    """
+    version = int(await redis_async.get(MODELS_VERSION_KEY) or 0)
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(AIModel))
+        models = list(result.scalars().all())
+    model_registry.replace(models, version)
+
+async def get_model_spec(model_id: str) -> ModelSpec | None:
+    """
+    Consulta o catálogo (carregando na primeira chamada, caso o startup não tenha conseguido).
+    """
+    if not model_registry.loaded:
+        await load_model_registry()
+    return model_registry.get(model_id)
+
+async def publish_models_version() -> int:
+    """
+    Incrementa a versão do catálogo e avisa API(s) e Worker(s) para recarregar.
+    Deve ser chamado DEPOIS do commit do seed.
+    """
+    version = await redis_async.incr(MODELS_VERSION_KEY)
+    await redis_async.publish(MODELS_RELOAD_CHANNEL, version)
+    logger.info(f"Nova versão do catálogo de modelos publicada: {version}")
+    return version
+
+async def run_model_registry_listener() -> None:
+    """
+    Task de fundo da API: escuta o canal de reload e recarrega o catálogo a cada nova versão.
+    """
+    while True:
+        try:
+            async with redis_async.pubsub() as pubsub:
+                await pubsub.subscribe(MODELS_RELOAD_CHANNEL)
+                # Recarrega ao (re)conectar: uma versão pode ter sido publicada enquanto estávamos fora
+                await load_model_registry()
+                async for message in pubsub.listen():
+                    if message["type"] == "message" and int(message["data"]) != model_registry.version:
+                        await load_model_registry()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Listener do catálogo de modelos caiu (reconectando): {e}")
+            await asyncio.sleep(5)
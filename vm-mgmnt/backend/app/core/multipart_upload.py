@@ -0,0 +1,151 @@
+import asyncio
+import json
+import math
+import uuid
+from dataclasses import dataclass, asdict
+
+from botocore.exceptions import ClientError
+
+from app.core.config import settings
+from app.core.redis_client import redis_async
+from app.core.storage import storage
+
+# Sessão do upload no Redis: liga o UploadId ao dono e ao caminho (o cliente só conhece o UploadId)
+MULTIPART_SESSION_KEY = "upload:multipart:{upload_id}"
+
+# Limites do S3: partes de no mínimo 5 MiB (exceto a última) e no máximo 10000 partes
+S3_MIN_PART_SIZE = 5 * 1024 ** 2
+S3_MAX_PARTS = 10000
+
+class MultipartUploadError(Exception):
+    """
+    O Storage recusou a conclusão (ETag de parte inválido, parte menor que o mínimo etc.).
+    """
+
+class MultipartSizeError(MultipartUploadError):
+    """
+    As partes recebidas não somam o tamanho declarado ou passam de MULTIPART_MAX_BYTES
+    (as URLs assinadas das partes não limitam o tamanho do corpo). O upload é abortado.
+    """
+    def __init__(self, message: str, too_large: bool):
+        super().__init__(message)
+        self.too_large = too_large
+
+@dataclass
+class MultipartSession:
+    upload_id: str
+    user_id: str
+    object_name: str
+    part_size: int
+    part_count: int
+    size: int | None = None # Tamanho declarado no início (None em sessões anteriores ao campo)
+
+def plan_parts(size: int) -> tuple[int, int]:
+    """
+    Tamanho e quantidade de partes para um arquivo de 'size' bytes.
+    Returns:
+        (part_size, part_count)
+    """
+    part_size = max(settings.MULTIPART_PART_SIZE, S3_MIN_PART_SIZE, math.ceil(size / S3_MAX_PARTS))
+    return part_size, max(math.ceil(size / part_size), 1)
+
+async def _save(session: MultipartSession) -> None:
+    await redis_async.set(
+        MULTIPART_SESSION_KEY.format(upload_id=session.upload_id),
+        json.dumps(asdict(session)),
+        ex=settings.MULTIPART_SESSION_TTL
+    )
+
+async def start_multipart_upload(user_id: str, filename: str, content_type: str, size: int) -> MultipartSession:
+    """
+    Inicia o upload no Storage e registra a sessão (mesma estrutura de caminho do upload-ticket simples).
+    """
+    sanitized_filename = filename.replace(" ", "_")
+    object_name = f"uploads/inputs/{uuid.uuid4()}-{sanitized_filename}"
+    part_size, part_count = plan_parts(size)
+
+    upload_id = await asyncio.to_thread(storage.create_multipart_upload, object_name, content_type)
+    session = MultipartSession(upload_id, user_id, object_name, part_size, part_count, size)
+    await _save(session)
+    return session
+
+async def get_multipart_session(upload_id: str, user_id: str) -> MultipartSession | None:
+    """
+    Sessão do upload, apenas se pertencer ao usuário (None se não existe, expirou ou é de outro usuário).
+    """
+    raw = await redis_async.get(MULTIPART_SESSION_KEY.format(upload_id=upload_id))
+    if raw is None:
+        return None
+    session = MultipartSession(**json.loads(raw))
+    return session if session.user_id == user_id else None
+
+def sign_parts(session: MultipartSession, part_numbers: list[int]) -> dict[int, str]:
+    return storage.generate_presigned_part_urls(
+        session.object_name, session.upload_id, part_numbers, expiration=settings.MULTIPART_URL_EXPIRATION
+    )
+
+async def uploaded_parts(session: MultipartSession) -> list[dict]:
+    return await asyncio.to_thread(storage.list_parts, session.object_name, session.upload_id)
+
+def _etag(value: str) -> str:
+    return value.strip('"')
+
+async def complete_multipart_upload(session: MultipartSession, parts: list[tuple[int, str]] | None) -> list[int]:
+    """
+    Conclui o upload.
+    O tamanho vem do Storage (ListParts), não do cliente: se as partes não somarem o tamanho declarado
+    ou passarem de MULTIPART_MAX_BYTES, o upload é abortado antes de virar um objeto.
+    Args:
+        parts: (part_number, etag) informados pelo cliente; None usa as partes que o Storage já recebeu
+               (navegadores nem sempre conseguem ler o header ETag da resposta do PUT, por CORS).
+    Returns:
+        Números das partes que ainda faltam (lista vazia = upload concluído).
+    Raises:
+        MultipartSizeError: Tamanho total divergente ou acima do limite (upload abortado).
+        MultipartUploadError: O Storage recusou as partes informadas.
+    """
+    stored = {part["PartNumber"]: part for part in await uploaded_parts(session)}
+    expected = set(range(1, session.part_count + 1))
+
+    if parts is None:
+        parts = [(number, part["ETag"]) for number, part in stored.items()]
+    numbers = {number for number, _ in parts}
+    for number, etag in parts:
+        if number in stored and _etag(etag) != _etag(stored[number]["ETag"]):
+            raise MultipartUploadError(f"ETag da parte {number} não confere com a parte recebida pelo Storage.")
+
+    missing = sorted(expected - (numbers & stored.keys()))
+    if missing:
+        return missing
+
+    # Conclui com as partes listadas (as mesmas que foram somadas): uma parte reenviada
+    # depois desta leitura muda o ETag e o Storage recusa a conclusão
+    completed = [stored[number] for number in sorted(numbers)]
+    total = sum(part["Size"] for part in completed)
+    too_large = total > settings.MULTIPART_MAX_BYTES
+    if too_large or (session.size is not None and total != session.size):
+        await abort_multipart_upload(session)
+        raise MultipartSizeError(
+            f"Partes somam {total} bytes (declarado: {session.size}, limite: {settings.MULTIPART_MAX_BYTES}). "
+            "Upload descartado.",
+            too_large=too_large,
+        )
+
+    try:
+        await asyncio.to_thread(
+            storage.complete_multipart_upload,
+            session.object_name,
+            session.upload_id,
+            [{"PartNumber": part["PartNumber"], "ETag": part["ETag"]} for part in completed]
+        )
+    except ClientError as e:
+        error = e.response.get("Error", {})
+        if error.get("Code") in ("InvalidPart", "InvalidPartOrder", "EntityTooSmall"):
+            raise MultipartUploadError(error.get("Message") or error["Code"]) from e
+        raise
+    await redis_async.delete(MULTIPART_SESSION_KEY.format(upload_id=session.upload_id))
+    return []
+
+async def abort_multipart_upload(session: MultipartSession) -> None:
+    await asyncio.to_thread(storage.abort_multipart_upload, session.object_name, session.upload_id)
+    await redis_async.delete(MULTIPART_SESSION_KEY.format(upload_id=session.upload_id))
@@ -0,0 +1,81 @@
+import asyncio
+import logging
+
+from sqlalchemy import select, delete
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.queue import enqueue_jobs
+from app.models.job_outbox_model import JobOutbox
+
+logger = logging.getLogger(__name__)
+
+# Sinal para acordar o relay assim que um job novo é commitado
+# (o polling periódico fica só como rede de segurança)
+_wakeup = asyncio.Event()
+
+def notify_outbox() -> None:
+    """
+    Chamado pelas rotas logo após o commit de um Job.
+    Não faz I/O: apenas acorda o relay, que publica no Redis em segundo plano.
+    """
+    _wakeup.set()
+
+async def relay_once() -> int:
+    """
+    Publica um lote da outbox no Redis e apaga as linhas publicadas.
+    Entrega "at-least-once": se o processo cair entre o pipeline e o commit,
+    o lote é reenviado e o Worker descarta a duplicata (ver update_job_start).
+
+    Returns:
+        Quantidade de jobs enviados para a fila.
+    """
+    async with AsyncSessionLocal() as session:
+        # SKIP LOCKED permite vários processos da API drenando a outbox sem disputa
+        stmt = (
+            select(JobOutbox)
+            .order_by(JobOutbox.created_at)
+            .limit(settings.OUTBOX_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+        )
+        result = await session.execute(stmt)
+        entries = result.scalars().all()
+
+        if not entries:
+            return 0
+
+        # Publicação em lote (1 pipeline) numa thread, sem travar o event loop
+        await asyncio.to_thread(
+            enqueue_jobs,
+            [(str(entry.job_id), entry.model_id, entry.input_params, entry.traceparent) for entry in entries]
+        )
+
+        await session.execute(delete(JobOutbox).where(JobOutbox.id.in_([entry.id for entry in entries])))
+        await session.commit()
+
+    logger.info(f"Outbox: {len(entries)} job(s) publicados na fila.")
+    return len(entries)
+
+async def run_outbox_relay() -> None:
+    """
+    Loop do relay (roda como task de fundo da API).
+    Drena a outbox enquanto houver lotes cheios; depois espera um aviso ou o intervalo de polling.
+    """
+    logger.info("Relay da outbox iniciado.")
+    while True:
+        # Limpa o aviso ANTES de drenar: um commit durante o relay_once não se perde
+        _wakeup.clear()
+        try:
+            sent = await relay_once()
+            if sent >= settings.OUTBOX_BATCH_SIZE:
+                continue # Ainda há backlog, segue drenando
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Redis/Banco fora do ar: as linhas continuam na outbox e serão reenviadas
+            logger.error(f"Falha ao drenar outbox (nova tentativa em breve): {e}")
+
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=settings.OUTBOX_POLL_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
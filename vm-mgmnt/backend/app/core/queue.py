@@ -1,5 +1,7 @@
 import redis
 from rq import Queue
+from rq.exceptions import NoSuchJobError
+from rq.job import Job as RQJob
 from app.core.config import settings
 
 # Criamos uma conexão, que só conecta quando usar
@@ -7,11 +9,60 @@ redis_conn = redis.from_url(settings.REDIS_URL) # Usamos a URL definida no .env
 
 # Criamos a fila padrão do sistema
 # É para esta fila que enviaremos os jobs de geração 3D
-job_queue = Queue("default", connection=redis_conn, default_timeout=5400)
+job_queue = Queue("default", connection=redis_conn, default_timeout=settings.JOB_TIMEOUT)
+
+# Fila das conversões de formato: atendida só por Workers de CPU, não disputa a GPU com a geração
+conversion_queue = Queue(settings.CONVERSION_QUEUE, connection=redis_conn, default_timeout=settings.CONVERSION_TIMEOUT)
 
 def get_queue() -> Queue:
     """
     Retorna a instância da fila para ser usada nos endpoints.
     Padrão Singleton implícito (o módulo Python cacheia a instância).
     """
-    return job_queue
\ No newline at end of file
+    return job_queue
+
+def enqueue_jobs(jobs: list[tuple[str, str, dict, str | None]]) -> None:
+    """
+    Enfileira vários jobs de uma vez usando um único pipeline do Redis
+    (1 ida e volta na rede, em vez de 1 por job).
+
+    Args:
+        jobs: Lista de tuplas (job_id, model_id, input_params, traceparent), na ordem de execução.
+    """
+    job_datas = [
+        Queue.prepare_data(
+            "app.worker.process_job",
+            args=(job_id, model_id, input_params, traceparent),
+            timeout=settings.JOB_TIMEOUT,
+            job_id=job_id, # O ID do RQ é o mesmo do banco (facilita rastrear no Dashboard)
+        )
+        for job_id, model_id, input_params, traceparent in jobs
+    ]
+
+    with redis_conn.pipeline() as pipe:
+        job_queue.enqueue_many(job_datas, pipeline=pipe)
+        pipe.execute()
+
+def enqueue_conversion(rq_job_id: str, args: tuple) -> None:
+    """
+    Enfileira uma conversão de formato (executada por app.conversion.convert_artifact no vm-ia).
+    """
+    conversion_queue.enqueue(
+        "app.conversion.convert_artifact",
+        args=args,
+        job_id=rq_job_id,
+        job_timeout=settings.CONVERSION_TIMEOUT,
+        result_ttl=0,        # O resultado é o artefato no banco; nada a guardar no Redis
+        failure_ttl=86400,
+    )
+
+def discard_rq_jobs(job_ids: list[str]) -> None:
+    """
+    Apaga do Redis os jobs RQ informados (hash + filas/registros), se ainda existirem.
+    Usado antes de reenfileirar um job cujo Worker morreu, já que o ID do RQ é o do banco.
+    """
+    for job_id in job_ids:
+        try:
+            RQJob.fetch(job_id, connection=redis_conn).delete()
+        except NoSuchJobError:
+            pass
@@ -0,0 +1,57 @@
+import logging
+
+from app.core.config import settings
+from app.core.redis_client import redis_async
+
+logger = logging.getLogger(__name__)
+
+async def _hit(key: str, window: int) -> tuple[int, int]:
+    """
+    Incrementa um contador de janela fixa no Redis.
+    Retorna (contagem_atual, segundos_ate_zerar).
+    """
+    async with redis_async.pipeline(transaction=True) as pipe:
+        pipe.incr(key)
+        pipe.expire(key, window, nx=True) # Só define o TTL na primeira batida da janela
+        pipe.ttl(key)
+        count, _, ttl = await pipe.execute()
+    return count, max(ttl, 1)
+
+def _failure_key(username: str, ip: str) -> str:
+    # Por (usuário, IP): falhas vindas de outro IP não bloqueiam o dono legítimo da conta
+    return f"login:fail:{username}:{ip}"
+
+async def check_login_throttle(username: str, ip: str) -> int | None:
+    """
+    Verifica os limites de login ANTES de gastar CPU com o bcrypt.
+    - Por IP: número de tentativas por janela (qualquer resultado).
+    - Por (usuário, IP): número de falhas seguidas por janela (bloqueio temporário só daquele IP).
+
+    Returns:
+        None se a tentativa pode seguir, ou o tempo (segundos) para o cliente tentar de novo.
+    """
+    count, ttl = await _hit(f"login:ip:{ip}", settings.LOGIN_IP_WINDOW)
+    if count > settings.LOGIN_IP_MAX_ATTEMPTS:
+        logger.warning(f"Login bloqueado por excesso de tentativas do IP {ip}.")
+        return ttl
+
+    key = _failure_key(username, ip)
+    failures = await redis_async.get(key)
+    if failures and int(failures) >= settings.LOGIN_USER_MAX_FAILURES:
+        logger.warning(f"Login bloqueado temporariamente para o usuário '{username}' a partir do IP {ip}.")
+        return max(await redis_async.ttl(key), 1)
+
+    return None
+
+async def register_login_failure(username: str, ip: str) -> None:
+    """
+    Conta uma falha de senha de um usuário EXISTENTE a partir do IP (a janela começa na primeira falha).
+    Usuários inexistentes não são contados: não há conta a proteger e o contador só ocuparia o Redis.
+    """
+    await _hit(_failure_key(username, ip), settings.LOGIN_USER_LOCKOUT)
+
+async def reset_login_failures(username: str, ip: str) -> None:
+    """
+    Login bem-sucedido zera o contador de falhas do usuário naquele IP.
+    """
+    await redis_async.delete(_failure_key(username, ip))
@@ -0,0 +1,99 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import select, func
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import JOBS_REAPED
+from app.core.outbox import notify_outbox
+from app.core.queue import discard_rq_jobs
+from app.core.tracing import start_span
+from app.models.job_model import Job, JobStatus
+from app.models.job_outbox_model import JobOutbox
+
+logger = logging.getLogger(__name__)
+
+async def reap_once() -> int:
+    """
+    Recolhe jobs em PROCESSING cuja lease venceu (o Worker dono morreu ou perdeu o banco).
+    Até JOB_MAX_RETRIES o job volta para a fila (retry_count + 1, via outbox); depois disso, FAILED.
+
+    Returns:
+        Quantidade de jobs recolhidos.
+    """
+    async with AsyncSessionLocal() as session:
+        # Usa o índice parcial ix_jobs_processing_lease; SKIP LOCKED permite várias instâncias da API
+        stmt = (
+            select(Job)
+            .where(Job.status == JobStatus.PROCESSING, Job.lease_expires_at < func.now())
+            .order_by(Job.lease_expires_at)
+            .limit(settings.JOB_REAPER_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+        )
+        result = await session.execute(stmt)
+        jobs = result.scalars().all()
+
+        if not jobs:
+            return 0
+
+        # O job RQ antigo ainda consta no registro de "em execução" do Worker morto:
+        # remove antes de reenfileirar com o mesmo ID (senão a limpeza do RQ o marcaria como falho).
+        await asyncio.to_thread(discard_rq_jobs, [str(job.id) for job in jobs])
+
+        requeued = 0
+        for job in jobs:
+            expired_owner = job.leased_by
+            job.leased_by = None
+            job.lease_expires_at = None
+
+            if job.retry_count < settings.JOB_MAX_RETRIES:
+                job.retry_count += 1
+                job.status = JobStatus.QUEUED
+                job.progress_percent = 0
+                job.started_at = None
+
+                span = start_span("api.reaper.requeue", {
+                    "job.id": str(job.id),
+                    "job.retry_count": job.retry_count,
+                    "worker.name": expired_owner or "",
+                }, trace_id=job.trace_id)
+                session.add(JobOutbox(
+                    job_id=job.id,
+                    model_id=job.model_id,
+                    input_params=job.input_params,
+                    traceparent=span.traceparent
+                ))
+                span.end()
+                requeued += 1
+                JOBS_REAPED.labels("requeued").inc()
+                logger.warning(f"Lease do Job {job.id} venceu ({expired_owner}). Reenfileirado (tentativa {job.retry_count}).")
+            else:
+                job.status = JobStatus.FAILED
+                job.completed_at = datetime.now(timezone.utc)
+                JOBS_REAPED.labels("failed").inc()
+                logger.error(f"Lease do Job {job.id} venceu ({expired_owner}) e o limite de tentativas acabou. Marcado como FAILED.")
+
+        await session.commit()
+
+    if requeued:
+        notify_outbox()
+    return len(jobs)
+
+async def run_job_reaper() -> None:
+    """
+    Loop do reaper (roda como task de fundo da API).
+    """
+    logger.info("Reaper de jobs iniciado.")
+    while True:
+        try:
+            reaped = await reap_once()
+            if reaped >= settings.JOB_REAPER_BATCH_SIZE:
+                continue # Ainda há leases vencidas, segue recolhendo
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Falha ao recolher jobs com lease vencida: {e}")
+
+        await asyncio.sleep(settings.JOB_REAPER_INTERVAL)
@@ -0,0 +1,6 @@
+import redis.asyncio as aioredis
+from app.core.config import settings
+
+# Cliente Redis ASSÍNCRONO para uso dentro das rotas (não bloqueia o event loop).
+# O cliente síncrono em app/core/queue.py continua sendo o usado pelo RQ.
+redis_async = aioredis.from_url(settings.REDIS_URL)
@@ -0,0 +1,257 @@
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from sqlalchemy import select, delete, or_
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.redis_client import redis_async
+from app.core.storage import storage
+from app.models.artifact_model import Artifact, ArtifactType
+from app.models.job_model import Job
+
+logger = logging.getLogger(__name__)
+
+UPLOADS_PREFIX = "uploads/inputs/"
+JOBS_PREFIX = "jobs/"
+DEBUG_OBJ_SUFFIX = "/model.obj" # Cópia bruta do DreamFusion (só Storage, sem linha em artifacts)
+
+# Trava no Redis: com várias instâncias da API, só uma faz a varredura por vez
+RETENTION_LOCK_KEY = "retention:lock"
+
+@dataclass
+class RetentionStats:
+    objects: int = 0
+    bytes: int = 0
+    failed: int = 0
+
+@dataclass
+class RetentionReport:
+    dry_run: bool
+    scanned: int = 0
+    categories: dict[str, RetentionStats] = field(default_factory=dict)
+    started_at: float = field(default_factory=time.perf_counter)
+    elapsed: float = 0.0
+
+    def add(self, category: str, objects: int, size: int, failed: int = 0) -> None:
+        stats = self.categories.setdefault(category, RetentionStats())
+        stats.objects += objects
+        stats.bytes += size
+        stats.failed += failed
+
+    def summary(self) -> str:
+        action = "seriam apagados" if self.dry_run else "apagados"
+        total = sum(s.objects for s in self.categories.values())
+        lines = [
+            f"Retenção{' (dry-run)' if self.dry_run else ''}: {self.scanned} objetos analisados, "
+            f"{total} {action} em {self.elapsed:.1f}s ({self.scanned / max(self.elapsed, 1e-6):.0f} objetos/s)."
+        ]
+        for name, stats in self.categories.items():
+            line = f"  - {name}: {stats.objects} objetos, {stats.bytes / 1024 ** 2:.1f} MB"
+            if stats.failed:
+                line += f" ({stats.failed} falharam)"
+            lines.append(line)
+        return "\n".join(lines)
+
+def _cutoff(seconds: float) -> datetime:
+    return datetime.now(timezone.utc) - timedelta(seconds=seconds)
+
+async def _referenced_paths(session, paths: list[str], ignore_artifacts: list[uuid.UUID] | None = None,
+                            ignore_jobs: list[uuid.UUID] | None = None) -> set[str]:
+    """
+    Caminhos ainda usados por algum Job: artefato registrado ou referência em input_params
+    (jobs antigos criados com 'input_path' não tinham artefato INPUT).
+    ignore_artifacts/ignore_jobs: referências que estão sendo apagadas e não contam.
+    """
+    stmt = select(Artifact.storage_path).where(Artifact.storage_path.in_(paths))
+    if ignore_artifacts:
+        stmt = stmt.where(Artifact.id.not_in(ignore_artifacts))
+    referenced = set((await session.execute(stmt)).scalars().all())
+
+    pending = [path for path in paths if path not in referenced]
+    if pending:
+        stmt = select(Job.input_params["input_path"].astext, Job.input_params["image_path"].astext).where(or_(
+            Job.input_params["input_path"].astext.in_(pending),
+            Job.input_params["image_path"].astext.in_(pending),
+        ))
+        if ignore_jobs:
+            stmt = stmt.where(Job.id.not_in(ignore_jobs))
+        result = await session.execute(stmt)
+        for row in result.all():
+            referenced.update(value for value in row if value)
+    return referenced
+
+class RetentionSweeper:
+    """
+    Ciclo de vida dos objetos no Storage:
+    1. Uploads (uploads/inputs/) sem Job, mais velhos que a validade do ticket + carência,
+       e uploads multipart nunca concluídos (as partes ocupam espaço sem aparecer na listagem);
+    2. Cópias brutas de OBJ (jobs/<id>/model.obj) após RETENTION_DEBUG_OBJ_DAYS;
+    3. Artefatos registrados, conforme o TTL do tipo (LOG, PREVIEW, OUTPUT_MODEL, INPUT, CONVERTED).
+    Objetos são apagados em lote (DeleteObjects) e as linhas de artifacts em DELETE únicos por lote.
+    """
+    def __init__(self, dry_run: bool = False):
+        self.dry_run = dry_run
+        self.report = RetentionReport(dry_run=dry_run)
+
+    async def run(self) -> RetentionReport:
+        await self._sweep_unreferenced(
+            "uploads", UPLOADS_PREFIX,
+            _cutoff(settings.UPLOAD_TICKET_EXPIRATION + settings.RETENTION_UPLOAD_GRACE),
+        )
+        if settings.RETENTION_DEBUG_OBJ_DAYS is not None:
+            await self._sweep_unreferenced(
+                "debug_obj", JOBS_PREFIX,
+                _cutoff(settings.RETENTION_DEBUG_OBJ_DAYS * 86400),
+                match=lambda key: key.endswith(DEBUG_OBJ_SUFFIX),
+            )
+
+        await self._sweep_multipart(UPLOADS_PREFIX, _cutoff(settings.MULTIPART_SESSION_TTL))
+
+        ttls = {
+            ArtifactType.LOG: settings.RETENTION_LOG_DAYS,
+            ArtifactType.PREVIEW: settings.RETENTION_PREVIEW_DAYS,
+            ArtifactType.OUTPUT_MODEL: settings.RETENTION_OUTPUT_MODEL_DAYS,
+            ArtifactType.INPUT: settings.RETENTION_INPUT_DAYS,
+            ArtifactType.CONVERTED: settings.RETENTION_CONVERTED_DAYS,
+        }
+        for artifact_type, days in ttls.items():
+            if days is not None:
+                await self._sweep_artifacts(artifact_type, _cutoff(days * 86400))
+
+        self.report.elapsed = time.perf_counter() - self.report.started_at
+        return self.report
+
+    async def _delete_objects(self, paths: list[str]) -> list[str]:
+        if self.dry_run or not paths:
+            return []
+        return await asyncio.to_thread(storage.delete_objects, paths)
+
+    async def _sweep_unreferenced(self, category: str, prefix: str, cutoff: datetime,
+                                  match: Callable[[str], bool] = lambda key: True) -> None:
+        """
+        Varre o prefixo no Storage e apaga os objetos antigos que nenhum Job referencia.
+        Uma consulta ao banco por página de listagem (até 1000 chaves).
+        """
+        pages = storage.list_objects(prefix)
+        while (page := await asyncio.to_thread(next, pages, None)) is not None:
+            self.report.scanned += len(page)
+            candidates = {
+                obj["Key"]: obj["Size"] for obj in page
+                if obj["LastModified"] < cutoff and match(obj["Key"])
+            }
+            if not candidates:
+                continue
+
+            async with AsyncSessionLocal() as session:
+                referenced = await _referenced_paths(session, list(candidates))
+            orphans = [key for key in candidates if key not in referenced]
+
+            failed = set(await self._delete_objects(orphans))
+            self.report.add(
+                category,
+                objects=len(orphans) - len(failed),
+                size=sum(candidates[key] for key in orphans if key not in failed),
+                failed=len(failed),
+            )
+
+    async def _sweep_multipart(self, prefix: str, cutoff: datetime) -> None:
+        """
+        Aborta os uploads multipart iniciados antes do corte e nunca concluídos.
+        """
+        pages = storage.list_multipart_uploads(prefix)
+        while (page := await asyncio.to_thread(next, pages, None)) is not None:
+            self.report.scanned += len(page)
+            stale = [upload for upload in page if upload["Initiated"] < cutoff]
+            failed = 0
+            if not self.dry_run:
+                for upload in stale:
+                    try:
+                        await asyncio.to_thread(storage.abort_multipart_upload, upload["Key"], upload["UploadId"])
+                    except Exception as e:
+                        logger.error(f"Falha ao abortar upload multipart {upload['Key']}: {e}")
+                        failed += 1
+            # Tamanho das partes exigiria um ListParts por upload: fica de fora do relatório
+            self.report.add("multipart", objects=len(stale) - failed, size=0, failed=failed)
+
+    async def _sweep_artifacts(self, artifact_type: ArtifactType, cutoff: datetime) -> None:
+        """
+        Apaga artefatos registrados mais velhos que o TTL do tipo, em lotes.
+        A linha sempre sai; o objeto só quando nenhum outro Artifact ou Job o referencia
+        (entradas deduplicadas em uploads/inputs/sha256/ são compartilhadas entre jobs).
+        """
+        category = f"artifacts_{artifact_type.value.lower()}"
+        batch_size = settings.RETENTION_BATCH_SIZE
+        last_id = None
+
+        while True:
+            async with AsyncSessionLocal() as session:
+                stmt = (
+                    select(Artifact.id, Artifact.job_id, Artifact.storage_path, Artifact.file_size_bytes)
+                    .where(Artifact.type == artifact_type.value, Artifact.created_at < cutoff)
+                    .order_by(Artifact.id)
+                    .limit(batch_size)
+                )
+                if last_id is not None:
+                    stmt = stmt.where(Artifact.id > last_id) # Paginação por chave (estável no dry-run)
+                rows = (await session.execute(stmt)).all()
+                if not rows:
+                    return
+                last_id = rows[-1].id
+                self.report.scanned += len(rows)
+
+                sizes = {row.storage_path: row.file_size_bytes or 0 for row in rows}
+                shared = await _referenced_paths(
+                    session, list(sizes),
+                    ignore_artifacts=[row.id for row in rows], ignore_jobs=[row.job_id for row in rows],
+                )
+                orphans = [path for path in sizes if path not in shared]
+
+                # Objeto que falhou mantém a linha: a próxima varredura tenta de novo
+                failed = set(await self._delete_objects(orphans))
+                deleted = [row for row in rows if row.storage_path not in failed]
+                if not self.dry_run and deleted:
+                    await session.execute(delete(Artifact).where(Artifact.id.in_([row.id for row in deleted])))
+                    await session.commit()
+
+            self.report.add(
+                category,
+                objects=len(orphans) - len(failed),
+                size=sum(sizes[path] for path in orphans if path not in failed),
+                failed=len(failed),
+            )
+            if len(rows) < batch_size:
+                return
+
+async def run_retention(dry_run: bool = False) -> RetentionReport | None:
+    """
+    Executa uma varredura completa se nenhuma outra instância estiver rodando.
+    """
+    if not await redis_async.set(RETENTION_LOCK_KEY, 1, nx=True, ex=settings.RETENTION_LOCK_TTL):
+        logger.info("Retenção: varredura já em andamento em outra instância.")
+        return None
+    try:
+        report = await RetentionSweeper(dry_run=dry_run).run()
+    finally:
+        await redis_async.delete(RETENTION_LOCK_KEY)
+    logger.info(report.summary())
+    return report
+
+async def run_retention_loop() -> None:
+    """
+    Loop da retenção (task de fundo da API), a cada RETENTION_INTERVAL segundos.
+    """
+    logger.info("Retenção do Storage iniciada.")
+    while True:
+        try:
+            await run_retention()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Falha na varredura de retenção: {e}")
+        await asyncio.sleep(settings.RETENTION_INTERVAL)
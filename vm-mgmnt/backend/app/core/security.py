@@ -1,8 +1,30 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
 from passlib.context import CryptContext
 
+from app.core.config import settings
+
 # Configuração do contexto de criptografia (Bcrypt)
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Pool dedicado para o bcrypt (CPU-bound, ~100-300ms por verificação).
+# O bcrypt libera o GIL, então threads bastam para tirar o custo do event loop.
+# Pool próprio (e não o default do asyncio) para que rajadas de login não ocupem
+# as threads usadas por outras tarefas (ex: relay da outbox).
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="bcrypt"
+)
+
+# Limite de verificações em andamento (executando + aguardando no pool)
+_hash_slots = asyncio.Semaphore(settings.PASSWORD_HASH_MAX_PENDING)
+
+class PasswordHashingBusy(Exception):
+    """
+    Todas as vagas de verificação de senha estão ocupadas (rajada de logins).
+    """
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verifica se a senha em texto plano corresponde ao hash guardado.
@@ -13,4 +35,21 @@ def get_password_hash(password: str) -> str:
     """
     Gera um hash seguro da senha.
     """
-    return pwd_context.hash(password)
\ No newline at end of file
+    return pwd_context.hash(password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Versão não-bloqueante do verify_password para uso nas rotas async.
+    Executa o bcrypt no pool dedicado; se não houver vaga dentro do tempo limite,
+    lança PasswordHashingBusy em vez de enfileirar indefinidamente.
+    """
+    try:
+        await asyncio.wait_for(_hash_slots.acquire(), timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise PasswordHashingBusy()
+
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_executor, verify_password, plain_password, hashed_password)
+    finally:
+        _hash_slots.release()
@@ -1,5 +1,9 @@
 import boto3
+import hashlib
 import logging
+import threading
+import time
+from collections import OrderedDict
 from botocore.exceptions import ClientError
 from app.core.config import settings
 
@@ -85,7 +89,8 @@ class StorageClient:
             logger.error(f"Erro ao gerar URL de download assinada: {e}")
             return ""
 
-    def generate_presigned_upload_url(self, object_name: str, content_type: str, expiration: int = 300) -> str:
+    def generate_presigned_upload_url(self, object_name: str, content_type: str, expiration: int = 300,
+                                      checksum_sha256: str | None = None) -> str:
         """
         Gera uma URL temporária para UPLOAD (PUT) direto para o MinIO.
         O Frontend usará esta URL para enviar o arquivo binário.
@@ -94,22 +99,270 @@ class StorageClient:
             object_name: Caminho final do arquivo (ex: uploads/inputs/uuid.png)
             content_type: Tipo MIME do arquivo (ex: image/png). Importante para validar no MinIO.
             expiration: Tempo de validade do ticket em segundos (Default: 5 min)
+            checksum_sha256: SHA-256 (base64) esperado do conteúdo. Vai assinado na URL: o cliente
+                             precisa enviar o header x-amz-checksum-sha256 e o Storage recusa corpo divergente.
         """
+        params = {
+            'Bucket': self.bucket_name,
+            'Key': object_name,
+            'ContentType': content_type
+        }
+        if checksum_sha256:
+            params['ChecksumSHA256'] = checksum_sha256
         try:
             url = self.s3_client.generate_presigned_url(
                 'put_object',
+                Params=params,
+                ExpiresIn=expiration
+            )
+            return url
+        except ClientError as e:
+            logger.error(f"Erro ao gerar URL de upload assinada: {e}")
+            return ""
+
+    # --- Upload multipart (arquivos grandes: partes em paralelo e retomáveis) ---
+
+    def create_multipart_upload(self, object_name: str, content_type: str) -> str:
+        """
+        Inicia um upload multipart.
+
+        Returns:
+            O UploadId, necessário para assinar as partes e concluir/abortar o upload.
+        """
+        response = self.s3_client.create_multipart_upload(
+            Bucket=self.bucket_name,
+            Key=object_name,
+            ContentType=content_type
+        )
+        return response["UploadId"]
+
+    def generate_presigned_part_urls(self, object_name: str, upload_id: str, part_numbers: list[int],
+                                     expiration: int = 3600) -> dict[int, str]:
+        """
+        Assina uma URL de PUT por parte (cálculo local, sem ida ao MinIO).
+
+        Returns:
+            Dicionário {part_number: url}.
+        """
+        return {
+            part_number: self.s3_client.generate_presigned_url(
+                'upload_part',
                 Params={
                     'Bucket': self.bucket_name,
                     'Key': object_name,
-                    'ContentType': content_type
+                    'UploadId': upload_id,
+                    'PartNumber': part_number
                 },
                 ExpiresIn=expiration
             )
-            return url
+            for part_number in part_numbers
+        }
+
+    def list_parts(self, object_name: str, upload_id: str) -> list[dict]:
+        """
+        Partes já recebidas pelo Storage (PartNumber, ETag, Size), em ordem.
+        """
+        parts = []
+        paginator = self.s3_client.get_paginator("list_parts")
+        for page in paginator.paginate(Bucket=self.bucket_name, Key=object_name, UploadId=upload_id):
+            parts.extend(page.get("Parts", []))
+        return parts
+
+    def complete_multipart_upload(self, object_name: str, upload_id: str, parts: list[dict]) -> None:
+        """
+        Junta as partes no objeto final.
+
+        Args:
+            parts: [{"PartNumber": n, "ETag": "..."}], em ordem crescente de PartNumber.
+        """
+        self.s3_client.complete_multipart_upload(
+            Bucket=self.bucket_name,
+            Key=object_name,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": parts}
+        )
+
+    def abort_multipart_upload(self, object_name: str, upload_id: str) -> None:
+        """
+        Descarta o upload e as partes já enviadas (senão elas ocupam espaço sem aparecer na listagem).
+        """
+        try:
+            self.s3_client.abort_multipart_upload(Bucket=self.bucket_name, Key=object_name, UploadId=upload_id)
         except ClientError as e:
-            logger.error(f"Erro ao gerar URL de upload assinada: {e}")
-            return ""
+            if e.response.get("Error", {}).get("Code") != "NoSuchUpload":
+                raise
+
+    def list_multipart_uploads(self, prefix: str):
+        """
+        Itera os uploads multipart em andamento sob o prefixo, página a página.
+
+        Yields:
+            Lista de dicts do boto3 (Key, UploadId, Initiated...) por página.
+        """
+        paginator = self.s3_client.get_paginator("list_multipart_uploads")
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            yield page.get("Uploads", [])
+
+    def generate_presigned_urls(self, object_names: list[str], expiration: int = 3600) -> dict[str, str]:
+        """
+        Assina várias URLs de download de uma vez (usado pela Galeria).
+        A assinatura é um cálculo local (HMAC), então não há ida ao MinIO por item.
+
+        Returns:
+            Dicionário {object_name: url}. Caminhos que falharem ficam de fora.
+        """
+        urls = {}
+        for object_name in dict.fromkeys(object_names): # Remove duplicados mantendo a ordem
+            url = self.generate_presigned_url(object_name, expiration=expiration)
+            if url:
+                urls[object_name] = url
+        return urls
+
+    def head_object(self, object_name: str, with_checksum: bool = False) -> dict | None:
+        """
+        Metadados do objeto (ContentLength, ETag, ContentType...) sem baixar o conteúdo.
+
+        Args:
+            with_checksum: Inclui o ChecksumSHA256 gravado no upload (se o cliente enviou um).
+
+        Returns:
+            O dict do boto3, ou None se o objeto não existe.
+        """
+        params = {'Bucket': self.bucket_name, 'Key': object_name}
+        if with_checksum:
+            params['ChecksumMode'] = 'ENABLED'
+        try:
+            return self.s3_client.head_object(**params)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    def read_range(self, object_name: str, start: int, end: int) -> bytes:
+        """
+        Lê apenas os bytes [start, end] do objeto (GET com header Range, limites inclusivos).
+        """
+        response = self.s3_client.get_object(
+            Bucket=self.bucket_name,
+            Key=object_name,
+            Range=f"bytes={start}-{end}"
+        )
+        return response["Body"].read()
+
+    def iter_object(self, object_name: str, chunk_size: int = 1024 * 1024):
+        """
+        Lê o objeto em streaming, em pedaços de até 'chunk_size' bytes (memória constante).
+        A conexão com o Storage é fechada mesmo se o consumidor parar no meio.
+        """
+        body = self.s3_client.get_object(Bucket=self.bucket_name, Key=object_name)["Body"]
+        try:
+            yield from body.iter_chunks(chunk_size=chunk_size)
+        finally:
+            body.close()
+
+    def sha256_object(self, object_name: str) -> str:
+        """
+        Calcula o SHA-256 (hex) do objeto lendo-o em streaming (sem guardar o arquivo inteiro em memória).
+        """
+        digest = hashlib.sha256()
+        body = self.s3_client.get_object(Bucket=self.bucket_name, Key=object_name)["Body"]
+        for chunk in body.iter_chunks(chunk_size=1024 * 1024):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+    def touch_object(self, object_name: str, content_type: str) -> None:
+        """
+        Renova o LastModified do objeto com uma cópia sobre si mesmo (no servidor, sem tráfego de dados).
+        """
+        self.s3_client.copy_object(
+            Bucket=self.bucket_name,
+            Key=object_name,
+            CopySource={'Bucket': self.bucket_name, 'Key': object_name},
+            MetadataDirective='REPLACE', # Obrigatório numa cópia sobre si mesmo
+            ContentType=content_type,
+            ChecksumAlgorithm='SHA256'
+        )
+
+    def list_objects(self, prefix: str):
+        """
+        Itera o bucket página a página (até 1000 objetos por página, o limite do S3).
+
+        Yields:
+            Lista de dicts do boto3 (Key, Size, LastModified...) por página.
+        """
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            yield page.get("Contents", [])
+
+    def delete_objects(self, object_names: list[str]) -> list[str]:
+        """
+        Apaga vários objetos com DeleteObjects (1 requisição a cada 1000 chaves).
+
+        Returns:
+            Caminhos que o Storage NÃO conseguiu apagar.
+        """
+        failed = []
+        for start in range(0, len(object_names), 1000):
+            chunk = object_names[start:start + 1000]
+            response = self.s3_client.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={"Objects": [{"Key": name} for name in chunk], "Quiet": True}
+            )
+            for error in response.get("Errors", []):
+                logger.error(f"Falha ao apagar {error.get('Key')}: {error.get('Code')} {error.get('Message')}")
+                failed.append(error["Key"])
+        return failed
+
+class PresignedUrlCache:
+    """
+    Cache em memória de URLs assinadas, por caminho no Storage.
+    Evita reassinar os mesmos artefatos a cada polling da Galeria.
+    Uma URL é reaproveitada até 'margin' segundos antes de expirar.
+    """
+    def __init__(self, client: StorageClient, expiration: int = 3600, margin: int = 300, max_entries: int = 10000):
+        self.client = client
+        self.expiration = expiration
+        self.margin = margin
+        self.max_entries = max_entries
+        # object_name -> (url, expira_em). OrderedDict funciona como LRU simples.
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, object_names: list[str]) -> dict[str, tuple[str, int]]:
+        """
+        Devolve {object_name: (url, segundos_restantes)}.
+        Apenas os caminhos ausentes ou perto de expirar são assinados, todos numa única rodada.
+        """
+        now = time.monotonic()
+        result = {}
+        missing = []
+
+        with self._lock:
+            for name in object_names:
+                entry = self._entries.get(name)
+                if entry and entry[1] - self.margin > now:
+                    self._entries.move_to_end(name)
+                    result[name] = (entry[0], int(entry[1] - now))
+                else:
+                    missing.append(name)
+
+        if missing:
+            signed = self.client.generate_presigned_urls(missing, expiration=self.expiration)
+            expires_at = now + self.expiration
+            with self._lock:
+                for name, url in signed.items():
+                    self._entries[name] = (url, expires_at)
+                    self._entries.move_to_end(name)
+                    result[name] = (url, self.expiration)
+                # Descarta as entradas menos usadas se o cache passar do limite
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        return result
 
 # Instância Singleton:
 # Ao importar 'storage' em outros arquivos, usaremos sempre esta mesma conexão
-storage = StorageClient()
\ No newline at end of file
+storage = StorageClient()
+
+# Cache compartilhado de URLs de download (1h de validade, renovadas 5 min antes)
+presigned_cache = PresignedUrlCache(storage)
@@ -0,0 +1,76 @@
+import asyncio
+import base64
+import logging
+from datetime import datetime, timezone
+
+from app.core.config import settings
+from app.core.redis_client import redis_async
+from app.core.storage import storage
+
+logger = logging.getLogger(__name__)
+
+# Uploads endereçados pelo conteúdo: a mesma imagem enviada por N usuários vira 1 objeto só
+CONTENT_ADDRESSED_PREFIX = "uploads/inputs/sha256/"
+
+# SHA-256 calculado pela API (Storage sem checksum gravado), por ETag: cada conteúdo é lido uma vez
+OBJECT_SHA256_KEY = "input:sha256:{etag}"
+
+def content_addressed_key(sha256_hex: str) -> str:
+    return f"{CONTENT_ADDRESSED_PREFIX}{sha256_hex}"
+
+def expected_sha256(object_name: str) -> str | None:
+    """
+    Hash que o objeto deve ter, se o caminho é endereçado pelo conteúdo.
+    """
+    if object_name.startswith(CONTENT_ADDRESSED_PREFIX):
+        return object_name[len(CONTENT_ADDRESSED_PREFIX):]
+    return None
+
+def sha256_to_base64(sha256_hex: str) -> str:
+    """
+    Formato do header x-amz-checksum-sha256 (base64 do digest binário).
+    """
+    return base64.b64encode(bytes.fromhex(sha256_hex)).decode()
+
+async def object_sha256(object_name: str, head: dict) -> str:
+    """
+    SHA-256 (hex) do conteúdo do objeto: o checksum gravado pelo Storage no upload, quando existe;
+    senão, calculado lendo o objeto (uma vez por ETag).
+    """
+    stored = head.get("ChecksumSHA256")
+    # Checksum de upload multipart vem como "<base64>-<partes>" (hash dos hashes, não do conteúdo)
+    if stored and "-" not in stored:
+        return base64.b64decode(stored).hex()
+
+    cache_key = OBJECT_SHA256_KEY.format(etag=head["ETag"].strip('"'))
+    cached = await redis_async.get(cache_key)
+    if cached is not None:
+        return cached.decode()
+
+    digest = await asyncio.to_thread(storage.sha256_object, object_name)
+    await redis_async.set(cache_key, digest, ex=settings.INPUT_VALIDATION_CACHE_TTL)
+    return digest
+
+async def find_existing_upload(sha256_hex: str) -> str | None:
+    """
+    Procura um upload já existente com este conteúdo.
+    Returns:
+        O caminho no Storage, ou None (objeto ausente, ou com conteúdo que não confere com o hash).
+    """
+    object_name = content_addressed_key(sha256_hex)
+    head = await asyncio.to_thread(storage.head_object, object_name, True)
+    if head is None:
+        return None
+
+    if await object_sha256(object_name, head) != sha256_hex:
+        # Não reaproveita: o novo ticket PUT sobrescreve o objeto com o conteúdo certo
+        logger.warning(f"Upload {object_name} não confere com o próprio hash. Será substituído.")
+        return None
+
+    # Upload antigo ainda sem Job pode estar na mira da retenção (ticket + RETENTION_UPLOAD_GRACE):
+    # renova o LastModified para o novo Job ter a mesma janela de um upload recém-feito
+    age = (datetime.now(timezone.utc) - head["LastModified"]).total_seconds()
+    if age > settings.UPLOAD_TICKET_EXPIRATION:
+        await asyncio.to_thread(storage.touch_object, object_name, head.get("ContentType", "application/octet-stream"))
+
+    return object_name
@@ -0,0 +1,39 @@
+import logging
+
+from pydantic import ValidationError
+
+from app.core.queue import job_queue
+from app.core.redis_client import redis_async
+from app.schemas.worker import WorkerHeartbeat
+
+logger = logging.getLogger(__name__)
+
+# Mesmo padrão de chave usado pelo HeartbeatPublisher do vm-ia
+HEARTBEAT_PATTERN = "worker:heartbeat:*"
+
+async def load_heartbeats() -> list[WorkerHeartbeat]:
+    """
+    Heartbeats vivos dos Workers (vm-ia), ordenados por nome.
+    Cada heartbeat tem TTL no Redis: Workers mortos somem sozinhos desta lista.
+    """
+    # SCAN não bloqueia o Redis como KEYS; os valores são lidos de uma vez
+    keys = [key async for key in redis_async.scan_iter(match=HEARTBEAT_PATTERN, count=100)]
+    raw_values = await redis_async.mget(keys) if keys else []
+
+    workers: list[WorkerHeartbeat] = []
+    for raw in raw_values:
+        if raw is None: # Expirou entre o SCAN e o MGET
+            continue
+        try:
+            workers.append(WorkerHeartbeat.model_validate_json(raw))
+        except ValidationError as e:
+            logger.warning(f"Heartbeat inválido ignorado: {e}")
+
+    workers.sort(key=lambda w: w.name)
+    return workers
+
+def serves_jobs(worker: WorkerHeartbeat) -> bool:
+    """
+    Worker da fila de geração (GPU). Os da fila de conversões (só CPU) não escoam os jobs.
+    """
+    return job_queue.name in worker.queues
@@ -0,0 +1,96 @@
+import io
+import logging
+import posixpath
+import zipfile
+from typing import Iterable, Iterator
+
+from app.core.config import settings
+from app.core.storage import storage
+
+logger = logging.getLogger(__name__)
+
+# Formatos já comprimidos: entram sem compressão (deflate só gastaria CPU para ganhar ~0%)
+STORED_EXTENSIONS = {".glb", ".png", ".jpg", ".jpeg", ".webp", ".gz", ".zip", ".mp4", ".ktx2"}
+
+# Subpastas de jobs/<id>/ que não fazem parte do resultado
+EXCLUDED_DIRS = ("logs/", "converted/") # converted/: conversões sob demanda (cache, refeitas a pedido)
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Destino do ZipFile sem seek: acumula o que foi escrito até o gerador repassar ao cliente.
+    Sem seek, o zipfile grava CRC e tamanhos num descritor após cada entrada (não volta no cabeçalho).
+    """
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def take(self, min_size: int = 0) -> bytes:
+        """
+        Retira o conteúdo acumulado, se já tiver pelo menos 'min_size' bytes.
+        """
+        if not self._buffer or len(self._buffer) < min_size:
+            return b""
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+def job_export_entries(job_ids: list[str]) -> Iterator[tuple[str, str, int, tuple]]:
+    """
+    Arquivos de resultado de cada job (tudo em jobs/<id>/ menos os logs: GLB, OBJ bruto, previews...).
+    A listagem é feita job a job, conforme o ZIP avança (o primeiro byte sai sem esperar todos).
+    Yields:
+        (nome_no_zip, caminho_no_storage, tamanho, data_zip)
+    """
+    for job_id in job_ids:
+        prefix = f"jobs/{job_id}/"
+        for page in storage.list_objects(prefix):
+            for obj in page:
+                relative = obj["Key"][len(prefix):]
+                if not relative or relative.endswith("/") or relative.startswith(EXCLUDED_DIRS):
+                    continue
+                # O formato ZIP só representa datas a partir de 1980
+                date_time = max(obj["LastModified"].timetuple()[:6], (1980, 1, 1, 0, 0, 0))
+                yield f"{job_id}/{relative}", obj["Key"], obj["Size"], date_time
+
+def stream_zip(entries: Iterable[tuple[str, str, int, tuple]]) -> Iterator[bytes]:
+    """
+    Monta o ZIP sob demanda a partir dos objetos do Storage: nada vai para disco e a memória
+    fica limitada a ~EXPORT_CHUNK_SIZE por vez, independente do tamanho total.
+    O gerador só avança quando o servidor pede o próximo pedaço, ou seja, quando o cliente
+    consumiu o anterior: um cliente lento segura a leitura do MinIO (backpressure).
+    """
+    chunk_size = settings.EXPORT_CHUNK_SIZE
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, mode="w", allowZip64=True) as archive:
+        for arcname, object_name, size, date_time in entries:
+            info = zipfile.ZipInfo(arcname, date_time=date_time)
+            stored = posixpath.splitext(arcname)[1].lower() in STORED_EXTENSIONS
+            info.compress_type = zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED
+            info.file_size = size # Com o tamanho conhecido, o zipfile decide sozinho se precisa de ZIP64
+
+            try:
+                with archive.open(info, mode="w") as entry:
+                    for chunk in storage.iter_object(object_name, chunk_size):
+                        entry.write(chunk)
+                        if data := sink.take(chunk_size):
+                            yield data
+            except Exception as e:
+                # O cabeçalho já foi enviado: não há como voltar atrás, o ZIP sai truncado
+                logger.error(f"Exportação interrompida em {object_name}: {e}")
+                raise
+        if data := sink.take():
+            yield data
+    # Diretório central (escrito ao fechar o ZipFile)
+    if data := sink.take():
+        yield data
@@ -8,6 +8,7 @@ from sqlalchemy import select
 
 from app.core.config import settings
 from app.core.database import AsyncSessionLocal
+from app.core.model_registry import publish_models_version
 from app.models.user_model import User
 from app.models.ai_model import AIModel
 
@@ -39,13 +40,15 @@ async def seed_users(session):
             username=username,
             password_hash=password_hash,
             api_key=api_key,
-            is_active=True
+            is_active=True,
+            is_superuser=True
         )
         session.add(user)
     else:
         logger.info("-> Usuário existe. Atualizando credenciais (Senha/Key) para garantir consistência...")
         user.password_hash = password_hash
         user.api_key = api_key
+        user.is_superuser = True
         # O SQLAlchemy detecta a mudança e fará o UPDATE no commit
         session.add(user)
 
@@ -101,6 +104,9 @@ async def main():
             # Tudo roda numa transação. Se der erro, faz Rollback. Se der certo, faz Commit no final.
             await seed_users(session)
             await seed_models(session)
+
+    # Só depois do commit: avisa API(s) e Worker(s) para recarregarem o catálogo de modelos
+    await publish_models_version()
             
     logger.info("Seed concluído com sucesso!")
 
@@ -1,12 +1,52 @@
+import asyncio
+import contextlib
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
+from app.core.metrics import MetricsMiddleware, metrics_response
+from app.core.model_registry import run_model_registry_listener
+from app.core.outbox import run_outbox_relay
+from app.core.reaper import run_job_reaper
+from app.core.retention import run_retention_loop
+from app.core.tracing import configure_tracing, run_trace_exporter
 from app.api.api import api_router
 
+# Exportação de spans (rastreamento ponta a ponta dos Jobs)
+configure_tracing("tcc-api", settings.TRACE_EXPORT_PATH or None)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Ciclo de vida da API: sobe as tarefas de fundo no startup e as encerra no shutdown.
+    """
+    background_tasks = [
+        # Relay da outbox: publica no Redis os jobs commitados pelas rotas
+        asyncio.create_task(run_outbox_relay()),
+        # Catálogo de modelos: carrega no startup e recarrega a cada seed
+        asyncio.create_task(run_model_registry_listener()),
+        # Reaper: jobs em PROCESSING com lease vencida (Worker morto) voltam para a fila ou falham
+        asyncio.create_task(run_job_reaper()),
+    ]
+    if settings.TRACE_EXPORT_PATH:
+        # Spans ficam num buffer em memória; a gravação no arquivo sai do event loop
+        background_tasks.append(asyncio.create_task(run_trace_exporter(settings.TRACE_FLUSH_INTERVAL)))
+    if settings.RETENTION_INTERVAL > 0:
+        # Retenção do Storage: uploads órfãos e TTL por tipo de artefato
+        background_tasks.append(asyncio.create_task(run_retention_loop()))
+    yield
+    for task in background_tasks:
+        task.cancel()
+    for task in background_tasks:
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # --- Configuração de CORS (Cross-Origin Resource Sharing) ---
@@ -21,6 +61,10 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_headers=["*"],    # Permite todos os headers (Authorization, Content-Type, etc.)
     )
 
+# --- Métricas (Prometheus) ---
+# Latência por rota; exposto em GET /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Incluímos todas as rotas da API com o prefixo /api/v1
 app.include_router(api_router, prefix="/api/v1")
 
@@ -34,4 +78,12 @@ def health_check():
     Rota simples para verificar se a API está de pé.
     Futuramente pode verificar conexão com Redis/Banco.
     """
-    return {"status": "ok", "env": settings.PROJECT_NAME}
\ No newline at end of file
+    return {"status": "ok", "env": settings.PROJECT_NAME}
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """
+    Endpoint de scrape do Prometheus: latência por rota e profundidade/idade das filas RQ.
+    Rota síncrona de propósito: a leitura das filas usa o cliente Redis síncrono (roda no threadpool).
+    """
+    return metrics_response()
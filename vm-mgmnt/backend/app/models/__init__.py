@@ -3,4 +3,5 @@ from .user_model import User as User
 from .ai_model import AIModel as AIModel
 from .job_model import Job as Job
 from .artifact_model import Artifact as Artifact
-from .job_event_model import JobEvent as JobEvent
\ No newline at end of file
+from .job_event_model import JobEvent as JobEvent
+from .job_outbox_model import JobOutbox as JobOutbox
\ No newline at end of file
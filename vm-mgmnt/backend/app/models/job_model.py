@@ -2,7 +2,7 @@ import uuid
 import enum  # <--- Importante
 from datetime import datetime
 from typing import Any
-from sqlalchemy import String, Integer, Text, DateTime, ForeignKey
+from sqlalchemy import String, Integer, Text, DateTime, ForeignKey, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 
@@ -14,9 +14,14 @@ class JobStatus(str, enum.Enum):
     PROCESSING = "PROCESSING"
     SUCCEEDED = "SUCCEEDED"
     FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
 
 class Job(Base):
     __tablename__ = "jobs"
+    __table_args__ = (
+        # Índice parcial: o reaper só varre os jobs em PROCESSING (fração mínima da tabela)
+        Index("ix_jobs_processing_lease", "lease_expires_at", postgresql_where=text("status = 'PROCESSING'")),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     
@@ -33,6 +38,14 @@ class Job(Base):
     input_params: Mapped[dict[str, Any]] = mapped_column(JSONB, default=dict)
     retry_count: Mapped[int] = mapped_column(Integer, default=0)
 
+    # Rastreamento ponta a ponta (W3C trace id, 32 hex). Liga o Job aos spans exportados.
+    trace_id: Mapped[str | None] = mapped_column(String(32), nullable=True, index=True)
+
+    # Lease do Worker dono do job: renovada enquanto o job roda.
+    # Lease vencida em PROCESSING = Worker morto (o reaper da API reenfileira ou falha o job).
+    leased_by: Mapped[str | None] = mapped_column(String, nullable=True)
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
     # Timestamps do ciclo de vida
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
     started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
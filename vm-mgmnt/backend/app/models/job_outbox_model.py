@@ -0,0 +1,25 @@
+import uuid
+from datetime import datetime
+from typing import Any
+from sqlalchemy import String, DateTime, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+
+from app.models.base import Base
+
+class JobOutbox(Base):
+    """
+    Outbox transacional: cada linha é um Job que ainda precisa ser enviado para a fila (Redis).
+    É gravada na MESMA transação do Job, então um job commitado nunca fica sem enfileirar.
+    O relay da API apaga a linha depois de publicar no Redis.
+    """
+    __tablename__ = "job_outbox"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    job_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    # Cópia dos argumentos do process_job (o relay não precisa ler a tabela jobs)
+    model_id: Mapped[str] = mapped_column(String, nullable=False)
+    input_params: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False, default=dict)
+    traceparent: Mapped[str | None] = mapped_column(String, nullable=True) # Contexto de trace repassado ao Worker
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, index=True)
@@ -0,0 +1,22 @@
+import argparse
+import asyncio
+import logging
+
+from app.core.retention import run_retention
+
+# Configuração de Logs
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+async def main(dry_run: bool):
+    logger.info(f"Iniciando varredura de retenção{' (dry-run, nada será apagado)' if dry_run else ''}...")
+    report = await run_retention(dry_run=dry_run)
+    if report is None:
+        logger.warning("Outra instância está executando a retenção. Tente novamente mais tarde.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Retenção do Storage (uploads órfãos e TTL por tipo de artefato)")
+    parser.add_argument("--dry-run", action="store_true", help="Apenas relata o que seria apagado")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.dry_run))
@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from pydantic import AliasChoices, BaseModel, Field
+from typing import Any, Literal
 from uuid import UUID
 from datetime import datetime
 
@@ -13,6 +14,8 @@ class ArtifactRead(ArtifactBase):
     job_id: UUID
     storage_path: str  # Caminho interno (ex: jobs/123/output.glb)
     created_at: datetime
+    # Estatísticas da malha (só OUTPUT_MODEL). No ORM o atributo é metadata_ (nome reservado no SQLAlchemy)
+    metadata: dict[str, Any] | None = Field(None, validation_alias=AliasChoices("metadata_", "metadata"))
 
     class Config:
         from_attributes = True
@@ -21,6 +24,27 @@ class ArtifactRead(ArtifactBase):
 class ArtifactDownload(BaseModel):
     download_url: str  # A URL assinada gigante
     expires_in: int    # Tempo em segundos
+    metadata: dict[str, Any] | None = None # Estatísticas da malha (vértices, bbox, textura...), sem precisar baixar
+
+# --- Conversão de formato sob demanda (POST /jobs/{id}/conversions) ---
+class ConversionOptions(BaseModel):
+    scale: float = Field(1.0, gt=0)            # Fator de escala (ex: 1000 para metros -> milímetros no STL)
+    up_axis: Literal["y", "z"] = "y"           # Eixo "para cima" do arquivo gerado (GLB é Y-up)
+    # Só para "glb" (variantes de textura). None = padrão do Worker (jpeg, qualidade 85, resolução original)
+    texture_format: Literal["jpeg", "webp", "png"] | None = None # webp usa EXT_texture_webp
+    texture_quality: int | None = Field(None, ge=1, le=100)
+    max_texture_size: int | None = Field(None, ge=64, le=8192)   # Maior lado da textura, em pixels
+
+class ConversionRequest(BaseModel):
+    format: Literal["usdz", "ply", "stl", "obj", "glb"] # "obj" vem num ZIP com o MTL e as texturas
+    options: ConversionOptions = Field(default_factory=ConversionOptions)
+
+class ConversionResponse(BaseModel):
+    status: str                      # READY | PENDING (tente de novo em instantes) | FAILED
+    format: str
+    download_url: str | None = None  # Preenchido quando READY
+    expires_in: int | None = None
+    error: str | None = None         # Motivo da falha (FAILED)
 
 # --- schemas para Upload (PUT - Ticket de Entrada) ---
 class ArtifactUploadRequest(BaseModel):
@@ -29,12 +53,46 @@ class ArtifactUploadRequest(BaseModel):
     """
     filename: str       # Ex: "minha_textura.png"
     content_type: str   # Ex: "image/png" (Crucial para validação no MinIO)
+    # SHA-256 (hex) do conteúdo. Opcional: com ele, arquivos repetidos não são enviados de novo
+    sha256: str | None = Field(None, pattern=r"^[0-9a-fA-F]{64}$")
 
 class ArtifactUploadResponse(BaseModel):
     """
     A API responde: 'Use esta URL e guarde este caminho'
     """
-    upload_url: str     # URL assinada para o Frontend fazer PUT direto
+    upload_url: str | None # URL assinada para o Frontend fazer PUT direto (None se o upload é dispensado)
     object_name: str    # O caminho final gerado (ex: uploads/inputs/uuid.png). 
                         # IMPORTANTE: O Frontend deve enviar este valor ao criar o Job!
-    expires_in: int
\ No newline at end of file
+    expires_in: int
+    upload_required: bool = True        # False: o conteúdo já está no Storage (mesmo SHA-256)
+    checksum_sha256: str | None = None  # Valor do header x-amz-checksum-sha256 exigido no PUT
+
+# --- Upload multipart (arquivos grandes: partes em paralelo, retomáveis) ---
+class MultipartUploadRequest(BaseModel):
+    filename: str
+    content_type: str
+    size: int = Field(..., gt=0)  # Tamanho total em bytes (define a quantidade de partes)
+
+class MultipartPartUrl(BaseModel):
+    part_number: int    # Começa em 1
+    upload_url: str     # URL assinada para o PUT desta parte
+
+class MultipartUploadResponse(BaseModel):
+    upload_id: str
+    object_name: str    # Caminho final (enviar ao criar o Job, como no upload simples)
+    part_size: int      # Bytes por parte (a última pode ser menor)
+    part_count: int
+    parts: list[MultipartPartUrl]       # URLs das partes que ainda faltam enviar
+    uploaded_parts: list[int] = []      # Partes já recebidas pelo Storage (retomada)
+    expires_in: int     # Validade das URLs, em segundos
+
+class MultipartCompletePart(BaseModel):
+    part_number: int
+    etag: str           # Header ETag da resposta do PUT da parte
+
+class MultipartCompleteRequest(BaseModel):
+    # Opcional: sem a lista, a API usa as partes que o Storage já recebeu
+    parts: list[MultipartCompletePart] | None = None
+
+class MultipartCompleteResponse(BaseModel):
+    object_name: str
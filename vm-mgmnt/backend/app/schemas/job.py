@@ -35,8 +35,50 @@ class JobRead(JobBase):
     started_at: datetime | None = None
     completed_at: datetime | None = None
 
+    # Reenfileiramentos automáticos (Worker morreu durante o job)
+    retry_count: int = 0
+
+    # ID do trace (W3C) para buscar os spans do job no arquivo/Collector de traces
+    trace_id: str | None = None
+
+    # Estimativas do controle de admissão (só na criação e em GET /jobs/{id} de jobs não finalizados)
+    estimated_start: datetime | None = None
+    estimated_completion: datetime | None = None
+
     # CONFIGURAÇÃO CRÍTICA (Pydantic V2)
     # Isso diz: "Pydantic, aceite ler dados não só de dicionários, 
     # mas também de Objetos do SQLAlchemy (ORM)".
     # Sem isso, ele grita erro ao tentar converter a linha do banco para JSON.
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+# 4. JobGalleryItem: Card da Galeria
+# Junta o Job com os links assinados dos seus artefatos (modelo 3D e preview),
+# para o Frontend montar a Galeria sem chamar /download job por job.
+class JobGalleryItem(JobRead):
+    model_url: str | None = None    # URL assinada do OUTPUT_MODEL (None se ainda não existe)
+    preview_url: str | None = None  # URL assinada do PREVIEW (None se o modelo não gera)
+    expires_in: int | None = None   # Menor validade restante entre as URLs, em segundos
+    # Estatísticas do OUTPUT_MODEL (vertex_count, face_count, bbox_min/max, has_colors, texture_width/height,
+    # glb_chunks): LOD e orçamento decididos sem baixar o arquivo. None para resultados anteriores ao cálculo
+    model_metadata: dict[str, Any] | None = None
+
+
+# 5. Submissão em Lote (POST /jobs/batch)
+# Cada item é um JobCreate normal; a resposta devolve um resultado por item, na mesma ordem.
+class JobBatchCreate(BaseModel):
+    items: list[JobCreate] = Field(..., min_length=1, description="Jobs a criar (na ordem de submissão)")
+
+class JobBatchItemResult(BaseModel):
+    index: int                   # Posição do item no payload original
+    job: JobRead | None = None   # Preenchido quando o job foi criado
+    error: str | None = None     # Motivo da rejeição (ex: modelo inexistente)
+
+class JobBatchResponse(BaseModel):
+    created: int
+    failed: int
+    results: list[JobBatchItemResult]
+
+
+# 6. Exportação em ZIP (POST /jobs/export)
+class JobExportRequest(BaseModel):
+    job_ids: list[uuid.UUID] = Field(..., min_length=1, description="Jobs cujos resultados entram no ZIP")
@@ -17,6 +17,7 @@ class UserRead(BaseModel):
     id: UUID
     username: str
     is_active: bool
+    is_superuser: bool = False
 
     class Config:
         from_attributes = True # Antigo orm_mode
\ No newline at end of file
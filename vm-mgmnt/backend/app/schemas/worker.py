@@ -0,0 +1,42 @@
+from pydantic import BaseModel
+
+# --- Telemetria de GPU (vazia quando o Worker não tem GPU/NVML) ---
+class GpuSample(BaseModel):
+    index: int
+    name: str
+    utilization_percent: float
+    memory_used_bytes: int
+    memory_total_bytes: int
+
+# --- Heartbeat publicado por cada Worker (vm-ia) no Redis ---
+class WorkerHeartbeat(BaseModel):
+    name: str
+    hostname: str
+    pid: int
+    queues: list[str] = ["default"] # Filas RQ atendidas (heartbeats sem o campo: Workers só da fila de geração)
+    metrics_port: int | None = None # Porta do exporter Prometheus deste Worker
+    timestamp: float            # Epoch (segundos) da última publicação
+    state: str                  # "busy" | "idle"
+    job_id: str | None = None
+    model_id: str | None = None
+    stage: str | None = None    # download | inference | convert | upload ...
+    stage_since: float | None = None
+    cpu_percent: float
+    rss_bytes: int
+    temp_disk_used_bytes: int
+    temp_disk_total_bytes: int
+    gpus: list[GpuSample] = []
+
+# --- Visão agregada do cluster (GET /workers/cluster) ---
+class ClusterStatus(BaseModel):
+    # Contagens e GPUs: só os Workers da fila de geração (a capacidade que escoa os jobs)
+    total_workers: int
+    busy_workers: int
+    idle_workers: int
+    other_workers: int              # Workers de outras filas (ex.: conversões, só CPU)
+    total_gpus: int
+    avg_gpu_utilization_percent: float | None = None # None se nenhum Worker reporta GPU
+    gpu_memory_used_bytes: int
+    gpu_memory_total_bytes: int
+    jobs_by_model: dict[str, int]   # Jobs em execução agora, por modelo
+    workers: list[WorkerHeartbeat]  # Todos os Workers vivos, de qualquer fila (vazia para não administradores)
@@ -0,0 +1,87 @@
+"""
+Apoio dos benchmarks que passam pela API inteira (app.main via ASGI em memória, sem rede)
+com Postgres e Redis de verdade: usuário e modelo descartáveis, apagados no fim junto com os jobs.
+Rode contra um banco de desenvolvimento (ex: DATABASE_URL=...tcc_bench), nunca o de produção.
+"""
+import contextlib
+import os
+import uuid
+
+os.environ.setdefault("FIRST_SUPERUSER_USERNAME", "bench")
+os.environ.setdefault("FIRST_SUPERUSER_PASSWORD", "bench")
+os.environ.setdefault("FIRST_SUPERUSER_API_KEY", "bench")
+os.environ.setdefault("TRACE_EXPORT_PATH", "") # Sem gravação de spans em disco durante a medição
+
+import httpx
+from sqlalchemy import delete, select
+
+from app.core.database import AsyncSessionLocal, engine, sync_engine
+from app.core.model_registry import load_model_registry
+from app.models.ai_model import AIModel
+from app.models.artifact_model import Artifact
+from app.models.job_event_model import JobEvent
+from app.models.job_model import Job
+from app.models.user_model import User
+
+MODEL_ID = "bench-model"
+
+# O echo=True das engines imprimiria cada query e dominaria o tempo medido
+engine.echo = False
+sync_engine.echo = False
+
+async def ensure_model(model_id: str = MODEL_ID) -> None:
+    async with AsyncSessionLocal() as session:
+        if not await session.get(AIModel, model_id):
+            session.add(AIModel(id=model_id, name="Benchmark"))
+            await session.commit()
+    await load_model_registry()
+
+async def create_user(password_hash: str = "x", is_superuser: bool = False) -> User:
+    async with AsyncSessionLocal() as session:
+        user = User(
+            username=f"bench-{uuid.uuid4().hex[:12]}",
+            password_hash=password_hash,
+            api_key=uuid.uuid4().hex,
+            is_superuser=is_superuser,
+        )
+        session.add(user)
+        await session.commit()
+        return user
+
+async def delete_jobs_of(user_ids: list[uuid.UUID]) -> None:
+    """
+    Apaga os jobs dos usuários do benchmark (a outbox cai em cascata; artefatos e eventos antes).
+    """
+    async with AsyncSessionLocal() as session:
+        jobs = select(Job.id).where(Job.user_id.in_(user_ids))
+        await session.execute(delete(Artifact).where(Artifact.job_id.in_(jobs)))
+        await session.execute(delete(JobEvent).where(JobEvent.job_id.in_(jobs)))
+        await session.execute(delete(Job).where(Job.user_id.in_(user_ids)))
+        await session.commit()
+
+@contextlib.asynccontextmanager
+async def bench_users(count: int = 1, password_hash: str = "x", is_superuser: bool = False):
+    """
+    Usuários descartáveis (e o modelo do benchmark no catálogo), removidos com seus jobs na saída.
+    """
+    await ensure_model()
+    users = [await create_user(password_hash, is_superuser) for _ in range(count)]
+    try:
+        yield users
+    finally:
+        user_ids = [user.id for user in users]
+        await delete_jobs_of(user_ids)
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(User).where(User.id.in_(user_ids)))
+            await session.commit()
+
+def api_client(app, api_key: str | None = None, **kwargs) -> httpx.AsyncClient:
+    headers = {"x-api-key": api_key} if api_key else {}
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench/api/v1", headers=headers,
+        timeout=None, **kwargs
+    )
+
+def percentile(samples: list[float], p: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
@@ -0,0 +1,192 @@
+"""
+Validação das entradas no POST /jobs: tempo de Worker evitado numa mistura com arquivos quebrados
+e taxa de acerto do cache por ETag.
+
+Sobe --uploads imagens sintéticas em uploads/inputs/ (PNG e JPEG válidos e, numa fração --broken, arquivos
+que não são imagem, truncados, vazios, pequenos/grandes demais ou caminhos que nem existem); uma parte
+(--duplicates) repete o conteúdo de outro upload com outro nome (mesmo ETag). Depois envia --jobs POST /jobs
+sorteando entre eles (reenvios do mesmo arquivo), pela API inteira via ASGI em memória.
+
+Sem a validação, cada job recusado ocuparia um Worker de GPU até falhar: o download da entrada
+(medido aqui, do mesmo Storage) mais a partida do wrapper até abrir a imagem (--wrapper-startup,
+o início do estágio 'inference' nos jobs que falham; veja worker_stage_seconds no vm-ia).
+O relay da outbox não roda: nada chega à fila, e jobs, uploads e entradas do cache são apagados no fim.
+
+Uso (no diretório do backend, com Postgres migrado, Redis e MinIO ou outro S3 local no ar):
+    poetry run python -m benchmarks.input_validation [--jobs 500] [--uploads 150] [--broken 0.3] [--wrapper-startup 20]
+"""
+import argparse
+import asyncio
+import os
+import random
+import struct
+import time
+import uuid
+import zlib
+from collections import Counter
+
+os.environ.setdefault("ADMISSION_MAX_ACTIVE_PER_USER", "0")
+os.environ.setdefault("ADMISSION_MAX_WAIT", str(10 ** 9))
+
+from benchmarks._api import MODEL_ID, api_client, bench_users, percentile
+
+from app.api.endpoints import jobs as jobs_endpoint
+from app.core import input_validation
+from app.core.redis_client import redis_async
+from app.core.storage import storage
+from app.main import app
+
+def _png(width: int, height: int, size: int) -> bytes:
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    header = b"\x89PNG\r\n\x1a\n" + struct.pack(">I", len(ihdr)) + b"IHDR" + ihdr + struct.pack(">I", zlib.crc32(b"IHDR" + ihdr))
+    return header + os.urandom(size - len(header))
+
+def _jpeg(width: int, height: int, size: int) -> bytes:
+    # SOI + APP0 + SOF0 (altura, largura, 3 componentes)
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00"
+    sof0 = b"\xff\xc0" + struct.pack(">HBHHB", 17, 8, height, width, 3) + b"\x01\x22\x00\x02\x11\x01\x03\x11\x01"
+    header = b"\xff\xd8" + app0 + sof0
+    return header + os.urandom(size - len(header))
+
+# Tipo de entrada -> conteúdo (None = caminho sem objeto no Storage)
+VALID_KINDS = {
+    "png": lambda size: _png(1024, 1024, size),
+    "jpeg": lambda size: _jpeg(1280, 960, size),
+}
+BROKEN_KINDS = {
+    "nao_imagem": lambda size: os.urandom(size),
+    "truncada": lambda size: _png(1024, 1024, size)[:20],
+    "vazia": lambda size: b"",
+    "pequena": lambda size: _png(32, 32, size),
+    "grande": lambda size: _png(12000, 12000, size),
+    "ausente": lambda size: None,
+}
+
+def make_uploads(count: int, broken: float, duplicates: float, size: int, rng: random.Random) -> list[tuple[str, str, bytes | None]]:
+    """
+    Returns:
+        Lista de (tipo, caminho, conteúdo); duplicados repetem o conteúdo de um upload anterior.
+    """
+    uploads = []
+    for _ in range(count):
+        if uploads and rng.random() < duplicates:
+            kind, _, data = rng.choice([upload for upload in uploads if upload[2] is not None])
+        elif rng.random() < broken:
+            kind = rng.choice(list(BROKEN_KINDS))
+            data = BROKEN_KINDS[kind](size)
+        else:
+            kind = rng.choice(list(VALID_KINDS))
+            data = VALID_KINDS[kind](size)
+        uploads.append((kind, f"uploads/inputs/bench-{uuid.uuid4()}.img", data))
+    return uploads
+
+def put_uploads(uploads: list[tuple[str, str, bytes | None]]) -> set[str]:
+    etags = set()
+    for _, path, data in uploads:
+        if data is not None:
+            response = storage.s3_client.put_object(Bucket=storage.bucket_name, Key=path, Body=data)
+            etags.add(response["ETag"].strip('"'))
+    return etags
+
+def download_seconds(path: str) -> float:
+    """
+    O que o Worker gasta baixando a entrada antes de descobrir o problema (caminho ausente falha no primeiro GET).
+    """
+    started = time.perf_counter()
+    try:
+        for _ in storage.iter_object(path):
+            pass
+    except Exception:
+        pass
+    return time.perf_counter() - started
+
+def _timed(samples: list[float], function):
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await function(*args, **kwargs)
+        finally:
+            samples.append(time.perf_counter() - started)
+    return wrapper
+
+def _count_calls(counter: Counter, name: str, function):
+    if asyncio.iscoroutinefunction(function):
+        async def wrapper(*args, **kwargs):
+            counter[name] += 1
+            return await function(*args, **kwargs)
+    else:
+        def wrapper(*args, **kwargs):
+            counter[name] += 1
+            return function(*args, **kwargs)
+    return wrapper
+
+async def main(jobs: int, uploads_count: int, broken: float, duplicates: float, size_kb: int,
+               wrapper_startup: float, seed: int) -> None:
+    rng = random.Random(seed)
+    uploads = make_uploads(uploads_count, broken, duplicates, size_kb * 1024, rng)
+    etags = await asyncio.to_thread(put_uploads, uploads)
+    kinds = Counter(kind for kind, _, _ in uploads)
+    print(f"{len(uploads)} uploads de {size_kb} KB: " + ", ".join(f"{kind}={count}" for kind, count in sorted(kinds.items())))
+
+    # Leituras do cabeçalho (GET parcial) x consultas ao cache: cada GET é um miss
+    calls, validations = Counter(), []
+    original_inspect, original_read_range = input_validation._inspect, storage.read_range
+    original_validate = jobs_endpoint.validate_input_upload
+    input_validation._inspect = _count_calls(calls, "lookups", original_inspect)
+    storage.read_range = _count_calls(calls, "reads", original_read_range)
+    jobs_endpoint.validate_input_upload = _timed(validations, original_validate)
+
+    statuses, latencies, rejected = Counter(), [], []
+    try:
+        async with bench_users() as (user,):
+            async with api_client(app, user.api_key) as client:
+                for _ in range(jobs):
+                    kind, path, _ = rng.choice(uploads)
+                    started = time.perf_counter()
+                    response = await client.post("/jobs/", json={"model_id": MODEL_ID, "input_params": {"input_path": path}})
+                    latencies.append(time.perf_counter() - started)
+                    statuses[(kind, response.status_code)] += 1
+                    if response.status_code == 422:
+                        rejected.append(path)
+                    elif response.status_code != 201:
+                        raise RuntimeError(f"POST /jobs inesperado ({response.status_code}): {response.text}")
+
+        downloads = {path: await asyncio.to_thread(download_seconds, path) for path in set(rejected)}
+    finally:
+        input_validation._inspect, storage.read_range = original_inspect, original_read_range
+        jobs_endpoint.validate_input_upload = original_validate
+        await asyncio.to_thread(storage.delete_objects, [path for _, path, data in uploads if data is not None])
+        if etags:
+            await redis_async.delete(*(input_validation.VALIDATION_CACHE_KEY.format(etag=etag) for etag in etags))
+
+    accepted = sum(count for (_, code), count in statuses.items() if code == 201)
+    print(f"\n{jobs} POST /jobs: {accepted} criados, {len(rejected)} recusados com 422")
+    for kind in sorted({kind for kind, _ in statuses}):
+        codes = ", ".join(f"{code}={count}" for (k, code), count in sorted(statuses.items()) if k == kind)
+        print(f"  {kind:<11} {codes}")
+    print(f"  POST /jobs inteiro: p50 {percentile(latencies, 0.5) * 1000:.1f} ms, p99 {percentile(latencies, 0.99) * 1000:.1f} ms")
+    print(f"  só a validação:     p50 {percentile(validations, 0.5) * 1000:.1f} ms, p99 {percentile(validations, 0.99) * 1000:.1f} ms")
+
+    lookups, reads = calls["lookups"], calls["reads"]
+    print(f"\nCache por ETag: {lookups} consultas, {reads} GETs parciais no Storage "
+          f"(acerto {100 * (lookups - reads) / max(lookups, 1):.0f}%)")
+
+    download = sum(downloads[path] for path in rejected)
+    avoided = download + len(rejected) * wrapper_startup
+    print(f"\nTempo de Worker evitado: {avoided:.0f}s ({avoided / 60:.1f} min) em {len(rejected)} jobs "
+          f"= download {download:.1f}s + partida do wrapper {len(rejected)} x {wrapper_startup:.0f}s")
+    print(f"  ({100 * len(rejected) / jobs:.0f}% dos jobs não ocupam a GPU; "
+          f"custo da validação na API: {sum(validations):.1f}s somados em {jobs} requisições)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tempo de Worker evitado pela validação das entradas")
+    parser.add_argument("--jobs", type=int, default=500, help="POST /jobs enviados")
+    parser.add_argument("--uploads", type=int, default=150, help="Uploads distintos sorteados pelos jobs")
+    parser.add_argument("--broken", type=float, default=0.3, help="Fração de uploads quebrados")
+    parser.add_argument("--duplicates", type=float, default=0.2, help="Fração de uploads com o conteúdo de outro")
+    parser.add_argument("--size-kb", type=int, default=512, help="Tamanho de cada upload")
+    parser.add_argument("--wrapper-startup", type=float, default=20.0,
+                        help="Segundos do wrapper até abrir a imagem (processo, CUDA e pesos do modelo)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    asyncio.run(main(args.jobs, args.uploads, args.broken, args.duplicates, args.size_kb, args.wrapper_startup, args.seed))
@@ -0,0 +1,76 @@
+"""
+Vazão de criação de jobs: POST /jobs/batch x um POST /jobs por item.
+
+Passa pela API inteira (autenticação, catálogo, admissão, INSERTs e outbox) via ASGI em memória,
+com Postgres e Redis reais. O relay da outbox não roda: nada chega à fila dos Workers, e os jobs
+criados são apagados entre as rodadas. Os limites de admissão ficam desligados para não mascarar a vazão.
+
+Uso (no diretório do backend, com Postgres migrado e Redis no ar):
+    poetry run python -m benchmarks.job_batch [--sizes 1 100 1000] [--rounds 3] [--concurrency 1]
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("ADMISSION_MAX_ACTIVE_PER_USER", "0")
+os.environ.setdefault("ADMISSION_MAX_WAIT", str(10 ** 9))
+
+from benchmarks._api import MODEL_ID, api_client, bench_users, delete_jobs_of
+
+from app.main import app
+
+def _items(count: int) -> list[dict]:
+    return [{"model_id": MODEL_ID, "prompt": f"benchmark {i}", "input_params": {"seed": i}} for i in range(count)]
+
+async def run_batch(client, count: int) -> float:
+    started = time.perf_counter()
+    response = await client.post("/jobs/batch", json={"items": _items(count)})
+    elapsed = time.perf_counter() - started
+    response.raise_for_status()
+    assert response.json()["created"] == count, response.json()
+    return elapsed
+
+async def run_per_item(client, count: int, concurrency: int) -> float:
+    """
+    O mesmo lote, um POST /jobs por item ('concurrency' requisições em voo, como um script cliente).
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def create(item: dict) -> None:
+        async with semaphore:
+            response = await client.post("/jobs/", json=item)
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(create(item) for item in _items(count)))
+    return time.perf_counter() - started
+
+async def main(sizes: list[int], rounds: int, concurrency: int) -> None:
+    async with bench_users() as (user,):
+        async with api_client(app, user.api_key) as client:
+            await run_batch(client, 10) # Aquecimento (conexões do pool, catálogo, caches da admissão)
+            await delete_jobs_of([user.id])
+
+            print(f"{'itens':>6} {'variante':<22} {'tempo':>10} {'jobs/s':>10}")
+            for size in sizes:
+                results = {"batch": [], "per_item": []}
+                # Rodadas alternadas: a tabela jobs cresce igual para as duas variantes
+                for _ in range(rounds):
+                    results["batch"].append(await run_batch(client, size))
+                    await delete_jobs_of([user.id])
+                    results["per_item"].append(await run_per_item(client, size, concurrency))
+                    await delete_jobs_of([user.id])
+
+                batch, per_item = min(results["batch"]), min(results["per_item"])
+                print(f"{size:>6} {'POST /jobs/batch':<22} {batch * 1000:>8.1f}ms {size / batch:>10.0f}")
+                print(f"{size:>6} {f'POST /jobs x{size} (c={concurrency})':<22} {per_item * 1000:>8.1f}ms "
+                      f"{size / per_item:>10.0f}   batch {per_item / batch:.1f}x mais rápido")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vazão de POST /jobs/batch x POST /jobs por item")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 1000], help="Itens por lote")
+    parser.add_argument("--rounds", type=int, default=3, help="Rodadas por tamanho (vale a melhor)")
+    parser.add_argument("--concurrency", type=int, default=1, help="Requisições simultâneas na variante por item")
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.rounds, args.concurrency))
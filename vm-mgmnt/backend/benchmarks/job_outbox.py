@@ -0,0 +1,171 @@
+"""
+Latência do POST /jobs com a outbox transacional x o enqueue síncrono do RQ que ela substituiu.
+
+Duas cópias mínimas da rota de criação, idênticas até o commit (autenticação, INSERT do Job):
+- outbox:  grava a linha da outbox na mesma transação e só acorda o relay (que roda em segundo plano,
+           publicando no Redis numa thread);
+- enqueue: commit e depois job_queue.enqueue() síncrono dentro do handler (bloqueia o event loop
+           durante as idas ao Redis).
+'clients' requisições em voo, via ASGI em memória, com Postgres e Redis reais. Além da latência,
+mede o atraso até o job existir na fila (enqueued_at do RQ - created_at do Job).
+--redis-rtt-ms põe um proxy TCP com atraso na frente do Redis (Redis em outra máquina da rede).
+Os jobs criados saem do banco e da fila no fim.
+
+Uso (no diretório do backend, com Postgres migrado e Redis no ar):
+    poetry run python -m benchmarks.job_outbox [--requests 500] [--clients 16] [--redis-rtt-ms 2]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import threading
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlsplit, urlunsplit
+
+def _start_delay_proxy(host: str, port: int, delay: float) -> int:
+    """
+    Proxy TCP numa thread própria: cada bloco espera 'delay' segundos em cada sentido.
+    Returns:
+        Porta local do proxy.
+    """
+    loop = asyncio.new_event_loop()
+
+    async def pipe(reader, writer):
+        while data := await reader.read(65536):
+            await asyncio.sleep(delay)
+            writer.write(data)
+            await writer.drain()
+        writer.close()
+
+    async def handle(client_reader, client_writer):
+        upstream_reader, upstream_writer = await asyncio.open_connection(host, port)
+        await asyncio.gather(pipe(client_reader, upstream_writer), pipe(upstream_reader, client_writer))
+
+    server = loop.run_until_complete(asyncio.start_server(handle, "127.0.0.1", 0))
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return server.sockets[0].getsockname()[1]
+
+def _proxied_redis_url(url: str, rtt_ms: float) -> str:
+    parts = urlsplit(url)
+    proxy_port = _start_delay_proxy(parts.hostname, parts.port or 6379, rtt_ms / 2000)
+    auth = parts.netloc.rsplit("@", 1)[0] + "@" if "@" in parts.netloc else ""
+    return urlunsplit(parts._replace(netloc=f"{auth}127.0.0.1:{proxy_port}"))
+
+# O REDIS_URL é lido na importação dos clientes: o proxy precisa subir antes
+_parser = argparse.ArgumentParser(description="Latência do POST /jobs: outbox x enqueue síncrono")
+_parser.add_argument("--requests", type=int, default=500, help="Requisições por variante e rodada")
+_parser.add_argument("--clients", type=int, default=16, help="Requisições simultâneas")
+_parser.add_argument("--rounds", type=int, default=3, help="Rodadas alternadas por variante")
+_parser.add_argument("--redis-rtt-ms", type=float, default=0.0, help="Ida e volta extra até o Redis (0 = direto)")
+args = _parser.parse_args()
+if args.redis_rtt_ms and "REDIS_URL" in os.environ:
+    os.environ["REDIS_URL"] = _proxied_redis_url(os.environ["REDIS_URL"], args.redis_rtt_ms)
+
+from benchmarks._api import MODEL_ID, api_client, bench_users, delete_jobs_of, percentile # noqa: E402
+
+from fastapi import FastAPI # noqa: E402
+from rq.job import Job as RQJob # noqa: E402
+from sqlalchemy import select # noqa: E402
+
+from app.api.deps import CurrentUser, db_session # noqa: E402
+from app.core.config import settings # noqa: E402
+from app.core.database import AsyncSessionLocal # noqa: E402
+from app.core.outbox import notify_outbox, run_outbox_relay # noqa: E402
+from app.core.queue import discard_rq_jobs, job_queue, redis_conn # noqa: E402
+from app.models.job_model import Job, JobStatus # noqa: E402
+from app.models.job_outbox_model import JobOutbox # noqa: E402
+from app.schemas.job import JobCreate # noqa: E402
+
+def build_app(variant: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/api/v1/jobs/", status_code=201)
+    async def create_job(job_in: JobCreate, current_user: CurrentUser, session: db_session):
+        new_job = Job(user_id=current_user.id, model_id=job_in.model_id, status=JobStatus.QUEUED,
+                      prompt=job_in.prompt, input_params=job_in.input_params)
+        session.add(new_job)
+        await session.flush()
+
+        if variant == "outbox":
+            session.add(JobOutbox(job_id=new_job.id, model_id=new_job.model_id, input_params=new_job.input_params))
+            await session.commit()
+            notify_outbox()
+        else:
+            await session.commit()
+            job_queue.enqueue(
+                "app.worker.process_job", str(new_job.id), new_job.model_id, new_job.input_params,
+                job_timeout=settings.JOB_TIMEOUT, job_id=str(new_job.id)
+            )
+        return {"id": str(new_job.id)}
+
+    return app
+
+async def measure(app: FastAPI, api_key: str, requests: int, clients: int) -> list[float]:
+    """
+    Latência (segundos) de cada requisição, com 'clients' em voo.
+    """
+    semaphore = asyncio.Semaphore(clients)
+    samples = []
+
+    async def create(i: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post("/jobs/", json={"model_id": MODEL_ID, "prompt": f"benchmark {i}"})
+            samples.append(time.perf_counter() - started)
+            response.raise_for_status()
+
+    async with api_client(app, api_key) as client:
+        await asyncio.gather(*(create(i) for i in range(requests)))
+    return samples
+
+def _naive_utc(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+async def queue_delays(user_id) -> list[float]:
+    """
+    Segundos entre a criação de cada Job e sua chegada na fila do RQ (espera o relay drenar a outbox).
+    """
+    async with AsyncSessionLocal() as session:
+        while (await session.execute(select(JobOutbox.id).join(Job).where(Job.user_id == user_id).limit(1))).first():
+            await asyncio.sleep(0.05)
+        jobs = (await session.execute(select(Job.id, Job.created_at).where(Job.user_id == user_id))).all()
+
+    rq_jobs = await asyncio.to_thread(RQJob.fetch_many, [str(job_id) for job_id, _ in jobs], connection=redis_conn)
+    delays = [
+        (_naive_utc(rq_job.enqueued_at) - _naive_utc(created_at)).total_seconds()
+        for (_, created_at), rq_job in zip(jobs, rq_jobs) if rq_job is not None
+    ]
+    await asyncio.to_thread(discard_rq_jobs, [str(job_id) for job_id, _ in jobs])
+    return delays
+
+async def main(requests: int, clients: int, rounds: int) -> None:
+    relay = asyncio.create_task(run_outbox_relay())
+    apps = {"outbox": build_app("outbox"), "enqueue": build_app("enqueue")}
+    results = {name: ([], []) for name in apps}
+
+    async with bench_users() as (user,):
+        for name, app in apps.items(): # Aquecimento
+            await measure(app, user.api_key, 50, clients)
+            await queue_delays(user.id)
+            await delete_jobs_of([user.id])
+
+        for _ in range(rounds):
+            for name, app in apps.items():
+                latencies, delays = results[name]
+                latencies.extend(await measure(app, user.api_key, requests, clients))
+                delays.extend(await queue_delays(user.id))
+                await delete_jobs_of([user.id])
+
+    relay.cancel()
+    rtt = f"RTT extra do Redis {args.redis_rtt_ms:g} ms" if args.redis_rtt_ms else "Redis direto"
+    print(f"POST /jobs ({rounds} x {requests} requisições, {clients} em voo, {rtt})")
+    for name, (latencies, delays) in results.items():
+        print(
+            f"  {name:<8} p50 {percentile(latencies, 0.50) * 1000:7.2f} ms   p99 {percentile(latencies, 0.99) * 1000:7.2f} ms   "
+            f"média {statistics.mean(latencies) * 1000:7.2f} ms   até a fila: p50 {percentile(delays, 0.50) * 1000:6.1f} ms  "
+            f"p99 {percentile(delays, 0.99) * 1000:6.1f} ms"
+        )
+
+if __name__ == "__main__":
+    asyncio.run(main(args.requests, args.clients, args.rounds))
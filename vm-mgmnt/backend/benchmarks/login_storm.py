@@ -0,0 +1,132 @@
+"""
+Latência do GET /jobs durante uma rajada de logins (credential stuffing contra contas reais).
+
+Um usuário legítimo consulta GET /jobs/ em sequência enquanto 'attackers' clientes tentam senhas
+erradas em POST /auth/login, cada tentativa vinda de um IP diferente (X-Forwarded-For, lido como atrás
+do proxy em produção). Três cenários, cada um por --seconds:
+- sem rajada:  linha de base;
+- bcrypt inline: o login antes do pool dedicado (verificação no event loop, sem throttling);
+- atual:       bcrypt no pool dedicado com limite de vagas (503) e throttling por IP/usuário (429).
+Via ASGI em memória, com Postgres e Redis reais. As chaves de throttling criadas saem do Redis no fim.
+
+Uso (no diretório do backend, com Postgres migrado e Redis no ar):
+    poetry run python -m benchmarks.login_storm [--seconds 10] [--attackers 32] [--attacker-ips 10000]
+"""
+import argparse
+import asyncio
+import collections
+import logging
+import random
+import statistics
+import time
+
+from benchmarks._api import api_client, bench_users, percentile
+
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
+
+from app.api.endpoints import auth
+from app.core.redis_client import redis_async
+from app.core.security import get_password_hash, verify_password
+from app.main import app
+
+PASSWORD = "senha-do-benchmark"
+# Faixa reservada para testes de desempenho (RFC 2544): não colide com chaves de IPs reais no Redis
+ATTACKER_NET = "198.18"
+
+# Um aviso por tentativa bloqueada inundaria a saída
+logging.getLogger("app.core.rate_limit").setLevel(logging.ERROR)
+
+async def _inline_verify(plain_password: str, hashed_password: str) -> bool:
+    return verify_password(plain_password, hashed_password)
+
+async def _no_throttle(*args) -> None:
+    return None
+
+INLINE_LOGIN = {
+    "verify_password_async": _inline_verify,
+    "check_login_throttle": _no_throttle,
+    "register_login_failure": _no_throttle,
+    "reset_login_failures": _no_throttle,
+}
+
+async def poll_jobs(client, deadline: float) -> list[float]:
+    samples = []
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.get("/jobs/", params={"limit": 20})
+        samples.append(time.perf_counter() - started)
+        response.raise_for_status()
+        await asyncio.sleep(0.01) # ~Frontend em polling agressivo, e não um laço fechado
+    return samples
+
+async def storm(client, usernames: list[str], attacker_ips: int, deadline: float, statuses: collections.Counter) -> None:
+    while time.perf_counter() < deadline:
+        n = random.randrange(attacker_ips)
+        ip = f"{ATTACKER_NET}.{n // 256 % 256}.{n % 256}"
+        response = await client.post(
+            "/auth/login",
+            json={"username": random.choice(usernames), "password": "errada"},
+            headers={"X-Forwarded-For": ip},
+        )
+        statuses[response.status_code] += 1
+
+async def run(name: str, victim_key: str, usernames: list[str], args, with_storm: bool) -> None:
+    proxied = ProxyHeadersMiddleware(app, trusted_hosts="*")
+    deadline = time.perf_counter() + args.seconds
+    statuses = collections.Counter()
+    async with api_client(proxied, victim_key) as victim, api_client(proxied) as attacker:
+        attackers = [
+            asyncio.create_task(storm(attacker, usernames, args.attacker_ips, deadline, statuses))
+            for _ in range(args.attackers if with_storm else 0)
+        ]
+        samples = await poll_jobs(victim, deadline)
+        await asyncio.gather(*attackers)
+
+    logins = sum(statuses.values())
+    print(
+        f"  {name:<14} GET /jobs p50 {percentile(samples, 0.50) * 1000:8.1f} ms   p99 {percentile(samples, 0.99) * 1000:8.1f} ms   "
+        f"média {statistics.mean(samples) * 1000:8.1f} ms   ({len(samples)} req)"
+    )
+    if logins:
+        detail = "  ".join(f"{code}: {count}" for code, count in sorted(statuses.items()))
+        print(f"  {'':<14} logins {logins / args.seconds:6.0f}/s   {detail}")
+
+async def clear_throttle_keys(usernames: list[str]) -> None:
+    keys = [key async for key in redis_async.scan_iter(f"login:ip:{ATTACKER_NET}.*", count=1000)]
+    for username in usernames:
+        keys += [key async for key in redis_async.scan_iter(f"login:fail:{username}:*", count=1000)]
+    if keys:
+        await redis_async.delete(*keys)
+
+async def main(args) -> None:
+    password_hash = get_password_hash(PASSWORD)
+    async with bench_users(args.accounts + 1, password_hash=password_hash) as (victim, *accounts):
+        usernames = [user.username for user in accounts]
+        async with api_client(app, victim.api_key) as client: # Aquecimento
+            await client.get("/jobs/")
+
+        print(f"GET /jobs/ por {args.seconds:g}s; rajada: {args.attackers} clientes, "
+              f"{args.attacker_ips} IPs, {args.accounts} contas")
+        try:
+            await run("sem rajada", victim.api_key, usernames, args, with_storm=False)
+
+            originals = {name: getattr(auth, name) for name in INLINE_LOGIN}
+            for name, replacement in INLINE_LOGIN.items():
+                setattr(auth, name, replacement)
+            try:
+                await run("bcrypt inline", victim.api_key, usernames, args, with_storm=True)
+            finally:
+                for name, original in originals.items():
+                    setattr(auth, name, original)
+
+            await run("atual", victim.api_key, usernames, args, with_storm=True)
+        finally:
+            await clear_throttle_keys(usernames)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latência do GET /jobs durante uma rajada de logins")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Duração de cada cenário")
+    parser.add_argument("--attackers", type=int, default=32, help="Tentativas de login simultâneas")
+    parser.add_argument("--attacker-ips", type=int, default=10000, help="IPs distintos de origem das tentativas")
+    parser.add_argument("--accounts", type=int, default=20, help="Contas reais atacadas (bcrypt roda para elas)")
+    asyncio.run(main(parser.parse_args()))
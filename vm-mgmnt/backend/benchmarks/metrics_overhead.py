@@ -0,0 +1,97 @@
+"""
+Custo do middleware de métricas (Prometheus) nas rotas quentes da API.
+
+Monta duas cópias mínimas das rotas mais chamadas (polling de GET /jobs/{job_id} e /health),
+uma com e outra sem o MetricsMiddleware, e mede a latência por requisição via ASGI em memória
+(sem rede, banco ou Redis: só o que o middleware acrescenta).
+
+Uso (no diretório do backend):
+    poetry run python -m benchmarks.metrics_overhead [--requests 20000] [--rounds 5]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import uuid
+
+# O módulo de métricas importa a configuração; o benchmark não conecta em nenhum serviço
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://bench@localhost/bench")
+os.environ.setdefault("MINIO_ENDPOINT", "http://localhost:9000")
+os.environ.setdefault("MINIO_ACCESS_KEY", "bench")
+os.environ.setdefault("MINIO_SECRET_KEY", "bench")
+os.environ.setdefault("MINIO_BUCKET", "bench")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("FIRST_SUPERUSER_USERNAME", "bench")
+os.environ.setdefault("FIRST_SUPERUSER_PASSWORD", "bench")
+os.environ.setdefault("FIRST_SUPERUSER_API_KEY", "bench")
+
+import httpx
+from fastapi import FastAPI
+
+from app.core.metrics import MetricsMiddleware
+
+def build_app(with_metrics: bool) -> FastAPI:
+    app = FastAPI()
+    if with_metrics:
+        app.add_middleware(MetricsMiddleware)
+
+    @app.get("/api/v1/jobs/{job_id}")
+    async def read_job(job_id: uuid.UUID):
+        return {"id": str(job_id), "status": "PROCESSING", "progress_percent": 42}
+
+    @app.get("/api/v1/health")
+    def health_check():
+        return {"status": "ok"}
+
+    return app
+
+async def measure(app: FastAPI, path: str, requests: int) -> list[float]:
+    """
+    Latência (segundos) de cada requisição, em sequência.
+    """
+    transport = httpx.ASGITransport(app=app)
+    samples = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(min(requests // 10, 500)): # Aquecimento
+            await client.get(path)
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = await client.get(path)
+            samples.append(time.perf_counter() - start)
+            response.raise_for_status()
+    return samples
+
+def percentile(samples: list[float], p: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+async def main(requests: int, rounds: int) -> None:
+    routes = {
+        "GET /jobs/{job_id}": f"/api/v1/jobs/{uuid.uuid4()}",
+        "GET /health": "/api/v1/health",
+    }
+    apps = {"sem métricas": build_app(False), "com métricas": build_app(True)}
+
+    for label, path in routes.items():
+        results = {name: [] for name in apps}
+        # Rodadas alternadas: ruído da máquina (GC, CPU) afeta as duas variantes por igual
+        for _ in range(rounds):
+            for name, app in apps.items():
+                results[name].extend(await measure(app, path, requests))
+
+        print(f"\n{label} ({rounds} x {requests} requisições)")
+        for name, samples in results.items():
+            print(
+                f"  {name:<13} média {statistics.mean(samples) * 1e6:7.1f} us   "
+                f"p50 {percentile(samples, 0.50) * 1e6:7.1f} us   p99 {percentile(samples, 0.99) * 1e6:7.1f} us"
+            )
+        base, instrumented = statistics.median(results["sem métricas"]), statistics.median(results["com métricas"])
+        print(f"  custo do middleware (p50): {(instrumented - base) * 1e6:+.1f} us ({(instrumented / base - 1) * 100:+.1f}%)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Custo do middleware de métricas nas rotas quentes")
+    parser.add_argument("--requests", type=int, default=20000, help="Requisições por rodada e variante")
+    parser.add_argument("--rounds", type=int, default=5, help="Rodadas alternadas por variante")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.rounds))
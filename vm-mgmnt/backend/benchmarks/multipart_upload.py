@@ -0,0 +1,176 @@
+"""
+Upload de entradas grandes: PUT único (upload-ticket) x multipart com partes em paralelo.
+
+Sobe o mesmo arquivo pelo MinIO configurado (ou um stand-in S3 local), usando as URLs assinadas
+como o navegador faz:
+- single:    uma URL de put_object, o arquivo inteiro num PUT;
+- multipart: uma URL por parte, --concurrency PUTs em paralelo, depois o complete da API;
+- resume:    a conexão cai na metade (--drop-at); a retomada reenvia só as partes que faltam
+             (no PUT único, a queda recomeça do zero);
+- oversize:  uma parte maior que o declarado; o complete confere o ListParts e descarta o upload.
+--connection-mbps limita a banda de cada conexão (link de um cliente remoto); 0 = sem limite.
+
+Uso (no diretório do backend, com MinIO e Redis no ar):
+    poetry run python -m benchmarks.multipart_upload [--size-mb 256] [--concurrency 4] [--connection-mbps 100]
+"""
+import argparse
+import asyncio
+import os
+import time
+import uuid
+
+# Só MinIO e Redis são usados; banco e superusuário não são acessados
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://bench@localhost/bench")
+os.environ.setdefault("FIRST_SUPERUSER_USERNAME", "bench")
+os.environ.setdefault("FIRST_SUPERUSER_PASSWORD", "bench")
+os.environ.setdefault("FIRST_SUPERUSER_API_KEY", "bench")
+# Arquivos acima do limite das imagens de entrada (o multipart herda o INPUT_MAX_BYTES)
+os.environ.setdefault("INPUT_MAX_BYTES", str(5 * 1024 ** 3))
+
+import httpx
+
+from app.core.config import settings
+from app.core.multipart_upload import (
+    MultipartSizeError, complete_multipart_upload, sign_parts, start_multipart_upload, uploaded_parts,
+)
+from app.core.storage import storage
+
+CHUNK_SIZE = 64 * 1024
+
+async def _body(data: memoryview, mbps: float):
+    """
+    Corpo do PUT em blocos, com a banda limitada a 'mbps' (megabits/s) quando > 0.
+    """
+    started = time.perf_counter()
+    for offset in range(0, len(data), CHUNK_SIZE):
+        yield bytes(data[offset:offset + CHUNK_SIZE])
+        if mbps:
+            ahead = (offset + CHUNK_SIZE) * 8 / (mbps * 1e6) - (time.perf_counter() - started)
+            if ahead > 0:
+                await asyncio.sleep(ahead)
+
+async def _put(client: httpx.AsyncClient, url: str, data: memoryview, mbps: float, headers: dict | None = None) -> str:
+    response = await client.put(
+        url, content=_body(data, mbps), headers={**(headers or {}), "Content-Length": str(len(data))}
+    )
+    response.raise_for_status()
+    return response.headers["ETag"]
+
+async def run_single(client: httpx.AsyncClient, data: memoryview, mbps: float) -> float:
+    object_name = f"uploads/inputs/bench-{uuid.uuid4()}-single.bin"
+    url = storage.generate_presigned_upload_url(object_name, "application/octet-stream")
+    started = time.perf_counter()
+    await _put(client, url, data, mbps, headers={"Content-Type": "application/octet-stream"})
+    elapsed = time.perf_counter() - started
+    storage.delete_objects([object_name])
+    return elapsed
+
+async def _upload_parts(client: httpx.AsyncClient, session, data: memoryview, numbers: list[int],
+                        concurrency: int, mbps: float) -> int:
+    """
+    Envia as partes indicadas com 'concurrency' PUTs simultâneos; devolve os bytes enviados.
+    """
+    urls = sign_parts(session, numbers)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def put_part(number: int) -> int:
+        part = data[(number - 1) * session.part_size:number * session.part_size]
+        async with semaphore:
+            await _put(client, urls[number], part, mbps)
+        return len(part)
+
+    return sum(await asyncio.gather(*(put_part(number) for number in numbers)))
+
+async def run_multipart(client: httpx.AsyncClient, data: memoryview, concurrency: int, mbps: float) -> tuple[float, float]:
+    """
+    Returns:
+        (segundos do upload inteiro, segundos só do complete, incluindo o ListParts)
+    """
+    started = time.perf_counter()
+    session = await start_multipart_upload("bench", "multipart.bin", "application/octet-stream", len(data))
+    await _upload_parts(client, session, data, list(range(1, session.part_count + 1)), concurrency, mbps)
+    completing = time.perf_counter()
+    assert await complete_multipart_upload(session, None) == []
+    finished = time.perf_counter()
+    storage.delete_objects([session.object_name])
+    return finished - started, finished - completing
+
+async def run_resume(client: httpx.AsyncClient, data: memoryview, concurrency: int, mbps: float,
+                     drop_at: float) -> tuple[float, int]:
+    """
+    Returns:
+        (segundos, bytes enviados no total, contando o que foi enviado antes da queda)
+    """
+    started = time.perf_counter()
+    session = await start_multipart_upload("bench", "resume.bin", "application/octet-stream", len(data))
+    # Antes da queda: só as primeiras partes chegam ao Storage
+    before_drop = list(range(1, int(session.part_count * drop_at) + 1))
+    sent = await _upload_parts(client, session, data, before_drop, concurrency, mbps)
+
+    # Retomada (GET .../{upload_id}): partes recebidas pelo Storage + URLs novas para as que faltam
+    done = {part["PartNumber"] for part in await uploaded_parts(session)}
+    pending = [number for number in range(1, session.part_count + 1) if number not in done]
+    sent += await _upload_parts(client, session, data, pending, concurrency, mbps)
+    assert await complete_multipart_upload(session, None) == []
+    elapsed = time.perf_counter() - started
+    storage.delete_objects([session.object_name])
+    return elapsed, sent
+
+async def run_oversize(client: httpx.AsyncClient, data: memoryview) -> bool:
+    """
+    Cliente declara um tamanho e envia uma parte a mais de bytes pela URL assinada.
+    Returns:
+        True se o complete recusou e o upload foi abortado.
+    """
+    session = await start_multipart_upload("bench", "oversize.bin", "application/octet-stream", len(data))
+    await _upload_parts(client, session, data, list(range(1, session.part_count)), 8, 0)
+    last = session.part_count
+    bigger = memoryview(bytes(data[(last - 1) * session.part_size:]) + b"\0" * (1024 ** 2))
+    await _put(client, sign_parts(session, [last])[last], bigger, 0)
+    try:
+        await complete_multipart_upload(session, None)
+    except MultipartSizeError:
+        return not _upload_exists(session)
+    storage.delete_objects([session.object_name])
+    return False
+
+def _upload_exists(session) -> bool:
+    try:
+        storage.list_parts(session.object_name, session.upload_id)
+        return True
+    except Exception:
+        return False
+
+def _rate(size: int, seconds: float) -> str:
+    return f"{seconds:7.2f}s  {size / 1024 ** 2 / seconds:7.1f} MB/s"
+
+async def main(args) -> None:
+    data = memoryview(os.urandom(args.size_mb * 1024 ** 2))
+    limit = f"{args.connection_mbps:.0f} Mbit/s por conexão" if args.connection_mbps else "sem limite de banda"
+    print(f"Storage: {settings.MINIO_ENDPOINT}  arquivo: {args.size_mb} MB  partes: "
+          f"{settings.MULTIPART_PART_SIZE / 1024 ** 2:.0f} MB  paralelo: {args.concurrency}  ({limit})")
+
+    async with httpx.AsyncClient(timeout=None, limits=httpx.Limits(max_connections=args.concurrency * 2)) as client:
+        single = min([await run_single(client, data, args.connection_mbps) for _ in range(args.rounds)])
+        print(f"  single     {_rate(len(data), single)}")
+
+        results = [await run_multipart(client, data, args.concurrency, args.connection_mbps) for _ in range(args.rounds)]
+        multipart, complete = min(results)
+        print(f"  multipart  {_rate(len(data), multipart)}  (complete + ListParts: {complete * 1000:.0f} ms)")
+
+        resume, sent = await run_resume(client, data, args.concurrency, args.connection_mbps, args.drop_at)
+        # PUT único: o que foi enviado antes da queda se perde e o arquivo inteiro é reenviado
+        single_resent = int(len(data) * args.drop_at) + len(data)
+        print(f"  resume     {_rate(len(data), resume)}  enviados {sent / 1024 ** 2:.0f} MB "
+              f"(PUT único após a queda em {args.drop_at:.0%}: {single_resent / 1024 ** 2:.0f} MB)")
+
+        print(f"  oversize   {'recusado e abortado' if await run_oversize(client, data) else 'ACEITO'}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PUT único x multipart paralelo no MinIO")
+    parser.add_argument("--size-mb", type=int, default=256)
+    parser.add_argument("--concurrency", type=int, default=4, help="PUTs de partes simultâneos (o frontend usa 4)")
+    parser.add_argument("--connection-mbps", type=float, default=0.0, help="Banda por conexão em Mbit/s (0 = sem limite)")
+    parser.add_argument("--drop-at", type=float, default=0.5, help="Fração enviada antes da queda no cenário resume")
+    parser.add_argument("--rounds", type=int, default=3, help="Repetições de single e multipart (vale a melhor)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,132 @@
+"""
+Vazão da retenção num bucket sintético grande (~100k objetos por padrão, metade em cada fase).
+
+- uploads:   uploads órfãos em uploads/inputs/<prefixo da rodada>/, varridos pelo RetentionSweeper
+             (listagem + 1 consulta ao banco por página + DeleteObjects em lotes de 1000), em dry-run e de verdade;
+             antes, duas amostras apagadas direto: um DeleteObject por chave e storage.delete_objects
+             (DeleteObjects em lotes de 1000, sem a listagem e o banco da varredura);
+- artifacts: artefatos LOG vencidos (linhas em artifacts + objetos em jobs/<id>/logs/), apagados pelo
+             _sweep_artifacts: DeleteObjects e um DELETE em artifacts por lote de RETENTION_BATCH_SIZE.
+As varreduras ficam restritas ao prefixo e às linhas da rodada (o resto do bucket e do banco não é tocado).
+Objetos, jobs e usuário descartáveis são apagados no fim, mesmo se a medição falhar.
+
+Uso (no diretório do backend, com Postgres migrado e MinIO ou outro S3 local no ar):
+    poetry run python -m benchmarks.retention [--objects 100000] [--sample 2000] [--batch-sample 10000]
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert
+
+from benchmarks._api import MODEL_ID, bench_users
+
+from app.core.database import AsyncSessionLocal
+from app.core.retention import UPLOADS_PREFIX, RetentionSweeper
+from app.core.storage import storage
+from app.models.artifact_model import Artifact, ArtifactType
+from app.models.job_model import Job, JobStatus
+
+# Artefatos da rodada: criados "em 2000", vencidos para um corte logo depois (nenhuma linha real é tão antiga)
+ARTIFACTS_CREATED_AT = datetime(2000, 1, 1, tzinfo=timezone.utc)
+ARTIFACTS_CUTOFF = ARTIFACTS_CREATED_AT + timedelta(days=1)
+ARTIFACTS_PER_JOB = 10
+OBJECT_SIZE = 512
+
+def put_objects(keys: list[str], concurrency: int) -> float:
+    body = b"x" * OBJECT_SIZE
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        list(executor.map(lambda key: storage.s3_client.put_object(Bucket=storage.bucket_name, Key=key, Body=body), keys))
+    return len(keys) / (time.perf_counter() - started)
+
+def delete_per_key(keys: list[str]) -> float:
+    """
+    Uma requisição DeleteObject por chave (como um loop ingênuo de limpeza faria).
+    """
+    started = time.perf_counter()
+    for key in keys:
+        storage.s3_client.delete_object(Bucket=storage.bucket_name, Key=key)
+    return len(keys) / (time.perf_counter() - started)
+
+def delete_batched(keys: list[str]) -> float:
+    started = time.perf_counter()
+    failed = storage.delete_objects(keys)
+    assert not failed, failed
+    return len(keys) / (time.perf_counter() - started)
+
+def _print_report(label: str, report) -> None:
+    for name, stats in report.categories.items():
+        rate = stats.objects / max(report.elapsed, 1e-6)
+        print(f"  {label:<8} {name}: {report.scanned} analisados, {stats.objects} "
+              f"{'seriam apagados' if report.dry_run else 'apagados'} em {report.elapsed:.1f}s ({rate:.0f} objetos/s)"
+              + (f", {stats.failed} falharam" if stats.failed else ""))
+
+async def _sweep(dry_run: bool, sweep) -> object:
+    sweeper = RetentionSweeper(dry_run=dry_run)
+    await sweep(sweeper)
+    sweeper.report.elapsed = time.perf_counter() - sweeper.report.started_at
+    return sweeper.report
+
+async def run_uploads(keys: list[str], prefix: str, sample: int, batch_sample: int) -> None:
+    print(f"Uploads órfãos: {len(keys)} objetos em {prefix}")
+    print(f"  DeleteObject por chave ({sample} objetos): {delete_per_key(keys[:sample]):.0f} objetos/s")
+    batch = keys[sample:sample + batch_sample]
+    print(f"  DeleteObjects em lotes de 1000 ({len(batch)} objetos): {delete_batched(batch):.0f} objetos/s")
+
+    # Corte no futuro: todos os objetos da rodada já contam como vencidos
+    cutoff = datetime.now(timezone.utc) + timedelta(days=1)
+    for dry_run in (True, False):
+        report = await _sweep(dry_run, lambda sweeper: sweeper._sweep_unreferenced("uploads", prefix, cutoff))
+        _print_report("dry-run" if dry_run else "apagando", report)
+
+async def run_artifacts(keys: list[str], user_id: uuid.UUID) -> None:
+    print(f"Artefatos LOG vencidos: {len(keys)} linhas e objetos (lotes de DELETE e DeleteObjects)")
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as session:
+        job_ids = [uuid.uuid4() for _ in range(0, len(keys), ARTIFACTS_PER_JOB)]
+        await session.execute(insert(Job), [
+            {"id": job_id, "user_id": user_id, "model_id": MODEL_ID, "status": JobStatus.SUCCEEDED, "input_params": {}}
+            for job_id in job_ids
+        ])
+        await session.execute(insert(Artifact), [
+            {"job_id": job_ids[i // ARTIFACTS_PER_JOB], "type": ArtifactType.LOG.value, "storage_path": key,
+             "file_size_bytes": OBJECT_SIZE, "created_at": ARTIFACTS_CREATED_AT}
+            for i, key in enumerate(keys)
+        ])
+        await session.commit()
+    print(f"  {len(job_ids)} jobs e {len(keys)} artefatos inseridos em {time.perf_counter() - started:.1f}s")
+
+    for dry_run in (True, False):
+        report = await _sweep(dry_run, lambda sweeper: sweeper._sweep_artifacts(ArtifactType.LOG, ARTIFACTS_CUTOFF))
+        _print_report("dry-run" if dry_run else "apagando", report)
+
+async def main(objects: int, sample: int, batch_sample: int, concurrency: int) -> None:
+    run_id = uuid.uuid4().hex[:12]
+    prefix = f"{UPLOADS_PREFIX}bench-retention-{run_id}/"
+    upload_keys = [f"{prefix}{uuid.uuid4()}-input.png" for _ in range(objects // 2)]
+    log_keys = [f"jobs/bench-retention-{run_id}/{i:06d}/logs/model.log.gz" for i in range(objects // 2)]
+
+    try:
+        rate = await asyncio.to_thread(put_objects, upload_keys + log_keys, concurrency)
+        print(f"{objects} objetos de {OBJECT_SIZE} B criados ({rate:.0f} PUT/s, {concurrency} em paralelo)\n")
+
+        await run_uploads(upload_keys, prefix, sample, batch_sample)
+        print()
+        async with bench_users() as (user,):
+            await run_artifacts(log_keys, user.id)
+    finally:
+        # Sobras de uma rodada interrompida (DeleteObjects ignora chaves que já não existem)
+        await asyncio.to_thread(storage.delete_objects, upload_keys + log_keys)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vazão da retenção (DeleteObjects e DELETE em lote de artefatos)")
+    parser.add_argument("--objects", type=int, default=100_000, help="Objetos sintéticos (metade por fase)")
+    parser.add_argument("--sample", type=int, default=2000, help="Uploads apagados um a um, para comparação")
+    parser.add_argument("--batch-sample", type=int, default=10_000, help="Uploads apagados direto com DeleteObjects")
+    parser.add_argument("--concurrency", type=int, default=10, help="PUTs em paralelo na criação do bucket (o pool do boto3 tem 10 conexões)")
+    args = parser.parse_args()
+    asyncio.run(main(args.objects, args.sample, args.batch_sample, args.concurrency))
@@ -0,0 +1,124 @@
+"""
+Memória da exportação em ZIP (POST /jobs/export) com dezenas de GB de resultados: o stream_zip
+mantém o pico de alocações estável, independente do total exportado.
+
+Os objetos vêm de um Storage falso em memória (o mesmo bloco de dados repetido até o tamanho de cada
+objeto), com a mistura de um job típico: GLB (STORED), OBJ bruto (DEFLATED) e preview PNG (STORED).
+O ZIP é consumido e descartado pedaço a pedaço, como o StreamingResponse faz com o cliente. O pico
+do tracemalloc é amostrado a cada 10% do total; o pico de RSS do processo sai no fim.
+Com --compare, monta também um ZIP do mesmo formato inteiro num io.BytesIO (volume menor), para comparação.
+
+Uso (no diretório do backend; não acessa MinIO, banco nem Redis):
+    poetry run python -m benchmarks.zip_export [--gigabytes 10] [--compare 0.5]
+"""
+import argparse
+import io
+import os
+import resource
+import sys
+import time
+import tracemalloc
+import types
+import zipfile
+
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://bench@localhost/bench")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("MINIO_ENDPOINT", "http://localhost:9000")
+os.environ.setdefault("MINIO_ACCESS_KEY", "bench")
+os.environ.setdefault("MINIO_SECRET_KEY", "bench")
+os.environ.setdefault("MINIO_BUCKET", "bench")
+os.environ.setdefault("FIRST_SUPERUSER_USERNAME", "bench")
+os.environ.setdefault("FIRST_SUPERUSER_PASSWORD", "bench")
+os.environ.setdefault("FIRST_SUPERUSER_API_KEY", "bench")
+
+# Arquivos de um job típico: (nome, fração do tamanho do job)
+JOB_FILES = [("model.glb", 0.90), ("raw/model.obj", 0.09), ("preview.png", 0.01)]
+JOB_BYTES = 200 * 1024 ** 2
+
+class FakeStorage:
+    """
+    Stand-in do StorageClient: cada objeto é o mesmo bloco repetido até o tamanho pedido (nada é guardado por objeto).
+    Blocos aleatórios para os formatos binários e texto de vértices para o OBJ (o deflate trabalha de verdade).
+    """
+    def __init__(self, sizes: dict[str, int], block_size: int):
+        self.sizes = sizes
+        lines = b"".join(b"v %.6f %.6f %.6f\n" % tuple(os.urandom(3)) for _ in range(block_size // 24))
+        self.blocks = {".obj": lines[:block_size], "": os.urandom(block_size)}
+
+    def iter_object(self, object_name: str, chunk_size: int = 1024 * 1024):
+        block = self.blocks.get(os.path.splitext(object_name)[1], self.blocks[""])
+        remaining = self.sizes[object_name]
+        while remaining:
+            data = block[:min(chunk_size, remaining)]
+            remaining -= len(data)
+            yield data
+
+def build_entries(total_bytes: int) -> tuple[list[tuple[str, str, int, tuple]], dict[str, int]]:
+    entries, sizes = [], {}
+    for job in range(max(1, total_bytes // JOB_BYTES)):
+        for name, fraction in JOB_FILES:
+            object_name = f"jobs/{job:05d}/{name}"
+            sizes[object_name] = int(JOB_BYTES * fraction)
+            entries.append((f"{job:05d}/{name}", object_name, sizes[object_name], (2026, 1, 15, 12, 0, 0)))
+    return entries, sizes
+
+# O StorageClient de verdade confere o bucket ao ser importado: o falso entra no lugar antes do zip_export
+_storage_module = types.ModuleType("app.core.storage")
+_storage_module.storage = None # Substituído pelo FakeStorage em cada rodada
+sys.modules["app.core.storage"] = _storage_module
+
+from app.core import zip_export # noqa: E402
+from app.core.config import settings # noqa: E402
+
+def run_stream(total_bytes: int) -> None:
+    entries, sizes = build_entries(total_bytes)
+    zip_export.storage = FakeStorage(sizes, settings.EXPORT_CHUNK_SIZE)
+    total = sum(sizes.values())
+    print(f"stream_zip: {len(entries) // len(JOB_FILES)} jobs, {len(entries)} arquivos, "
+          f"{total / 1024 ** 3:.1f} GB (pedaços de {settings.EXPORT_CHUNK_SIZE / 1024 ** 2:.0f} MB)")
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    sent, next_report = 0, total / 10
+    for chunk in zip_export.stream_zip(entries):
+        sent += len(chunk)
+        if sent >= next_report:
+            _, peak = tracemalloc.get_traced_memory()
+            print(f"  {sent / 1024 ** 3:6.2f} GB enviados   pico tracemalloc {peak / 1024 ** 2:7.1f} MB")
+            next_report += total / 10
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  ZIP de {sent / 1024 ** 3:.2f} GB em {elapsed:.1f}s ({sent / 1024 ** 2 / elapsed:.0f} MB/s), "
+          f"pico tracemalloc {peak / 1024 ** 2:.1f} MB")
+
+def run_in_memory(total_bytes: int) -> None:
+    entries, sizes = build_entries(total_bytes)
+    storage = FakeStorage(sizes, settings.EXPORT_CHUNK_SIZE)
+    tracemalloc.start()
+    started = time.perf_counter()
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, mode="w", allowZip64=True) as archive:
+        for arcname, object_name, size, date_time in entries:
+            info = zipfile.ZipInfo(arcname, date_time=date_time)
+            stored = os.path.splitext(arcname)[1].lower() in zip_export.STORED_EXTENSIONS
+            info.compress_type = zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED
+            with archive.open(info, mode="w") as entry:
+                for chunk in storage.iter_object(object_name, settings.EXPORT_CHUNK_SIZE):
+                    entry.write(chunk)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"io.BytesIO: ZIP de {buffer.tell() / 1024 ** 3:.2f} GB em {elapsed:.1f}s, pico tracemalloc {peak / 1024 ** 2:.1f} MB")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memória do stream_zip exportando dezenas de GB")
+    parser.add_argument("--gigabytes", type=float, default=10.0, help="Total de resultados exportados")
+    parser.add_argument("--compare", type=float, default=0.0, help="GB do ZIP montado inteiro em memória (0 = não roda)")
+    args = parser.parse_args()
+
+    run_stream(int(args.gigabytes * 1024 ** 3))
+    if args.compare:
+        run_in_memory(int(args.compare * 1024 ** 3))
+    # ru_maxrss em KB no Linux
+    print(f"Pico de RSS do processo: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
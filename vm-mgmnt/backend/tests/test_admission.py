@@ -0,0 +1,216 @@
+import asyncio
+import math
+import statistics
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core import admission
+from app.core.admission import AdmissionDecision, QueueSnapshot, WaitEstimator
+from app.core.config import settings
+from app.models.job_model import Job, JobStatus
+from app.schemas.worker import WorkerHeartbeat
+
+NOW = datetime(2026, 1, 15, 12, 0, tzinfo=timezone.utc)
+DEFAULT_DURATION = 600.0
+
+# Histórico replayado (started_at, completed_at) dos jobs SUCCEEDED, como o _load_durations lê do banco.
+# O sf3d tem um job preso por 1 h num Worker lento: a mediana não pode se deixar levar por ele.
+HISTORY = {
+    "sf3d-v1": [(NOW - timedelta(hours=h, seconds=s), NOW - timedelta(hours=h)) for h, s in
+                [(1, 40), (2, 44), (3, 45), (4, 47), (5, 3600)]],
+    "dreamfusion-sd": [(NOW - timedelta(days=d, seconds=s), NOW - timedelta(days=d)) for d, s in
+                       [(1, 1800), (2, 2000), (3, 2100), (4, 2200)]],
+}
+
+def _replay_durations(history: dict[str, list[tuple[datetime, datetime]]]) -> dict[str, float]:
+    """
+    Mesma agregação do _load_durations: percentile_cont(0.5) de completed_at - started_at por modelo.
+    """
+    return {
+        model_id: statistics.median((completed - started).total_seconds() for started, completed in jobs)
+        for model_id, jobs in history.items()
+    }
+
+@pytest.fixture
+def estimator() -> WaitEstimator:
+    return WaitEstimator(_replay_durations(HISTORY), DEFAULT_DURATION)
+
+def test_replayed_history_durations(estimator):
+    assert estimator.duration("sf3d-v1") == 45.0
+    assert estimator.duration("dreamfusion-sd") == 2050.0
+    assert estimator.duration("modelo-sem-historico") == DEFAULT_DURATION
+
+@pytest.mark.parametrize("snapshot, expected_wait", [
+    (QueueSnapshot(), 0.0),
+    (QueueSnapshot(queued={"sf3d-v1": 10}), 450.0),
+    # Em execução: só o que falta da duração típica; o atrasado conta como 0 (não como trabalho negativo)
+    (QueueSnapshot(queued={"sf3d-v1": 10, "dreamfusion-sd": 2},
+                   running=[("sf3d-v1", 30.0), ("dreamfusion-sd", 3000.0)], workers=2), (450 + 4100 + 15) / 2),
+    (QueueSnapshot(queued={"modelo-sem-historico": 3}, workers=3), DEFAULT_DURATION),
+    # Sem heartbeat vivo: nunca divide por zero
+    (QueueSnapshot(queued={"sf3d-v1": 4}, workers=0), 180.0),
+])
+def test_estimate_wait_for_queue_depths(estimator, snapshot, expected_wait):
+    assert estimator.estimate_wait(snapshot) == pytest.approx(expected_wait)
+
+def test_estimated_start_and_completion(estimator):
+    decision = AdmissionDecision(wait_seconds=900.0, estimator=estimator, workers=2)
+
+    single = decision.estimates("dreamfusion-sd", now=NOW)
+    assert single["estimated_start"] == NOW + timedelta(seconds=900)
+    assert single["estimated_completion"] == NOW + timedelta(seconds=900 + 2050)
+
+    # Lote: os jobs anteriores do mesmo lote entram na fila antes, divididos entre os Workers
+    batched = decision.estimates("sf3d-v1", ahead=2 * 2050.0, now=NOW)
+    assert batched["estimated_start"] == NOW + timedelta(seconds=900 + 2050)
+    assert batched["estimated_completion"] == NOW + timedelta(seconds=900 + 2050 + 45)
+
+@pytest.fixture
+def admission_state(monkeypatch, estimator):
+    """
+    Caches do módulo preenchidos com o histórico e a fila do teste (sem banco nem Redis).
+    """
+    def load(snapshot: QueueSnapshot, active_jobs: int = 0):
+        monkeypatch.setattr(admission, "_durations_cache", admission._Cached(3600))
+        monkeypatch.setattr(admission, "_snapshot_cache", admission._Cached(3600))
+        admission._durations_cache.set(estimator.durations)
+        admission._snapshot_cache.set(snapshot)
+
+        async def active_jobs_of(session, user_id):
+            return active_jobs
+        monkeypatch.setattr(admission, "_active_jobs_of", active_jobs_of)
+
+    monkeypatch.setattr(settings, "ADMISSION_DEFAULT_DURATION", DEFAULT_DURATION)
+    monkeypatch.setattr(settings, "ADMISSION_MAX_WAIT", 3600)
+    monkeypatch.setattr(settings, "ADMISSION_MAX_ACTIVE_PER_USER", 50)
+    return load
+
+def _check(model_ids: list[str]) -> AdmissionDecision:
+    return asyncio.run(admission.check_admission(None, uuid.uuid4(), model_ids))
+
+@pytest.mark.parametrize("queued_dreamfusion, workers, retry_after", [
+    (1, 1, None),      # 2050 s de espera
+    (3, 2, None),      # 3075 s
+    (4, 4, None),      # 8200 s / 4 = 2050 s
+    (7, 4, None),      # 14350 s / 4 = 3587.5 s: ainda abaixo do limite
+    (2, 1, 500),       # 4100 s: 500 s acima do limite de 3600 s
+    (8, 4, 500),       # 16400 s / 4 = 4100 s
+    (30, 2, 27150),    # 61500 s / 2 = 30750 s
+])
+def test_global_wait_threshold_sets_retry_after(admission_state, queued_dreamfusion, workers, retry_after):
+    admission_state(QueueSnapshot(queued={"dreamfusion-sd": queued_dreamfusion}, workers=workers))
+    decision = _check(["sf3d-v1"])
+
+    expected_wait = queued_dreamfusion * 2050.0 / workers
+    assert decision.wait_seconds == pytest.approx(expected_wait)
+    assert decision.retry_after == retry_after
+    assert (decision.reason is None) == (retry_after is None)
+
+def test_wait_exactly_at_limit_is_admitted(admission_state):
+    # 80 jobs de 45 s num Worker = 3600 s (o limite é exclusivo)
+    admission_state(QueueSnapshot(queued={"sf3d-v1": 80}))
+    assert _check(["sf3d-v1"]).retry_after is None
+
+    admission_state(QueueSnapshot(queued={"sf3d-v1": 81}))
+    assert _check(["sf3d-v1"]).retry_after == math.ceil(81 * 45 - 3600)
+
+def test_max_wait_defaults_to_job_timeout(admission_state, monkeypatch):
+    monkeypatch.setattr(settings, "ADMISSION_MAX_WAIT", None)
+    monkeypatch.setattr(settings, "JOB_TIMEOUT", 5400)
+    admission_state(QueueSnapshot(queued={"dreamfusion-sd": 3}))
+    assert _check(["sf3d-v1"]).retry_after == math.ceil(3 * 2050 - 5400)
+
+@pytest.mark.parametrize("active_jobs, model_ids, admitted, retry_after", [
+    (49, ["dreamfusion-sd"], 1, None),
+    (50, ["dreamfusion-sd"], 0, 2050),
+    # Lote que passa do limite: entram os que cabem; uma vaga abre com o job mais curto do lote
+    (48, ["dreamfusion-sd", "sf3d-v1", "sf3d-v1"], 2, 45),
+])
+def test_per_user_limit_sets_retry_after(admission_state, active_jobs, model_ids, admitted, retry_after):
+    admission_state(QueueSnapshot(), active_jobs=active_jobs)
+    decision = _check(model_ids)
+    assert decision.admitted == admitted
+    assert decision.retry_after == retry_after
+    if retry_after is not None:
+        assert f"{active_jobs} ativos" in decision.reason
+
+def test_batch_larger_than_per_user_limit_is_partially_admitted(admission_state, monkeypatch):
+    monkeypatch.setattr(settings, "ADMISSION_MAX_WAIT", 10 ** 6)
+    admission_state(QueueSnapshot(), active_jobs=0)
+    # Lote maior que o limite por usuário, vindo de um usuário sem jobs ativos: os 50 primeiros entram
+    decision = _check(["sf3d-v1"] * (settings.ADMISSION_MAX_ACTIVE_PER_USER + 30))
+    assert decision.admitted == settings.ADMISSION_MAX_ACTIVE_PER_USER
+    assert decision.retry_after == 45
+    assert "Limite de 50 jobs ativos" in decision.reason
+
+    admission_state(QueueSnapshot(), active_jobs=20)
+    assert _check(["sf3d-v1"] * 100).admitted == 30
+
+@pytest.mark.parametrize("queued_sf3d, workers, batch, admitted", [
+    (0, 1, 80, 80),    # O 80º começa em 79 * 45 = 3555 s
+    (0, 1, 82, 81),    # O 82º começaria em 81 * 45 = 3645 s
+    (40, 1, 60, 41),   # 1800 s de fila: cabem mais 41 (o 41º começa em 3600 s)
+    (40, 2, 200, 121), # 900 s de fila; cada job do lote soma 22,5 s: o 121º começa em 3600 s
+    (81, 1, 5, 0),     # Fila já acima do limite: nenhum entra
+])
+def test_batch_own_work_counts_towards_max_wait(admission_state, monkeypatch, queued_sf3d, workers, batch, admitted):
+    monkeypatch.setattr(settings, "ADMISSION_MAX_ACTIVE_PER_USER", 0)
+    admission_state(QueueSnapshot(queued={"sf3d-v1": queued_sf3d}, workers=workers))
+    decision = _check(["sf3d-v1"] * batch)
+    assert decision.admitted == admitted
+    if admitted < batch:
+        projected = (queued_sf3d + admitted) * 45 / workers
+        assert decision.retry_after == math.ceil(projected - 3600)
+        assert decision.reason.startswith("Fila cheia")
+    else:
+        assert decision.retry_after is None
+
+def test_count_admitted_updates_cached_queue(admission_state):
+    admission_state(QueueSnapshot(queued={"dreamfusion-sd": 1}))
+    assert _check(["dreamfusion-sd"]).retry_after is None
+
+    # Rajada dentro do TTL do snapshot: os aceitos entram na conta dos próximos pedidos
+    admission.count_admitted(["dreamfusion-sd"])
+    assert _check(["dreamfusion-sd"]).retry_after == math.ceil(2 * 2050 - 3600)
+
+def test_estimate_job_for_queued_and_running(admission_state):
+    admission_state(QueueSnapshot(queued={"sf3d-v1": 3, "dreamfusion-sd": 1}, running=[("sf3d-v1", 5.0)], workers=2))
+
+    queued = Job(model_id="sf3d-v1", status=JobStatus.QUEUED)
+    estimates = asyncio.run(admission.estimate_job(queued))
+    # Fila inteira à frente menos o próprio job: (3*45 + 2050 + 40 - 45) / 2 Workers
+    wait = (3 * 45 + 2050 + 40 - 45) / 2
+    start = estimates["estimated_start"]
+    assert abs((start - datetime.now(timezone.utc)).total_seconds() - wait) < 5
+    assert estimates["estimated_completion"] - start == timedelta(seconds=45)
+
+    running = Job(model_id="dreamfusion-sd", status=JobStatus.PROCESSING, started_at=NOW)
+    assert asyncio.run(admission.estimate_job(running)) == {
+        "estimated_start": NOW,
+        "estimated_completion": NOW + timedelta(seconds=2050),
+    }
+
+    finished = Job(model_id="sf3d-v1", status=JobStatus.SUCCEEDED, started_at=NOW)
+    assert asyncio.run(admission.estimate_job(finished)) is None
+
+def _heartbeat(name: str, **fields) -> WorkerHeartbeat:
+    return WorkerHeartbeat(name=name, hostname="gpu-01", pid=1, timestamp=0.0, state="idle", cpu_percent=0.0,
+                           rss_bytes=0, temp_disk_used_bytes=0, temp_disk_total_bytes=0, **fields)
+
+@pytest.mark.parametrize("heartbeats, expected", [
+    ([], 1), # Sem Worker vivo: assume 1
+    ([_heartbeat("a", queues=["default"]), _heartbeat("b", queues=["default"])], 2),
+    # Workers de conversão (só CPU) não escoam a fila de geração
+    ([_heartbeat("a", queues=["default"]), _heartbeat("c1", queues=["conversions"]),
+      _heartbeat("c2", queues=["conversions"])], 1),
+    ([_heartbeat("a", queues=["default", "conversions"]), _heartbeat("c", queues=["conversions"])], 1),
+    # Heartbeat de um Worker anterior ao campo 'queues': só atendia a fila de geração
+    ([_heartbeat("antigo")], 1),
+])
+def test_count_workers_only_counts_job_queue(monkeypatch, heartbeats, expected):
+    async def load_heartbeats():
+        return heartbeats
+    monkeypatch.setattr(admission, "load_heartbeats", load_heartbeats)
+    assert asyncio.run(admission._count_workers()) == expected
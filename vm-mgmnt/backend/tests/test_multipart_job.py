@@ -0,0 +1,125 @@
+import asyncio
+import os
+import struct
+import uuid
+import zlib
+
+import httpx
+import pytest
+from sqlalchemy import delete, select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.core.model_registry import load_model_registry
+from app.core.redis_client import redis_async
+from app.core.storage import storage
+from app.main import app
+from app.models.ai_model import AIModel
+from app.models.artifact_model import Artifact, ArtifactType
+from app.models.job_event_model import JobEvent
+from app.models.job_model import Job
+from app.models.user_model import User
+
+MODEL_ID = "multipart-test"
+
+def _png(width: int, height: int, size: int) -> bytes:
+    """
+    PNG de 'size' bytes: assinatura + IHDR reais (o que a validação lê) e o resto preenchendo as partes.
+    """
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    chunk = struct.pack(">I", len(ihdr)) + b"IHDR" + ihdr + struct.pack(">I", zlib.crc32(b"IHDR" + ihdr))
+    header = b"\x89PNG\r\n\x1a\n" + chunk
+    return header + os.urandom(size - len(header))
+
+def _client(api_key: str) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test/api/v1",
+                             headers={"x-api-key": api_key}, timeout=60)
+
+async def _services_available() -> str | None:
+    try:
+        async with AsyncSessionLocal() as session:
+            await session.execute(select(1))
+        await redis_async.ping()
+        await asyncio.to_thread(storage.s3_client.head_bucket, Bucket=settings.MINIO_BUCKET)
+    except Exception as e:
+        return f"Postgres/Redis/Storage indisponíveis: {e}"
+    return None
+
+async def _upload_multipart(client: httpx.AsyncClient, data: bytes) -> str:
+    """
+    Fluxo do navegador: ticket, PUT de cada parte na URL assinada e complete pela API.
+    """
+    response = await client.post("/jobs/upload-ticket/multipart",
+                                 json={"filename": "grande.png", "content_type": "image/png", "size": len(data)})
+    assert response.status_code == 200, response.text
+    ticket = response.json()
+    assert ticket["part_count"] > 1
+
+    async with httpx.AsyncClient(timeout=60) as storage_client:
+        for part in ticket["parts"]:
+            start = (part["part_number"] - 1) * ticket["part_size"]
+            put = await storage_client.put(part["upload_url"], content=data[start:start + ticket["part_size"]])
+            put.raise_for_status()
+
+    response = await client.post(f"/jobs/upload-ticket/multipart/{ticket['upload_id']}/complete", json={})
+    assert response.status_code == 200, response.text
+    return response.json()["object_name"]
+
+async def _scenario() -> None:
+    reason = await _services_available()
+    if reason:
+        pytest.skip(reason)
+
+    async with AsyncSessionLocal() as session:
+        if not await session.get(AIModel, MODEL_ID):
+            session.add(AIModel(id=MODEL_ID, name="Multipart test"))
+        user = User(username=f"multipart-{uuid.uuid4().hex[:8]}", password_hash="x", api_key=uuid.uuid4().hex)
+        session.add(user)
+        await session.commit()
+    await load_model_registry()
+
+    try:
+        async with _client(user.api_key) as client:
+            # Entrada grande o bastante para várias partes, dentro do limite da validação do Job
+            data = _png(1024, 768, 2 * settings.MULTIPART_PART_SIZE + 4096)
+            assert len(data) <= settings.INPUT_MAX_BYTES
+            object_name = await _upload_multipart(client, data)
+
+            response = await client.post("/jobs/", json={"model_id": MODEL_ID, "input_params": {"input_path": object_name}})
+            assert response.status_code == 201, response.text
+            job_id = uuid.UUID(response.json()["id"])
+
+            async with AsyncSessionLocal() as session:
+                artifact = (await session.execute(
+                    select(Artifact).where(Artifact.job_id == job_id, Artifact.type == ArtifactType.INPUT)
+                )).scalar_one()
+            assert (artifact.storage_path, artifact.file_size_bytes) == (object_name, len(data))
+
+            # Acima do limite da entrada: recusado já no ticket, antes de qualquer parte subir
+            response = await client.post("/jobs/upload-ticket/multipart", json={
+                "filename": "enorme.png", "content_type": "image/png", "size": settings.INPUT_MAX_BYTES + 1
+            })
+            assert response.status_code == 413
+    finally:
+        async with AsyncSessionLocal() as session:
+            jobs = select(Job.id).where(Job.user_id == user.id)
+            await session.execute(delete(Artifact).where(Artifact.job_id.in_(jobs)))
+            await session.execute(delete(JobEvent).where(JobEvent.job_id.in_(jobs)))
+            await session.execute(delete(Job).where(Job.user_id == user.id))
+            await session.execute(delete(User).where(User.id == user.id))
+            await session.commit()
+        # Conexões presas a este event loop não servem para os próximos testes
+        await engine.dispose()
+        await redis_async.connection_pool.disconnect()
+
+def test_job_from_completed_multipart_upload():
+    asyncio.run(_scenario())
+
+def test_multipart_limit_follows_input_limit(monkeypatch):
+    monkeypatch.setenv("INPUT_MAX_BYTES", str(10 * 1024 ** 2))
+    monkeypatch.delenv("MULTIPART_MAX_BYTES", raising=False)
+    assert type(settings)().MULTIPART_MAX_BYTES == 10 * 1024 ** 2
+
+    monkeypatch.setenv("MULTIPART_MAX_BYTES", str(20 * 1024 ** 2))
+    with pytest.raises(ValueError, match="INPUT_MAX_BYTES"):
+        type(settings)()
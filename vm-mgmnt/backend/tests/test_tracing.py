@@ -0,0 +1,87 @@
+import asyncio
+import importlib.util
+import json
+from pathlib import Path
+
+import pytest
+
+from app.core import tracing
+
+# Cópia do Worker: spans que atravessam API -> Redis -> Worker precisam do mesmo formato nos dois lados
+WORKER_TRACING = Path(__file__).resolve().parents[3] / "vm-ia" / "app" / "core" / "tracing.py"
+
+@pytest.fixture
+def worker_tracing():
+    if not WORKER_TRACING.exists():
+        pytest.skip("vm-ia não está ao lado do backend neste checkout")
+    spec = importlib.util.spec_from_file_location("worker_tracing", WORKER_TRACING)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+@pytest.fixture(autouse=True)
+def reset_tracing():
+    yield
+    tracing.flush_spans()
+    tracing.configure_tracing("tcc", None)
+
+def _export_fixed_span(module, path: Path) -> dict:
+    module.configure_tracing("tcc-test", str(path))
+    span = module.start_span(
+        "api.create_job", {"job.id": "abc", "retry": 2, "ok": True, "ratio": 0.5},
+        traceparent="00-" + "a" * 32 + "-" + "b" * 16 + "-01", start_ns=1_000
+    )
+    span.span_id = "c" * 16
+    span.error = "RuntimeError: boom"
+    span.end(end_ns=2_000)
+    if hasattr(module, "flush_spans"):
+        module.flush_spans()
+    return json.loads(path.read_text().splitlines()[-1])
+
+def test_same_otlp_line_as_worker(tmp_path, worker_tracing):
+    api_line = _export_fixed_span(tracing, tmp_path / "api.jsonl")
+    worker_line = _export_fixed_span(worker_tracing, tmp_path / "worker.jsonl")
+    assert api_line == worker_line
+
+def test_same_traceparent_as_worker(worker_tracing):
+    traceparent = "00-" + "1" * 32 + "-" + "2" * 16 + "-01"
+    for value in (traceparent, "00-curto-2-01", None, ""):
+        assert tracing.parse_traceparent(value) == worker_tracing.parse_traceparent(value)
+
+    span = tracing.start_span("api.x", traceparent=traceparent)
+    assert worker_tracing.parse_traceparent(span.traceparent) == (span.trace_id, span.span_id)
+
+def test_end_does_not_write_until_flush(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    tracing.configure_tracing("tcc-test", str(path))
+    for i in range(3):
+        tracing.start_span(f"api.span{i}").end()
+
+    assert not path.exists()
+    assert tracing.flush_spans() == 3
+    assert len(path.read_text().splitlines()) == 3
+    assert tracing.flush_spans() == 0
+
+def test_exporter_flushes_in_background_and_on_shutdown(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    tracing.configure_tracing("tcc-test", str(path))
+
+    async def scenario():
+        exporter = asyncio.create_task(tracing.run_trace_exporter(0.01))
+        tracing.start_span("api.periodic").end()
+        await asyncio.sleep(0.1)
+        periodic = len(path.read_text().splitlines())
+
+        tracing.start_span("api.shutdown").end()
+        exporter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await exporter
+        return periodic
+
+    assert asyncio.run(scenario()) == 1
+    assert len(path.read_text().splitlines()) == 2
+
+def test_disabled_exporter_drops_spans(tmp_path):
+    tracing.configure_tracing("tcc-test", None)
+    tracing.start_span("api.ignored").end()
+    assert tracing.flush_spans() == 0
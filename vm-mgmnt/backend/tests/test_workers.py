@@ -0,0 +1,32 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.api.endpoints import workers
+from app.schemas.worker import GpuSample, WorkerHeartbeat
+
+HEARTBEATS = [
+    WorkerHeartbeat(name="gpu-01.1", hostname="gpu-01", pid=4242, metrics_port=9101, timestamp=0.0, state="busy",
+                    job_id="3f1c", model_id="sf3d-v1", cpu_percent=90.0, rss_bytes=1, temp_disk_used_bytes=0,
+                    temp_disk_total_bytes=0, gpus=[GpuSample(index=0, name="A100", utilization_percent=80.0,
+                                                             memory_used_bytes=10, memory_total_bytes=40)]),
+    WorkerHeartbeat(name="cpu-01.1", hostname="cpu-01", pid=7, queues=["conversions"], timestamp=0.0, state="idle",
+                    cpu_percent=0.0, rss_bytes=1, temp_disk_used_bytes=0, temp_disk_total_bytes=0),
+]
+
+@pytest.fixture(autouse=True)
+def heartbeats(monkeypatch):
+    async def load_heartbeats():
+        return HEARTBEATS
+    monkeypatch.setattr(workers, "load_heartbeats", load_heartbeats)
+
+@pytest.mark.parametrize("is_superuser, expected_workers", [(True, HEARTBEATS), (False, [])])
+def test_worker_details_are_restricted_to_admins(is_superuser, expected_workers):
+    cluster = asyncio.run(workers.get_cluster_status(SimpleNamespace(is_superuser=is_superuser)))
+
+    # Os agregados (usados pelo painel de todos os usuários) não dependem do papel
+    assert (cluster.total_workers, cluster.busy_workers, cluster.other_workers) == (1, 1, 1)
+    assert cluster.avg_gpu_utilization_percent == 80.0
+    assert cluster.jobs_by_model == {"sf3d-v1": 1}
+    assert cluster.workers == expected_workers
@@ -0,0 +1,60 @@
+import io
+import os
+import zipfile
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core import zip_export
+
+OBJECTS = {
+    "jobs/a1/model.glb": os.urandom(3 * 1024 ** 2 + 17),
+    "jobs/a1/preview.png": os.urandom(40_000),
+    "jobs/a1/raw/model.obj": b"v 0.1 0.2 0.3\nf 1 2 3\n" * 50_000,
+    "jobs/a1/logs/model.log.gz": b"log",
+    "jobs/a1/converted/model.fbx": b"fbx",
+    "jobs/b2/model.glb": b"",
+}
+
+class FakeStorage:
+    def list_objects(self, prefix: str):
+        # Duas páginas, como o paginador do S3
+        keys = sorted(key for key in OBJECTS if key.startswith(prefix))
+        page = [{"Key": key, "Size": len(OBJECTS[key]), "LastModified": datetime(2026, 1, 15, 12, 0, tzinfo=timezone.utc)}
+                for key in keys]
+        yield page[:2]
+        yield page[2:]
+
+    def iter_object(self, object_name: str, chunk_size: int = 1024 * 1024):
+        data = OBJECTS[object_name]
+        for start in range(0, len(data), chunk_size):
+            yield data[start:start + chunk_size]
+
+@pytest.fixture(autouse=True)
+def fake_storage(monkeypatch):
+    monkeypatch.setattr(zip_export, "storage", FakeStorage())
+    # Pedaços pequenos: o ZIP sai em vários yields, inclusive no meio das entradas
+    monkeypatch.setattr(zip_export.settings, "EXPORT_CHUNK_SIZE", 64 * 1024)
+
+def test_export_entries_skip_logs_and_conversions():
+    entries = list(zip_export.job_export_entries(["a1", "b2"]))
+    assert [arcname for arcname, *_ in entries] == ["a1/model.glb", "a1/preview.png", "a1/raw/model.obj", "b2/model.glb"]
+    assert all(size == len(OBJECTS[key]) for _, key, size, _ in entries)
+
+def test_stream_zip_is_a_valid_archive():
+    chunks = list(zip_export.stream_zip(zip_export.job_export_entries(["a1", "b2"])))
+    assert len(chunks) > 1
+
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+        assert archive.testzip() is None
+        infos = {info.filename: info for info in archive.infolist()}
+        assert set(infos) == {"a1/model.glb", "a1/preview.png", "a1/raw/model.obj", "b2/model.glb"}
+        for arcname, info in infos.items():
+            assert archive.read(arcname) == OBJECTS[f"jobs/{arcname}"]
+            assert info.date_time == (2026, 1, 15, 12, 0, 0)
+
+        # GLB e PNG já são comprimidos: entram como STORED; o OBJ (texto) é comprimido
+        assert infos["a1/model.glb"].compress_type == zipfile.ZIP_STORED
+        assert infos["a1/preview.png"].compress_type == zipfile.ZIP_STORED
+        assert infos["a1/raw/model.obj"].compress_type == zipfile.ZIP_DEFLATED
+        assert infos["a1/raw/model.obj"].compress_size < infos["a1/raw/model.obj"].file_size